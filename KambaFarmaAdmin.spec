@@ -10,7 +10,7 @@ _hiddenimports = collect_submodules('models.admindashboard')
 # Collect all files (py, resources) under src/models/admindashboard and preserve subfolders
 _extra_datas = []
 for p in Path('src/models/admindashboard').rglob('*'):
-    if p.is_file():
+    if p.is_file() and '__pycache__' not in p.parts:
         # Place files under the same relative path inside the bundle
         rel = p.relative_to('src/models/admindashboard')
         dest = Path('models/admindashboard') / rel
@@ -25,7 +25,9 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Nada disto é usado (os gráficos são desenhados com QPainter, src/utils/charts.py).
+    excludes=['tkinter', 'matplotlib', 'numpy', 'IPython', 'pytest',
+              'PyQt5.QtWebEngineWidgets', 'PyQt5.QtQml', 'PyQt5.QtQuick'],
     noarchive=False,
     optimize=0,
 )
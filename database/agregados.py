@@ -0,0 +1,252 @@
+"""Tabelas de totais diários e mensais mantidas por triggers.
+
+``vendas_diarias``/``vendas_mensais`` (por dia/mês de ``vendas.data_venda``)
+e ``financas_diarias``/``financas_mensais`` (por dia/mês, ``tipo`` e
+``categoria`` de ``transacoes_financeiras``; ``''`` = sem categoria) guardam
+o total e o número de registos; ``vendas_produtos`` guarda a quantidade
+vendida de cada produto (``itens_venda``). Os
+triggers de INSERT, UPDATE e DELETE das tabelas de origem mantêm-nas
+atualizadas na mesma transação, por isso os relatórios de um mês ou de um
+ano leem no máximo uma linha por dia em vez de todas as vendas/transações.
+
+``reconstruir_agregados`` volta a calcular tudo a partir das tabelas de
+origem (``scripts/rebuild_aggregates.py``), por exemplo depois de uma
+importação feita com os triggers desligados.
+
+``vendas_periodo``/``financas_periodo`` somam um período qualquer
+``[início, fim)``: os meses inteiros vêm das tabelas mensais e só os dias
+soltos nas pontas das diárias, por isso o custo não depende do número de
+vendas nem do comprimento do período.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from .db import transaction
+
+# tabela agregada -> (tabela de origem, colunas da chave, expressões da chave
+#                     sobre a linha de origem, expressão do valor, contador)
+_AGREGADOS = {
+    "vendas_diarias": ("vendas", ("dia",), ("DATE({r}.data_venda)",), "{r}.total", "num_vendas"),
+    "vendas_mensais": ("vendas", ("mes",), ("strftime('%Y-%m', {r}.data_venda)",), "{r}.total", "num_vendas"),
+    "financas_diarias": ("transacoes_financeiras", ("dia", "tipo", "categoria"),
+                         ("DATE({r}.data_transacao)", "{r}.tipo", "COALESCE({r}.categoria, '')"),
+                         "{r}.valor", "num_transacoes"),
+    "financas_mensais": ("transacoes_financeiras", ("mes", "tipo", "categoria"),
+                         ("strftime('%Y-%m', {r}.data_transacao)", "{r}.tipo", "COALESCE({r}.categoria, '')"),
+                         "{r}.valor", "num_transacoes"),
+    "vendas_produtos": ("itens_venda", ("produto_id",), ("{r}.produto_id",), "{r}.quantidade", "num_itens"),
+}
+
+# colunas da chave que não são texto
+_TIPOS_CHAVE = {"produto_id": "INTEGER"}
+
+# colunas alteradas que obrigam a mover a linha entre agregados
+_COLUNAS_UPDATE = {
+    "vendas": "data_venda, total",
+    "transacoes_financeiras": "data_transacao, tipo, categoria, valor",
+    "itens_venda": "produto_id, quantidade",
+}
+
+
+def _criar_tabela(nome: str) -> str:
+    _, chaves, _, _, contador = _AGREGADOS[nome]
+    colunas = ",\n    ".join(f"{c} {_TIPOS_CHAVE.get(c, 'TEXT')} NOT NULL" for c in chaves)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {nome} (\n"
+        f"    {colunas},\n"
+        f"    total REAL NOT NULL DEFAULT 0,\n"
+        f"    {contador} INTEGER NOT NULL DEFAULT 0,\n"
+        f"    PRIMARY KEY ({', '.join(chaves)})\n"
+        f") WITHOUT ROWID"
+    )
+
+
+def _somar(nome: str, linha: str) -> str:
+    """Instrução do trigger que junta a linha ``NEW``/``OLD`` ao agregado."""
+    _, chaves, exprs, valor, contador = _AGREGADOS[nome]
+    exprs = [e.format(r=linha) for e in exprs]
+    # a chave da data (ou do produto) é a primeira: linhas sem ela não são agregadas
+    return (
+        f"INSERT INTO {nome} ({', '.join(chaves)}, total, {contador}) "
+        f"SELECT {', '.join(exprs)}, COALESCE({valor.format(r=linha)}, 0), 1 "
+        f"WHERE {exprs[0]} IS NOT NULL "
+        f"ON CONFLICT ({', '.join(chaves)}) DO UPDATE SET "
+        f"total = total + excluded.total, {contador} = {contador} + 1;"
+    )
+
+
+def _subtrair(nome: str, linha: str) -> str:
+    _, chaves, exprs, valor, contador = _AGREGADOS[nome]
+    onde = " AND ".join(f"{c} = {e.format(r=linha)}" for c, e in zip(chaves, exprs))
+    return (
+        f"UPDATE {nome} SET total = total - COALESCE({valor.format(r=linha)}, 0), "
+        f"{contador} = {contador} - 1 WHERE {onde};\n"
+        f"    DELETE FROM {nome} WHERE {onde} AND {contador} <= 0;"
+    )
+
+
+def _triggers(origem: str) -> List[str]:
+    tabelas = [nome for nome, definicao in _AGREGADOS.items() if definicao[0] == origem]
+    inserir = "\n    ".join(_somar(t, "NEW") for t in tabelas)
+    apagar = "\n    ".join(_subtrair(t, "OLD") for t in tabelas)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{origem}_agregados_ins AFTER INSERT ON {origem}\n"
+        f"BEGIN\n    {inserir}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{origem}_agregados_del AFTER DELETE ON {origem}\n"
+        f"BEGIN\n    {apagar}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{origem}_agregados_upd "
+        f"AFTER UPDATE OF {_COLUNAS_UPDATE[origem]} ON {origem}\n"
+        f"BEGIN\n    {apagar}\n    {inserir}\nEND",
+    ]
+
+
+def remover_agregados(conn, origem: str):
+    """Apaga as tabelas agregadas de ``origem`` e os seus triggers.
+
+    Usado quando a chave de um agregado muda: ``criar_agregados`` e
+    ``reconstruir_agregados`` voltam a criá-los com a definição atual.
+    """
+    for evento in ("ins", "del", "upd"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_{origem}_agregados_{evento}")
+    for nome, definicao in _AGREGADOS.items():
+        if definicao[0] == origem:
+            conn.execute(f"DROP TABLE IF EXISTS {nome}")
+
+
+def criar_agregados(conn):
+    """Cria as tabelas agregadas e os triggers (idempotente)."""
+    for nome in _AGREGADOS:
+        conn.execute(_criar_tabela(nome))
+    # produtos mais vendidos sem ordenar a tabela toda
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vendas_produtos_total ON vendas_produtos(total)")
+    for origem in _COLUNAS_UPDATE:
+        for sql in _triggers(origem):
+            conn.execute(sql)
+
+
+def reconstruir_agregados() -> Dict[str, int]:
+    """Recalcula todas as tabelas agregadas; devolve o número de linhas de cada.
+
+    Dentro de outra transação (ex.: numa migração) junta-se a ela.
+    """
+    linhas = {}
+    with transaction(immediate=True) as conn:
+        for nome, (origem, chaves, exprs, valor, contador) in _AGREGADOS.items():
+            exprs = [e.format(r=origem) for e in exprs]
+            conn.execute(f"DELETE FROM {nome}")
+            conn.execute(
+                f"INSERT INTO {nome} ({', '.join(chaves)}, total, {contador}) "
+                f"SELECT {', '.join(exprs)}, COALESCE(SUM({valor.format(r=origem)}), 0), COUNT(*) "
+                f"FROM {origem} WHERE {exprs[0]} IS NOT NULL "
+                f"GROUP BY {', '.join(exprs)}"
+            )
+            linhas[nome] = conn.execute(f"SELECT COUNT(*) FROM {nome}").fetchone()[0]
+    return linhas
+
+
+# =========================================================
+# Leitura
+# =========================================================
+def vendas_por_dia(conn, inicio: str, fim: str) -> Dict[str, float]:
+    """Total de vendas de cada dia com ``inicio <= dia < fim`` (yyyy-MM-dd)."""
+    return dict(conn.execute(
+        "SELECT dia, total FROM vendas_diarias WHERE dia >= ? AND dia < ?", (inicio, fim)
+    ).fetchall())
+
+
+def total_vendas_mes(conn, mes: str) -> float:
+    """Total de vendas do mês ``mes`` (yyyy-MM)."""
+    row = conn.execute("SELECT total FROM vendas_mensais WHERE mes = ?", (mes,)).fetchone()
+    return row[0] if row else 0.0
+
+
+def totais_financas(conn, mes: str = None, dia: str = None) -> Dict[str, float]:
+    """Total por ``tipo`` de transação no mês ``mes`` ou no dia ``dia``."""
+    if dia is not None:
+        rows = conn.execute("SELECT tipo, SUM(total) FROM financas_diarias WHERE dia = ? GROUP BY tipo", (dia,))
+    else:
+        rows = conn.execute("SELECT tipo, SUM(total) FROM financas_mensais WHERE mes = ? GROUP BY tipo", (mes,))
+    return dict(rows.fetchall())
+
+
+def mais_vendidos(conn, limite: int) -> List[Tuple[Optional[str], float]]:
+    """``(nome, quantidade vendida)`` dos ``limite`` produtos mais vendidos."""
+    return conn.execute(
+        """
+        SELECT p.nome_comercial, vp.total
+        FROM vendas_produtos vp
+        LEFT JOIN produtos p ON p.id = vp.produto_id
+        ORDER BY vp.total DESC
+        LIMIT ?
+        """,
+        (limite,),
+    ).fetchall()
+
+
+def total_vendas_dia(conn, dia: str) -> float:
+    """Total de vendas do dia ``dia`` (yyyy-MM-dd)."""
+    row = conn.execute("SELECT total FROM vendas_diarias WHERE dia = ?", (dia,)).fetchone()
+    return row[0] if row else 0.0
+
+
+
+def _mes_seguinte(dia: str) -> str:
+    ano, mes = int(dia[:4]), int(dia[5:7])
+    return f"{ano + 1}-01-01" if mes == 12 else f"{ano}-{mes + 1:02d}-01"
+
+
+def dividir_periodo(inicio: Optional[str], fim: Optional[str]):
+    """Divide ``[inicio, fim)`` (yyyy-MM-dd) em dias soltos e meses inteiros.
+
+    Devolve ``(intervalos de dias, intervalo de meses)``: até dois intervalos
+    ``[dia, dia)`` nas pontas e ``(mês inicial, mês final exclusivo)`` (yyyy-MM),
+    ou ``None`` se o período não tiver nenhum mês inteiro. Um limite ``None``
+    deixa o período aberto desse lado.
+    """
+    inicio, fim = inicio and inicio[:10], fim and fim[:10]
+    inicio_meses = inicio if inicio is None or inicio[8:] == "01" else _mes_seguinte(inicio)
+    fim_meses = fim if fim is None or fim[8:] == "01" else fim[:8] + "01"
+    if inicio_meses is not None and fim_meses is not None and inicio_meses >= fim_meses:
+        return [(inicio, fim)], None
+    dias = [(a, b) for a, b in ((inicio, inicio_meses), (fim_meses, fim)) if a != b]
+    return dias, (inicio_meses and inicio_meses[:7], fim_meses and fim_meses[:7])
+
+
+def _intervalo(coluna: str, inicio: Optional[str], fim: Optional[str]) -> Tuple[str, list]:
+    condicoes = [f"{coluna} {op} ?" for op, limite in ((">=", inicio), ("<", fim)) if limite]
+    return " AND ".join(condicoes) or "1", [limite for limite in (inicio, fim) if limite]
+
+
+def _ler_periodo(conn, diaria: str, mensal: str, colunas: str, inicio, fim) -> List[tuple]:
+    """Linhas ``(colunas..., total)`` de ``[inicio, fim)`` nas tabelas ``diaria``/``mensal``.
+
+    Sem ``colunas`` devolve uma só linha com o total do período.
+    """
+    dias, meses = dividir_periodo(inicio, fim)
+    selecao = f"{colunas}, " if colunas else ""
+    partes, params = [], []
+    for a, b in dias:
+        partes.append(f"SELECT {selecao}total FROM {diaria} WHERE dia >= ? AND dia < ?")
+        params += [a, b]
+    if meses is not None:
+        condicao, limites = _intervalo("mes", *meses)
+        partes.append(f"SELECT {selecao}total FROM {mensal} WHERE {condicao}")
+        params += limites
+    agrupar = f" GROUP BY {colunas}" if colunas else ""
+    return conn.execute(
+        f"SELECT {selecao}SUM(total) FROM ({' UNION ALL '.join(partes)}){agrupar}", params
+    ).fetchall()
+
+
+def vendas_periodo(conn, inicio: Optional[str] = None, fim: Optional[str] = None) -> float:
+    """Total de vendas de ``inicio <= dia < fim`` (yyyy-MM-dd; ``None`` = sem limite)."""
+    return _ler_periodo(conn, "vendas_diarias", "vendas_mensais", "", inicio, fim)[0][0] or 0.0
+
+
+def financas_periodo(conn, inicio: Optional[str] = None, fim: Optional[str] = None) -> Dict[Tuple[str, str], float]:
+    """Total por ``(tipo, categoria)`` das transações de ``inicio <= dia < fim``."""
+    return {
+        (tipo, categoria): total
+        for tipo, categoria, total in _ler_periodo(
+            conn, "financas_diarias", "financas_mensais", "tipo, categoria", inicio, fim
+        )
+    }
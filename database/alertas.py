@@ -0,0 +1,144 @@
+"""Alertas de stock mantidos por triggers.
+
+``alertas_stock`` tem o nível de urgência de cada produto com stock baixo:
+
+- ``critical``: stock ≤ 20% do mínimo (sem mínimo definido: ≤ 2 unidades);
+- ``warning``: stock ≤ 50% do mínimo (sem mínimo: ≤ 5);
+- ``low``: stock ≤ mínimo.
+
+Os triggers de ``produtos`` recalculam o nível só da linha alterada, na
+mesma transação, e apenas quando o produto está ou estava em alerta — uma
+venda de um produto com stock folgado não escreve nada aqui. Cada alteração
+leva a ``versao`` seguinte do contador ``alertas_stock`` da tabela
+``versoes``; um produto que sai de alerta (reposto, desativado ou apagado)
+fica com ``nivel`` NULL, para que quem acompanha as alterações também saiba
+que o tem de retirar. ``alteracoes_alertas(conn, versao)`` devolve só o que
+mudou desde ``versao``.
+"""
+import sqlite3
+from typing import Dict, List, Tuple
+
+from .db import transaction
+
+NIVEIS = ("critical", "warning", "low")
+
+# colunas de produtos mostradas nos cartões de alerta
+_COLUNAS_UPDATE = "stock, stock_minimo, ativo, nome_comercial, imagem_id"
+
+
+def nivel_sql(linha: str) -> str:
+    """Expressão SQL do nível de alerta da linha ``linha`` (NULL sem alerta)."""
+    stock = f"COALESCE({linha}.stock, 0)"
+    minimo = f"COALESCE({linha}.stock_minimo, 0)"
+    return (
+        f"(CASE WHEN COALESCE({linha}.ativo, 1) != 1 THEN NULL "
+        f"WHEN {minimo} > 0 THEN (CASE WHEN {stock} <= {minimo} * 0.2 THEN 'critical' "
+        f"WHEN {stock} <= {minimo} * 0.5 THEN 'warning' "
+        f"WHEN {stock} <= {minimo} THEN 'low' END) "
+        f"WHEN {stock} <= 2 THEN 'critical' "
+        f"WHEN {stock} <= 5 THEN 'warning' END)"
+    )
+
+
+def _registar(produto: str, nivel: str, condicao: str) -> str:
+    """Instruções do trigger: nova versão e nível do produto, se ``condicao``."""
+    return (
+        f"UPDATE versoes SET versao = versao + 1 WHERE tabela = 'alertas_stock' AND {condicao};\n"
+        f"    INSERT INTO alertas_stock (produto_id, nivel, versao) "
+        f"SELECT {produto}, {nivel}, (SELECT versao FROM versoes WHERE tabela = 'alertas_stock') "
+        f"WHERE {condicao} "
+        f"ON CONFLICT (produto_id) DO UPDATE SET nivel = excluded.nivel, versao = excluded.versao;"
+    )
+
+
+def criar_alertas_stock(conn):
+    """Cria ``alertas_stock``, o contador de versões e os triggers de ``produtos``."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS alertas_stock (
+            produto_id INTEGER PRIMARY KEY,
+            nivel TEXT CHECK (nivel IN ('critical', 'warning', 'low')),
+            versao INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alertas_stock_versao ON alertas_stock(versao)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alertas_stock_nivel ON alertas_stock(nivel)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS versoes (tabela TEXT PRIMARY KEY, versao INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID"
+    )
+    conn.execute("INSERT OR IGNORE INTO versoes (tabela, versao) VALUES ('alertas_stock', 0)")
+
+    novo, antigo = nivel_sql("NEW"), nivel_sql("OLD")
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_produtos_alertas_ins AFTER INSERT ON produtos\n"
+        f"BEGIN\n    {_registar('NEW.id', novo, f'{novo} IS NOT NULL')}\nEND"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_produtos_alertas_upd AFTER UPDATE OF {_COLUNAS_UPDATE} ON produtos\n"
+        f"BEGIN\n    {_registar('NEW.id', novo, f'({novo} IS NOT NULL OR {antigo} IS NOT NULL)')}\nEND"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_produtos_alertas_del AFTER DELETE ON produtos\n"
+        f"BEGIN\n    {_registar('OLD.id', 'NULL', f'{antigo} IS NOT NULL')}\nEND"
+    )
+
+
+def reconstruir_alertas_stock():
+    """Recalcula os alertas de todos os produtos (numa só versão nova)."""
+    with transaction(immediate=True) as conn:
+        conn.execute("UPDATE versoes SET versao = versao + 1 WHERE tabela = 'alertas_stock'")
+        versao = versao_alertas(conn)
+        conn.execute(
+            f"""
+            INSERT INTO alertas_stock (produto_id, nivel, versao)
+            SELECT p.id, {nivel_sql('p')}, ? FROM produtos p
+            WHERE {nivel_sql('p')} IS NOT NULL
+               OR p.id IN (SELECT produto_id FROM alertas_stock WHERE nivel IS NOT NULL)
+            ON CONFLICT (produto_id) DO UPDATE SET nivel = excluded.nivel, versao = excluded.versao
+            """,
+            (versao,),
+        )
+        # produtos apagados sem passar pelos triggers
+        conn.execute(
+            "UPDATE alertas_stock SET nivel = NULL, versao = ? "
+            "WHERE nivel IS NOT NULL AND produto_id NOT IN (SELECT id FROM produtos)",
+            (versao,),
+        )
+
+
+def versao_alertas(conn) -> int:
+    row = conn.execute("SELECT versao FROM versoes WHERE tabela = 'alertas_stock'").fetchone()
+    return row[0] if row else 0
+
+
+def alteracoes_alertas(conn, desde: int = 0) -> Tuple[int, List[sqlite3.Row]]:
+    """``(versão atual, alertas alterados depois de desde)``.
+
+    Cada linha traz ``id``, ``nivel`` (NULL = já não está em alerta) e os
+    dados do cartão do produto.
+    """
+    versao = versao_alertas(conn)
+    if versao <= desde:
+        return versao, []
+    linhas = conn.execute(
+        """
+        SELECT a.produto_id AS id, a.nivel, p.nome_comercial, p.imagem_id, p.stock,
+               COALESCE(p.stock_minimo, 0) AS stock_minimo
+        FROM alertas_stock a
+        LEFT JOIN produtos p ON p.id = a.produto_id
+        WHERE a.versao > ?
+        """,
+        (desde,),
+    ).fetchall()
+    return versao, linhas
+
+
+def contagem_alertas(conn) -> Dict[str, int]:
+    """Número de produtos em cada nível."""
+    contagem = dict.fromkeys(NIVEIS, 0)
+    for nivel, n in conn.execute(
+        "SELECT nivel, COUNT(*) FROM alertas_stock WHERE nivel IS NOT NULL GROUP BY nivel"
+    ):
+        contagem[nivel] = n
+    return contagem
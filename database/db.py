@@ -1,13 +1,200 @@
+"""Gestão de ligações à base de dados SQLite.
+
+O caminho da base é resolvido uma única vez para toda a aplicação e cada
+thread reutiliza a sua própria ligação (os PRAGMAs são aplicados apenas
+quando a ligação é criada). As escritas devem usar ``transaction()``, que
+faz commit no fim do bloco ou rollback em caso de erro.
+
+Relatórios e exportações correm dentro de ``query_guard()``, que instala um
+progress handler na ligação: a consulta é abortada quando o ``CancelToken``
+é cancelado ou quando passa o tempo máximo configurado.
+"""
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+DB_FILENAME = "kamba_farma.db"
+DEFAULT_DB_PATH = Path(__file__).resolve().parent / DB_FILENAME
+
+# Aplicados uma vez por ligação, no momento em que é aberta.
+PRAGMAS = (
+    "PRAGMA foreign_keys = ON;",
+    "PRAGMA busy_timeout = 5000;",
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA cache_size = -8000;",
+)
+
+# Tempo máximo (segundos) de uma consulta de relatório; None = sem limite.
+DEFAULT_QUERY_BUDGET = 30.0
+# Instruções da VM do SQLite entre verificações do cancelamento (~ms).
+PROGRESS_STEPS = 1000
+
+_db_path = None
+_query_budget = DEFAULT_QUERY_BUDGET
+_local = threading.local()
+
+
+class QueryCancelled(sqlite3.OperationalError):
+    """A consulta foi cancelada pelo utilizador."""
+
+
+class QueryTimeout(sqlite3.OperationalError):
+    """A consulta excedeu o tempo máximo permitido."""
+
+
+class CancelToken:
+    """Pedido de cancelamento partilhado entre threads."""
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._evento.is_set()
+
+    def cancel(self) -> None:
+        self._evento.set()
+
 
 def get_db_path(base_path: Path) -> Path:
-    return base_path / "kamba_farma.db"
+    return base_path / DB_FILENAME
+
+
+def set_db_path(path) -> None:
+    """Define o ficheiro usado pela aplicação (testes, execução headless).
+
+    ``None`` volta ao ficheiro configurado em ``src/config/settings.DB_FILE``.
+    As ligações em cache apontadas para outro ficheiro são reabertas no
+    próximo ``get_connection()`` de cada thread.
+    """
+    global _db_path
+    _db_path = Path(path) if path is not None else None
+
 
+def set_query_budget(seconds) -> None:
+    """Define o tempo máximo por omissão de ``query_guard()`` (None = sem limite)."""
+    global _query_budget
+    _query_budget = seconds
 
-def connect(db_path: Path):
+
+def resolve_db_path() -> Path:
+    """Caminho da base de dados partilhado por toda a aplicação.
+
+    O de ``set_db_path``, se foi definido; senão ``DB_FILE`` das
+    configurações (variável de ambiente ``KAMBA_DB_FILE``).
+    """
+    if _db_path is not None:
+        return _db_path
+    try:
+        from src.config.settings import DB_FILE
+    except ImportError:
+        return DEFAULT_DB_PATH
+    return Path(DB_FILE)
+
+
+def connect(db_path: Path = None):
+    """Abre uma ligação nova (não partilhada) com os PRAGMAs aplicados.
+
+    Usado por scripts e ferramentas; a aplicação deve preferir
+    ``get_connection()``.
+    """
+    if db_path is None:
+        db_path = resolve_db_path()
     conn = sqlite3.connect(str(db_path))
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     return conn
+
+
+def get_connection():
+    """Devolve a ligação em cache da thread atual, abrindo-a se necessário."""
+    path = resolve_db_path()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "path", None) != path:
+        close_connection()
+        conn = None
+    if conn is None:
+        conn = connect(path)
+        _local.conn = conn
+        _local.path = path
+    return conn
+
+
+def close_connection() -> None:
+    """Fecha a ligação em cache da thread atual (se existir)."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    _local.path = None
+    if conn is not None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+@contextmanager
+def transaction(immediate: bool = False):
+    """Bloco transacional sobre a ligação da thread atual.
+
+    ``immediate=True`` usa ``BEGIN IMMEDIATE`` para obter o lock de escrita
+    logo no início. Blocos aninhados juntam-se à transação exterior.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
+@contextmanager
+def query_guard(token: CancelToken = None, budget=...):
+    """Torna interrompíveis as consultas feitas dentro do bloco.
+
+    As consultas da ligação da thread atual são abortadas poucos
+    milissegundos depois de ``token.cancel()`` (``QueryCancelled``) ou quando
+    excedem ``budget`` segundos (``QueryTimeout``; por omissão o valor de
+    ``set_query_budget``). Blocos aninhados juntam-se ao exterior.
+    """
+    conn = get_connection()
+    if getattr(_local, "guarded", False):
+        yield conn
+        return
+    if budget is ...:
+        budget = _query_budget
+    prazo = time.monotonic() + budget if budget else None
+    motivo = []
+
+    def verificar():
+        if token is not None and token.cancelled:
+            motivo.append("cancelada")
+            return 1
+        if prazo is not None and time.monotonic() > prazo:
+            motivo.append("tempo")
+            return 1
+        return 0
+
+    conn.set_progress_handler(verificar, PROGRESS_STEPS)
+    _local.guarded = True
+    try:
+        yield conn
+    except sqlite3.OperationalError as e:
+        if motivo and motivo[0] == "cancelada":
+            raise QueryCancelled("Consulta cancelada") from e
+        if motivo:
+            raise QueryTimeout(f"A consulta excedeu o tempo máximo de {budget:g} s") from e
+        raise
+    finally:
+        _local.guarded = False
+        conn.set_progress_handler(None, 0)
@@ -0,0 +1,132 @@
+"""Imagens de produtos, lotes e usuários, endereçadas pelo conteúdo.
+
+As fotos ficam na tabela ``imagens``, uma linha por conteúdo distinto (a
+chave única é o SHA-256 dos bytes): gravar a mesma foto duas vezes devolve o
+mesmo ``id``. ``produtos``, ``lotes`` e ``usuarios`` guardam só
+``imagem_id``, por isso as leituras dessas tabelas não arrastam os BLOBs —
+a foto é lida à parte, e apenas quando é mostrada.
+
+Cada imagem pode ter miniaturas em tamanhos fixos (tabela ``miniaturas``,
+lado maior em píxeis), geradas ao gravar a foto por
+``src/utils/miniaturas.py``; os cartões das vistas leem só a miniatura.
+
+Quando uma foto é substituída ou a linha que a usava é apagada, triggers
+(``criar_limpeza_imagens``) apagam a imagem antiga se mais nenhuma linha a
+referenciar, e as miniaturas saem com ela (``ON DELETE CASCADE``).
+``remover_imagens_orfas`` faz a mesma limpeza para a base inteira — na
+migração e em ``scripts/rebuild_aggregates.py``, para imagens que ficaram
+órfãs sem passar pelos triggers.
+"""
+import hashlib
+import sqlite3
+from typing import Dict, Optional
+
+# tabelas com coluna imagem_id
+TABELAS_COM_IMAGEM = ("produtos", "lotes", "usuarios")
+
+
+def criar_imagens(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS imagens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hash TEXT NOT NULL UNIQUE,
+            dados BLOB NOT NULL,
+            tamanho INTEGER NOT NULL,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def criar_miniaturas(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS miniaturas (
+            imagem_id INTEGER NOT NULL REFERENCES imagens(id) ON DELETE CASCADE,
+            tamanho INTEGER NOT NULL,
+            dados BLOB NOT NULL,
+            PRIMARY KEY (imagem_id, tamanho)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _sem_referencias(imagem: str) -> str:
+    return " AND ".join(
+        f"NOT EXISTS (SELECT 1 FROM {t} WHERE imagem_id = {imagem})" for t in TABELAS_COM_IMAGEM
+    )
+
+
+def criar_limpeza_imagens(conn):
+    """Índices de ``imagem_id`` e triggers que apagam as imagens que deixam de ser usadas."""
+    for tabela in TABELAS_COM_IMAGEM:
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{tabela}_imagem ON {tabela}(imagem_id) WHERE imagem_id IS NOT NULL"
+        )
+        apagar = f"DELETE FROM imagens WHERE id = OLD.imagem_id AND {_sem_referencias('OLD.imagem_id')};"
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tabela}_imagem_del AFTER DELETE ON {tabela} "
+            f"WHEN OLD.imagem_id IS NOT NULL\nBEGIN\n    {apagar}\nEND"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tabela}_imagem_upd AFTER UPDATE OF imagem_id ON {tabela} "
+            f"WHEN OLD.imagem_id IS NOT NULL AND OLD.imagem_id IS NOT NEW.imagem_id\nBEGIN\n    {apagar}\nEND"
+        )
+
+
+def hash_imagem(dados: bytes) -> str:
+    return hashlib.sha256(dados).hexdigest()
+
+
+def guardar_imagem(conn, dados: Optional[bytes]) -> Optional[int]:
+    """Grava ``dados`` (se ainda não existirem) e devolve o ``id`` da imagem.
+
+    Devolve ``None`` sem foto, para poder ser passado diretamente como
+    ``imagem_id``.
+    """
+    if not dados:
+        return None
+    dados = bytes(dados)
+    chave = hash_imagem(dados)
+    conn.execute(
+        "INSERT OR IGNORE INTO imagens (hash, dados, tamanho) VALUES (?, ?, ?)",
+        (chave, sqlite3.Binary(dados), len(dados)),
+    )
+    return conn.execute("SELECT id FROM imagens WHERE hash = ?", (chave,)).fetchone()[0]
+
+
+def ler_imagem(conn, imagem_id: Optional[int]) -> Optional[bytes]:
+    """Bytes da imagem ``imagem_id``, ou ``None``."""
+    if imagem_id is None:
+        return None
+    row = conn.execute("SELECT dados FROM imagens WHERE id = ?", (imagem_id,)).fetchone()
+    return bytes(row[0]) if row else None
+
+
+def guardar_miniaturas(conn, imagem_id: int, miniaturas: Dict[int, bytes]):
+    """Grava as miniaturas ``{tamanho: bytes}`` da imagem ``imagem_id``."""
+    conn.executemany(
+        "INSERT OR REPLACE INTO miniaturas (imagem_id, tamanho, dados) VALUES (?, ?, ?)",
+        [(imagem_id, tamanho, sqlite3.Binary(dados)) for tamanho, dados in miniaturas.items()],
+    )
+
+
+def ler_miniatura(conn, imagem_id: int, tamanho: int) -> Optional[bytes]:
+    row = conn.execute(
+        "SELECT dados FROM miniaturas WHERE imagem_id = ? AND tamanho = ?", (imagem_id, tamanho)
+    ).fetchone()
+    return bytes(row[0]) if row else None
+
+
+def tem_miniaturas(conn, imagem_id: int) -> bool:
+    return conn.execute("SELECT 1 FROM miniaturas WHERE imagem_id = ? LIMIT 1", (imagem_id,)).fetchone() is not None
+
+
+def remover_imagens_orfas(conn) -> int:
+    """Apaga as imagens (e miniaturas) que nenhuma linha referencia; devolve quantas."""
+    referencias = " UNION ".join(
+        f"SELECT imagem_id FROM {t} WHERE imagem_id IS NOT NULL" for t in TABELAS_COM_IMAGEM
+    )
+    cur = conn.execute(f"DELETE FROM imagens WHERE id NOT IN ({referencias})")
+    return cur.rowcount
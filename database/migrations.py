@@ -0,0 +1,450 @@
+"""Migrações versionadas do esquema.
+
+Cada migração tem um número, uma descrição e uma função que recebe a
+ligação. A versão aplicada fica guardada na tabela ``schema_version`` e
+``migrate()`` corre, por ordem, apenas as que ainda faltam — cada uma na sua
+própria transação, juntamente com o registo da nova versão. As migrações
+devem ser idempotentes (``IF NOT EXISTS``, verificação de colunas), porque
+bases antigas podem já ter parte das alterações feitas à mão.
+"""
+import hashlib
+import sqlite3
+from pathlib import Path
+
+from .agregados import criar_agregados, reconstruir_agregados, remover_agregados
+from .alertas import criar_alertas_stock, reconstruir_alertas_stock
+from .db import transaction
+from .imagens import (
+    TABELAS_COM_IMAGEM, criar_imagens, criar_limpeza_imagens, criar_miniaturas, guardar_imagem,
+    remover_imagens_orfas,
+)
+from .pesquisa import criar_pesquisa, criar_versao_produtos, reconstruir_pesquisa
+
+SCHEMA_FILE = Path(__file__).resolve().parent / "schema.sql"
+
+
+def _split_statements(sql: str):
+    """Divide um script SQL em instruções completas (sem PRAGMAs)."""
+    statements = []
+    buffer = ""
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            stmt = buffer.strip()
+            buffer = ""
+            if stmt.upper().startswith("PRAGMA"):
+                continue
+            statements.append(stmt)
+    return statements
+
+
+def has_column(conn, table: str, column: str) -> bool:
+    cur = conn.execute(f"PRAGMA table_info({table});")
+    return any(r[1] == column for r in cur.fetchall())
+
+
+# =========================================================
+# Migrações
+# =========================================================
+def _m001_schema_base(conn):
+    for stmt in _split_statements(SCHEMA_FILE.read_text(encoding="utf-8")):
+        conn.execute(stmt)
+
+
+def _m002_produtos_descricao(conn):
+    # antes feito por scripts/add_descricao_column.py
+    if not has_column(conn, "produtos", "descricao"):
+        conn.execute("ALTER TABLE produtos ADD COLUMN descricao TEXT")
+
+
+def _m003_admin_inicial(conn):
+    # antes feito por LoginWindow.create_sample_database: garante que uma
+    # instalação nova tem uma conta de administrador para o primeiro login
+    conn.execute(
+        "INSERT INTO usuarios (nome, senha_hash, perfil, ativo) "
+        "SELECT ?, ?, ?, 1 WHERE NOT EXISTS (SELECT 1 FROM usuarios)",
+        ("admin", hashlib.sha256(b"admin123").hexdigest(), "admin"),
+    )
+
+
+def _m004_indices_vendas(conn):
+    # itens de uma venda (histórico, faturas, devoluções)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_itens_venda_venda ON itens_venda(venda_id)")
+    # totais por período: cobre SUM(total) sem ler a tabela
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vendas_data ON vendas(data_venda, total)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_historico_itens_historico "
+        "ON historico_compra_itens(historico_compra_id)"
+    )
+
+
+def _m005_indices_lotes(conn):
+    # escolha de lotes por validade (FEFO) para um produto
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lotes_produto_validade ON lotes(produto_id, validade)")
+
+
+def _m006_indices_financas(conn):
+    # totais por tipo e período: cobre SUM(valor) sem ler a tabela
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transacoes_tipo_data "
+        "ON transacoes_financeiras(tipo, data_transacao, valor)"
+    )
+
+
+def _m007_historico_venda_id(conn):
+    # liga cada compra à venda; antes a ligação era feita por proximidade
+    # de tempo (< 10 s) entre tempo_compra e data_venda
+    if not has_column(conn, "historico_compra", "venda_id"):
+        conn.execute("ALTER TABLE historico_compra ADD COLUMN venda_id INTEGER REFERENCES vendas(id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_historico_compra_venda ON historico_compra(venda_id)")
+    conn.execute(
+        """
+        UPDATE historico_compra
+        SET venda_id = (
+            SELECT id FROM (
+                SELECT v.id, ABS(strftime('%s', v.data_venda) - strftime('%s', historico_compra.tempo_compra)) AS distancia
+                FROM vendas v
+                WHERE v.data_venda BETWEEN datetime(historico_compra.tempo_compra, '-10 seconds')
+                                       AND datetime(historico_compra.tempo_compra, '+10 seconds')
+            )
+            WHERE distancia < 10
+            ORDER BY distancia, id DESC
+            LIMIT 1
+        )
+        WHERE venda_id IS NULL
+        """
+    )
+
+
+def _m008_agregados_vendas_financas(conn):
+    # totais por dia/mês mantidos por triggers (ver database/agregados.py);
+    # preenchidos a partir das vendas e transações já existentes. A chave
+    # dos totais de finanças inclui a categoria (migração 17), que nas bases
+    # antigas só é preenchida pela migração 9
+    if not has_column(conn, "transacoes_financeiras", "categoria"):
+        conn.execute("ALTER TABLE transacoes_financeiras ADD COLUMN categoria TEXT")
+    criar_agregados(conn)
+    reconstruir_agregados()
+
+
+def _m009_transacoes_categoria(conn):
+    # a categoria das saídas era gravada só como prefixo da descrição
+    # ("Categoria: ..."); passa a ter coluna própria para agrupar por ela
+    if not has_column(conn, "transacoes_financeiras", "categoria"):
+        conn.execute("ALTER TABLE transacoes_financeiras ADD COLUMN categoria TEXT")
+    categorias = ("Transferência", "Compra Stock", "Uso Pessoal", "Passagem", "Salário", "Outro")
+    conn.execute(
+        f"""
+        UPDATE transacoes_financeiras
+        SET categoria = CASE
+            WHEN TRIM(SUBSTR(descricao, 1, INSTR(descricao, ':') - 1)) IN ({', '.join('?' * len(categorias))})
+            THEN TRIM(SUBSTR(descricao, 1, INSTR(descricao, ':') - 1))
+            ELSE 'Outro'
+        END
+        WHERE tipo = 'saida' AND categoria IS NULL
+        """,
+        categorias,
+    )
+    # totais por período, tipo e categoria: cobre SUM(valor) sem ler a tabela
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transacoes_data_categoria "
+        "ON transacoes_financeiras(data_transacao, tipo, categoria, valor)"
+    )
+
+
+def _imutavel(conn, tabela: str, mensagem: str):
+    """Triggers que rejeitam UPDATE e DELETE em ``tabela`` (só aceita INSERT)."""
+    for evento in ("UPDATE", "DELETE"):
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tabela}_imutavel_{evento.lower()[:3]} "
+            f"BEFORE {evento} ON {tabela}\n"
+            f"BEGIN\n    SELECT RAISE(ABORT, '{mensagem}');\nEND"
+        )
+
+
+def _proteger_fechado(conn, tabela: str, nome: str, fechado: str, mensagem: str):
+    """Triggers que rejeitam alterações a ``tabela`` quando ``fechado`` se verifica.
+
+    ``fechado`` é uma condição sobre ``{r}`` (a linha ``NEW``/``OLD``).
+    """
+    condicoes = {
+        "ins": fechado.format(r="NEW"),
+        "del": fechado.format(r="OLD"),
+        "upd": f"{fechado.format(r='OLD')} OR {fechado.format(r='NEW')}",
+    }
+    eventos = {"ins": "INSERT", "del": "DELETE", "upd": "UPDATE"}
+    for sufixo, condicao in condicoes.items():
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tabela}_{nome}_{sufixo} "
+            f"BEFORE {eventos[sufixo]} ON {tabela} WHEN {condicao}\n"
+            f"BEGIN\n    SELECT RAISE(ABORT, '{mensagem}');\nEND"
+        )
+
+
+def _proteger_mes_fechado(conn, tabela: str, coluna: str):
+    """Triggers que impedem alterar ``tabela`` em meses com fecho."""
+    _proteger_fechado(
+        conn, tabela, "mes_fechado",
+        f"EXISTS (SELECT 1 FROM fechos_mensais WHERE mes = strftime('%Y-%m', {{r}}.{coluna}))",
+        f"Mês fechado: {tabela} não pode ser alterada",
+    )
+
+
+def _proteger_dia_fechado(conn, tabela: str, coluna: str):
+    """Triggers que impedem alterar ``tabela`` em dias com o caixa fechado."""
+    _proteger_fechado(
+        conn, tabela, "dia_fechado",
+        f"EXISTS (SELECT 1 FROM fechos_caixa WHERE dia = DATE({{r}}.{coluna}))",
+        f"Caixa fechado: {tabela} não pode ser alterada",
+    )
+
+
+def _m010_fechos_mensais(conn):
+    # fecho de mês: totais congelados de entradas, saídas e resultado
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fechos_mensais (
+            mes TEXT PRIMARY KEY,
+            total_entrada REAL NOT NULL,
+            total_saida REAL NOT NULL,
+            lucro REAL NOT NULL,
+            fechado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    # totais do mês por tipo e categoria ('' = sem categoria; vendas com tipo 'venda')
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fechos_mensais_totais (
+            mes TEXT NOT NULL REFERENCES fechos_mensais(mes),
+            tipo TEXT NOT NULL,
+            categoria TEXT NOT NULL DEFAULT '',
+            total REAL NOT NULL,
+            PRIMARY KEY (mes, tipo, categoria)
+        ) WITHOUT ROWID
+        """
+    )
+    # um fecho é definitivo, e as vendas/transações do mês deixam de mudar
+    for tabela in ("fechos_mensais", "fechos_mensais_totais"):
+        _imutavel(conn, tabela, "Fecho mensal não pode ser alterado")
+    _proteger_mes_fechado(conn, "vendas", "data_venda")
+    _proteger_mes_fechado(conn, "transacoes_financeiras", "data_transacao")
+
+
+def _m011_fechos_caixa(conn):
+    # operador e posto de cada venda, para o relatório Z por caixa
+    if not has_column(conn, "vendas", "terminal"):
+        conn.execute("ALTER TABLE vendas ADD COLUMN terminal TEXT")
+    # devoluções do dia (registadas em logs_sistema)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_sistema_data ON logs_sistema(data_log)")
+    # relatório Z: totais do dia; produtos e saídas em JSON
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fechos_caixa (
+            dia TEXT PRIMARY KEY,
+            total_vendas REAL NOT NULL,
+            num_vendas INTEGER NOT NULL,
+            num_itens INTEGER NOT NULL,
+            total_saidas REAL NOT NULL,
+            num_devolucoes INTEGER NOT NULL,
+            qtd_devolvida INTEGER NOT NULL,
+            produtos TEXT NOT NULL,
+            saidas TEXT NOT NULL,
+            fechado_por INTEGER REFERENCES usuarios(id),
+            fechado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    # totais do dia por operador e posto (0 / '' = desconhecido)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fechos_caixa_operadores (
+            dia TEXT NOT NULL REFERENCES fechos_caixa(dia),
+            usuario_id INTEGER NOT NULL DEFAULT 0,
+            terminal TEXT NOT NULL DEFAULT '',
+            operador TEXT,
+            num_vendas INTEGER NOT NULL,
+            num_itens INTEGER NOT NULL,
+            total REAL NOT NULL,
+            PRIMARY KEY (dia, usuario_id, terminal)
+        ) WITHOUT ROWID
+        """
+    )
+    for tabela in ("fechos_caixa", "fechos_caixa_operadores"):
+        _imutavel(conn, tabela, "Fecho de caixa não pode ser alterado")
+
+
+def _m012_pesquisa_produtos(conn):
+    # índice FTS5 da pesquisa de produtos (ver database/pesquisa.py); sem
+    # FTS5 no SQLite a pesquisa continua a usar LIKE
+    if criar_pesquisa(conn):
+        reconstruir_pesquisa()
+
+
+def _m013_versao_produtos(conn):
+    # contador de alterações do catálogo para os índices em memória da venda
+    criar_versao_produtos(conn)
+
+
+def _m014_imagens(conn):
+    # as fotos saem das linhas de produtos/lotes/usuarios para a tabela
+    # imagens (ver database/imagens.py); a coluna foto antiga fica a NULL
+    criar_imagens(conn)
+    for tabela in TABELAS_COM_IMAGEM:
+        if not has_column(conn, tabela, "imagem_id"):
+            conn.execute(f"ALTER TABLE {tabela} ADD COLUMN imagem_id INTEGER REFERENCES imagens(id)")
+        if not has_column(conn, tabela, "foto"):
+            continue
+        ids = [r[0] for r in conn.execute(f"SELECT id FROM {tabela} WHERE foto IS NOT NULL")]
+        for linha_id in ids:
+            foto = conn.execute(f"SELECT foto FROM {tabela} WHERE id = ?", (linha_id,)).fetchone()[0]
+            conn.execute(
+                f"UPDATE {tabela} SET imagem_id = COALESCE(imagem_id, ?), foto = NULL WHERE id = ?",
+                (guardar_imagem(conn, foto), linha_id),
+            )
+
+
+def _m015_miniaturas(conn):
+    # miniaturas das fotos; as das imagens já existentes são geradas quando
+    # forem pedidas pela primeira vez (ver src/utils/miniaturas.py)
+    criar_miniaturas(conn)
+
+
+def _m016_alertas_stock(conn):
+    # níveis de alerta de stock mantidos por triggers (ver database/alertas.py)
+    criar_alertas_stock(conn)
+    reconstruir_alertas_stock()
+
+
+def _m017_financas_por_categoria(conn):
+    # financas_diarias/financas_mensais passam a ter a categoria na chave,
+    # para os relatórios por categoria lerem os agregados
+    remover_agregados(conn, "transacoes_financeiras")
+    criar_agregados(conn)
+    reconstruir_agregados()
+
+
+def _m018_dias_fechados(conn):
+    # depois do fecho de caixa, as vendas e saídas do dia deixam de mudar:
+    # o relatório Z gravado continua a corresponder ao que está na base
+    _proteger_dia_fechado(conn, "vendas", "data_venda")
+    _proteger_dia_fechado(conn, "transacoes_financeiras", "data_transacao")
+
+
+def _m019_devolucoes(conn):
+    # devoluções numa tabela própria (o relatório Z lia-as do texto de
+    # logs_sistema.acao); sem chaves estrangeiras para manter o histórico
+    # de vendas e produtos entretanto apagados
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS devolucoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            historico_compra_id INTEGER,
+            produto_id INTEGER,
+            quantidade INTEGER NOT NULL,
+            motivo TEXT,
+            data_devolucao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_devolucoes_data ON devolucoes(data_devolucao)")
+    # devoluções antigas: "devolucao: produto <id> quantidade <n>"
+    conn.execute(
+        """
+        INSERT INTO devolucoes (historico_compra_id, produto_id, quantidade, data_devolucao)
+        SELECT registro_id,
+               CAST(SUBSTR(acao, INSTR(acao, 'produto ') + 8,
+                           INSTR(acao, ' quantidade') - INSTR(acao, 'produto ') - 8) AS INTEGER),
+               CAST(SUBSTR(acao, INSTR(acao, 'quantidade ') + 11) AS INTEGER),
+               data_log
+        FROM logs_sistema
+        WHERE acao LIKE 'devolucao:%' AND NOT EXISTS (SELECT 1 FROM devolucoes)
+        ORDER BY id
+        """
+    )
+    _proteger_dia_fechado(conn, "devolucoes", "data_devolucao")
+
+
+def _m020_limpeza_imagens(conn):
+    # fotos substituídas e linhas apagadas deixavam as imagens antigas na
+    # base; passam a ser apagadas por triggers (ver database/imagens.py)
+    criar_limpeza_imagens(conn)
+    remover_imagens_orfas(conn)
+
+
+def _m021_indices_dashboard(conn):
+    # lotes com stock a caducar, por validade (dashboard)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lotes_validade_com_stock ON lotes(validade) WHERE quantidade_atual > 0"
+    )
+    # quantidade vendida por produto (vendas_produtos), mantida por triggers
+    criar_agregados(conn)
+    reconstruir_agregados()
+
+
+MIGRATIONS = [
+    (1, "esquema base", _m001_schema_base),
+    (2, "coluna produtos.descricao", _m002_produtos_descricao),
+    (3, "administrador inicial", _m003_admin_inicial),
+    (4, "índices de vendas", _m004_indices_vendas),
+    (5, "índices de lotes", _m005_indices_lotes),
+    (6, "índices de transações financeiras", _m006_indices_financas),
+    (7, "historico_compra.venda_id", _m007_historico_venda_id),
+    (8, "agregados diários e mensais de vendas e finanças", _m008_agregados_vendas_financas),
+    (9, "transacoes_financeiras.categoria", _m009_transacoes_categoria),
+    (10, "fechos mensais", _m010_fechos_mensais),
+    (11, "fechos de caixa (relatório Z)", _m011_fechos_caixa),
+    (12, "pesquisa de produtos (FTS5)", _m012_pesquisa_produtos),
+    (13, "versão do catálogo de produtos", _m013_versao_produtos),
+    (14, "imagens endereçadas pelo conteúdo", _m014_imagens),
+    (15, "miniaturas das imagens", _m015_miniaturas),
+    (16, "alertas de stock", _m016_alertas_stock),
+    (17, "totais de finanças por categoria", _m017_financas_por_categoria),
+    (18, "dias de caixa fechados", _m018_dias_fechados),
+    (19, "devoluções", _m019_devolucoes),
+    (20, "limpeza de imagens sem uso", _m020_limpeza_imagens),
+    (21, "índices e agregados do dashboard", _m021_indices_dashboard),
+]
+
+
+# =========================================================
+# Execução
+# =========================================================
+def _ensure_version_table(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INTEGER PRIMARY KEY,
+            descricao TEXT,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def current_version() -> int:
+    with transaction() as conn:
+        _ensure_version_table(conn)
+        row = conn.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()
+    return row[0]
+
+
+def migrate(verbose: bool = False) -> int:
+    """Aplica as migrações pendentes e devolve a versão final do esquema."""
+    versao = current_version()
+    for numero, descricao, aplicar in MIGRATIONS:
+        if numero <= versao:
+            continue
+        with transaction(immediate=True) as conn:
+            # outra instância pode ter migrado entretanto
+            aplicada = conn.execute("SELECT 1 FROM schema_version WHERE versao = ?", (numero,)).fetchone()
+            if not aplicada:
+                aplicar(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (versao, descricao) VALUES (?, ?)",
+                    (numero, descricao),
+                )
+        if verbose and not aplicada:
+            print(f"Migração {numero:03d} aplicada: {descricao}")
+        versao = numero
+    return versao
@@ -0,0 +1,144 @@
+"""Pesquisa de produtos com um índice FTS5.
+
+``produtos_fts`` indexa nome comercial, princípio ativo, categoria e código
+de barras de ``produtos`` (tabela de conteúdo externo: o texto não é
+duplicado) e é mantida por triggers. O tokenizer ``unicode61`` com
+``remove_diacritics 2`` ignora maiúsculas e acentos ("acido" encontra
+"Ácido"), cada palavra pesquisada é um prefixo e os resultados vêm ordenados
+por ``bm25`` — o nome pesa mais do que o princípio ativo, e este mais do que
+a categoria. O custo de uma pesquisa depende do número de resultados, não do
+tamanho do catálogo.
+
+Se o SQLite não tiver FTS5, ``pesquisar_produtos`` usa ``LIKE``.
+
+``versao_produtos`` devolve um contador (tabela ``versoes``) que os triggers
+incrementam quando um produto é criado ou apagado, ou lhe muda o nome, o
+código de barras, o preço ou o estado ativo; os índices em memória do ecrã
+de venda comparam-no para saber se têm de ser recarregados.
+"""
+import re
+import sqlite3
+from typing import List
+
+from .db import transaction
+
+_COLUNAS = ("nome_comercial", "principio_ativo", "categoria", "codigo_barras")
+# pesos do bm25 pela ordem de _COLUNAS
+_PESOS = (10.0, 5.0, 2.0, 1.0)
+
+_CAMPOS = "p.id, p.nome_comercial, p.principio_ativo, p.stock, p.preco_venda, p.codigo_barras, p.categoria"
+
+
+def _sql_linha(linha: str) -> str:
+    return ", ".join(f"{linha}.{c}" for c in ("id",) + _COLUNAS)
+
+
+def criar_pesquisa(conn) -> bool:
+    """Cria ``produtos_fts`` e os triggers; ``False`` se não houver FTS5."""
+    colunas = ", ".join(_COLUNAS)
+    try:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5("
+            f"{colunas}, content='produtos', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+    except sqlite3.OperationalError:
+        return False
+    inserir = f"INSERT INTO produtos_fts (rowid, {colunas}) VALUES ({_sql_linha('NEW')});"
+    apagar = (
+        f"INSERT INTO produtos_fts (produtos_fts, rowid, {colunas}) "
+        f"VALUES ('delete', {_sql_linha('OLD')});"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_ins AFTER INSERT ON produtos\n"
+        f"BEGIN\n    {inserir}\nEND"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_del AFTER DELETE ON produtos\n"
+        f"BEGIN\n    {apagar}\nEND"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_upd AFTER UPDATE OF {colunas} ON produtos\n"
+        f"BEGIN\n    {apagar}\n    {inserir}\nEND"
+    )
+    return True
+
+
+def reconstruir_pesquisa():
+    """Reconstrói o índice a partir de ``produtos``."""
+    with transaction(immediate=True) as conn:
+        conn.execute("INSERT INTO produtos_fts (produtos_fts) VALUES ('rebuild')")
+
+
+def tem_pesquisa(conn) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'produtos_fts'"
+    ).fetchone() is not None
+
+
+def expressao_fts(termo: str) -> str:
+    """Converte o texto digitado numa consulta FTS5: todas as palavras, como prefixo.
+
+    A pontuação é descartada (nada do que o utilizador escreve é sintaxe
+    FTS5); devolve ``""`` se não sobrar nenhuma palavra.
+    """
+    palavras = re.findall(r"\w+", termo)
+    return " ".join(f'"{p}"*' for p in palavras)
+
+
+def pesquisar_produtos(conn, termo: str, limite: int = 20) -> List[sqlite3.Row]:
+    """Produtos ativos que correspondem a ``termo``, do mais relevante ao menos."""
+    expressao = expressao_fts(termo)
+    if not expressao:
+        return []
+    if tem_pesquisa(conn):
+        return conn.execute(
+            f"""
+            SELECT {_CAMPOS}
+            FROM produtos_fts
+            JOIN produtos p ON p.id = produtos_fts.rowid
+            WHERE produtos_fts MATCH ? AND p.ativo = 1
+            ORDER BY bm25(produtos_fts, {", ".join(map(str, _PESOS))})
+            LIMIT ?
+            """,
+            (expressao, limite),
+        ).fetchall()
+    like = f"%{termo.strip()}%"
+    return conn.execute(
+        f"""
+        SELECT {_CAMPOS}
+        FROM produtos p
+        WHERE p.ativo = 1 AND ({" OR ".join(f"p.{c} LIKE ?" for c in _COLUNAS)})
+        ORDER BY p.nome_comercial
+        LIMIT ?
+        """,
+        (like,) * len(_COLUNAS) + (limite,),
+    ).fetchall()
+
+
+# =========================================================
+# Versão do catálogo
+# =========================================================
+# colunas cuja alteração invalida os índices em memória (o stock não conta:
+# muda a cada venda e não aparece nas sugestões nem no mapa de códigos)
+_COLUNAS_VERSAO = "nome_comercial, codigo_barras, preco_venda, ativo"
+
+
+def criar_versao_produtos(conn):
+    """Cria ``versoes`` e os triggers que incrementam a versão de ``produtos``."""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS versoes (tabela TEXT PRIMARY KEY, versao INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID"
+    )
+    conn.execute("INSERT OR IGNORE INTO versoes (tabela, versao) VALUES ('produtos', 0)")
+    incrementar = "UPDATE versoes SET versao = versao + 1 WHERE tabela = 'produtos';"
+    eventos = {"ins": "INSERT", "del": "DELETE", "upd": f"UPDATE OF {_COLUNAS_VERSAO}"}
+    for sufixo, evento in eventos.items():
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_{sufixo} AFTER {evento} ON produtos\n"
+            f"BEGIN\n    {incrementar}\nEND"
+        )
+
+
+def versao_produtos(conn) -> int:
+    row = conn.execute("SELECT versao FROM versoes WHERE tabela = 'produtos'").fetchone()
+    return row[0] if row else 0
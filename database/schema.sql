@@ -1,5 +1,14 @@
 -- Schema mínimo para gestão de stock
 PRAGMA foreign_keys = ON;
+-- Imagens (fotos de usuários, produtos e lotes), únicas pelo hash do conteúdo
+CREATE TABLE IF NOT EXISTS imagens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash TEXT NOT NULL UNIQUE,
+    dados BLOB NOT NULL,
+    tamanho INTEGER NOT NULL,
+    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Usuarios
 CREATE TABLE IF NOT EXISTS usuarios (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -9,7 +18,7 @@ CREATE TABLE IF NOT EXISTS usuarios (
     area_atuacao TEXT,
     contacto TEXT,
     genero TEXT,
-    foto BLOB,
+    imagem_id INTEGER REFERENCES imagens(id),
     senha_hash TEXT NOT NULL,
     perfil TEXT DEFAULT 'usuario',
     ativo INTEGER NOT NULL DEFAULT 1,
@@ -32,7 +41,7 @@ CREATE TABLE IF NOT EXISTS produtos (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     nome_comercial TEXT NOT NULL,
     principio_ativo TEXT,
-    foto BLOB,
+    imagem_id INTEGER REFERENCES imagens(id),
     categoria TEXT,
     forma_farmaceutica TEXT,
     preco_venda REAL DEFAULT 0.0,
@@ -56,7 +65,7 @@ CREATE TABLE IF NOT EXISTS lotes (
     produto_id INTEGER NOT NULL,
     numero_lote TEXT,
     validade DATE,
-    foto BLOB,
+    imagem_id INTEGER REFERENCES imagens(id),
     quantidade_inicial INTEGER DEFAULT 0,
     quantidade_atual INTEGER DEFAULT 0,
     preco_compra REAL DEFAULT 0.0,
@@ -82,6 +91,7 @@ CREATE TABLE IF NOT EXISTS vendas (
     usuario_id INTEGER,
     data_venda TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     total REAL NOT NULL DEFAULT 0.0,
+    terminal TEXT,
     FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
 );
 
@@ -100,13 +110,16 @@ CREATE TABLE IF NOT EXISTS itens_venda (
 );
 
 -- Histórico de Compras
--- Armazena um registro de compras feitas (comprador, timestamp e lista de produtos).
+-- Armazena um registro de compras feitas (comprador, timestamp e lista de produtos),
+-- ligado à venda correspondente por `venda_id`.
 CREATE TABLE IF NOT EXISTS historico_compra (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
+    venda_id INTEGER,
     comprador_nome TEXT NOT NULL,
     produtos_comprados JSON,
     quantidade_total INTEGER DEFAULT 0,
-    tempo_compra TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    tempo_compra TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(venda_id) REFERENCES vendas(id)
 );
 
 -- Itens do histórico de compra (normalizado) — liga cada item ao produto
@@ -136,6 +149,7 @@ CREATE TABLE IF NOT EXISTS transacoes_financeiras (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     tipo TEXT NOT NULL,
     descricao TEXT,
+    categoria TEXT,
     valor REAL NOT NULL,
     data_transacao TEXT,
     criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -4,6 +4,7 @@ import os
 import sqlite3
 import time
 from database.db import connect, get_db_path
+from database.imagens import guardar_imagem
 
 
 def human_readable(bytes_size):
@@ -26,11 +27,11 @@ def insert_product(conn, name, blob_bytes):
     cur = conn.cursor()
     cur.execute(
         """
-        INSERT INTO produtos (nome_comercial, principio_ativo, foto, categoria, forma_farmaceutica,
+        INSERT INTO produtos (nome_comercial, principio_ativo, imagem_id, categoria, forma_farmaceutica,
             preco_venda, preco_compra, stock, codigo_barras, unidade, stock_minimo, ativo)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (name, 'ativo-'+name, sqlite3.Binary(blob_bytes), 'GERAL', 'COMPRIMIDO',
+        (name, 'ativo-'+name, guardar_imagem(conn, blob_bytes), 'GERAL', 'COMPRIMIDO',
          0.0, 0.0, 0, None, 'un', 0, 1)
     )
 
@@ -1,4 +1,5 @@
 from pathlib import Path
+import argparse
 import sys
 from pathlib import Path as _Path
 # Ensure project root is on sys.path so top-level packages like `database`
@@ -8,18 +9,19 @@ if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
 from database import db
-import sqlite3
+from database.migrations import migrate
 
 
-def init_db():
-    base = Path(__file__).resolve().parents[1]
-    schema = base / 'database' / 'schema.sql'
-    db_path = base / 'database' / 'kamba_farma.db'
-    with sqlite3.connect(db_path) as conn:
-        with open(schema, 'r') as f:
-            conn.executescript(f.read())
-    print('Database inicializada em', db_path)
+def init_db(db_path: Path = None):
+    """Cria a base (se não existir) e aplica as migrações pendentes."""
+    if db_path is not None:
+        db.set_db_path(db_path)
+    versao = migrate(verbose=True)
+    print('Database inicializada em', db.resolve_db_path(), f'(esquema v{versao})')
 
 
 if __name__ == '__main__':
-    init_db()
+    parser = argparse.ArgumentParser(description='Inicializa/atualiza o esquema da base de dados')
+    parser.add_argument('--db', help='Path to DB file (optional)')
+    args = parser.parse_args()
+    init_db(Path(args.db) if args.db else None)
@@ -0,0 +1,139 @@
+"""Perfil do arranque: tempo de importação por módulo até ao ecrã de login.
+
+Para cada ponto de entrada (``ui.login_window`` de ``src/main.py`` e
+``models.admindashboard.dashboardadmin``, a entrada do executável
+``KambaFarmaAdmin``) corre ``python -X importtime`` num processo limpo,
+mostra os módulos mais lentos e compara o tempo total com o orçamento
+guardado em ``scripts/startup_budget.json``.
+
+A verificação falha (código de saída 1) se uma entrada ultrapassar o seu
+orçamento (mais a tolerância) ou se, antes do login, for importado algum
+módulo proibido (matplotlib, numpy, páginas do dashboard, ...).
+
+Uso:
+    python scripts/profile_startup.py            # relatório + verificação
+    python scripts/profile_startup.py --update   # grava os tempos atuais como orçamento
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_ROOT = Path(__file__).resolve().parents[1]
+BUDGET_FILE = Path(__file__).resolve().parent / 'startup_budget.json'
+
+
+def medir_importacao(modulo: str) -> dict:
+    """Importa ``modulo`` num processo novo e devolve {módulo: (self_ms, cumulativo_ms)}."""
+    env = dict(os.environ)
+    caminhos = [str(_ROOT / 'src'), str(_ROOT)]
+    if env.get('PYTHONPATH'):
+        caminhos.append(env['PYTHONPATH'])
+    env['PYTHONPATH'] = os.pathsep.join(caminhos)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=str(_ROOT), env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        erro = proc.stderr.strip().splitlines()
+        raise RuntimeError(f'falha ao importar {modulo}: {erro[-1] if erro else proc.returncode}')
+    return parse_importtime(proc.stderr)
+
+
+def parse_importtime(saida: str) -> dict:
+    """Converte a saída de ``-X importtime`` em {módulo: (self_ms, cumulativo_ms)}."""
+    tempos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        partes = linha[len('import time:'):].split('|')
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            continue  # cabeçalho
+        nome = partes[2].strip()
+        tempos[nome] = (int(partes[0]) / 1000.0, int(partes[1]) / 1000.0)
+    return tempos
+
+
+def medir(modulo: str, repeticoes: int = 3) -> dict:
+    """Melhor de ``repeticoes`` medições (reduz o ruído do sistema)."""
+    melhor = None
+    for _ in range(repeticoes):
+        tempos = medir_importacao(modulo)
+        if melhor is None or tempos[modulo][1] < melhor[modulo][1]:
+            melhor = tempos
+    return melhor
+
+
+def proibidos_carregados(tempos: dict, budget: dict) -> list:
+    permitidos = set(budget.get('permitidos', []))
+    encontrados = []
+    for nome in tempos:
+        if nome in permitidos:
+            continue
+        for prefixo in budget.get('proibidos', []):
+            if nome == prefixo or nome.startswith(prefixo + '.'):
+                encontrados.append(nome)
+                break
+    return sorted(encontrados)
+
+
+def carregar_budget() -> dict:
+    if BUDGET_FILE.exists():
+        return json.loads(BUDGET_FILE.read_text(encoding='utf-8'))
+    return {'tolerancia': 0.25, 'entradas': {}, 'proibidos': [], 'permitidos': []}
+
+
+def relatorio(modulo: str, tempos: dict, top: int):
+    total = tempos[modulo][1]
+    print(f'\n== {modulo}: {total:.1f} ms ({len(tempos)} módulos)')
+    print(f'{"self ms":>9} {"cumul. ms":>10}  módulo')
+    for nome, (proprio, cumulativo) in sorted(tempos.items(), key=lambda t: -t[1][0])[:top]:
+        print(f'{proprio:9.1f} {cumulativo:10.1f}  {nome}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede o tempo de importação no arranque e verifica o orçamento')
+    parser.add_argument('--update', action='store_true', help='Grava os tempos medidos como novo orçamento')
+    parser.add_argument('--top', type=int, default=15, help='Número de módulos a listar por entrada')
+    parser.add_argument('--repeat', type=int, default=3, help='Medições por entrada (usa a melhor)')
+    args = parser.parse_args()
+
+    budget = carregar_budget()
+    tolerancia = budget.get('tolerancia', 0.25)
+    falhas = []
+    for modulo, limite in budget.get('entradas', {}).items():
+        try:
+            tempos = medir(modulo, args.repeat)
+        except RuntimeError as e:
+            print('Erro:', e)
+            sys.exit(2)
+        relatorio(modulo, tempos, args.top)
+        total = tempos[modulo][1]
+
+        proibidos = proibidos_carregados(tempos, budget)
+        if proibidos:
+            falhas.append(f'{modulo} importa módulos proibidos antes do login: {", ".join(proibidos)}')
+
+        if args.update:
+            limite['max_ms'] = round(total, 1)
+        elif total > limite['max_ms'] * (1 + tolerancia):
+            falhas.append(f'{modulo}: {total:.1f} ms excede o orçamento de {limite["max_ms"]:.1f} ms '
+                          f'(+{tolerancia:.0%})')
+
+    if args.update:
+        BUDGET_FILE.write_text(json.dumps(budget, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print('\nOrçamento atualizado em', BUDGET_FILE)
+
+    if falhas:
+        print('\nRegressões no arranque:')
+        for falha in falhas:
+            print(' -', falha)
+        sys.exit(1)
+    print('\nArranque dentro do orçamento.')
+
+
+if __name__ == '__main__':
+    main()
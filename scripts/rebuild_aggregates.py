@@ -0,0 +1,34 @@
+from pathlib import Path
+import argparse
+import sys
+# Ensure project root is on sys.path so top-level packages like `database`
+# are importable when the script is executed directly from anywhere.
+_ROOT = Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database import db
+from database.agregados import reconstruir_agregados
+from database.imagens import remover_imagens_orfas
+from database.migrations import migrate
+
+
+def rebuild(db_path: Path = None):
+    """Recalcula as tabelas de totais diários/mensais a partir das vendas e transações.
+
+    Apaga também as imagens que nenhuma linha usa (ver database/imagens.py).
+    """
+    if db_path is not None:
+        db.set_db_path(db_path)
+    migrate()
+    for tabela, linhas in reconstruir_agregados().items():
+        print(f'{tabela}: {linhas} linhas')
+    with db.transaction(immediate=True) as conn:
+        print(f'imagens sem uso apagadas: {remover_imagens_orfas(conn)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reconstrói os agregados de vendas e finanças e apaga imagens sem uso')
+    parser.add_argument('--db', help='Path to DB file (optional)')
+    args = parser.parse_args()
+    rebuild(Path(args.db) if args.db else None)
@@ -1,5 +1,16 @@
+import os
+import socket
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[2]
-DB_FILE = BASE_DIR / 'database' / 'kamba_farma.db'
+# Base de dados da aplicação (database.db.resolve_db_path)
+DB_FILE = Path(os.environ.get('KAMBA_DB_FILE') or BASE_DIR / 'database' / 'kamba_farma.db')
 DEBUG = True
+
+# Posto de venda gravado em cada venda (relatório Z por caixa)
+TERMINAL = os.environ.get('KAMBA_TERMINAL') or socket.gethostname()
+
+# Fotos gravadas (produtos, lotes, usuários): lado maior em píxeis e
+# qualidade JPEG (0-100) com que são recodificadas ao serem escolhidas
+FOTO_LADO_MAXIMO = int(os.environ.get('KAMBA_FOTO_LADO_MAXIMO', 1024))
+FOTO_QUALIDADE = int(os.environ.get('KAMBA_FOTO_QUALIDADE', 80))
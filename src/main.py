@@ -6,6 +6,17 @@ def main():
     src_dir = Path(__file__).resolve().parent
     if str(src_dir) not in sys.path:
         sys.path.insert(0, str(src_dir))
+    root_dir = src_dir.parent
+    if str(root_dir) not in sys.path:
+        sys.path.insert(0, str(root_dir))
+
+    # aplicar migrações pendentes do esquema antes de abrir a interface
+    from database.migrations import migrate
+    try:
+        migrate()
+    except Exception as e:
+        print('Erro ao atualizar a base de dados:', e)
+        sys.exit(1)
 
     try:
         from ui.login_window import LoginWindow
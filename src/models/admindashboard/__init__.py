@@ -5,25 +5,35 @@ module file `models/admindashboard/lote.py` (the SPA entry). This
 resolves the name collision between the package `lote/` and the
 module `lote.py` so callers can continue using
 `from models.admindashboard.lote import LotePage`.
+
+The module is only loaded when `LotePage` is first accessed, so importing
+any `models.admindashboard.*` module (e.g. the dashboard at startup) does
+not pay for the lote views.
 """
 
 from pathlib import Path
 import importlib.util
 import sys
 
-__all__ = []
+__all__ = ["LotePage"]
 
 _module_path = Path(__file__).resolve().parents[1] / "lote.py"
-if _module_path.exists():
-	try:
+
+
+def __getattr__(name):
+	if name != "LotePage":
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	module = sys.modules.get("models.admindashboard._lote_module")
+	if module is None and _module_path.exists():
 		spec = importlib.util.spec_from_file_location("models.admindashboard._lote_module", str(_module_path))
-		if spec and spec.loader:
-			module = importlib.util.module_from_spec(spec)
-			sys.modules[spec.name] = module
+		module = importlib.util.module_from_spec(spec)
+		sys.modules[spec.name] = module
+		try:
 			spec.loader.exec_module(module)
-			if hasattr(module, "LotePage"):
-				LotePage = getattr(module, "LotePage")
-				__all__.append("LotePage")
-	except Exception:
-		# If loading fails, leave package empty so imports fail loudly later.
-		pass
+		except Exception:
+			del sys.modules[spec.name]
+			raise
+	if module is None or not hasattr(module, "LotePage"):
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	globals()["LotePage"] = module.LotePage
+	return module.LotePage
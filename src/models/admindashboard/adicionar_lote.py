@@ -14,8 +14,11 @@ _ROOT = Path(__file__).resolve().parents[3]
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
-from src.config.paths import DB_DIR
-from database.db import connect, get_db_path
+from database.db import get_connection, transaction
+from src.utils.async_loader import AsyncLoader
+from src.utils.fotos import FILTRO_IMAGENS, ler_foto
+from src.utils.logger import logger
+from src.utils.miniaturas import guardar_foto
 
 from colors import *
 # Local aliases and helpers
@@ -29,6 +32,7 @@ BORDER_COLOR = BORDER_COLOR
 TEXT_PRIMARY = TEXT_PRIMARY
 TEXT_SECONDARY = "#6B7280"
 TEXT_LIGHT = "#9CA3AF"
+INFO_FOTO = "• Formatos suportados: JPG, PNG, BMP\n• Fotos grandes são reduzidas e otimizadas ao escolher"
 
 class RoundedFrame(QFrame):
     """Frame com cantos arredondados."""
@@ -54,6 +58,10 @@ class AdicionarLoteView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.foto_data = None  # Para armazenar a imagem em bytes
+        # Preparação da foto escolhida fora da thread da interface
+        self._foto_loader = AsyncLoader(self)
+        self._foto_loader.loaded.connect(self._on_foto_preparada)
+        self._foto_loader.failed.connect(self._on_foto_falhou)
         self.setup_ui()
         self.load_choices()
         
@@ -461,8 +469,8 @@ class AdicionarLoteView(QWidget):
         foto_layout.addLayout(foto_content_layout)
         
         # Informações sobre a foto
-        foto_info = QLabel("• Formatos suportados: JPG, PNG, BMP\n• Tamanho máximo recomendado: 2MB")
-        foto_info.setStyleSheet(f"""
+        self.foto_info = QLabel(INFO_FOTO)
+        self.foto_info.setStyleSheet(f"""
             font-size: 12px;
             color: {TEXT_SECONDARY};
             font-style: italic;
@@ -470,7 +478,7 @@ class AdicionarLoteView(QWidget):
             background-color: {BG_COLOR};
             border-radius: 6px;
         """)
-        foto_layout.addWidget(foto_info)
+        foto_layout.addWidget(self.foto_info)
         
         foto_group.setLayout(foto_layout)
         form_layout.addWidget(foto_group)
@@ -566,9 +574,7 @@ class AdicionarLoteView(QWidget):
 
     def load_choices(self):
         """Carrega produtos e fornecedores dos comboboxes."""
-        db_path = get_db_path(DB_DIR)
-        conn = connect(db_path)
-        cur = conn.cursor()
+        cur = get_connection().cursor()
         
         try:
             # Produtos
@@ -594,8 +600,6 @@ class AdicionarLoteView(QWidget):
                 
         except Exception as e:
             print(f"Erro ao carregar opções: {e}")
-        finally:
-            conn.close()
 
     def choose_foto(self):
         """Abre diálogo para escolher imagem."""
@@ -603,31 +607,29 @@ class AdicionarLoteView(QWidget):
             self, 
             "Escolher imagem do lote", 
             "", 
-            "Imagens (*.png *.jpg *.jpeg *.bmp);;Todos os arquivos (*.*)"
+            f"{FILTRO_IMAGENS};;Todos os arquivos (*.*)"
         )
         if fn:
-            try:
-                with open(fn, 'rb') as f:
-                    self.foto_data = f.read()
-                
-                # Verificar tamanho (limite de 2MB)
-                if len(self.foto_data) > 2 * 1024 * 1024:
-                    QMessageBox.warning(
-                        self,
-                        "Imagem muito grande",
-                        "A imagem selecionada excede 2MB. Por favor, selecione uma imagem menor."
-                    )
-                    self.foto_data = None
-                else:
-                    self._update_foto_preview()
-                    
-            except Exception as e:
-                QMessageBox.warning(self, "Erro", f"Não foi possível ler a imagem selecionada: {str(e)}")
+            # Reduzir e recodificar em segundo plano (ver src/utils/fotos.py)
+            self.foto_preview.setText("A preparar\nimagem...")
+            self._foto_loader.run(ler_foto, fn)
+
+    def _on_foto_preparada(self, foto):
+        self.foto_data = foto.dados
+        self._update_foto_preview()
+        self.foto_info.setText(f"{INFO_FOTO}\n• Imagem otimizada: {foto.resumo()}")
+        logger.info("Foto do lote preparada: %s", foto.resumo())
+
+    def _on_foto_falhou(self, mensagem):
+        QMessageBox.warning(self, "Erro", f"Não foi possível ler a imagem selecionada: {mensagem}")
+        self._update_foto_preview()
 
     def remover_foto(self):
         """Remove a foto selecionada"""
+        self._foto_loader.cancel()
         self.foto_data = None
         self._update_foto_preview()
+        self.foto_info.setText(INFO_FOTO)
 
     def on_cancel(self):
         """Limpa o formulário."""
@@ -635,8 +637,10 @@ class AdicionarLoteView(QWidget):
         self.validade.setDate(QDate.currentDate().addYears(1))
         self.quantidade.setValue(1)
         self.preco_compra.setValue(0.0)
+        self._foto_loader.cancel()
         self.foto_data = None
         self._update_foto_preview()
+        self.foto_info.setText(INFO_FOTO)
         self.fornecedor_cb.setCurrentIndex(0)
         
         if self.produto_cb.count() > 0:
@@ -672,34 +676,30 @@ class AdicionarLoteView(QWidget):
         foto_bytes = self.foto_data  # Já temos os bytes da imagem
         
         # Salvar no banco
-        db_path = get_db_path(DB_DIR)
-        conn = connect(db_path)
-        
         try:
-            cur = conn.cursor()
+            with transaction() as conn:
+                cur = conn.cursor()
             
-            # Inserir lote
-            cur.execute(
-                """
-                INSERT INTO lotes (
-                    produto_id, numero_lote, validade, foto, 
-                    quantidade_inicial, quantidade_atual, preco_compra, fornecedor_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    produto_id, numero_lote, validade, 
-                    sqlite3.Binary(foto_bytes) if foto_bytes else None,
-                    quantidade, quantidade, preco, fornecedor_id
+                # Inserir lote
+                cur.execute(
+                    """
+                    INSERT INTO lotes (
+                        produto_id, numero_lote, validade, imagem_id,
+                        quantidade_inicial, quantidade_atual, preco_compra, fornecedor_id
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        produto_id, numero_lote, validade, 
+                        guardar_foto(conn, foto_bytes),
+                        quantidade, quantidade, preco, fornecedor_id
+                    )
                 )
-            )
             
-            # Atualizar stock do produto
-            cur.execute(
-                "UPDATE produtos SET stock = COALESCE(stock, 0) + ? WHERE id = ?",
-                (quantidade, produto_id)
-            )
-            
-            conn.commit()
+                # Atualizar stock do produto
+                cur.execute(
+                    "UPDATE produtos SET stock = COALESCE(stock, 0) + ? WHERE id = ?",
+                    (quantidade, produto_id)
+                )
             
             # Mensagem de sucesso
             QMessageBox.information(
@@ -715,14 +715,11 @@ class AdicionarLoteView(QWidget):
             self.on_cancel()
             
         except Exception as e:
-            conn.rollback()
             QMessageBox.critical(
                 self, 
                 "❌ Erro", 
                 f"Erro ao salvar lote:\n{str(e)}"
             )
-        finally:
-            conn.close()
 
 
 if __name__ == '__main__':
@@ -21,9 +21,12 @@ _ROOT = Path(__file__).resolve().parents[3]
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
-from src.config.paths import DB_DIR
-from database.db import get_db_path, connect
+from database.db import transaction
 from src.core.auth import hash_password
+from src.utils.async_loader import AsyncLoader
+from src.utils.fotos import FILTRO_IMAGENS, ler_foto
+from src.utils.logger import logger
+from src.utils.miniaturas import guardar_foto
 
 from colors import *
 # Local aliases and legacy helpers
@@ -176,6 +179,9 @@ class PhotoFrame(QLabel):
         self.setAlignment(Qt.AlignCenter)
         self.setCursor(Qt.PointingHandCursor)
         self.photo_data = None
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._on_photo_ready)
+        self._loader.failed.connect(self._on_photo_failed)
         self._setup_ui()
         
     def _setup_ui(self):
@@ -204,49 +210,53 @@ class PhotoFrame(QLabel):
             self, 
             "Escolher foto", 
             str(Path.home()), 
-            "Imagens (*.png *.jpg *.jpeg *.bmp *.gif)"
+            FILTRO_IMAGENS
         )
         
         if path:
-            try:
-                with open(path, "rb") as f:
-                    self.photo_data = f.read()
-                
-                pixmap = QPixmap()
-                pixmap.loadFromData(self.photo_data)
-                pixmap = pixmap.scaled(
-                    140, 140, 
-                    Qt.KeepAspectRatio, 
-                    Qt.SmoothTransformation
-                )
-                
-                # Criar pixmap arredondado
-                rounded = QPixmap(140, 140)
-                rounded.fill(Qt.transparent)
-                
-                painter = QPainter(rounded)
-                painter.setRenderHint(QPainter.Antialiasing)
-                painter.setRenderHint(QPainter.SmoothPixmapTransform)
-                
-                path = QPainterPath()
-                path.addEllipse(0, 0, 140, 140)
-                painter.setClipPath(path)
-                painter.drawPixmap(0, 0, pixmap)
-                painter.end()
-                
-                self.setPixmap(rounded)
-                self.setStyleSheet(f"""
-                    QLabel {{
-                        background-color: transparent;
-                        border: 3px solid {GREEN_SUCCESS};
-                        border-radius: 80px;
-                    }}
-                """)
-                
-                self.photo_selected.emit(self.photo_data)
-                
-            except Exception as e:
-                print(f"Erro ao carregar foto: {e}")
+            # Reduzir e recodificar em segundo plano (ver src/utils/fotos.py)
+            self._loader.run(ler_foto, path)
+
+    def _on_photo_ready(self, foto):
+        self.photo_data = foto.dados
+        
+        pixmap = QPixmap()
+        pixmap.loadFromData(self.photo_data)
+        pixmap = pixmap.scaled(
+            140, 140, 
+            Qt.KeepAspectRatio, 
+            Qt.SmoothTransformation
+        )
+        
+        # Criar pixmap arredondado
+        rounded = QPixmap(140, 140)
+        rounded.fill(Qt.transparent)
+        
+        painter = QPainter(rounded)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        
+        path = QPainterPath()
+        path.addEllipse(0, 0, 140, 140)
+        painter.setClipPath(path)
+        painter.drawPixmap(0, 0, pixmap)
+        painter.end()
+        
+        self.setPixmap(rounded)
+        self.setToolTip(f"Foto otimizada: {foto.resumo()}")
+        self.setStyleSheet(f"""
+            QLabel {{
+                background-color: transparent;
+                border: 3px solid {GREEN_SUCCESS};
+                border-radius: 80px;
+            }}
+        """)
+        
+        self.photo_selected.emit(self.photo_data)
+        logger.info("Foto do usuário preparada: %s", foto.resumo())
+
+    def _on_photo_failed(self, mensagem):
+        logger.warning("Erro ao carregar foto: %s", mensagem)
 
 
 class AdicionarUsuarioView(QWidget):
@@ -606,16 +616,13 @@ class AdicionarUsuarioView(QWidget):
 
         # Save to database
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO usuarios (nome, numero_bi, area_atuacao, contacto, genero, foto, senha_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (nome, numero_bi or None, area_atuacao or None, contacto or None, genero or None, self.foto_bytes, senha_hash)
-            )
-            conn.commit()
-            last_id = cur.lastrowid
-            conn.close()
+            with transaction() as conn:
+                cur = conn.execute(
+                    "INSERT INTO usuarios (nome, numero_bi, area_atuacao, contacto, genero, imagem_id, senha_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (nome, numero_bi or None, area_atuacao or None, contacto or None, genero or None,
+                     guardar_foto(conn, self.foto_bytes), senha_hash)
+                )
+                last_id = cur.lastrowid
             
             # Emitir sinal para que o container (pagina) saiba que há um novo usuário
             try:
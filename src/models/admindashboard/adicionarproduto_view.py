@@ -7,8 +7,20 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, pyqtSignal, QDate, QSize
 from PyQt5.QtGui import QPixmap, QFont, QIcon, QPainter, QPainterPath, QColor, QLinearGradient
 import sqlite3
+import sys
 from pathlib import Path
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import get_connection, transaction
+from src.utils.async_loader import AsyncLoader
+from src.utils.fotos import FILTRO_IMAGENS, ler_foto
+from src.utils.logger import logger
+from src.utils.miniaturas import guardar_foto
+
 from colors import *
 # Local aliases and legacy helpers
 MILK_BG = BACKGROUND_GRAY
@@ -28,6 +40,7 @@ PURPLE = "#9B59B6"
 BLUE_INFO = "#3498DB"
 ORANGE_ALERT = "#F39C12"
 SHADOW_COLOR = SHADOW_COLOR
+INFO_FOTO = "• Formatos suportados: JPG, PNG, BMP\n• Fotos grandes são reduzidas e otimizadas ao escolher"
 
 class RoundedFrame(QFrame):
     """Frame com cantos arredondados."""
@@ -313,6 +326,10 @@ class AddProductPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.foto_data = None  # Para armazenar a imagem em bytes
+        # Preparação da foto escolhida fora da thread da interface
+        self._foto_loader = AsyncLoader(self)
+        self._foto_loader.loaded.connect(self._on_foto_preparada)
+        self._foto_loader.failed.connect(self._on_foto_falhou)
         self._setup_ui()
         
     def _setup_ui(self):
@@ -657,8 +674,8 @@ class AddProductPage(QWidget):
         photo_layout.addLayout(photo_content)
         
         # Informações sobre a foto
-        foto_info = QLabel("• Formatos suportados: JPG, PNG, BMP\n• Tamanho máximo recomendado: 2MB")
-        foto_info.setStyleSheet(f"""
+        self.foto_info = QLabel(INFO_FOTO)
+        self.foto_info.setStyleSheet(f"""
             font-size: 13px;
             color: {TEXT_SECONDARY};
             font-style: italic;
@@ -667,7 +684,7 @@ class AddProductPage(QWidget):
             border-radius: 8px;
             border-left: 4px solid {TEAL_PRIMARY};
         """)
-        photo_layout.addWidget(foto_info)
+        photo_layout.addWidget(self.foto_info)
         
         form_layout.addWidget(photo_group)
         
@@ -738,38 +755,35 @@ class AddProductPage(QWidget):
             self,
             "Selecionar Imagem do Produto",
             "",
-            "Imagens (*.png *.jpg *.jpeg *.bmp *.gif);;Todos os arquivos (*.*)"
+            f"{FILTRO_IMAGENS};;Todos os arquivos (*.*)"
         )
         
         if file_path:
-            try:
-                with open(file_path, 'rb') as file:
-                    self.foto_data = file.read()
-                
-                # Verificar tamanho (limite de 2MB)
-                if len(self.foto_data) > 2 * 1024 * 1024:
-                    QMessageBox.warning(
-                        self,
-                        "Imagem muito grande",
-                        "A imagem selecionada excede 2MB. Por favor, selecione uma imagem menor."
-                    )
-                    self.foto_data = None
-                else:
-                    self._update_foto_preview()
-                    
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Erro ao carregar imagem",
-                    f"Não foi possível carregar a imagem:\n{str(e)}"
-                )
-                self.foto_data = None
-                self._update_foto_preview()
+            # Reduzir e recodificar em segundo plano (ver src/utils/fotos.py)
+            self.foto_preview.setText("A preparar\nimagem...")
+            self._foto_loader.run(ler_foto, file_path)
+
+    def _on_foto_preparada(self, foto):
+        self.foto_data = foto.dados
+        self._update_foto_preview()
+        self.foto_info.setText(f"{INFO_FOTO}\n• Imagem otimizada: {foto.resumo()}")
+        logger.info("Foto do produto preparada: %s", foto.resumo())
+
+    def _on_foto_falhou(self, mensagem):
+        QMessageBox.critical(
+            self,
+            "Erro ao carregar imagem",
+            f"Não foi possível carregar a imagem:\n{mensagem}"
+        )
+        self.foto_data = None
+        self._update_foto_preview()
 
     def _remover_foto(self):
         """Remove a foto selecionada"""
+        self._foto_loader.cancel()
         self.foto_data = None
         self._update_foto_preview()
+        self.foto_info.setText(INFO_FOTO)
 
     def _validar_dados(self):
         """Valida os dados do formulário"""
@@ -836,15 +850,10 @@ class AddProductPage(QWidget):
 
     def _load_fornecedores(self):
         try:
-            # Resolve project root reliably and build path to local database copy used by this view
-            db_path = Path(__file__).resolve().parents[3] / 'database' / 'kamba_farma.db'
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+            cur = get_connection().cursor()
             cur.execute("SELECT id, nome FROM fornecedores WHERE ativo=1 ORDER BY nome")
             for r in cur.fetchall():
                 self.fornecedor_combo.addItem(r['nome'], r['id'])
-            conn.close()
         except Exception:
             pass
 
@@ -864,8 +873,10 @@ class AddProductPage(QWidget):
         self.nome_lote_input.clear()
         self.validade_input.setDate(QDate.currentDate())
         self.sem_validade_cb.setChecked(False)
+        self._foto_loader.cancel()
         self.foto_data = None
         self._update_foto_preview()
+        self.foto_info.setText(INFO_FOTO)
 
     def _on_salvar(self):
         """Salva o produto no banco de dados"""
@@ -873,107 +884,99 @@ class AddProductPage(QWidget):
             return
         
         try:
-            # Conectar ao banco de dados
-            # Resolve project root reliably and build path to local database copy used by this view
-            db_path = Path(__file__).resolve().parents[3] / 'database' / 'kamba_farma.db'
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
+            # Produto, fornecedor novo e lote inicial gravados numa única transação
+            with transaction() as conn:
+                cursor = conn.cursor()
             
-            # Garantir existência da tabela `produtos` compatível com o schema principal
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS produtos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nome_comercial TEXT NOT NULL,
-                    principio_ativo TEXT,
-                    foto BLOB,
-                    categoria TEXT,
-                    preco_venda REAL DEFAULT 0.0,
-                    preco_compra REAL DEFAULT 0.0,
-                    stock INTEGER DEFAULT 0,
-                    forma_farmaceutica TEXT,
-                    codigo_barras TEXT UNIQUE,
-                    unidade TEXT,
-                    stock_minimo INTEGER DEFAULT 0,
-                    fornecedor_padrao_id INTEGER,
-                    lote_padrao_id INTEGER,
-                    ativo INTEGER NOT NULL DEFAULT 1,
-                    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Definir/obter fornecedor
-            fornecedor_id = None
-            if self.fornecedor_combo.currentIndex() > 0:
-                fornecedor_id = self.fornecedor_combo.currentData()
-            else:
-                typed = self.fornecedor_combo.currentText().strip()
-                if typed and typed.lower() != 'selecione...':
-                    try:
-                        cur2 = conn.cursor()
-                        cur2.execute("INSERT INTO fornecedores (nome, ativo) VALUES (?, ?)", (typed, 1))
-                        fornecedor_id = cur2.lastrowid
-                        conn.commit()
-                        self.fornecedor_combo.addItem(typed, fornecedor_id)
-                        self.fornecedor_combo.setCurrentIndex(self.fornecedor_combo.count() - 1)
-                    except Exception:
-                        fornecedor_id = None
-
-            # Inserir produto principal
-            cursor.execute('''
-                INSERT INTO produtos (nome_comercial, principio_ativo, foto, categoria, preco_venda, preco_compra, stock, forma_farmaceutica, codigo_barras, unidade, stock_minimo, fornecedor_padrao_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                self.nome_input.text().strip(),
-                self.principio_input.text().strip() if self.principio_input.text().strip() else None,
-                self.foto_data,
-                self.categoria_combo.currentText(),
-                self.preco_input.value(),
-                self.preco_compra_input.value(),
-                int(self.stock_input.value()),
-                self.forma_input.text().strip(),
-                self.codigo_barras_input.text().strip() or None,
-                self.unidade_input.text().strip(),
-                int(self.stock_minimo_input.value()),
-                fornecedor_id
-            ))
-            conn.commit()
-            produto_id = cursor.lastrowid
-
-            # Se foi fornecido nome do lote ou stock>0, criar lote vinculado
-            nome_lote = self.nome_lote_input.text().strip()
-            quantidade = int(self.stock_input.value())
-            validade = None
-            if not self.sem_validade_cb.isChecked():
-                validade = self.validade_input.date().toString('yyyy-MM-dd')
-            lote_id = None
-            if nome_lote or quantidade > 0:
+                # Garantir existência da tabela `produtos` compatível com o schema principal
                 cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS lotes (
+                    CREATE TABLE IF NOT EXISTS produtos (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        produto_id INTEGER NOT NULL,
-                        numero_lote TEXT,
-                        validade DATE,
-                        foto BLOB,
-                        quantidade_inicial INTEGER DEFAULT 0,
-                        quantidade_atual INTEGER DEFAULT 0,
+                        nome_comercial TEXT NOT NULL,
+                        principio_ativo TEXT,
+                        imagem_id INTEGER,
+                        categoria TEXT,
+                        preco_venda REAL DEFAULT 0.0,
                         preco_compra REAL DEFAULT 0.0,
-                        fornecedor_id INTEGER,
-                        data_entrada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        stock INTEGER DEFAULT 0,
+                        forma_farmaceutica TEXT,
+                        codigo_barras TEXT UNIQUE,
+                        unidade TEXT,
+                        stock_minimo INTEGER DEFAULT 0,
+                        fornecedor_padrao_id INTEGER,
+                        lote_padrao_id INTEGER,
                         ativo INTEGER NOT NULL DEFAULT 1,
-                        FOREIGN KEY(produto_id) REFERENCES produtos(id),
-                        FOREIGN KEY(fornecedor_id) REFERENCES fornecedores(id)
+                        criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
-                cursor.execute(
-                    "INSERT INTO lotes (produto_id, numero_lote, validade, quantidade_inicial, quantidade_atual, preco_compra, fornecedor_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (produto_id, nome_lote if nome_lote else None, validade, quantidade, quantidade, self.preco_input.value(), fornecedor_id)
-                )
-                conn.commit()
-                lote_id = cursor.lastrowid
-                cursor.execute("UPDATE produtos SET lote_padrao_id = ? WHERE id = ?", (lote_id, produto_id))
-                conn.commit()
 
-            conn.close()
+                # Definir/obter fornecedor
+                fornecedor_id = None
+                if self.fornecedor_combo.currentIndex() > 0:
+                    fornecedor_id = self.fornecedor_combo.currentData()
+                else:
+                    typed = self.fornecedor_combo.currentText().strip()
+                    if typed and typed.lower() != 'selecione...':
+                        try:
+                            cur2 = conn.cursor()
+                            cur2.execute("INSERT INTO fornecedores (nome, ativo) VALUES (?, ?)", (typed, 1))
+                            fornecedor_id = cur2.lastrowid
+                            self.fornecedor_combo.addItem(typed, fornecedor_id)
+                            self.fornecedor_combo.setCurrentIndex(self.fornecedor_combo.count() - 1)
+                        except Exception:
+                            fornecedor_id = None
+
+                # Inserir produto principal
+                cursor.execute('''
+                    INSERT INTO produtos (nome_comercial, principio_ativo, imagem_id, categoria, preco_venda, preco_compra, stock, forma_farmaceutica, codigo_barras, unidade, stock_minimo, fornecedor_padrao_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    self.nome_input.text().strip(),
+                    self.principio_input.text().strip() if self.principio_input.text().strip() else None,
+                    guardar_foto(conn, self.foto_data),
+                    self.categoria_combo.currentText(),
+                    self.preco_input.value(),
+                    self.preco_compra_input.value(),
+                    int(self.stock_input.value()),
+                    self.forma_input.text().strip(),
+                    self.codigo_barras_input.text().strip() or None,
+                    self.unidade_input.text().strip(),
+                    int(self.stock_minimo_input.value()),
+                    fornecedor_id
+                ))
+                produto_id = cursor.lastrowid
+
+                # Se foi fornecido nome do lote ou stock>0, criar lote vinculado
+                nome_lote = self.nome_lote_input.text().strip()
+                quantidade = int(self.stock_input.value())
+                validade = None
+                if not self.sem_validade_cb.isChecked():
+                    validade = self.validade_input.date().toString('yyyy-MM-dd')
+                lote_id = None
+                if nome_lote or quantidade > 0:
+                    cursor.execute('''
+                        CREATE TABLE IF NOT EXISTS lotes (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            produto_id INTEGER NOT NULL,
+                            numero_lote TEXT,
+                            validade DATE,
+                            imagem_id INTEGER,
+                            quantidade_inicial INTEGER DEFAULT 0,
+                            quantidade_atual INTEGER DEFAULT 0,
+                            preco_compra REAL DEFAULT 0.0,
+                            fornecedor_id INTEGER,
+                            data_entrada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            ativo INTEGER NOT NULL DEFAULT 1,
+                            FOREIGN KEY(produto_id) REFERENCES produtos(id),
+                            FOREIGN KEY(fornecedor_id) REFERENCES fornecedores(id)
+                        )
+                    ''')
+                    cursor.execute(
+                        "INSERT INTO lotes (produto_id, numero_lote, validade, quantidade_inicial, quantidade_atual, preco_compra, fornecedor_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (produto_id, nome_lote if nome_lote else None, validade, quantidade, quantidade, self.preco_input.value(), fornecedor_id)
+                    )
+                    lote_id = cursor.lastrowid
+                    cursor.execute("UPDATE produtos SET lote_padrao_id = ? WHERE id = ?", (lote_id, produto_id))
 
             # Mostrar mensagem de sucesso
             msg = f"""
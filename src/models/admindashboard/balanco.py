@@ -1,5 +1,4 @@
 from pathlib import Path
-import sqlite3
 from datetime import datetime
 import sys
 
@@ -12,28 +11,35 @@ from PyQt5.QtGui import QFont, QColor
 
 # Import robusto: tenta import relativo, senão usa import absoluto
 try:
-    from .db_utils import _find_db_file
+    from .db_utils import get_connection
 except ImportError:
     # Se executado como script direto
     sys.path.insert(0, str(Path(__file__).parent))
-    from db_utils import _find_db_file
+    from db_utils import get_connection
 
+from src.services.financas_service import fechar_mes, resumo_balanco, totais_mes
+from src.utils.async_loader import AsyncLoader
 
-def _find_db_file():
-    root = Path(__file__).resolve()
-    for _ in range(8):
-        db_dir = root / "database"
-        if db_dir.exists():
-            db_file = db_dir / "kamba_farma.db"
-            return db_file if db_file.exists() else None
-        root = root.parent
-    return None
+
+def calcular_balanco(ym: str) -> dict:
+    """Entradas, saídas por categoria e resultado do mês ``ym`` (yyyy-MM).
+
+    Meses fechados vêm do fecho congelado; o mês aberto é calculado ao vivo
+    (vendas e transações por tipo e categoria numa única consulta).
+    """
+    totais, fechado = totais_mes(ym)
+    dados = resumo_balanco(totais)
+    dados["fechado"] = fechado
+    return dados
 
 
 class BalancoView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.db_file = _find_db_file()
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._aplicar_balanco)
+        self._loader.failed.connect(self._on_balanco_failed)
+        self._loader.cancel_on_hide(self, self.compute_balanco)
         self._init_ui()
 
     def _init_ui(self):
@@ -54,9 +60,15 @@ class BalancoView(QWidget):
         self.mes_picker.dateChanged.connect(self.compute_balanco)
         btn_atualizar = QPushButton(" Atualizar")
         btn_atualizar.clicked.connect(self.compute_balanco)
+        self.btn_fechar = QPushButton("Fechar mês")
+        self.btn_fechar.setToolTip("Congela os totais do mês; depois disso as vendas e transações do mês não podem ser alteradas")
+        self.btn_fechar.clicked.connect(self.fechar_mes_selecionado)
+        self.estado_label = QLabel("")
         mes_layout.addWidget(lbl_mes)
         mes_layout.addWidget(self.mes_picker)
         mes_layout.addWidget(btn_atualizar)
+        mes_layout.addWidget(self.btn_fechar)
+        mes_layout.addWidget(self.estado_label)
         mes_layout.addStretch()
         layout.addLayout(mes_layout)
         PRIMARY_COLOR = "#28C7D3"
@@ -116,79 +128,71 @@ class BalancoView(QWidget):
         # Carregar balanço do mês atual
         self.compute_balanco()
 
+    def refresh(self):
+        """Recalcula o balanço ao voltar à view."""
+        self.compute_balanco()
+
     def compute_balanco(self):
-        """Calcula o balanço completo do mês: entradas, saídas e resultado."""
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
-            return
+        """Calcula o balanço completo do mês em segundo plano."""
+        self._loader.run(calcular_balanco, self._mes_selecionado())
 
+    def _mes_selecionado(self) -> str:
         date = self.mes_picker.date()
-        year = date.year()
-        month = date.month()
-        ym = f"{year}-{month:02d}"
-
+        return f"{date.year()}-{date.month():02d}"
+
+    def fechar_mes_selecionado(self):
+        """Congela o mês selecionado em ``fechos_mensais`` (após confirmação)."""
+        ym = self._mes_selecionado()
+        resposta = QMessageBox.question(
+            self, "Fechar mês",
+            f"Fechar {self.mes_picker.date().toString('MMMM yyyy')}?\n"
+            "Os totais ficam congelados e as vendas e transações do mês deixam de poder ser alteradas.",
+        )
+        if resposta != QMessageBox.Yes:
+            return
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-
-            # ===== ENTRADAS =====
-            # Vendas
-            cur.execute("SELECT SUM(total) as total_vendas FROM vendas WHERE strftime('%Y-%m', data_venda) = ?", (ym,))
-            r = cur.fetchone()
-            total_vendas = r['total_vendas'] if r and r['total_vendas'] is not None else 0.0
-            self.vendas_label.setText(f"Vendas: Kz {total_vendas:,.2f}")
-
-            # Kumbu
-            cur.execute("SELECT SUM(valor) as total_kumbu FROM transacoes_financeiras WHERE tipo = 'kumbu' AND strftime('%Y-%m', data_transacao) = ?", (ym,))
-            r = cur.fetchone()
-            total_kumbu = r['total_kumbu'] if r and r['total_kumbu'] is not None else 0.0
-            self.kumbu_label.setText(f"Kumbu: Kz {total_kumbu:,.2f}")
-
-            # Empréstimo
-            cur.execute("SELECT SUM(valor) as total_emprest FROM transacoes_financeiras WHERE tipo = 'emprestimo' AND strftime('%Y-%m', data_transacao) = ?", (ym,))
-            r = cur.fetchone()
-            total_emprest = r['total_emprest'] if r and r['total_emprest'] is not None else 0.0
-            self.emprestimo_label.setText(f"Empréstimo: Kz {total_emprest:,.2f}")
-
-            # Total de entradas
-            total_entrada = total_vendas + total_kumbu + total_emprest
-            self.total_entrada_label.setText(f"Total Entradas: Kz {total_entrada:,.2f}")
-
-            # ===== SAÍDAS =====
-            categorias = [
-                ("Transferência", self.transferencia_label),
-                ("Compra Stock", self.stock_label),
-                ("Uso Pessoal", self.pessoal_label),
-                ("Passagem", self.passagem_label),
-                ("Salário", self.salario_label),
-                ("Outro", self.outro_label)
-            ]
-
-            total_saida = 0.0
-            for cat_name, label_widget in categorias:
-                cur.execute(
-                    "SELECT SUM(valor) as cat_total FROM transacoes_financeiras WHERE tipo = 'saida' AND descricao LIKE ? AND strftime('%Y-%m', data_transacao) = ?",
-                    (f"{cat_name}:%", ym)
-                )
-                r = cur.fetchone()
-                cat_total = r['cat_total'] if r and r['cat_total'] is not None else 0.0
-                total_saida += cat_total
-                label_widget.setText(f"{cat_name}: Kz {cat_total:,.2f}")
-
-            self.total_saida_label.setText(f"Total Saídas: Kz {total_saida:,.2f}")
-
-            # ===== RESULTADO FINAL =====
-            lucro = total_entrada - total_saida
-            self.lucro_label.setText(f"Lucro/Prejuízo: Kz {lucro:,.2f}")
-            
-            # Colorir resultado (verde = lucro, vermelho = prejuízo)
-            if lucro >= 0:
-                self.lucro_label.setStyleSheet("color:#27AE60;font-weight:bold;font-size:14px;")
-            else:
-                self.lucro_label.setStyleSheet("color:#E74C3C;font-weight:bold;font-size:14px;")
-
-            conn.close()
-
+            fechar_mes(ym)
+        except ValueError as e:
+            QMessageBox.warning(self, "Fechar mês", str(e))
+            return
         except Exception as e:
-            QMessageBox.warning(self, "Erro", f"Falha ao calcular balanço: {e}")
+            QMessageBox.critical(self, "Erro", f"Falha ao fechar o mês: {e}")
+            return
+        self.compute_balanco()
+
+    def _aplicar_balanco(self, dados: dict):
+        """Mostra entradas, saídas e resultado calculados por ``calcular_balanco``."""
+        self.estado_label.setText("Mês fechado" if dados['fechado'] else "Mês aberto")
+        self.btn_fechar.setEnabled(not dados['fechado'])
+
+        # ===== ENTRADAS =====
+        self.vendas_label.setText(f"Vendas: Kz {dados['vendas']:,.2f}")
+        self.kumbu_label.setText(f"Kumbu: Kz {dados['kumbu']:,.2f}")
+        self.emprestimo_label.setText(f"Empréstimo: Kz {dados['emprestimo']:,.2f}")
+        self.total_entrada_label.setText(f"Total Entradas: Kz {dados['total_entrada']:,.2f}")
+
+        # ===== SAÍDAS =====
+        labels = {
+            "Transferência": self.transferencia_label,
+            "Compra Stock": self.stock_label,
+            "Uso Pessoal": self.pessoal_label,
+            "Passagem": self.passagem_label,
+            "Salário": self.salario_label,
+            "Outro": self.outro_label,
+        }
+        for cat_name, cat_total in dados['saidas'].items():
+            labels[cat_name].setText(f"{cat_name}: Kz {cat_total:,.2f}")
+        self.total_saida_label.setText(f"Total Saídas: Kz {dados['total_saida']:,.2f}")
+
+        # ===== RESULTADO FINAL =====
+        lucro = dados['lucro']
+        self.lucro_label.setText(f"Lucro/Prejuízo: Kz {lucro:,.2f}")
+        
+        # Colorir resultado (verde = lucro, vermelho = prejuízo)
+        if lucro >= 0:
+            self.lucro_label.setStyleSheet("color:#27AE60;font-weight:bold;font-size:14px;")
+        else:
+            self.lucro_label.setStyleSheet("color:#E74C3C;font-weight:bold;font-size:14px;")
+
+    def _on_balanco_failed(self, mensagem: str):
+        QMessageBox.warning(self, "Erro", f"Falha ao calcular balanço: {mensagem}")
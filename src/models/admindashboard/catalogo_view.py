@@ -1,9 +1,20 @@
+"""Catálogo de produtos em grelha de ícones.
+
+Os produtos são itens de um ``CatalogoModel`` mostrados num ``QListView`` em
+modo ícone e desenhados pelo ``CartaoProdutoDelegate`` — não há um widget por
+produto. O modelo recebe a lista (leve: id, nome, preço e ``imagem_id``) lida
+em segundo plano e expõe-a à vista aos poucos (``canFetchMore``/``fetchMore``);
+as miniaturas só são pedidas para os cartões que chegam a ser desenhados, e
+ficam na cache partilhada de ``src/utils/miniaturas.py``. A pesquisa filtra
+através de um ``QSortFilterProxyModel`` (``CatalogoFiltro``) sobre o nome
+normalizado.
+"""
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QScrollArea, QWidget as QWidgetLocal,
-    QGridLayout, QFrame, QSizePolicy, QSpacerItem
+    QWidget, QVBoxLayout, QLabel, QFrame, QLineEdit, QListView,
+    QStyledItemDelegate, QStyle
 )
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QPixmap, QFont, QColor, QPalette
+from PyQt5.QtCore import Qt, QSize, QRectF, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QFont, QColor, QPalette, QPainter, QPainterPath, QPen, QFontMetrics
 
 import sys
 from pathlib import Path
@@ -13,14 +24,185 @@ _ROOT = Path(__file__).resolve().parents[3]
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
-from src.config.paths import DB_DIR
-from database.db import get_db_path, connect
+from database.db import get_connection
+from src.services.autocomplete_service import normalizar
+from src.utils.async_loader import AsyncLoader
+from src.utils.miniaturas import MINIATURA_GRANDE, miniaturas
+
+# Papéis dos itens do modelo
+PRECO_ROLE = Qt.UserRole + 1
+IMAGEM_ROLE = Qt.UserRole + 2
+FILTRO_ROLE = Qt.UserRole + 3
+
+# Itens entregues à vista de cada vez (fetchMore)
+LOTE_CATALOGO = 200
+TAMANHO_CARTAO = QSize(200, 250)
+
+
+def consultar_catalogo():
+    """Produtos ativos ordenados por nome: (id, nome, preço, imagem_id, nome normalizado)."""
+    cur = get_connection().cursor()
+    cur.execute("SELECT id, nome_comercial, imagem_id, preco_venda FROM produtos WHERE ativo=1 ORDER BY nome_comercial")
+    return [
+        (r['id'], r['nome_comercial'] or '-', float(r['preco_venda'] or 0), r['imagem_id'], normalizar(r['nome_comercial'] or ''))
+        for r in cur.fetchall()
+    ]
+
+
+class CatalogoModel(QAbstractListModel):
+    """Produtos do catálogo, expostos à vista em lotes de ``LOTE_CATALOGO``."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._produtos = []
+        self._expostos = 0
+        # imagem_id -> linhas que a mostram (para redesenhar quando a miniatura chega)
+        self._linhas_por_imagem = {}
+        miniaturas().pronta.connect(self._on_miniatura_pronta)
+
+    def definir_produtos(self, produtos):
+        self.beginResetModel()
+        self._produtos = list(produtos)
+        self._expostos = min(LOTE_CATALOGO, len(self._produtos))
+        self._linhas_por_imagem = {}
+        for linha, produto in enumerate(self._produtos):
+            if produto[3] is not None:
+                self._linhas_por_imagem.setdefault(produto[3], []).append(linha)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._expostos
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._expostos < len(self._produtos)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        novos = min(LOTE_CATALOGO, len(self._produtos) - self._expostos)
+        if novos <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._expostos, self._expostos + novos - 1)
+        self._expostos += novos
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._expostos:
+            return None
+        produto_id, nome, preco, imagem_id, chave = self._produtos[index.row()]
+        if role == Qt.DisplayRole:
+            return nome
+        if role == PRECO_ROLE:
+            return preco
+        if role == IMAGEM_ROLE:
+            return imagem_id
+        if role == FILTRO_ROLE:
+            return chave
+        if role == Qt.UserRole:
+            return produto_id
+        return None
+
+    def expor_todos(self):
+        """Entrega à vista todos os produtos (ex.: antes de filtrar)."""
+        if self._expostos < len(self._produtos):
+            self.beginInsertRows(QModelIndex(), self._expostos, len(self._produtos) - 1)
+            self._expostos = len(self._produtos)
+            self.endInsertRows()
+
+    def _on_miniatura_pronta(self, imagem_id, tamanho):
+        if tamanho != MINIATURA_GRANDE:
+            return
+        for linha in self._linhas_por_imagem.get(imagem_id, ()):
+            if linha < self._expostos:
+                indice = self.index(linha)
+                self.dataChanged.emit(indice, indice, [IMAGEM_ROLE])
+
+
+class CatalogoFiltro(QSortFilterProxyModel):
+    """Filtra o ``CatalogoModel`` pelo nome, sem distinguir acentos nem maiúsculas."""
+
+    def __init__(self, modelo: CatalogoModel, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(modelo)
+        self.setFilterRole(FILTRO_ROLE)
+
+    def pesquisar(self, texto: str):
+        texto = normalizar(texto.strip())
+        if texto:
+            # o filtro só vê as linhas expostas: a pesquisa cobre o catálogo todo
+            self.sourceModel().expor_todos()
+        self.setFilterFixedString(texto)
+
+
+class CartaoProdutoDelegate(QStyledItemDelegate):
+    """Desenha o cartão de um produto: foto, nome e preço."""
+
+    def sizeHint(self, option, index):
+        return TAMANHO_CARTAO
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = QRectF(option.rect).adjusted(4, 4, -4, -4)
+
+        # Cartão
+        hover = bool(option.state & QStyle.State_MouseOver)
+        caminho = QPainterPath()
+        caminho.addRoundedRect(rect, 15, 15)
+        painter.fillPath(caminho, QColor("#f8f9fa" if hover else "white"))
+        painter.setPen(QPen(QColor("#3498db" if hover else "#e0e0e0"), 2))
+        painter.drawPath(caminho)
+
+        # Imagem (marcador até a miniatura estar em cache)
+        area = QRectF(rect.center().x() - 75, rect.top() + 12, 150, 150)
+        fundo = QPainterPath()
+        fundo.addRoundedRect(area, 10, 10)
+        painter.fillPath(fundo, QColor("#f8f9fa"))
+        painter.setPen(QPen(QColor("#e0e0e0"), 1))
+        painter.drawPath(fundo)
+        imagem_id = index.data(IMAGEM_ROLE)
+        pix = miniaturas().pedir(imagem_id, MINIATURA_GRANDE) if imagem_id is not None else None
+        if pix is not None:
+            x = area.center().x() - pix.width() / 2
+            y = area.center().y() - pix.height() / 2
+            painter.drawPixmap(int(x), int(y), pix)
+
+        # Nome (até duas linhas)
+        fonte_nome = QFont(option.font)
+        fonte_nome.setPointSize(10)
+        fonte_nome.setWeight(QFont.DemiBold)
+        painter.setFont(fonte_nome)
+        painter.setPen(QColor("#2c3e50"))
+        area_nome = QRectF(rect.left() + 10, area.bottom() + 6, rect.width() - 20, 36)
+        nome = QFontMetrics(fonte_nome).elidedText(index.data(Qt.DisplayRole) or '', Qt.ElideRight, int(area_nome.width()) * 2 - 10)
+        painter.drawText(area_nome, Qt.AlignHCenter | Qt.AlignTop | Qt.TextWordWrap, nome)
+
+        # Preço
+        fonte_preco = QFont(option.font)
+        fonte_preco.setPointSize(11)
+        fonte_preco.setWeight(QFont.Bold)
+        painter.setFont(fonte_preco)
+        texto_preco = f"Kz {index.data(PRECO_ROLE) or 0:,.2f}"
+        largura = QFontMetrics(fonte_preco).horizontalAdvance(texto_preco) + 24
+        area_preco = QRectF(rect.center().x() - largura / 2, rect.bottom() - 34, largura, 26)
+        etiqueta = QPainterPath()
+        etiqueta.addRoundedRect(area_preco, 8, 8)
+        painter.fillPath(etiqueta, QColor("#f1f8e9"))
+        painter.setPen(QPen(QColor("#c8e6c9"), 1))
+        painter.drawPath(etiqueta)
+        painter.setPen(QColor("#27ae60"))
+        painter.drawText(area_preco, Qt.AlignCenter, texto_preco)
+
+        painter.restore()
 
 
 class CatalogoView(QWidget):
     """Lista os produtos com foto, preço e nome do banco de dados."""
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._on_products_loaded)
+        self._loader.failed.connect(self._on_products_failed)
         self._setup_ui()
         self._load_products()
 
@@ -40,7 +222,7 @@ class CatalogoView(QWidget):
         title_container = QFrame()
         title_container.setFrameShape(QFrame.NoFrame)
         title_layout = QVBoxLayout(title_container)
-        
+
         title = QLabel(" Catálogo de Produtos")
         title.setAlignment(Qt.AlignCenter)
         title_font = QFont()
@@ -57,24 +239,57 @@ class CatalogoView(QWidget):
             }
         """)
         title.setFixedHeight(60)
-        
+
         subtitle = QLabel("Navegue pelos nossos produtos disponíveis")
         subtitle.setAlignment(Qt.AlignCenter)
         subtitle_font = QFont()
         subtitle_font.setPointSize(12)
         subtitle.setFont(subtitle_font)
         subtitle.setStyleSheet("color: #7f8c8d; padding: 5px;")
-        
+
         title_layout.addWidget(title)
         title_layout.addWidget(subtitle)
         main_layout.addWidget(title_container)
 
-        # Área de rolagem com estilo
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setFrameShape(QFrame.NoFrame)
-        self.scroll.setStyleSheet("""
-            QScrollArea {
+        # Pesquisa (filtra pelo nome, sem maiúsculas nem acentos)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Pesquisar produto...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                background-color: white;
+                border: 2px solid #e0e0e0;
+                border-radius: 10px;
+                padding: 10px 14px;
+                font-size: 14px;
+                color: #2c3e50;
+            }
+            QLineEdit:focus {
+                border: 2px solid #3498db;
+            }
+        """)
+        self.search_input.textChanged.connect(self._on_search)
+        main_layout.addWidget(self.search_input)
+
+        # Modelo, filtro e vista em grelha
+        self.model = CatalogoModel(self)
+        self.proxy = CatalogoFiltro(self.model, self)
+
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.IconMode)
+        self.list_view.setResizeMode(QListView.Adjust)
+        self.list_view.setMovement(QListView.Static)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setBatchSize(LOTE_CATALOGO)
+        self.list_view.setSpacing(10)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setSelectionMode(QListView.NoSelection)
+        self.list_view.setFrameShape(QFrame.NoFrame)
+        self.list_view.setItemDelegate(CartaoProdutoDelegate(self.list_view))
+        self.list_view.setModel(self.proxy)
+        self.list_view.setStyleSheet("""
+            QListView {
                 border: none;
                 background-color: transparent;
             }
@@ -93,195 +308,57 @@ class CatalogoView(QWidget):
                 background: #7f8c8d;
             }
         """)
+        main_layout.addWidget(self.list_view, 1)
 
-        # Container dos produtos - ALTERADO: Remove alinhamento central
-        self.container = QWidgetLocal()
-        self.container.setStyleSheet("background-color: transparent;")
-        self.grid = QGridLayout(self.container)
-        self.grid.setContentsMargins(10, 10, 10, 10)
-        self.grid.setHorizontalSpacing(20)
-        self.grid.setVerticalSpacing(25)
-        # REMOVIDO: self.grid.setAlignment(Qt.AlignTop | Qt.AlignHCenter)
-        # Adicionado: Alinha conteúdo ao topo e à esquerda
-        self.grid.setAlignment(Qt.AlignTop | Qt.AlignLeft)
-        
-        # Configurar as colunas para não se expandirem igualmente
-        self.grid.setColumnStretch(0, 0)
-        self.grid.setColumnStretch(1, 0)
-        self.grid.setColumnStretch(2, 0)
-        self.grid.setColumnStretch(3, 0)
-        
-        self.scroll.setWidget(self.container)
-        main_layout.addWidget(self.scroll)
-
-    def _create_product_card(self, name, price, photo_bytes):
-        # Card principal
-        card = QFrame()
-        card.setFrameShape(QFrame.StyledPanel)
-        card.setLineWidth(1)
-        card.setFixedSize(200, 280)
-        card.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-        card.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 15px;
-                border: 2px solid #e0e0e0;
-            }
-            QFrame:hover {
-                border: 2px solid #3498db;
-                background-color: #f8f9fa;
-            }
-        """)
-        
-        layout = QVBoxLayout(card)
-        layout.setContentsMargins(15, 15, 15, 15)
-        layout.setSpacing(12)
-        layout.setAlignment(Qt.AlignCenter)
-
-        # Container da imagem
-        img_container = QFrame()
-        img_container.setFixedSize(150, 150)
-        img_container.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border-radius: 10px;
-                border: 1px solid #e0e0e0;
-            }
-        """)
-        img_layout = QVBoxLayout(img_container)
-        img_layout.setContentsMargins(5, 5, 5, 5)
-        
-        img = QLabel()
-        img.setAlignment(Qt.AlignCenter)
-        img.setFixedSize(140, 140)
-        
-        if photo_bytes:
-            pix = QPixmap()
-            if pix.loadFromData(photo_bytes):
-                # Calcular o tamanho mantendo proporção
-                pix = pix.scaled(130, 130, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                img.setPixmap(pix)
-                # Centralizar a imagem
-                img.setAlignment(Qt.AlignCenter)
-            else:
-                img.setText("")
-                img.setStyleSheet("font-size: 48px; color: #bdc3c7;")
-        else:
-            img.setText("")
-            img.setStyleSheet("font-size: 48px; color: #bdc3c7;")
-        
-        img_layout.addWidget(img)
-        
-        # Nome do produto
-        name_label = QLabel(name)
-        name_label.setWordWrap(True)
-        name_label.setAlignment(Qt.AlignCenter)
-        name_label.setMaximumHeight(40)
-        name_label.setStyleSheet("""
-            QLabel {
-                font-weight: 600;
-                font-size: 14px;
-                color: #2c3e50;
-                padding: 5px;
-            }
-        """)
-        
-        # Preço
-        price_label = QLabel(f"Kz {price:,.2f}")
-        price_label.setAlignment(Qt.AlignCenter)
-        price_label.setStyleSheet("""
-            QLabel {
-                color: #27ae60;
-                font-weight: 700;
-                font-size: 16px;
-                padding: 8px 12px;
-                background-color: #f1f8e9;
-                border-radius: 8px;
-                border: 1px solid #c8e6c9;
-            }
-        """)
-        
-        # Adicionar widgets ao layout
-        layout.addWidget(img_container, 0, Qt.AlignCenter)
-        layout.addWidget(name_label)
-        layout.addWidget(price_label)
-        
-        # Espaçador no final para manter o alinhamento
-        layout.addSpacerItem(QSpacerItem(20, 10, QSizePolicy.Minimum, QSizePolicy.Expanding))
-        
-        return card
+        # Mensagens (sem produtos / erro) no lugar da grelha
+        self.estado_label = QLabel()
+        self.estado_label.setAlignment(Qt.AlignCenter)
+        self.estado_label.setWordWrap(True)
+        self.estado_label.hide()
+        main_layout.addWidget(self.estado_label, 1)
+
+    def _mostrar_estado(self, texto, estilo):
+        self.estado_label.setText(texto)
+        self.estado_label.setStyleSheet(estilo)
+        self.estado_label.show()
+        self.list_view.hide()
 
     def _load_products(self):
-        try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
-            cur.execute("SELECT id, nome_comercial, foto, preco_venda FROM produtos WHERE ativo=1 ORDER BY nome_comercial")
-            rows = cur.fetchall()
-            conn.close()
-
-            if not rows:
-                # Mensagem quando não há produtos
-                no_products = QLabel("Nenhum produto disponível no momento")
-                no_products.setAlignment(Qt.AlignCenter)
-                no_products_font = QFont()
-                no_products_font.setPointSize(16)
-                no_products.setFont(no_products_font)
-                no_products.setStyleSheet("color: #95a5a6; padding: 50px;")
-                self.grid.addWidget(no_products, 0, 0)
-                return
-
-            # Número fixo de colunas
-            cols = 4
-            
-            row = 0
-            col = 0
-            for r in rows:
-                name = r['nome_comercial'] if 'nome_comercial' in r.keys() else r[1]
-                price = r['preco_venda'] if 'preco_venda' in r.keys() else (r[3] if len(r) > 3 else 0)
-                photo = r['foto'] if 'foto' in r.keys() else (r[2] if len(r) > 2 else None)
-                card = self._create_product_card(name, price or 0.0, photo)
-                # ALTERADO: Adiciona sem alinhamento central, apenas na posição grid[row][col]
-                self.grid.addWidget(card, row, col)
-                col += 1
-                if col >= cols:
-                    col = 0
-                    row += 1
-
-            # Adicionar um widget vazio que se expande para empurrar tudo para a esquerda
-            # Isso evita que os cards fiquem centralizados quando há poucos produtos
-            if col > 0:  # Se a última linha não está completa
-                for c in range(col, cols):
-                    spacer = QWidget()
-                    spacer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-                    self.grid.addWidget(spacer, row, c)
-            
-            # Adicionar uma coluna de expansão à direita para manter os cards à esquerda
-            self.grid.setColumnStretch(cols, 1)
-
-        except Exception as e:
-            # Mensagem de erro melhorada
-            error_container = QFrame()
-            error_container.setStyleSheet("""
-                QFrame {
-                    background-color: #ffebee;
-                    border-radius: 10px;
-                    border: 1px solid #ffcdd2;
-                    padding: 20px;
-                }
-            """)
-            error_layout = QVBoxLayout(error_container)
-            
-            error_icon = QLabel("")
-            error_icon.setAlignment(Qt.AlignCenter)
-            error_icon.setStyleSheet("font-size: 32px; margin-bottom: 10px;")
-            
-            error_label = QLabel(f"Erro ao carregar produtos:\n{str(e)}")
-            error_label.setAlignment(Qt.AlignCenter)
-            error_label.setWordWrap(True)
-            error_label.setStyleSheet("color: #c62828; font-weight: 500;")
-            
-            error_layout.addWidget(error_icon)
-            error_layout.addWidget(error_label)
-            
-            self.grid.addWidget(error_container, 0, 0, 1, 3)
\ No newline at end of file
+        """Lê o catálogo em segundo plano."""
+        self._loader.run(consultar_catalogo)
+
+    def refresh(self):
+        """Chamado pelo dashboard ao voltar à página."""
+        self._load_products()
+
+    def _on_search(self, texto):
+        self.proxy.pesquisar(texto)
+
+    def _on_products_loaded(self, produtos):
+        """Entrega ao modelo os produtos devolvidos por ``consultar_catalogo``."""
+        self.model.definir_produtos(produtos)
+        if not produtos:
+            # Mensagem quando não há produtos
+            self._mostrar_estado(
+                "Nenhum produto disponível no momento",
+                "color: #95a5a6; padding: 50px; font-size: 16px;"
+            )
+            return
+        self.estado_label.hide()
+        self.list_view.show()
+
+    def _on_products_failed(self, mensagem):
+        """Mostra o erro no lugar da grelha."""
+        self._mostrar_estado(
+            f"Erro ao carregar produtos:\n{mensagem}",
+            """
+            QLabel {
+                background-color: #ffebee;
+                border-radius: 10px;
+                border: 1px solid #ffcdd2;
+                padding: 20px;
+                color: #c62828;
+                font-weight: 500;
+            }
+            """
+        )
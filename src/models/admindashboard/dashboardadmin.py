@@ -12,7 +12,6 @@
 
 import sys
 import os
-import sqlite3
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel,
@@ -24,6 +23,14 @@ from PyQt5.QtGui import QFont, QFontDatabase, QPainter, QBrush, QColor, QLinearG
 import hashlib
 import logging
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import get_connection, resolve_db_path
+from database.migrations import migrate
+
 # logging para debug de login (arquivo local)
 logger = logging.getLogger('kamba.login')
 if not logger.handlers:
@@ -38,6 +45,10 @@ if not logger.handlers:
     fmt = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
     fh.setFormatter(fmt)
     logger.addHandler(fh)
+    # tempos de construção das páginas (PageRegistry)
+    pages_logger = logging.getLogger('kamba.pages')
+    pages_logger.setLevel(logging.INFO)
+    pages_logger.addHandler(fh)
 
 # ============================================================================
 # CONSTANTES DE CORES (PALETA KAMBA)
@@ -70,61 +81,13 @@ TEXT_PRIMARY = TEXT_DARK              # texto principal
 TEXT_SECONDARY = "#607D8B"          # texto secundário
 BORDER_DIVIDER = "#E0E0E0"          # linhas, bordas
 
-# Tentativas de importar implementações modulares (fallback para classes locais)
-# Usamos import absoluto para evitar problemas de contexto durante import
-try:
-    from models.admindashboard.home import HomePage as HomePageModule
-except Exception:
-    HomePageModule = None
-
-# Produto: pode haver também um package `produto/` que sobrescreve o módulo `produto.py`.
-ProdutoPageModule = None
-try:
-    from models.admindashboard.produto import ProdutoPage as ProdutoPageModule
-except Exception as e:
-    logger.debug('Import direto de models.admindashboard.produto falhou: %s', e)
-    # Tentar carregar pelo nome do pacote (funciona quando PyInstaller empacota o módulo)
-    try:
-        import importlib
-        m = importlib.import_module('models.admindashboard.produto')
-        ProdutoPageModule = getattr(m, 'ProdutoPage', None)
-        if ProdutoPageModule:
-            logger.debug('ProdutoPage carregado via importlib.import_module')
-    except Exception as e2:
-        logger.debug('Import via import_module falhou: %s', e2)
-        # Fallback para desenvolvimento local: carregar o arquivo `produto.py` diretamente
-        try:
-            import importlib.util
-            from pathlib import Path
-            prod_path = Path(__file__).parent / 'produto.py'
-            if prod_path.exists():
-                spec = importlib.util.spec_from_file_location('models.admindashboard._produto_module', str(prod_path))
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                ProdutoPageModule = getattr(module, 'ProdutoPage', None)
-        except Exception as e3:
-            logger.debug('Import from file falhou: %s', e3)
-            ProdutoPageModule = None
-
-try:
-    from models.admindashboard.lote import LotePage as LotePageModule
-except Exception:
-    LotePageModule = None
-
-try:
-    from models.admindashboard.venda import VendaPage as VendaPageModule
-except Exception:
-    VendaPageModule = None
-
+# As páginas modulares (home.py, produto.py, ...) são importadas apenas na
+# primeira visita, através do PageRegistry; as classes locais abaixo servem
+# de fallback quando um módulo não carrega.
 try:
-    from models.admindashboard.usuario import UsuarioPage as UsuarioPageModule
-except Exception:
-    UsuarioPageModule = None
-
-try:
-    from models.admindashboard.financas import FinancasPage as FinancasPageModule
-except Exception:
-    FinancasPageModule = None
+    from models.admindashboard.page_registry import PageRegistry
+except ImportError:
+    from page_registry import PageRegistry
 
 # ============================================================================
 # FUNÇÕES AUXILIARES
@@ -874,9 +837,11 @@ class UserDashboard(QMainWindow):
         self.stack = QStackedWidget()
         self.stack.setObjectName("user_stack")
         
-        # Adicionar páginas do usuário
-        self.stack.addWidget(UserVendaPage())      # index 0
-        self.stack.addWidget(UserCatalogoPage())   # index 1
+        # Adicionar páginas do usuário (construídas na primeira visita)
+        self.pages = PageRegistry(self.stack, self)
+        self.pages.pageFailed.connect(self._on_page_failed)
+        self.pages.add('Venda', 'models.admindashboard.venda', 'VendaPage', UserVendaPage)                  # index 0
+        self.pages.add('Catálogo', 'models.admindashboard.catalogo_view', 'CatalogoView', UserCatalogoPage)  # index 1
         
         main_layout.addWidget(menu)
         main_layout.addWidget(self.stack, 1)
@@ -937,90 +902,15 @@ class UserDashboard(QMainWindow):
         if index < len(self.menu_buttons):
             self.menu_buttons[index].setStyleSheet(self._get_user_button_style(True))
         
-        # Caso especial: se selecionar Venda (index 0), tentar carregar dinamicamente `VendaPage`
-        if index == 0:
-            try:
-                import importlib
-                import importlib.util
-
-                # tentar importar como pacote primeiro
-                try:
-                    import models.admindashboard.venda as venda_mod
-                    importlib.reload(venda_mod)
-                except ModuleNotFoundError:
-                    # fallback: carregar diretamente pelo caminho do arquivo
-                    venda_path = Path(__file__).parent / 'venda.py'
-                    if venda_path.exists():
-                        spec = importlib.util.spec_from_file_location('models.admindashboard.venda', str(venda_path))
-                        venda_mod = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(venda_mod)
-                    else:
-                        raise
-
-                VendaClass = getattr(venda_mod, 'VendaPage', None)
-                if VendaClass:
-                    old_widget = self.stack.widget(0) if 0 < self.stack.count() else None
-                    new_widget = VendaClass()
-                    if old_widget is not None:
-                        self.stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    self.stack.insertWidget(0, new_widget)
-                    self.stack.setCurrentIndex(0)
-                    return
-            except Exception as e:
-                try:
-                    QMessageBox.warning(self, 'Erro', f'Não foi possível carregar o módulo de Vendas: {e}')
-                except Exception:
-                    print('Erro ao carregar VendaPage:', e)
-                # Em caso de falha, continua com comportamento padrão
-
-        # Caso especial: se selecionar Catálogo (index 1), tentar carregar dinamicamente `CatalogoView`
-        if index == 1:
-            try:
-                import importlib
-                import importlib.util
-
-                # tentar importar como pacote primeiro
-                try:
-                    import models.admindashboard.catalogo_view as cat_mod
-                    importlib.reload(cat_mod)
-                except ModuleNotFoundError:
-                    # fallback: carregar diretamente pelo caminho do arquivo
-                    cat_path = Path(__file__).parent / '.' / 'catalogo_view.py'
-                    if cat_path.exists():
-                        spec = importlib.util.spec_from_file_location('models.admindashboard.catalogo_view', str(cat_path))
-                        cat_mod = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(cat_mod)
-                    else:
-                        raise
-
-                CatClass = getattr(cat_mod, 'CatalogoView', None)
-                if CatClass:
-                    old_widget = self.stack.widget(1) if 1 < self.stack.count() else None
-                    new_widget = CatClass()
-                    if old_widget is not None:
-                        self.stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    self.stack.insertWidget(1, new_widget)
-                    self.stack.setCurrentIndex(1)
-                    return
-            except Exception as e:
-                try:
-                    QMessageBox.warning(self, 'Erro', f'Não foi possível carregar o catálogo: {e}')
-                except Exception:
-                    print('Erro ao carregar CatalogoView:', e)
-                # Em caso de falha, continua com comportamento padrão
-
-        # Muda a página (comportamento padrão)
-        if 0 <= index < self.stack.count():
-            self.stack.setCurrentIndex(index)
-    
+        # Constrói a página na primeira visita; nas seguintes apenas atualiza os dados
+        self.pages.show(index)
+
+    def _on_page_failed(self, index, nome, erro):
+        try:
+            QMessageBox.warning(self, 'Erro', f'Não foi possível carregar {nome}: {erro}')
+        except Exception:
+            print(f'Erro ao carregar {nome}:', erro)
+
     def apply_user_styles(self):
         style = f"""
             QMainWindow {{
@@ -1260,45 +1150,19 @@ class AdminDashboard(QMainWindow):
         self.stack = QStackedWidget()
         self.stack.setObjectName("stack")
         
-        # Adiciona páginas (usa implementações modulares quando disponíveis)
-        # Home (fallback para a Home simples definida abaixo)
-        if HomePageModule:
-            self.stack.addWidget(HomePageModule())
-        else:
-            self.stack.addWidget(HomePage())               # index 0
-
-        # Produtos
-        if ProdutoPageModule:
-            self.stack.addWidget(ProdutoPageModule())
-        else:
-            self.stack.addWidget(ProdutoPage())            # index 1
-
-        # Lotes
-        if LotePageModule:
-            self.stack.addWidget(LotePageModule())
-        else:
-            self.stack.addWidget(LotePage())               # index 2
-
-        # Vendas
-        if VendaPageModule:
-            self.stack.addWidget(VendaPageModule())
-        else:
-            self.stack.addWidget(VendaPage())              # index 3
-
-        # Finanças
-        if FinancasPageModule:
-            self.stack.addWidget(FinancasPageModule())
-        else:
-            self.stack.addWidget(FinancasPage())           # index 4 (fallback local FinancasPage)
-
-        # Usuários
-        if UsuarioPageModule:
-            self.stack.addWidget(UsuarioPageModule())
-        else:
-            self.stack.addWidget(UsuarioPage())            # index 5
-
+        # Adiciona páginas (usa implementações modulares quando disponíveis,
+        # com as páginas simples definidas acima como fallback). Cada página é
+        # construída apenas na primeira visita.
+        self.pages = PageRegistry(self.stack, self)
+        self.pages.pageFailed.connect(self._on_page_failed)
+        self.pages.add('Home', 'models.admindashboard.home', 'HomePage', HomePage)                  # index 0
+        self.pages.add('Produtos', 'models.admindashboard.produto', 'ProdutoPage', ProdutoPage)     # index 1
+        self.pages.add('Lotes', 'models.admindashboard.lote', 'LotePage', LotePage)                # index 2
+        self.pages.add('Vendas', 'models.admindashboard.venda', 'VendaPage', VendaPage)            # index 3
+        self.pages.add('Finanças', 'models.admindashboard.financas', 'FinancasPage', FinancasPage)  # index 4
+        self.pages.add('Usuários', 'models.admindashboard.usuario', 'UsuarioPage', UsuarioPage)    # index 5
         # Fornecedores (não há módulo externo por enquanto, usa a versão local)
-        self.stack.addWidget(FornecedorPage())         # index 6
+        self.pages.add('Fornecedores', fallback=FornecedorPage)                                    # index 6
 
         main_layout.addWidget(menu)
         main_layout.addWidget(self.stack, 1)
@@ -1324,212 +1188,14 @@ class AdminDashboard(QMainWindow):
         if index < len(self.menu_buttons):
             self.menu_buttons[index].setStyleSheet(self._get_button_style(True))
         
-        # Se for o botão Home (index 0), tentar carregar dinamicamente a implementação
-        if index == 0:
-            try:
-                import importlib, traceback
-                # Primeiro, tentar importar como pacote (quando 'models' estiver no sys.path)
-                try:
-                    import models.admindashboard.home as home_mod
-                    importlib.reload(home_mod)
-                except ModuleNotFoundError as mnfe:
-                    # Fallback: carregar diretamente o arquivo home.py ao lado deste módulo
-                    home_path = Path(__file__).parent / 'home.py'
-                    if home_path.exists():
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location('models.admindashboard.home', str(home_path))
-                        home_mod = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(home_mod)
-                    else:
-                        raise
-
-                HomeClass = getattr(home_mod, 'HomePage', None)
-                if HomeClass:
-                    # substituir o widget existente na posição 0
-                    old_widget = self.stack.widget(0)
-                    new_widget = HomeClass()
-                    if old_widget is not None:
-                        self.stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    # Insere a nova página, exibe imediatamente e retorna para evitar lógica adicional
-                    self.stack.insertWidget(0, new_widget)
-                    self.stack.setCurrentIndex(0)
-                    return
-            except Exception as e:
-                # Em caso de falha, manter o fallback local já presente
-                print('Aviso: falha ao carregar HomePage:', e)
-                # Mostrar aviso ao usuário quando possível
-                try:
-                    QMessageBox.warning(self, "Erro", f"Falha ao carregar HomePage: {e}")
-                except Exception:
-                    pass
-
-        # Se for o botão Lotes (index 2), tentar carregar dinamicamente a implementação em `lote.py`
-        if index == 2:
-            try:
-                import importlib, traceback
-                # Tentar importar como pacote primeiro
-                try:
-                    import models.admindashboard.lote as lote_mod
-                    importlib.reload(lote_mod)
-                except ModuleNotFoundError:
-                    # Fallback: carregar diretamente o arquivo lote.py
-                    lote_path = Path(__file__).parent / 'lote.py'
-                    if lote_path.exists():
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location('models.admindashboard.lote', str(lote_path))
-                        lote_mod = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(lote_mod)
-                    else:
-                        raise
-
-                LoteClass = getattr(lote_mod, 'LotePage', None)
-                if LoteClass:
-                    old_widget = self.stack.widget(2)
-                    new_widget = LoteClass()
-                    if old_widget is not None:
-                        self.stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    self.stack.insertWidget(2, new_widget)
-                    self.stack.setCurrentIndex(2)
-                    return
-            except Exception as e:
-                print('Aviso: falha ao carregar LotePage:', e)
-                try:
-                    QMessageBox.warning(self, "Erro", f"Falha ao carregar LotePage: {e}")
-                except Exception:
-                    pass
-
-        # Se for o botão Vendas (index 3), tentar carregar dinamicamente a implementação em `venda.py`
-        if index == 3:
-            try:
-                import importlib, traceback
-                # Tentar importar como pacote primeiro
-                try:
-                    import models.admindashboard.venda as venda_mod
-                    importlib.reload(venda_mod)
-                except ModuleNotFoundError:
-                    # Fallback: carregar diretamente o arquivo venda.py
-                    venda_path = Path(__file__).parent / 'venda.py'
-                    if venda_path.exists():
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location('models.admindashboard.venda', str(venda_path))
-                        venda_mod = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(venda_mod)
-                    else:
-                        raise
-
-                VendaClass = getattr(venda_mod, 'VendaPage', None)
-                if VendaClass:
-                    old_widget = self.stack.widget(3)
-                    new_widget = VendaClass()
-                    if old_widget is not None:
-                        self.stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    self.stack.insertWidget(3, new_widget)
-                    self.stack.setCurrentIndex(3)
-                    return
-            except Exception as e:
-                print('Aviso: falha ao carregar VendaPage:', e)
-                try:
-                    QMessageBox.warning(self, "Erro", f"Falha ao carregar VendaPage: {e}")
-                except Exception:
-                    pass
-
-        # Se for o botão Finanças (index 4), tentar carregar dinamicamente a implementação em `financas.py`
-        if index == 4:
-            try:
-                import importlib, traceback
-                # Tentar importar como pacote primeiro
-                try:
-                    import models.admindashboard.financas as financas_mod
-                    importlib.reload(financas_mod)
-                except ModuleNotFoundError:
-                    # Fallback: carregar diretamente o arquivo financas.py
-                    financas_path = Path(__file__).parent / 'financas.py'
-                    if financas_path.exists():
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location('models.admindashboard.financas', str(financas_path))
-                        financas_mod = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(financas_mod)
-                    else:
-                        raise
-
-                FinancasClass = getattr(financas_mod, 'FinancasPage', None)
-                if FinancasClass:
-                    old_widget = self.stack.widget(4)
-                    new_widget = FinancasClass()
-                    if old_widget is not None:
-                        self.stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    self.stack.insertWidget(4, new_widget)
-                    self.stack.setCurrentIndex(4)
-                    return
-            except Exception as e:
-                print('Aviso: falha ao carregar FinancasPage:', e)
-                try:
-                    QMessageBox.warning(self, "Erro", f"Falha ao carregar FinancasPage: {e}")
-                except Exception:
-                    pass
-
-        # Se for o botão Usuários (index 5), tentar carregar dinamicamente a implementação em `usuario.py`
-        if index == 5:
-            try:
-                import importlib, traceback
-                # Tentar importar como pacote primeiro
-                try:
-                    import models.admindashboard.usuario as usuario_mod
-                    importlib.reload(usuario_mod)
-                except ModuleNotFoundError:
-                    # Fallback: carregar diretamente o arquivo usuario.py
-                    usuario_path = Path(__file__).parent / 'usuario.py'
-                    if usuario_path.exists():
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location('models.admindashboard.usuario', str(usuario_path))
-                        usuario_mod = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(usuario_mod)
-                    else:
-                        raise
-
-                UsuarioClass = getattr(usuario_mod, 'UsuarioPage', None)
-                if UsuarioClass:
-                    old_widget = self.stack.widget(5)
-                    new_widget = UsuarioClass()
-                    if old_widget is not None:
-                        self.stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    self.stack.insertWidget(5, new_widget)
-                    self.stack.setCurrentIndex(5)
-                    return
-            except Exception as e:
-                print('Aviso: falha ao carregar UsuarioPage:', e)
-                try:
-                    QMessageBox.warning(self, "Erro", f"Falha ao carregar UsuarioPage: {e}")
-                except Exception:
-                    pass
-
-        # Muda a página
-        # Garante que o índice solicitado exista
-        if 0 <= index < self.stack.count():
-            self.stack.setCurrentIndex(index)
-        else:
-            # índice inválido: selecionar 0 por segurança
-            self.stack.setCurrentIndex(0)
+        # Constrói a página na primeira visita; nas seguintes apenas atualiza os dados
+        self.pages.show(index)
+
+    def _on_page_failed(self, index, nome, erro):
+        try:
+            QMessageBox.warning(self, "Erro", f"Falha ao carregar {nome}: {erro}")
+        except Exception:
+            pass
 
     def _get_button_style(self, selected=False):
         if selected:
@@ -2254,29 +1920,9 @@ class LoginWindow(QMainWindow):
         
         # Se não for usuário local, tentar autenticar contra a base de dados
         try:
-            # Resolver caminho do DB a partir de config, fallback para busca
-            try:
-                from config.settings import DB_FILE
-                db_path = DB_FILE
-            except Exception:
-                # subir até encontrar pasta `database`
-                file_path = Path(__file__).resolve()
-                _ROOT = file_path
-                for _ in range(8):
-                    if (_ROOT / 'database').exists():
-                        break
-                    _ROOT = _ROOT.parent
-                db_path = _ROOT / 'database' / 'kamba_farma.db'
-
-            logger.debug("Login attempt username=%r db_path=%s", username, db_path)
+            logger.debug("Login attempt username=%r db_path=%s", username, resolve_db_path())
 
-            # Criar banco de dados de exemplo se não existir (compatibilidade)
-            if not db_path.exists():
-                self.create_sample_database(db_path)
-
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+            cur = get_connection().cursor()
 
             # Buscar usuário (case-insensitive)
             cur.execute("SELECT id, nome, senha_hash, perfil, ativo FROM usuarios WHERE nome = ? COLLATE NOCASE LIMIT 1", (username,))
@@ -2287,8 +1933,6 @@ class LoginWindow(QMainWindow):
                 cur.execute("SELECT id, nome, senha_hash, perfil, ativo FROM usuarios WHERE perfil = ? COLLATE NOCASE LIMIT 1", (username,))
                 row = cur.fetchone()
 
-            conn.close()
-
             if not row:
                 # usuário não encontrado
                 self.shake_login_button()
@@ -2342,38 +1986,6 @@ class LoginWindow(QMainWindow):
         # Pequeno delay para mostrar a mensagem de sucesso
         QTimer.singleShot(800, self.open_main_window)
 
-    def create_sample_database(self, db_path):
-        """Cria um banco de dados de exemplo com dados iniciais"""
-        conn = sqlite3.connect(str(db_path))
-        cur = conn.cursor()
-        
-        # Criar tabela de usuários
-        cur.execute("""
-            CREATE TABLE usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                senha_hash TEXT NOT NULL,
-                perfil TEXT,
-                ativo INTEGER DEFAULT 1
-            )
-        """)
-        
-        # Inserir usuários de exemplo
-        sample_users = [
-            ('admin', hash_password('admin123'), 'admin', 1),
-            ('joao', hash_password('joao123'), 'user', 1),
-            ('maria', hash_password('maria123'), 'user', 1),
-        ]
-        
-        for nome, senha, perfil, ativo in sample_users:
-            cur.execute(
-                "INSERT INTO usuarios (nome, senha_hash, perfil, ativo) VALUES (?, ?, ?, ?)",
-                (nome, senha, perfil, ativo)
-            )
-        
-        conn.commit()
-        conn.close()
-
     def shake_login_button(self):
         """Animação de shake para feedback de erro"""
         import random
@@ -2409,6 +2021,9 @@ class LoginWindow(QMainWindow):
 # FUNÇÃO PRINCIPAL
 # ============================================================================
 def main():
+    # Atualizar o esquema da base de dados antes de abrir qualquer janela
+    migrate()
+
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     
@@ -4,7 +4,7 @@ Fornece helpers para registrar devoluções e validar entradas.
 """
 
 from typing import Dict, Any
-import sqlite3
+import sys
 from pathlib import Path
 import datetime
 
@@ -14,6 +14,13 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import get_connection, transaction
+
 
 def registrar_devolucao(venda_id: int, produto_id: int, quantidade: int, motivo: str) -> Dict[str, Any]:
     """Registra a devolução de um produto associado a uma venda.
@@ -27,114 +34,96 @@ def registrar_devolucao(venda_id: int, produto_id: int, quantidade: int, motivo:
     Returns:
         Um dicionário com o resultado da operação.
     """
-    # localizar arquivo de banco: subir até encontrar a pasta `database`
-    file_path = Path(__file__).resolve()
-    _ROOT = file_path
-    for _ in range(8):
-        if (_ROOT / 'database').exists():
-            break
-        _ROOT = _ROOT.parent
-    db_file = _ROOT / 'database' / 'kamba_farma.db'
-
-    if not db_file.exists():
-        raise DevolucaoError(f"Arquivo de banco de dados não encontrado: {db_file}")
-
     try:
-        conn = sqlite3.connect(str(db_file))
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-
-        # verificar existência do histórico e tempo da compra
-        cur.execute("SELECT quantidade_total, tempo_compra FROM historico_compra WHERE id = ?", (venda_id,))
-        hc = cur.fetchone()
-        if not hc:
-            raise DevolucaoError(f"Histórico de compra {venda_id} não encontrado")
-
-        # checar prazo de devolução: máximo 4 horas desde tempo_compra
-        tempo_compra = hc['tempo_compra']
-        if tempo_compra:
-            tstr = str(tempo_compra)
-            if '.' in tstr:
-                tstr = tstr.split('.')[0]
-            try:
-                comprado_em = datetime.datetime.strptime(tstr, '%Y-%m-%d %H:%M:%S')
-            except Exception:
+        # leitura e escrita na mesma transação: o lock de escrita é obtido logo
+        # no início para que o histórico não mude entre a validação e o estorno
+        with transaction(immediate=True) as conn:
+            cur = conn.cursor()
+
+            # verificar existência do histórico e tempo da compra
+            cur.execute("SELECT quantidade_total, tempo_compra FROM historico_compra WHERE id = ?", (venda_id,))
+            hc = cur.fetchone()
+            if not hc:
+                raise DevolucaoError(f"Histórico de compra {venda_id} não encontrado")
+
+            # checar prazo de devolução: máximo 4 horas desde tempo_compra
+            tempo_compra = hc['tempo_compra']
+            if tempo_compra:
+                tstr = str(tempo_compra)
+                if '.' in tstr:
+                    tstr = tstr.split('.')[0]
                 try:
-                    comprado_em = datetime.datetime.fromisoformat(tstr)
+                    comprado_em = datetime.datetime.strptime(tstr, '%Y-%m-%d %H:%M:%S')
                 except Exception:
-                    comprado_em = None
-
-            if comprado_em is not None:
-                delta = datetime.datetime.now() - comprado_em
-                if delta.total_seconds() > 4 * 3600:
-                    raise DevolucaoError("Prazo máximo de devolução (4 horas) excedido.")
-
-        # verificar item no histórico
-        cur.execute(
-            "SELECT id, quantidade FROM historico_compra_itens WHERE historico_compra_id = ? AND produto_id = ?",
-            (venda_id, produto_id)
-        )
-        item = cur.fetchone()
-        if not item:
-            raise DevolucaoError("Produto não encontrado no histórico informado")
-
-        atual_qtd = item['quantidade'] or 0
-        if quantidade > atual_qtd:
-            raise DevolucaoError(f"Quantidade a devolver ({quantidade}) maior que a registrada ({atual_qtd})")
-
-        novo_valor = atual_qtd - quantidade
+                    try:
+                        comprado_em = datetime.datetime.fromisoformat(tstr)
+                    except Exception:
+                        comprado_em = None
 
-        # iniciar transação
-        conn.execute('BEGIN')
+                if comprado_em is not None:
+                    delta = datetime.datetime.now() - comprado_em
+                    if delta.total_seconds() > 4 * 3600:
+                        raise DevolucaoError("Prazo máximo de devolução (4 horas) excedido.")
 
-        # atualizar stock do produto (estornar)
-        cur.execute("UPDATE produtos SET stock = COALESCE(stock,0) + ? WHERE id = ?", (quantidade, produto_id))
+            # verificar item no histórico
+            cur.execute(
+                "SELECT id, quantidade FROM historico_compra_itens WHERE historico_compra_id = ? AND produto_id = ?",
+                (venda_id, produto_id)
+            )
+            item = cur.fetchone()
+            if not item:
+                raise DevolucaoError("Produto não encontrado no histórico informado")
+
+            atual_qtd = item['quantidade'] or 0
+            if quantidade > atual_qtd:
+                raise DevolucaoError(f"Quantidade a devolver ({quantidade}) maior que a registrada ({atual_qtd})")
+
+            novo_valor = atual_qtd - quantidade
+
+            # atualizar stock do produto (estornar)
+            cur.execute("UPDATE produtos SET stock = COALESCE(stock,0) + ? WHERE id = ?", (quantidade, produto_id))
+
+            if novo_valor > 0:
+                cur.execute(
+                    "UPDATE historico_compra_itens SET quantidade = ? WHERE id = ?",
+                    (novo_valor, item['id'])
+                )
+            else:
+                cur.execute(
+                    "DELETE FROM historico_compra_itens WHERE id = ?",
+                    (item['id'],)
+                )
+
+            # diminuir quantidade_total, garantindo não ficar negativo
+            quantidade_total = hc['quantidade_total'] or 0
+            nova_total = max(0, quantidade_total - quantidade)
+            cur.execute(
+                "UPDATE historico_compra SET quantidade_total = ? WHERE id = ?",
+                (nova_total, venda_id)
+            )
 
-        if novo_valor > 0:
+            # devolução (lida pelo relatório Z) e registo no log
             cur.execute(
-                "UPDATE historico_compra_itens SET quantidade = ? WHERE id = ?",
-                (novo_valor, item['id'])
+                "INSERT INTO devolucoes (historico_compra_id, produto_id, quantidade, motivo) VALUES (?, ?, ?, ?)",
+                (venda_id, produto_id, quantidade, motivo)
             )
-        else:
             cur.execute(
-                "DELETE FROM historico_compra_itens WHERE id = ?",
-                (item['id'],)
+                "INSERT INTO logs_sistema (usuario_id, acao, tabela_afetada, registro_id) VALUES (?, ?, ?, ?)",
+                (None, f"devolucao: produto {produto_id} quantidade {quantidade}", 'historico_compra', venda_id)
             )
 
-        # diminuir quantidade_total, garantindo não ficar negativo
-        quantidade_total = hc['quantidade_total'] or 0
-        nova_total = max(0, quantidade_total - quantidade)
-        cur.execute(
-            "UPDATE historico_compra SET quantidade_total = ? WHERE id = ?",
-            (nova_total, venda_id)
-        )
-
-        # opcional: registrar log da devolução
-        cur.execute(
-            "INSERT INTO logs_sistema (usuario_id, acao, tabela_afetada, registro_id) VALUES (?, ?, ?, ?)",
-            (None, f"devolucao: produto {produto_id} quantidade {quantidade}", 'historico_compra', venda_id)
-        )
-
-        conn.commit()
-        return {
-            "status": "ok",
-            "historico_compra_id": venda_id,
-            "produto_id": produto_id,
-            "devolvido": quantidade,
-            "restante_no_historico": novo_valor,
-            "quantidade_total": nova_total,
-        }
+            return {
+                "status": "ok",
+                "historico_compra_id": venda_id,
+                "produto_id": produto_id,
+                "devolvido": quantidade,
+                "restante_no_historico": novo_valor,
+                "quantidade_total": nova_total,
+            }
     except DevolucaoError:
-        conn.rollback()
         raise
     except Exception as e:
-        conn.rollback()
         raise DevolucaoError(str(e))
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 class DevolucaoError(Exception):
@@ -154,15 +143,6 @@ class DevolucaoDeProdutoView(QWidget):
         super().__init__(parent)
         self._setup_ui()
 
-        # localizar arquivo de banco: subir até encontrar a pasta `database`
-        file_path = Path(__file__).resolve()
-        _ROOT = file_path
-        for _ in range(8):
-            if (_ROOT / 'database').exists():
-                break
-            _ROOT = _ROOT.parent
-        self._db_file = _ROOT / 'database' / 'kamba_farma.db'
-
     def _setup_ui(self):
         layout = QVBoxLayout(self)
 
@@ -197,14 +177,8 @@ class DevolucaoDeProdutoView(QWidget):
             QMessageBox.warning(self, "Aviso", "Digite o nome do cliente para pesquisar.")
             return
 
-        if not self._db_file.exists():
-            QMessageBox.critical(self, "Erro", f"Arquivo de banco de dados não encontrado: {self._db_file}")
-            return
-
         try:
-            conn = sqlite3.connect(str(self._db_file))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+            cur = get_connection().cursor()
 
             like = f"%{term}%"
             cur.execute(
@@ -220,7 +194,6 @@ class DevolucaoDeProdutoView(QWidget):
                 (like,)
             )
             rows = cur.fetchall()
-            conn.close()
 
             self.table.setRowCount(0)
             for r in rows:
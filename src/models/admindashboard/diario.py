@@ -1,5 +1,4 @@
 from pathlib import Path
-import sqlite3
 from datetime import datetime
 import sys
 
@@ -12,28 +11,23 @@ from PyQt5.QtGui import QFont
 
 # Import robusto: tenta import relativo, senão usa import absoluto
 try:
-    from .db_utils import _find_db_file
+    from .db_utils import get_connection
 except ImportError:
     # Se executado como script direto
     sys.path.insert(0, str(Path(__file__).parent))
-    from db_utils import _find_db_file
+    from db_utils import get_connection
 
-
-def _find_db_file():
-    root = Path(__file__).resolve()
-    for _ in range(8):
-        db_dir = root / "database"
-        if db_dir.exists():
-            db_file = db_dir / "kamba_farma.db"
-            return db_file if db_file.exists() else None
-        root = root.parent
-    return None
+from src.services.caixa_service import consultar_dia, fechar_caixa
+from src.utils.async_loader import AsyncLoader
 
 
 class DiarioView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.db_file = _find_db_file()
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._aplicar_relatorio)
+        self._loader.failed.connect(self._on_relatorio_failed)
+        self._loader.cancel_on_hide(self, self.load_daily_report)
         self._init_ui()
 
     def _init_ui(self):
@@ -55,9 +49,15 @@ class DiarioView(QWidget):
         self.data_picker.dateChanged.connect(self.load_daily_report)
         btn_atualizar = QPushButton(" Atualizar")
         btn_atualizar.clicked.connect(self.load_daily_report)
+        self.btn_fechar = QPushButton("Fechar caixa")
+        self.btn_fechar.setToolTip("Grava o relatório Z do dia (totais, operadores, produtos, devoluções e saídas)")
+        self.btn_fechar.clicked.connect(self.fechar_caixa_do_dia)
+        self.estado_label = QLabel("")
         date_layout.addWidget(lbl_data)
         date_layout.addWidget(self.data_picker)
         date_layout.addWidget(btn_atualizar)
+        date_layout.addWidget(self.btn_fechar)
+        date_layout.addWidget(self.estado_label)
         date_layout.addStretch()
         layout.addLayout(date_layout)
 
@@ -76,8 +76,23 @@ class DiarioView(QWidget):
         self.saldo_label.setFont(QFont(None, 12, QFont.Bold))
         resumo_layout.addWidget(self.saldo_label)
 
+        self.contagens_label = QLabel("Vendas: 0 | Itens: 0 | Devoluções: 0")
+        resumo_layout.addWidget(self.contagens_label)
+
         layout.addLayout(resumo_layout)
 
+        # Totais por operador e posto
+        lbl_operadores = QLabel("Por Operador:")
+        lbl_operadores.setStyleSheet("font-weight:700;")
+        layout.addWidget(lbl_operadores)
+
+        self.operadores_table = QTableWidget()
+        self.operadores_table.setColumnCount(5)
+        self.operadores_table.setHorizontalHeaderLabels(["Operador", "Posto", "Vendas", "Itens", "Total"])
+        self.operadores_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.operadores_table.setMaximumHeight(140)
+        layout.addWidget(self.operadores_table)
+
         # Tabela de produtos vendidos
         lbl_produtos = QLabel("Produtos Vendidos:")
         lbl_produtos.setStyleSheet("font-weight:700;")
@@ -103,82 +118,79 @@ class DiarioView(QWidget):
         # Carregar dados do dia atual
         self.load_daily_report()
 
+    def refresh(self):
+        """Recarrega o relatório ao voltar à view."""
+        self.load_daily_report()
+
     def load_daily_report(self):
-        """Carrega o relatório diário: vendas, saídas e produtos."""
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
+        """Carrega o relatório do dia em segundo plano (o relatório Z gravado, se o caixa já fechou)."""
+        self._loader.run(consultar_dia, self._dia_selecionado())
+
+    def _dia_selecionado(self) -> str:
+        return self.data_picker.date().toString("yyyy-MM-dd")
+
+    def fechar_caixa_do_dia(self):
+        """Grava o relatório Z do dia selecionado (após confirmação)."""
+        resposta = QMessageBox.question(
+            self, "Fechar caixa",
+            f"Fechar o caixa de {self.data_picker.date().toString('dd/MM/yyyy')}?\n"
+            "O relatório Z fica gravado e não pode ser alterado, e deixa de ser "
+            "possível registar vendas ou saídas com esta data.",
+        )
+        if resposta != QMessageBox.Yes:
             return
-
-        data = self.data_picker.date()
-        data_str = data.toString("yyyy-MM-dd")
-
+        utilizador = getattr(self.window(), 'current_user', None) or {}
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-
-            # Total de vendas do dia
-            cur.execute(
-                "SELECT SUM(total) as total_vendas FROM vendas WHERE DATE(data_venda) = ?",
-                (data_str,)
-            )
-            r = cur.fetchone()
-            total_vendas = r['total_vendas'] if r and r['total_vendas'] is not None else 0.0
-            self.vendas_label.setText(f"Total de Vendas: AOA {total_vendas:,.2f}")
-
-            # Total de saídas do dia
-            cur.execute(
-                "SELECT SUM(valor) as total_saidas FROM transacoes_financeiras WHERE tipo = 'saida' AND DATE(data_transacao) = ?",
-                (data_str,)
-            )
-            r = cur.fetchone()
-            total_saidas = r['total_saidas'] if r and r['total_saidas'] is not None else 0.0
-            self.saidas_label.setText(f"Total de Saídas: AOA {total_saidas:,.2f}")
-
-            # Saldo = vendas - saídas
-            saldo = total_vendas - total_saidas
-            self.saldo_label.setText(f"Saldo do Dia: AOA {saldo:,.2f}")
-
-            # Produtos vendidos no dia
-            cur.execute(
-                """
-                SELECT p.nome_comercial as nome, SUM(iv.quantidade) as qtd, SUM(iv.subtotal) as subtotal
-                FROM vendas v
-                JOIN itens_venda iv ON iv.venda_id = v.id
-                JOIN produtos p ON p.id = iv.produto_id
-                WHERE DATE(v.data_venda) = ?
-                GROUP BY p.id
-                ORDER BY qtd DESC
-                """,
-                (data_str,)
-            )
-            produtos_rows = cur.fetchall()
-
-            # Preencher tabela de produtos
-            self.produtos_table.setRowCount(0)
-            for r in produtos_rows:
-                row = self.produtos_table.rowCount()
-                self.produtos_table.insertRow(row)
-                self.produtos_table.setItem(row, 0, QTableWidgetItem(str(r['nome'] or '-')))
-                self.produtos_table.setItem(row, 1, QTableWidgetItem(str(int(r['qtd'] or 0))))
-                self.produtos_table.setItem(row, 2, QTableWidgetItem(f"AOA {r['subtotal']:,.2f}" if r['subtotal'] else "AOA 0,00"))
-
-            # Saídas do dia
-            cur.execute(
-                "SELECT descricao, valor FROM transacoes_financeiras WHERE tipo = 'saida' AND DATE(data_transacao) = ? ORDER BY data_transacao DESC",
-                (data_str,)
-            )
-            saidas_rows = cur.fetchall()
-
-            # Preencher tabela de saídas
-            self.saidas_table.setRowCount(0)
-            for r in saidas_rows:
-                row = self.saidas_table.rowCount()
-                self.saidas_table.insertRow(row)
-                self.saidas_table.setItem(row, 0, QTableWidgetItem(str(r['descricao'] or '')))
-                self.saidas_table.setItem(row, 1, QTableWidgetItem(f"AOA {r['valor']:,.2f}"))
-
-            conn.close()
-
+            fechar_caixa(self._dia_selecionado(), usuario_id=utilizador.get('id'))
+        except ValueError as e:
+            QMessageBox.warning(self, "Fechar caixa", str(e))
+            return
         except Exception as e:
-            QMessageBox.warning(self, "Erro", f"Falha ao carregar relatório diário: {e}")
+            QMessageBox.critical(self, "Erro", f"Falha ao fechar o caixa: {e}")
+            return
+        self.load_daily_report()
+
+    def _aplicar_relatorio(self, z):
+        """Preenche o resumo e as tabelas com o ``RelatorioZ`` do dia."""
+        fechado = z.fechado_em is not None
+        self.estado_label.setText(f"Caixa fechado em {z.fechado_em}" if fechado else "Caixa aberto")
+        self.btn_fechar.setEnabled(not fechado)
+
+        self.vendas_label.setText(f"Total de Vendas: AOA {z.total_vendas:,.2f}")
+        self.saidas_label.setText(f"Total de Saídas: AOA {z.total_saidas:,.2f}")
+        self.saldo_label.setText(f"Saldo do Dia: AOA {z.saldo:,.2f}")
+        self.contagens_label.setText(
+            f"Vendas: {z.num_vendas} | Itens: {z.num_itens} | "
+            f"Devoluções: {z.num_devolucoes} ({z.qtd_devolvida} un.)"
+        )
+
+        # Preencher tabela de operadores
+        self.operadores_table.setRowCount(0)
+        for _, operador, terminal, num_vendas, num_itens, total in z.operadores:
+            row = self.operadores_table.rowCount()
+            self.operadores_table.insertRow(row)
+            self.operadores_table.setItem(row, 0, QTableWidgetItem(operador or '-'))
+            self.operadores_table.setItem(row, 1, QTableWidgetItem(terminal or '-'))
+            self.operadores_table.setItem(row, 2, QTableWidgetItem(str(num_vendas)))
+            self.operadores_table.setItem(row, 3, QTableWidgetItem(str(num_itens)))
+            self.operadores_table.setItem(row, 4, QTableWidgetItem(f"AOA {total:,.2f}"))
+
+        # Preencher tabela de produtos
+        self.produtos_table.setRowCount(0)
+        for nome, qtd, subtotal in z.produtos:
+            row = self.produtos_table.rowCount()
+            self.produtos_table.insertRow(row)
+            self.produtos_table.setItem(row, 0, QTableWidgetItem(nome))
+            self.produtos_table.setItem(row, 1, QTableWidgetItem(str(qtd)))
+            self.produtos_table.setItem(row, 2, QTableWidgetItem(f"AOA {subtotal:,.2f}"))
+
+        # Preencher tabela de saídas
+        self.saidas_table.setRowCount(0)
+        for descricao, valor in z.saidas:
+            row = self.saidas_table.rowCount()
+            self.saidas_table.insertRow(row)
+            self.saidas_table.setItem(row, 0, QTableWidgetItem(descricao))
+            self.saidas_table.setItem(row, 1, QTableWidgetItem(f"AOA {valor:,.2f}"))
+
+    def _on_relatorio_failed(self, mensagem: str):
+        QMessageBox.warning(self, "Erro", f"Falha ao carregar relatório diário: {mensagem}")
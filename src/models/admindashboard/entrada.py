@@ -1,5 +1,4 @@
 from pathlib import Path
-import sqlite3
 from datetime import datetime
 import sys
 
@@ -13,22 +12,19 @@ from PyQt5.QtGui import QFont
 
 # Import robusto: tenta import relativo, senão usa import absoluto
 try:
-    from .db_utils import _find_db_file, ensure_transacoes_table
+    from .db_utils import get_connection, transaction, ensure_transacoes_table
 except ImportError:
     # Se executado como script direto
     sys.path.insert(0, str(Path(__file__).parent))
-    from db_utils import _find_db_file, ensure_transacoes_table
+    from db_utils import get_connection, transaction, ensure_transacoes_table
 
-
-def _ensure_table(db_file):
-    # this module no longer manages transacoes_financeiras; keep stub for compatibility
-    return
+from database.agregados import total_vendas_mes, totais_financas
+from src.utils.date_utils import filtro_periodo, intervalo_mes
 
 
 class KumbuDialog(QDialog):
-    def __init__(self, parent=None, db_file=None, on_success=None):
+    def __init__(self, parent=None, on_success=None):
         super().__init__(parent)
-        self.db_file = db_file
         self.on_success = on_success
         self.setWindowTitle("Adicionar Kumbu")
         self.setGeometry(100, 100, 500, 250)
@@ -80,9 +76,6 @@ class KumbuDialog(QDialog):
         self.setLayout(layout)
 
     def add_kumbu(self):
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
-            return
         valor = float(self.valor_field.value())
         descricao = self.desc_field.text().strip()
         if valor <= 0:
@@ -92,14 +85,11 @@ class KumbuDialog(QDialog):
             descricao = "Kumbu"
         data_str = self.date_field.date().toString("yyyy-MM-dd")
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO transacoes_financeiras (tipo, descricao, valor, data_transacao) VALUES (?, ?, ?, ?)",
-                ("kumbu", descricao, valor, data_str)
-            )
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute(
+                    "INSERT INTO transacoes_financeiras (tipo, descricao, valor, data_transacao) VALUES (?, ?, ?, ?)",
+                    ("kumbu", descricao, valor, data_str)
+                )
             QMessageBox.information(self, "Sucesso", "Kumbu registrada.")
             if self.on_success:
                 self.on_success()
@@ -109,9 +99,8 @@ class KumbuDialog(QDialog):
 
 
 class EmprestimoDialog(QDialog):
-    def __init__(self, parent=None, db_file=None, on_success=None):
+    def __init__(self, parent=None, on_success=None):
         super().__init__(parent)
-        self.db_file = db_file
         self.on_success = on_success
         self.setWindowTitle("Registrar Empréstimo")
         self.setGeometry(100, 100, 500, 250)
@@ -163,9 +152,6 @@ class EmprestimoDialog(QDialog):
         self.setLayout(layout)
 
     def add_emprestimo(self):
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
-            return
         valor = float(self.valor_field.value())
         descricao = self.desc_field.text().strip()
         if valor <= 0:
@@ -175,14 +161,11 @@ class EmprestimoDialog(QDialog):
             descricao = "Empréstimo"
         data_str = self.date_field.date().toString("yyyy-MM-dd")
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO transacoes_financeiras (tipo, descricao, valor, data_transacao) VALUES (?, ?, ?, ?)",
-                ("emprestimo", descricao, valor, data_str)
-            )
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute(
+                    "INSERT INTO transacoes_financeiras (tipo, descricao, valor, data_transacao) VALUES (?, ?, ?, ?)",
+                    ("emprestimo", descricao, valor, data_str)
+                )
             QMessageBox.information(self, "Sucesso", "Empréstimo registrado.")
             if self.on_success:
                 self.on_success()
@@ -194,11 +177,9 @@ class EmprestimoDialog(QDialog):
 class EntradaView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.db_file = _find_db_file()
         self._init_ui()
         # ensure transactions table exists so we can record kumbu/emprestimo
-        if self.db_file:
-            ensure_transacoes_table(self.db_file)
+        ensure_transacoes_table()
 
     def _init_ui(self):
         layout = QVBoxLayout(self)
@@ -265,48 +246,42 @@ class EntradaView(QWidget):
         return
 
     def open_kumbu_dialog(self):
-        dlg = KumbuDialog(self, self.db_file, on_success=self.compute_month_stats)
+        dlg = KumbuDialog(self, on_success=self.compute_month_stats)
         dlg.exec_()
 
     def open_emprestimo_dialog(self):
-        dlg = EmprestimoDialog(self, self.db_file, on_success=self.compute_month_stats)
+        dlg = EmprestimoDialog(self, on_success=self.compute_month_stats)
         dlg.exec_()
 
+    def refresh(self):
+        """Recalcula as estatísticas do mês ao voltar à view."""
+        self.compute_month_stats()
+
     def load_transactions(self):
         # removed
         return
 
     def compute_month_stats(self):
         """Calcula total de vendas no mês selecionado e produtos mais/menos vendidos."""
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
-            return
-
         date = self.mes_picker.date()
         year = date.year()
         month = date.month()
         ym = f"{year}-{month:02d}"
 
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            conn.row_factory = sqlite3.Row
+            conn = get_connection()
             cur = conn.cursor()
 
-            # Total receita: somar total da tabela vendas no mês
-            cur.execute("SELECT SUM(total) as total_mes FROM vendas WHERE strftime('%Y-%m', data_venda) = ?", (ym,))
-            r = cur.fetchone()
-            total_vendas = r['total_mes'] if r and r['total_mes'] is not None else 0.0
+            # Total receita: vendas do mês (tabela agregada vendas_mensais)
+            total_vendas = total_vendas_mes(conn, ym)
             self.total_vendas_label.setText(f"Vendas no mês: Kz {total_vendas:,.2f}")
 
-            # Somar kumbu e empréstimo do mês
-            cur.execute("SELECT SUM(valor) as kumbu_mes FROM transacoes_financeiras WHERE tipo = 'kumbu' AND strftime('%Y-%m', data_transacao) = ?", (ym,))
-            r = cur.fetchone()
-            kumbu_mes = r['kumbu_mes'] if r and r['kumbu_mes'] is not None else 0.0
+            # Kumbu e empréstimo do mês (tabela agregada financas_mensais)
+            financas = totais_financas(conn, mes=ym)
+            kumbu_mes = financas.get('kumbu', 0.0)
             self.kumbu_label.setText(f"Kumbu no mês: Kz {kumbu_mes:,.2f}")
 
-            cur.execute("SELECT SUM(valor) as emprest_mes FROM transacoes_financeiras WHERE tipo = 'emprestimo' AND strftime('%Y-%m', data_transacao) = ?", (ym,))
-            r = cur.fetchone()
-            emprest_mes = r['emprest_mes'] if r and r['emprest_mes'] is not None else 0.0
+            emprest_mes = financas.get('emprestimo', 0.0)
             self.emprest_label.setText(f"Empréstimo no mês: Kz {emprest_mes:,.2f}")
 
             # Total geral = vendas + kumbu + empréstimo
@@ -314,21 +289,21 @@ class EntradaView(QWidget):
             self.total_label.setText(f"Total no mês: Kz {total_geral:,.2f}")
 
             # Produtos vendidos (do mais vendido ao menos vendido)
+            condicao, params = filtro_periodo("v.data_venda", *intervalo_mes(ym))
             cur.execute(
-                """
+                f"""
                 SELECT p.nome_comercial as nome, SUM(iv.quantidade) as qtd
                 FROM vendas v
                 JOIN itens_venda iv ON iv.venda_id = v.id
                 JOIN produtos p ON p.id = iv.produto_id
-                WHERE strftime('%Y-%m', v.data_venda) = ?
+                WHERE {condicao}
                 GROUP BY p.id
                 ORDER BY qtd DESC
                 """,
-                (ym,)
+                params
             )
             top_rows = cur.fetchall()
 
-            conn.close()
 
             # Popular tabela top (mais -> menos)
             self.top_table.setRowCount(0)
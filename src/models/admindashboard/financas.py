@@ -11,7 +11,6 @@ Se as views não existirem, placeholders são exibidos.
 """
 
 from pathlib import Path
-import importlib.util
 import sys
 from typing import Optional, List
 
@@ -23,6 +22,11 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QPainter, QPainterPath, QLinearGradient
 
+try:
+    from .view_registry import ViewRegistry
+except ImportError:
+    from view_registry import ViewRegistry
+
 # Paleta de cores (unificada) - mesma do lote.py
 PRIMARY_COLOR = "#28C7D3"
 PRIMARY_DARK = "#0A777F"
@@ -231,30 +235,6 @@ class HeaderBar(QFrame):
         layout.addStretch()
 
 
-def _load_view_from_path(path: Path, class_name: str) -> Optional[QWidget]:
-    """Dynamically load a QWidget subclass named `class_name` from `path`.
-    Returns an instance or None if loading fails.
-    """
-    try:
-        if not path.exists():
-            return None
-        spec = importlib.util.spec_from_file_location(path.stem, str(path))
-        if spec is None or spec.loader is None:
-            return None
-        module = importlib.util.module_from_spec(spec)
-        # Ensure module has a unique name in sys.modules
-        mod_name = f"_financas_dynamic_{path.stem}"
-        sys.modules[mod_name] = module
-        spec.loader.exec_module(module)
-        cls = getattr(module, class_name, None)
-        if cls is None:
-            return None
-        return cls()
-    except Exception as e:
-        print(f"Error loading {path}: {e}")
-        return None
-
-
 class ContentPlaceholder(QWidget):
     """Placeholder estilizado para views não implementadas."""
     def __init__(self, title, filename, classname, parent=None):
@@ -378,7 +358,7 @@ class FinancasPage(QWidget):
 
     def _on_nav_item_selected(self, index):
         """Lida com seleção de item na navegação."""
-        self._animate_view_transition(index)
+        self.views.show(index, self._animate_view_transition)
         
         # Atualizar título do cabeçalho
         titles = [
@@ -431,46 +411,26 @@ class FinancasPage(QWidget):
                 self.content_stack.setCurrentIndex(index)
 
     def _load_views(self):
-        """Load views dynamically or show placeholders."""
-        views = [
-            ("Entradas Financeiras", "entrada.py", "EntradaView"),
-            ("Saídas Financeiras", "saida.py", "SaidaView"),
-            ("Diário Financeiro", "diario.py", "DiarioView"),
-            ("Balanço Financeiro", "balanco.py", "BalancoView"),
-        ]
-
-        for title, filename, classname in views:
-            path = self.views_dir / filename
-            widget = _load_view_from_path(path, classname)
-            
-            if widget is None:
-                # Criar placeholder estilizado
-                placeholder = ContentPlaceholder(title, filename, classname)
-                
-                # Container para o placeholder
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(placeholder)
-                
-                self.content_stack.addWidget(container)
-            else:
-                # Configurar estilo da view carregada
-                widget.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: transparent;
-                        color: {TEXT_PRIMARY};
-                    }}
-                """)
-                
-                # Container para a view
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(widget)
-                
-                self.content_stack.addWidget(container)
-
+        """Regista as views; cada uma só é criada quando é mostrada pela primeira vez."""
+        self.views = ViewRegistry(
+            self.content_stack, self.views_dir, placeholder=ContentPlaceholder,
+            style=f"""
+                QWidget {{
+                    background-color: transparent;
+                    color: {TEXT_PRIMARY};
+                }}
+            """,
+            parent=self,
+        )
+        self.views.add("Entradas Financeiras", "entrada.py", "EntradaView")
+        self.views.add("Saídas Financeiras", "saida.py", "SaidaView")
+        self.views.add("Diário Financeiro", "diario.py", "DiarioView")
+        self.views.add("Balanço Financeiro", "balanco.py", "BalancoView", prewarm=True)
+        self.views.show(0)
+
+    def refresh(self):
+        """Atualiza a view visível (chamado ao voltar a esta página)."""
+        self.views.refresh()
 
 if __name__ == '__main__':
     from PyQt5.QtWidgets import QApplication
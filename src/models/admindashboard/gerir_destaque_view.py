@@ -1,5 +1,6 @@
 from pathlib import Path
 import sqlite3
+import sys
 from typing import List
 
 from PyQt5.QtWidgets import (
@@ -8,16 +9,12 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
 
-def _find_db_path() -> Path:
-    p = Path(__file__).resolve()
-    for _ in range(8):
-        candidate = p.parent / "database" / "kamba_farma.db"
-        if candidate.exists():
-            return candidate
-        p = p.parent
-    # fallback to repository database path
-    return Path(__file__).resolve().parents[3] / "database" / "kamba_farma.db"
+from database.db import get_connection
 
 
 class ManageHighlightPage(QWidget):
@@ -50,16 +47,10 @@ class ManageHighlightPage(QWidget):
         self.table.setAlternatingRowColors(True)
         layout.addWidget(self.table)
 
-    def _get_conn(self):
-        db_path = _find_db_path()
-        return sqlite3.connect(str(db_path))
-
     def load_top_products(self):
         """Busca os produtos mais vendidos e popula a tabela."""
         try:
-            conn = self._get_conn()
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+            cur = get_connection().cursor()
 
             cur.execute(
                 """
@@ -95,11 +86,6 @@ class ManageHighlightPage(QWidget):
             self.table.setItem(0, 0, QTableWidgetItem("-"))
             self.table.setItem(0, 1, QTableWidgetItem("Banco de dados indisponível"))
             self.table.setItem(0, 2, QTableWidgetItem("0"))
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
 
 if __name__ == "__main__":
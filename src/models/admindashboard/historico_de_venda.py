@@ -9,9 +9,11 @@ Responsável por:
 """
 
 from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime, timedelta
 import sqlite3
+import sys
 import os
 
 from PyQt5.QtWidgets import (
@@ -19,12 +21,21 @@ from PyQt5.QtWidgets import (
     QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
     QMessageBox, QApplication, QFileDialog, QDialog, QDialogButtonBox,
     QSpacerItem, QSizePolicy, QDateEdit, QComboBox, QGroupBox,
-    QFormLayout, QFrame, QProgressDialog
+    QFormLayout, QFrame, QProgressDialog, QTableView, QAbstractItemView
 )
-from PyQt5.QtCore import Qt, QDate, QTimer, pyqtSignal
+from PyQt5.QtCore import Qt, QDate, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QTextDocument, QFont, QIcon, QColor, QBrush
 from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import get_connection, query_guard
+from src.utils.async_loader import AsyncLoader
+from src.utils.date_utils import filtro_periodo, intervalo_dia
+
 from colors import *
 
 # Local color overrides for specific UI elements
@@ -41,22 +52,117 @@ def hex_to_rgb(hex_color: str) -> tuple:
 
 
 # =========================================================
-# Localização do banco de dados
+# Consulta do histórico de vendas
 # =========================================================
-def _find_db_file() -> Optional[Path]:
-    root = Path(__file__).resolve()
-    for _ in range(8):
-        db_dir = root / "database"
-        if db_dir.exists():
-            db_file = db_dir / "kamba_farma.db"
-            return db_file if db_file.exists() else None
-        root = root.parent
-    return None
+# Vendas carregadas por página na tabela do histórico
+PAGINA_HISTORICO = 200
+# Páginas que o modelo da tabela mantém em memória
+JANELA_HISTORICO = 5
+
+
+def _filtros_historico(
+    venda_id: Optional[int] = None,
+    data_inicio: Optional[str] = None,
+    data_fim: Optional[str] = None,
+    cliente: Optional[str] = None
+) -> Tuple[List[str], List[Any]]:
+    """Monta as condições WHERE (sobre `vendas v`) e os parâmetros dos filtros."""
+    where_conditions = []
+    params = []
+
+    if venda_id is not None:
+        where_conditions.append("v.id = ?")
+        params.append(venda_id)
+
+    if data_inicio or data_fim:
+        # [data_inicio, dia seguinte a data_fim): pesquisa por intervalo em idx_vendas_data
+        inicio = intervalo_dia(data_inicio)[0] if data_inicio else None
+        fim = intervalo_dia(data_fim)[1] if data_fim else None
+        condicao, limites = filtro_periodo("v.data_venda", inicio, fim)
+        where_conditions.append(condicao)
+        params.extend(limites)
+
+    if cliente:
+        where_conditions.append("""
+            EXISTS (
+                SELECT 1 FROM historico_compra hc
+                WHERE hc.venda_id = v.id AND hc.comprador_nome LIKE ?
+            )
+        """)
+        params.append(f"%{cliente}%")
+
+    return where_conditions, params
+
+
+def _consultar_vendas(cur, where_conditions, params, limite) -> List[Dict[str, Any]]:
+    """Carrega as vendas filtradas com comprador e itens numa única consulta.
+
+    As vendas vêm por ordem decrescente de ``(data_venda, id)`` e os itens de
+    cada venda são agrupados em Python.
+    """
+    where_clause = ""
+    if where_conditions:
+        where_clause = "WHERE " + " AND ".join(where_conditions)
+
+    # Uma única consulta: as vendas da página, o comprador e os itens de
+    # cada venda (o total do filtro vem de ``resumo_historico``)
+    cur.execute(
+        f"""
+        SELECT
+            v.id, v.data_venda, v.total,
+            hc.comprador_nome,
+            iv.produto_id,
+            p.nome_comercial AS produto_nome,
+            iv.quantidade,
+            iv.preco_unitario,
+            iv.subtotal
+        FROM (
+            SELECT v.id, v.data_venda, v.total
+            FROM vendas v
+            {where_clause}
+            ORDER BY v.data_venda DESC, v.id DESC
+            LIMIT ?
+        ) v
+        LEFT JOIN historico_compra hc ON hc.venda_id = v.id
+        LEFT JOIN itens_venda iv ON iv.venda_id = v.id
+        LEFT JOIN produtos p ON p.id = iv.produto_id
+        ORDER BY v.data_venda DESC, v.id DESC, iv.id
+        """,
+        (*params, limite)
+    )
+
+    resultado = []
+    por_venda: Dict[int, Dict[str, Any]] = {}
+
+    for r in cur.fetchall():
+        venda = por_venda.get(r["id"])
+        if venda is None:
+            venda = {
+                "venda_id": r["id"],
+                "data": r["data_venda"],
+                "total": r["total"] or 0.0,
+                "quantidade_total": 0,
+                "produtos": [],
+                "comprador": r["comprador_nome"]
+            }
+            por_venda[r["id"]] = venda
+            resultado.append(venda)
+
+        if r["produto_id"] is None:
+            continue
+        qtd = r["quantidade"] or 0
+        venda["quantidade_total"] += qtd
+        venda["produtos"].append({
+            "produto_id": r["produto_id"],
+            "produto_nome": r["produto_nome"],
+            "quantidade": qtd,
+            "preco_unitario": r["preco_unitario"],
+            "subtotal": r["subtotal"],
+        })
+
+    return resultado
 
 
-# =========================================================
-# Consulta do histórico de vendas
-# =========================================================
 def obter_historico(
     venda_id: Optional[int] = None,
     limite: int = 100,
@@ -65,139 +171,285 @@ def obter_historico(
     cliente: Optional[str] = None
 ) -> Tuple[List[Dict[str, Any]], float]:
     """Retorna histórico de vendas e total geral"""
-    db_file = _find_db_file()
-    if not db_file:
+    try:
+        cur = get_connection().cursor()
+        where_conditions, params = _filtros_historico(venda_id, data_inicio, data_fim, cliente)
+        resultado = _consultar_vendas(cur, where_conditions, params, limite)
+        total_geral = sum(v["total"] for v in resultado)
+        return resultado, total_geral
+
+    except sqlite3.Error as e:
+        print(f"Erro no banco de dados: {e}")
         return [], 0.0
 
-    conn = None
+
+def _condicao_cursor(apos: Tuple[str, int]) -> Tuple[str, List[Any]]:
+    """Condição das vendas a seguir ao cursor ``(data_venda, id)``.
+
+    O limite ``data_venda <= ?`` à cabeça deixa o SQLite procurar em
+    ``idx_vendas_data`` em vez de percorrer o índice desde o início; o resto
+    desempata as vendas com a mesma data.
+    """
+    data, venda_id = apos
+    return "v.data_venda <= ? AND (v.data_venda < ? OR v.id < ?)", [data, data, venda_id]
+
+
+def obter_pagina_historico(
+    apos: Optional[Tuple[str, int]] = None,
+    tamanho: int = PAGINA_HISTORICO,
+    **filtros
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+    """Retorna uma página do histórico a seguir ao cursor ``apos``.
+
+    O cursor é o par ``(data_venda, id)`` da última venda da página anterior
+    (keyset): cada página custa o mesmo, seja a primeira ou a milésima. O
+    segundo valor devolvido é o cursor da página seguinte, ou ``None`` quando
+    não há mais vendas.
+    """
+    cur = get_connection().cursor()
+    where_conditions, params = _filtros_historico(**filtros)
+    if apos is not None:
+        condicao, limites = _condicao_cursor(apos)
+        where_conditions.append(condicao)
+        params.extend(limites)
+
+    vendas = _consultar_vendas(cur, where_conditions, params, tamanho)
+    if len(vendas) < tamanho:
+        return vendas, None
+    ultima = vendas[-1]
+    return vendas, (ultima["data"], ultima["venda_id"])
+
+
+def resumo_historico(**filtros) -> Dict[str, Any]:
+    """Número de vendas, total e data da venda mais recente para os filtros."""
+    cur = get_connection().cursor()
+    where_conditions, params = _filtros_historico(**filtros)
+    where_clause = ""
+    if where_conditions:
+        where_clause = "WHERE " + " AND ".join(where_conditions)
+    cur.execute(
+        f"""
+        SELECT COUNT(*) AS total_vendas, COALESCE(SUM(v.total), 0) AS total_geral,
+               MAX(v.data_venda) AS ultima_venda
+        FROM vendas v
+        {where_clause}
+        """,
+        params
+    )
+    r = cur.fetchone()
+    return {
+        "total_vendas": r["total_vendas"],
+        "total_geral": r["total_geral"],
+        "ultima_venda": r["ultima_venda"],
+    }
+
+
+def _formatar_data(data_venda: Optional[str]) -> str:
+    """'2024-05-01 14:30:00' -> '01/05/2024 14:30' (sem strptime por linha)."""
+    if not data_venda or len(data_venda) < 16:
+        return data_venda or ""
+    return f"{data_venda[8:10]}/{data_venda[5:7]}/{data_venda[0:4]} {data_venda[11:16]}"
+
+
+def carregar_historico(filtros: Dict[str, Any]) -> Dict[str, Any]:
+    """Primeira página e resumo do histórico (corre fora da thread da interface)."""
+    vendas, cursor = obter_pagina_historico(**filtros)
+    return {
+        "filtros": filtros,
+        "vendas": vendas,
+        "cursor": cursor,
+        "resumo": resumo_historico(**filtros),
+    }
+
+
+def exportar_historico_csv(file_name: str, filtros: Dict[str, Any]) -> str:
+    """Escreve em CSV todo o histórico filtrado, página a página.
+
+    Se a exportação falhar ou for cancelada, o ficheiro parcial é apagado.
+    """
     try:
-        conn = sqlite3.connect(str(db_file))
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-
-        where_conditions = []
-        params = []
-
-        if venda_id is not None:
-            where_conditions.append("v.id = ?")
-            params.append(venda_id)
-
-        if data_inicio:
-            where_conditions.append("DATE(v.data_venda) >= ?")
-            params.append(data_inicio)
-
-        if data_fim:
-            where_conditions.append("DATE(v.data_venda) <= ?")
-            params.append(data_fim)
-
-        if cliente:
-            where_conditions.append("""
-                EXISTS (
-                    SELECT 1 FROM historico_compra hc 
-                    WHERE ABS(strftime('%s', hc.tempo_compra) - strftime('%s', v.data_venda)) < 10 
-                    AND hc.comprador_nome LIKE ?
-                )
-            """)
-            params.append(f"%{cliente}%")
-
-        where_clause = ""
-        if where_conditions:
-            where_clause = "WHERE " + " AND ".join(where_conditions)
-
-        # Primeiro, contar total de vendas
-        cur.execute(f"SELECT COUNT(*) as total FROM vendas v {where_clause}", params)
-        total_vendas = cur.fetchone()["total"]
-
-        # Buscar vendas com limite
-        cur.execute(
-            f"""
-            SELECT v.id, v.data_venda, v.total
-            FROM vendas v
-            {where_clause}
-            ORDER BY v.data_venda DESC
-            LIMIT ?
-            """,
-            (*params, limite)
-        )
+        with open(file_name, 'w', encoding='utf-8') as f:
+            # Cabeçalho
+            f.write("ID;Cliente;Data;Hora;Itens;Total(Kz)\n")
+            
+            cursor = None
+            while True:
+                vendas, cursor = obter_pagina_historico(cursor, **filtros)
+                for venda in vendas:
+                    data, _, hora = _formatar_data(venda["data"]).partition(" ")
+                    
+                    linha = f"""
+{venda['venda_id']};
+{venda['comprador'] or 'N/A'};
+{data};
+{hora};
+{venda['quantidade_total']};
+{venda['total']:.2f}
+""".strip()
+                    f.write(linha + "\n")
+                if cursor is None:
+                    break
+    except BaseException:
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+        raise
+    return file_name
 
-        vendas = cur.fetchall()
-        resultado = []
-        total_geral = 0.0
 
-        for v in vendas:
-            cur.execute(
-                """
-                SELECT
-                    iv.produto_id,
-                    p.nome_comercial AS produto_nome,
-                    iv.quantidade,
-                    iv.preco_unitario,
-                    iv.subtotal
-                FROM itens_venda iv
-                LEFT JOIN produtos p ON p.id = iv.produto_id
-                WHERE iv.venda_id = ?
-                """,
-                (v["id"],)
-            )
+# =========================================================
+# Modelo da tabela – carregamento por páginas
+# =========================================================
+class HistoricoVendaModel(QAbstractTableModel):
+    """Modelo do histórico de vendas com carregamento incremental.
 
-            itens = cur.fetchall()
-            produtos = []
-            qtd_total = 0
-
-            for it in itens:
-                qtd = it["quantidade"] or 0
-                qtd_total += qtd
-                produtos.append({
-                    "produto_id": it["produto_id"],
-                    "produto_nome": it["produto_nome"],
-                    "quantidade": qtd,
-                    "preco_unitario": it["preco_unitario"],
-                    "subtotal": it["subtotal"],
-                })
-
-            comprador = None
-            try:
-                cur.execute(
-                    """
-                    SELECT comprador_nome
-                    FROM historico_compra
-                    WHERE ABS(
-                        strftime('%s', tempo_compra) -
-                        strftime('%s', ?)
-                    ) < 10
-                    ORDER BY id DESC
-                    LIMIT 1
-                    """,
-                    (v["data_venda"],)
-                )
-                row = cur.fetchone()
-                if row:
-                    comprador = row["comprador_nome"]
-            except sqlite3.Error:
-                comprador = None
-
-            venda_total = v["total"] or 0.0
-            total_geral += venda_total
-            
-            resultado.append({
-                "venda_id": v["id"],
-                "data": v["data_venda"],
-                "total": venda_total,
-                "quantidade_total": qtd_total,
-                "produtos": produtos,
-                "comprador": comprador,
-                "total_vendas": total_vendas
-            })
+    A tabela pede mais linhas (``canFetchMore``/``fetchMore``) à medida que o
+    utilizador faz scroll; cada pedido lê uma página a seguir ao último
+    ``(data_venda, id)`` carregado, por isso abrir o histórico custa sempre o
+    mesmo, independentemente do número total de vendas.
 
-        return resultado, total_geral
+    Só as ``JANELA_HISTORICO`` páginas usadas mais recentemente ficam em
+    memória. Das outras guarda-se apenas o cursor onde começam, e são relidas
+    quando a tabela volta a mostrá-las.
+    """
 
-    except sqlite3.Error as e:
-        print(f"Erro no banco de dados: {e}")
-        return [], 0.0
+    COLUNAS = ["ID", "Cliente", "Data/Hora", "Itens", "Total (Kz)"]
 
-    finally:
-        if conn:
-            conn.close()
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paginas: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._inicios: List[Optional[Tuple[str, int]]] = []
+        self._linhas = 0
+        self._filtros: Dict[str, Any] = {}
+        self._cursor: Optional[Tuple[str, int]] = None
+        self._fim = True
+
+    @property
+    def filtros(self) -> Dict[str, Any]:
+        return dict(self._filtros)
+
+    def carregar(self, **filtros):
+        """Recomeça o histórico com novos filtros e lê a primeira página."""
+        vendas, cursor = obter_pagina_historico(**filtros)
+        self.definir(filtros, vendas, cursor)
+
+    def definir(self, filtros: Dict[str, Any], vendas: List[Dict[str, Any]],
+                cursor: Optional[Tuple[str, int]]):
+        """Substitui o conteúdo por uma primeira página já lida (ex.: num worker)."""
+        self.beginResetModel()
+        self._paginas.clear()
+        self._guardar(0, vendas)
+        self._inicios = [None]
+        self._linhas = len(vendas)
+        self._filtros = dict(filtros)
+        self._cursor = cursor
+        self._fim = cursor is None
+        self.endResetModel()
+
+    def venda(self, row: int) -> Optional[Dict[str, Any]]:
+        if not 0 <= row < self._linhas:
+            return None
+        pagina, posicao = divmod(row, PAGINA_HISTORICO)
+        vendas = self._pagina(pagina)
+        # a página relida pode ter encolhido se entretanto se apagaram vendas
+        return vendas[posicao] if posicao < len(vendas) else None
+
+    def _guardar(self, pagina: int, vendas: List[Dict[str, Any]]):
+        for v in vendas:
+            v["data_formatada"] = _formatar_data(v["data"])
+        self._paginas[pagina] = vendas
+        self._paginas.move_to_end(pagina)
+        while len(self._paginas) > JANELA_HISTORICO:
+            self._paginas.popitem(last=False)
+
+    def _pagina(self, pagina: int) -> List[Dict[str, Any]]:
+        """Vendas da página, relidas a partir do cursor se já saíram da janela."""
+        vendas = self._paginas.get(pagina)
+        if vendas is not None:
+            self._paginas.move_to_end(pagina)
+            return vendas
+        try:
+            with query_guard():
+                vendas, _ = obter_pagina_historico(
+                    self._inicios[pagina], PAGINA_HISTORICO, **self._filtros)
+        except sqlite3.Error as e:
+            print(f"Erro no banco de dados: {e}")
+            return []
+        self._guardar(pagina, vendas)
+        return vendas
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._linhas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUNAS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._fim
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._fim:
+            return
+        inicio_pagina = self._cursor
+        try:
+            with query_guard():
+                vendas, self._cursor = obter_pagina_historico(
+                    inicio_pagina, PAGINA_HISTORICO, **self._filtros)
+        except sqlite3.Error as e:
+            print(f"Erro no banco de dados: {e}")
+            vendas, self._cursor = [], None
+        self._fim = self._cursor is None
+        if not vendas:
+            return
+
+        inicio = self._linhas
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(vendas) - 1)
+        self._guardar(len(self._inicios), vendas)
+        self._inicios.append(inicio_pagina)
+        self._linhas += len(vendas)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        venda = self.venda(index.row())
+        if venda is None:
+            return None
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(venda["venda_id"])
+            if col == 1:
+                return venda["comprador"] or "Cliente não identificado"
+            if col == 2:
+                return venda["data_formatada"]
+            if col == 3:
+                return f"{venda['quantidade_total']} itens"
+            if col == 4:
+                return f"Kz {venda['total'] or 0.0:,.2f}"
+        elif role == Qt.UserRole:
+            return venda["venda_id"]
+        elif role == Qt.TextAlignmentRole:
+            if col == 4:
+                return Qt.AlignRight | Qt.AlignVCenter
+            if col != 1:
+                return Qt.AlignCenter
+        elif role == Qt.ForegroundRole and col == 4:
+            # Colorir baseado no valor
+            total = venda["total"] or 0.0
+            if total > 10000:
+                return QBrush(QColor(0, 100, 0))  # Verde escuro
+            if total < 1000:
+                return QBrush(QColor(128, 128, 128))  # Cinza
+        return None
 
 
 # =========================================================
@@ -216,9 +468,20 @@ class HistoricoVendaView(QWidget):
         self.setStyleSheet(self._get_stylesheet())
         
         # Variáveis de estado
-        self.vendas = []
+        self.resumo = {"total_vendas": 0, "total_geral": 0.0, "ultima_venda": None}
         self.total_geral = 0.0
         self.filtro_ativo = False
+        self._silencioso = False
+        
+        # Consultas fora da thread da interface
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._on_history_loaded)
+        self._loader.failed.connect(self._on_history_failed)
+        self._loader.cancel_on_hide(self, lambda: self.load_history(silencioso=True))
+        # Exportação sem tempo máximo: pode ser longa, mas pode ser cancelada
+        self._export_loader = AsyncLoader(self, budget=None)
+        self._export_loader.loaded.connect(self._on_export_done)
+        self._export_loader.failed.connect(self._on_export_failed)
         
         # Timer para atualização automática
         self.timer = QTimer()
@@ -443,12 +706,10 @@ class HistoricoVendaView(QWidget):
         
         main_layout.addWidget(filter_group)
 
-        # Tabela de resultados
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Cliente", "Data/Hora", "Itens", "Total (Kz)"
-        ])
+        # Tabela de resultados (carregada por páginas à medida que se faz scroll)
+        self.model = HistoricoVendaModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         
         # Configurar cabeçalho
         header_view = self.table.horizontalHeader()
@@ -458,10 +719,12 @@ class HistoricoVendaView(QWidget):
         header_view.setSectionResizeMode(3, QHeaderView.ResizeToContents) # Itens
         header_view.setSectionResizeMode(4, QHeaderView.ResizeToContents) # Total
         
-        # Configurar seleção
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        # Configurar seleção (ordem fixa: mais recentes primeiro)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
-        self.table.setSortingEnabled(True)
+        self.table.verticalHeader().setVisible(False)
         
         main_layout.addWidget(self.table)
 
@@ -492,8 +755,8 @@ class HistoricoVendaView(QWidget):
         main_layout.addLayout(footer_layout)
 
         # Conectar eventos
-        self.table.cellDoubleClicked.connect(self._on_table_activated)
-        self.table.itemSelectionChanged.connect(self._on_selection_changed)
+        self.table.doubleClicked.connect(self._on_table_activated)
+        self.table.selectionModel().selectionChanged.connect(self._on_selection_changed)
 
     def _toggle_auto_refresh(self, checked: bool):
         """Ativa/desativa atualização automática"""
@@ -511,118 +774,72 @@ class HistoricoVendaView(QWidget):
         if self.isVisible() and not self.filtro_ativo:
             self.load_history(silencioso=True)
 
+    def refresh(self):
+        """Recarrega o histórico ao voltar à view (sem diálogo de progresso)."""
+        self.load_history(silencioso=True)
+
     def load_history(self, silencioso: bool = False):
-        """Carrega o histórico de vendas"""
-        if not silencioso:
-            progress = QProgressDialog("Carregando histórico...", "Cancelar", 0, 0, self)
-            progress.setWindowModality(Qt.WindowModal)
-            progress.show()
-            QApplication.processEvents()
+        """Carrega o histórico de vendas em segundo plano"""
+        # Coletar filtros
+        filtros = {}
         
-        try:
-            # Coletar filtros
-            filtros = {}
-            
-            if self.filter_id.text():
-                try:
-                    filtros['venda_id'] = int(self.filter_id.text())
-                except ValueError:
-                    pass
-            
-            if self.filter_cliente.text():
-                filtros['cliente'] = self.filter_cliente.text()
-            
-            if self.filter_data_inicio.date() != QDate.currentDate().addDays(-7):
-                filtros['data_inicio'] = self.filter_data_inicio.date().toString("yyyy-MM-dd")
-            
-            if self.filter_data_fim.date() != QDate.currentDate():
-                filtros['data_fim'] = self.filter_data_fim.date().toString("yyyy-MM-dd")
-            
-            # Buscar dados
-            self.vendas, self.total_geral = obter_historico(
-                venda_id=filtros.get('venda_id'),
-                limite=1000,
-                data_inicio=filtros.get('data_inicio'),
-                data_fim=filtros.get('data_fim'),
-                cliente=filtros.get('cliente')
-            )
-            
-            # Atualizar filtro ativo
-            self.filtro_ativo = any(filtros.values())
-            
-            # Atualizar interface
-            self._atualizar_tabela()
-            self._atualizar_estatisticas()
-            
-            self.atualizado.emit()
-            
-        except Exception as e:
-            if not silencioso:
-                QMessageBox.warning(self, "Erro", f"Erro ao carregar histórico: {str(e)}")
+        if self.filter_id.text():
+            try:
+                filtros['venda_id'] = int(self.filter_id.text())
+            except ValueError:
+                pass
+        
+        if self.filter_cliente.text():
+            filtros['cliente'] = self.filter_cliente.text()
         
-        finally:
-            if not silencioso:
-                progress.close()
+        if self.filter_data_inicio.date() != QDate.currentDate().addDays(-7):
+            filtros['data_inicio'] = self.filter_data_inicio.date().toString("yyyy-MM-dd")
+        
+        if self.filter_data_fim.date() != QDate.currentDate():
+            filtros['data_fim'] = self.filter_data_fim.date().toString("yyyy-MM-dd")
+        
+        self._silencioso = silencioso
+        self._loader.run(carregar_historico, filtros)
+        if not silencioso:
+            self._loader.progress_dialog(self, "Carregando histórico...")
 
-    def _atualizar_tabela(self):
-        """Atualiza a tabela com os dados carregados"""
-        self.table.setRowCount(0)
+    def _on_history_loaded(self, dados: Dict[str, Any]):
+        """Aplica à tabela o resultado do carregamento"""
+        filtros = dados["filtros"]
+        # primeira página na tabela, totais agregados no banco
+        self.model.definir(filtros, dados["vendas"], dados["cursor"])
+        self.resumo = dados["resumo"]
+        self.total_geral = self.resumo["total_geral"]
         
-        for venda in self.vendas:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # ID
-            item_id = QTableWidgetItem(str(venda["venda_id"]))
-            item_id.setData(Qt.UserRole, venda["venda_id"])
-            item_id.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 0, item_id)
-            
-            # Cliente
-            cliente = venda["comprador"] or "Cliente não identificado"
-            item_cliente = QTableWidgetItem(cliente)
-            self.table.setItem(row, 1, item_cliente)
-            
-            # Data/Hora
-            data_obj = datetime.strptime(venda["data"], "%Y-%m-%d %H:%M:%S")
-            data_formatada = data_obj.strftime("%d/%m/%Y %H:%M")
-            item_data = QTableWidgetItem(data_formatada)
-            item_data.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 2, item_data)
-            
-            # Itens
-            itens_text = f"{venda['quantidade_total']} itens"
-            item_itens = QTableWidgetItem(itens_text)
-            item_itens.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 3, item_itens)
-            
-            # Total
-            total = venda["total"] or 0.0
-            item_total = QTableWidgetItem(f"Kz {total:,.2f}")
-            item_total.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            
-            # Colorir baseado no valor
-            if total > 10000:
-                item_total.setForeground(QBrush(QColor(0, 100, 0)))  # Verde escuro
-            elif total < 1000:
-                item_total.setForeground(QBrush(QColor(128, 128, 128)))  # Cinza
-            
-            self.table.setItem(row, 4, item_total)
+        # Atualizar filtro ativo
+        self.filtro_ativo = any(filtros.values())
+        
+        # Atualizar interface
+        self._atualizar_tabela()
+        self._atualizar_estatisticas()
         
+        self.atualizado.emit()
+
+    def _on_history_failed(self, mensagem: str):
+        if not self._silencioso:
+            QMessageBox.warning(self, "Erro", f"Erro ao carregar histórico: {mensagem}")
+
+    def _atualizar_tabela(self):
+        """Atualiza o rodapé da tabela (as linhas vêm do modelo)"""
         # Atualizar label do total geral
         self.total_label.setText(f"Total Geral: Kz {self.total_geral:,.2f}")
 
     def _atualizar_estatisticas(self):
         """Atualiza as estatísticas exibidas"""
-        if not self.vendas:
+        total_vendas = self.resumo["total_vendas"]
+        if not total_vendas:
             self.stats_label.setText("Nenhuma venda encontrada")
             return
         
-        total_vendas = len(self.vendas)
         media_valor = self.total_geral / total_vendas if total_vendas > 0 else 0
         
         # Venda mais recente
-        mais_recente = max(self.vendas, key=lambda x: x["data"]) if self.vendas else None
+        mais_recente = self.resumo["ultima_venda"]
         
         stats_text = f"""
         <b> Estatísticas:</b> 
@@ -632,7 +849,7 @@ class HistoricoVendaView(QWidget):
         """
         
         if mais_recente:
-            stats_text += f" | Última Venda: <b>{mais_recente['data'].split()[0]}</b>"
+            stats_text += f" | Última Venda: <b>{mais_recente.split()[0]}</b>"
         
         self.stats_label.setText(stats_text)
 
@@ -680,41 +897,27 @@ class HistoricoVendaView(QWidget):
         self.filtro_ativo = False
         self.load_history()
 
-    def _on_table_activated(self, row, column):
+    def _on_table_activated(self, index):
         """Abre os detalhes da venda ao clicar duas vezes"""
         self.ver_detalhes()
 
-    def _on_selection_changed(self):
+    def _on_selection_changed(self, *args):
         """Atualiza o estado do botão de detalhes"""
-        has_selection = self.table.currentRow() >= 0
+        has_selection = self.table.selectionModel().hasSelection()
         self.btn_detalhes.setEnabled(has_selection)
 
+    def _venda_selecionada(self) -> Optional[Dict[str, Any]]:
+        """Venda da linha selecionada (ou None)"""
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.model.venda(rows[0].row())
+
     def ver_detalhes(self):
         """Abre a janela de detalhes da venda selecionada"""
-        selected = self.table.currentRow()
-        if selected < 0:
-            QMessageBox.information(self, "Aviso", "Selecione uma venda para ver os detalhes.")
-            return
-        
-        item_id = self.table.item(selected, 0)
-        if not item_id:
-            return
-        
-        try:
-            venda_id = int(item_id.data(Qt.UserRole))
-        except Exception:
-            QMessageBox.warning(self, "Erro", "ID da venda inválido.")
-            return
-        
-        # Encontrar a venda nos dados carregados
-        venda = None
-        for v in self.vendas:
-            if v["venda_id"] == venda_id:
-                venda = v
-                break
-        
+        venda = self._venda_selecionada()
         if not venda:
-            QMessageBox.warning(self, "Erro", "Venda não encontrada.")
+            QMessageBox.information(self, "Aviso", "Selecione uma venda para ver os detalhes.")
             return
         
         dlg = VendaInvoiceDialog(venda, parent=self)
@@ -722,32 +925,11 @@ class HistoricoVendaView(QWidget):
 
     def on_generate_pdf(self):
         """Gera PDF da venda selecionada"""
-        selected = self.table.currentRow()
-        if selected < 0:
-            QMessageBox.information(self, "Aviso", "Selecione uma venda para gerar PDF.")
-            return
-        
-        item_id = self.table.item(selected, 0)
-        if not item_id:
-            QMessageBox.warning(self, "Erro", "Não foi possível obter a venda selecionada.")
-            return
-        
-        try:
-            venda_id = int(item_id.data(Qt.UserRole))
-        except Exception:
-            QMessageBox.warning(self, "Erro", "ID da venda inválido.")
-            return
-        
-        # Encontrar a venda
-        venda = None
-        for v in self.vendas:
-            if v["venda_id"] == venda_id:
-                venda = v
-                break
-        
+        venda = self._venda_selecionada()
         if not venda:
-            QMessageBox.warning(self, "Erro", "Venda não encontrada.")
+            QMessageBox.information(self, "Aviso", "Selecione uma venda para gerar PDF.")
             return
+        venda_id = venda["venda_id"]
         
         # Solicitar local para salvar
         file_name, _ = QFileDialog.getSaveFileName(
@@ -771,7 +953,7 @@ class HistoricoVendaView(QWidget):
 
     def exportar_csv(self):
         """Exporta os dados para CSV"""
-        if not self.vendas:
+        if not self.resumo["total_vendas"]:
             QMessageBox.information(self, "Aviso", "Não há dados para exportar.")
             return
         
@@ -785,35 +967,20 @@ class HistoricoVendaView(QWidget):
         if not file_name:
             return
         
-        try:
-            with open(file_name, 'w', encoding='utf-8') as f:
-                # Cabeçalho
-                f.write("ID;Cliente;Data;Hora;Itens;Total(Kz)\n")
-                
-                # Dados
-                for venda in self.vendas:
-                    data_obj = datetime.strptime(venda["data"], "%Y-%m-%d %H:%M:%S")
-                    data = data_obj.strftime("%d/%m/%Y")
-                    hora = data_obj.strftime("%H:%M")
-                    
-                    linha = f"""
-{venda['venda_id']};
-{venda['comprador'] or 'N/A'};
-{data};
-{hora};
-{venda['quantidade_total']};
-{venda['total']:.2f}
-""".strip()
-                    f.write(linha + "\n")
-            
-            QMessageBox.information(self, "Sucesso", f"Dados exportados com sucesso:\n{file_name}")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Falha ao exportar CSV:\n{str(e)}")
+        self._export_loader.run(exportar_historico_csv, file_name, self.model.filtros)
+        self._export_loader.progress_dialog(self, "Exportando CSV...")
+
+    def _on_export_done(self, file_name: str):
+        QMessageBox.information(self, "Sucesso", f"Dados exportados com sucesso:\n{file_name}")
+
+    def _on_export_failed(self, mensagem: str):
+        QMessageBox.critical(self, "Erro", f"Falha ao exportar CSV:\n{mensagem}")
 
     def closeEvent(self, event):
-        """Garante que o timer seja parado ao fechar a janela"""
+        """Garante que o timer e o carregamento em curso sejam parados ao fechar a janela"""
         self.timer.stop()
+        self._loader.cancel()
+        self._export_loader.cancel()
         super().closeEvent(event)
 
 
@@ -1295,4 +1462,8 @@ if __name__ == "__main__":
     sys.exit(app.exec_())
 
 
-__all__ = ["obter_historico", "HistoricoVendaView", "VendaInvoiceDialog"]
\ No newline at end of file
+__all__ = [
+    "obter_historico", "obter_pagina_historico", "resumo_historico", "carregar_historico",
+    "exportar_historico_csv",
+    "HistoricoVendaModel", "HistoricoVendaView", "VendaInvoiceDialog",
+]
\ No newline at end of file
@@ -4,43 +4,20 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QDate, pyqtSignal, QSize
 from PyQt5.QtGui import QFont, QPainter, QLinearGradient, QBrush, QColor
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import numpy as np
 from datetime import datetime, timedelta
 import random
-import sqlite3
+import sys
 from pathlib import Path
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
 
-def _resolve_db_path() -> Path:
-    """Resolve o caminho para o arquivo de DB usando `config.settings.DB_FILE` ou procurando a pasta `database`.
-
-    Returns:
-        Path para `kamba_farma.db`.
-    """
-    try:
-        from config.settings import DB_FILE
-        return Path(DB_FILE)
-    except Exception:
-        # procurar a pasta `database` subindo até 8 níveis
-        p = Path(__file__).resolve()
-        root = p
-        for _ in range(8):
-            if (root / 'database').exists():
-                return root / 'database' / 'kamba_farma.db'
-            root = root.parent
-        # fallback para caminho relativo
-        return Path(__file__).resolve().parents[3] / 'database' / 'kamba_farma.db'
-
-
-def _get_conn():
-    db = _resolve_db_path()
-    conn = sqlite3.connect(str(db))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+from database.db import get_connection
+from src.services.dashboard_service import carregar_dashboard
+from src.utils.async_loader import AsyncLoader
+from src.utils.charts import LineChart, PieChart
 
 from colors import *
 # Local aliases
@@ -148,78 +125,6 @@ class ResponsiveCardWidget(QFrame):
         """)
 
 
-class ResponsiveSalesChart(FigureCanvas):
-    """Gráfico de vendas responsivo com matplotlib"""
-    def __init__(self, parent=None, dpi=100):
-        self.fig = Figure(dpi=dpi, facecolor='white')
-        self.fig.set_tight_layout(True)
-        self.axes = self.fig.add_subplot(111)
-        
-        super().__init__(self.fig)
-        self.setParent(parent)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setMinimumHeight(250)
-        
-        # Configurar estilo do gráfico
-        self.setup_chart_style()
-        
-    def setup_chart_style(self):
-        """Configura o estilo visual do gráfico"""
-        # Configurar cores das linhas e fundo
-        self.fig.patch.set_facecolor(WHITE_NEUTRAL)
-        self.axes.set_facecolor(WHITE)
-        
-        # Remover bordas
-        for spine in self.axes.spines.values():
-            spine.set_visible(False)
-        
-        # Configurar cor dos eixos
-        self.axes.tick_params(colors=DARK_GRAY, labelsize=9)
-        self.axes.yaxis.label.set_color(DARK_GRAY)
-        self.axes.xaxis.label.set_color(DARK_GRAY)
-        
-    def plot_sales_data(self, dates, values, title="Vendas Recentes"):
-        """Plota os dados de vendas"""
-        self.axes.clear()
-        
-        # Criar gráfico de linha
-        self.axes.plot(dates, values, 
-                      color=TEAL_PRIMARY, 
-                      linewidth=2.5,
-                      marker='o',
-                      markersize=6,
-                      markerfacecolor=TEAL_LIGHT,
-                      markeredgecolor=TEAL_PRIMARY)
-        
-        # Área sob a linha
-        self.axes.fill_between(dates, values, 
-                              alpha=0.1, 
-                              color=TEAL_PRIMARY)
-        
-        # Configurar título e labels
-        self.axes.set_title(title, 
-                           fontsize=12, 
-                           fontweight='bold',
-                           color=DARK_GRAY,
-                           pad=15)
-        self.axes.set_xlabel('Data', fontsize=10, color=DARK_GRAY)
-        self.axes.set_ylabel('Valor (Kz)', fontsize=10, color=DARK_GRAY)
-        
-        # Formatar eixos
-        self.axes.tick_params(axis='x', rotation=45, labelsize=8)
-        self.axes.tick_params(axis='y', labelsize=8)
-        self.axes.grid(True, alpha=0.2, linestyle='--', color=GRAY_MEDIUM)
-        
-        # Configurar limite do eixo Y para começar em 0
-        self.axes.set_ylim(bottom=0)
-        
-        # Ajustar layout dinamicamente
-        self.fig.tight_layout()
-        
-        self.setup_chart_style()
-        self.draw()
-
-
 class ResponsiveWelcomeWidget(QFrame):
     """Widget de boas-vindas responsivo"""
     def __init__(self, username="Administrador", parent=None):
@@ -341,49 +246,15 @@ class ResponsiveWelcomeWidget(QFrame):
         """)
 
 
-class ResponsivePieChart(FigureCanvas):
-    """Gráfico de pizza responsivo"""
-    def __init__(self, parent=None, dpi=100):
-        self.fig = Figure(dpi=dpi, facecolor='white')
-        self.fig.set_tight_layout(True)
-        self.axes = self.fig.add_subplot(111)
-        
-        super().__init__(self.fig)
-        self.setParent(parent)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setMinimumHeight(200)
-        self.setMinimumWidth(200)
-        
-    def plot_data(self, categories, values, title="Distribuição"):
-        """Plota dados em formato de pizza"""
-        self.axes.clear()
-        
-        colors = [TEAL_PRIMARY, TEAL_LIGHT, ORANGE_ALERT, GRAY_MEDIUM, "#2196F3"]
-        
-        # Ajustar tamanho da fonte baseado no tamanho do gráfico
-        fontsize = max(8, min(10, 100 / len(categories)))
-        
-        # Criar gráfico de pizza
-        wedges, texts, autotexts = self.axes.pie(values, 
-                                                 labels=categories,
-                                                 colors=colors[:len(categories)],
-                                                 autopct='%1.1f%%',
-                                                 startangle=90,
-                                                 textprops={'fontsize': fontsize})
-        
-        # Estilizar
-        self.axes.set_title(title, 
-                           fontsize=10, 
-                           fontweight='bold',
-                           color=DARK_GRAY)
-        
-        self.fig.tight_layout()
-        self.draw()
-
-
 class HomePage(QWidget):
+    # Janela do gráfico de vendas (a leitura é uma só consulta para qualquer N)
+    DIAS_GRAFICO = 7
+
     def __init__(self):
         super().__init__()
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._aplicar_dados)
+        self._loader.failed.connect(self._aplicar_dados_exemplo)
         self.setup_ui()
         self.load_sample_data()
         
@@ -447,7 +318,8 @@ class HomePage(QWidget):
         
         chart_layout = QVBoxLayout(chart_group)
         chart_layout.setContentsMargins(8, 8, 8, 8)
-        self.sales_chart = ResponsiveSalesChart(self)
+        self.sales_chart = LineChart(self, color=TEAL_PRIMARY)
+        self.sales_chart.setMinimumHeight(250)
         chart_layout.addWidget(self.sales_chart)
         
         charts_layout.addWidget(chart_group)
@@ -481,7 +353,7 @@ class HomePage(QWidget):
         
         product_layout = QVBoxLayout(product_group)
         product_layout.setContentsMargins(8, 8, 8, 8)
-        self.product_chart = ResponsivePieChart(self)
+        self.product_chart = PieChart(self)
         product_layout.addWidget(self.product_chart)
         
         # Lista de produtos mais vendidos
@@ -681,162 +553,85 @@ class HomePage(QWidget):
         return widget
     
     def load_sample_data(self):
-        """Carrega dados de exemplo para o dashboard"""
-        # Tentar carregar métricas reais do banco; se falhar, usar fallback de exemplo
-        try:
-            conn = _get_conn()
-            cur = conn.cursor()
-
-            # Total de vendas (soma da coluna `total` em vendas)
-            cur.execute("SELECT COALESCE(SUM(total),0) AS total_vendas FROM vendas")
-            total_vendas = cur.fetchone()[0] or 0
-
-            # Produtos em stock (soma de stock)
-            cur.execute("SELECT COALESCE(SUM(stock),0) AS produtos_stock FROM produtos")
-            produtos_stock = cur.fetchone()[0] or 0
-
-            # Funcionários (contagem de usuários)
-            cur.execute("SELECT COUNT(*) AS qtd_usuarios FROM usuarios")
-            qtd_usuarios = cur.fetchone()[0] or 0
-
-            # Vendas hoje
-            cur.execute("SELECT COALESCE(SUM(total),0) FROM vendas WHERE DATE(data_venda)=DATE('now','localtime')")
-            vendas_hoje = cur.fetchone()[0] or 0
-
-            # Top produtos por quantidade vendida (itens_venda)
-            cur.execute(
-                """
-                SELECT p.nome_comercial AS nome, SUM(iv.quantidade) AS vendido
-                FROM itens_venda iv
-                LEFT JOIN produtos p ON p.id = iv.produto_id
-                GROUP BY iv.produto_id
-                ORDER BY vendido DESC
-                LIMIT 5
-                """
-            )
-            top_rows = cur.fetchall()
-            top_products = [(r['nome'] or '---', f"{int(r['vendido'])} unidades") for r in top_rows]
+        """Carrega as métricas do dashboard em segundo plano"""
+        self._loader.run(carregar_dashboard, self.DIAS_GRAFICO)
 
-            # Alertas: produtos com stock baixo e lotes com validade próxima
-            cur.execute("SELECT nome_comercial, stock, stock_minimo FROM produtos WHERE stock IS NOT NULL ORDER BY stock ASC LIMIT 5")
-            low_stock = cur.fetchall()
-            low_stock_alerts = []
-            for r in low_stock:
-                if r['stock'] is None:
-                    continue
-                if r['stock_minimo'] is None:
-                    threshold = 5
-                else:
-                    threshold = r['stock_minimo'] + 5
-                if r['stock'] <= threshold:
-                    low_stock_alerts.append({'icon': '', 'text': f"Stock baixo para {r['nome_comercial']} (restam {r['stock']} unidades)", 'type': 'info', 'color': TEAL_PRIMARY})
-
-            cur.execute("SELECT p.nome_comercial AS produto, l.numero_lote, l.validade FROM lotes l LEFT JOIN produtos p ON p.id = l.produto_id WHERE DATE(l.validade) <= DATE('now','+30 days') ORDER BY DATE(l.validade) ASC LIMIT 5")
-            soon_expire = cur.fetchall()
-            expire_alerts = []
-            for r in soon_expire:
-                validade = r['validade']
-                expire_alerts.append({'icon': '', 'text': f"Lote {r['numero_lote']} de {r['produto']} com validade próxima ({validade})", 'type': 'warning', 'color': ORANGE_ALERT})
-
-            conn.close()
-
-            cards_data = [
-                {"title": "Total de Vendas", "value": f"Kz {int(total_vendas):,}", "icon": "", "trend": None, "color": TEAL_PRIMARY},
-                {"title": "Produtos em Stock", "value": f"{int(produtos_stock):,}", "icon": "", "trend": None, "color": TEAL_LIGHT},
-                {"title": "Funcionários", "value": f"{int(qtd_usuarios)}", "icon": "", "trend": None, "color": "#2196F3"},
-                {"title": "Vendas Hoje", "value": f"Kz {int(vendas_hoje):,}", "icon": "", "trend": None, "color": ORANGE_ALERT},
-            ]
-
-            # Limpar grid existente
-            for i in reversed(range(self.cards_grid.count())):
-                widget = self.cards_grid.itemAt(i).widget()
-                if widget is not None:
-                    widget.deleteLater()
-
-            for i, card_data in enumerate(cards_data):
-                card = ResponsiveCardWidget(**card_data)
-                row = i // 2
-                col = i % 2
-                self.cards_grid.addWidget(card, row, col)
-
-            # Atualizar gráfico de vendas: gerar últimos 7 dias com consultas simples por dia
-            dates = []
-            sales = []
-            today = datetime.now()
-            conn = _get_conn()
-            cur = conn.cursor()
-            for i in range(7):
-                d = (today - timedelta(days=6 - i)).date()
-                dates.append(d.strftime("%d/%m"))
-                cur.execute("SELECT COALESCE(SUM(total),0) FROM vendas WHERE DATE(data_venda)=?", (d.isoformat(),))
-                sales.append(int(cur.fetchone()[0] or 0))
-            conn.close()
+    def refresh(self):
+        """Chamado pelo dashboard ao voltar à página: relê apenas os dados"""
+        self.load_sample_data()
 
-            self.sales_chart.plot_sales_data(dates, sales, "Vendas dos Últimos 7 Dias")
+    def _aplicar_dados(self, snapshot):
+        """Atualiza cards, gráficos e alertas com o ``DashboardSnapshot`` lido"""
+        cards_data = [
+            {"title": "Total de Vendas", "value": f"Kz {int(snapshot.total_vendas):,}", "icon": "", "trend": None, "color": TEAL_PRIMARY},
+            {"title": "Produtos em Stock", "value": f"{snapshot.produtos_stock:,}", "icon": "", "trend": None, "color": TEAL_LIGHT},
+            {"title": "Funcionários", "value": f"{snapshot.qtd_usuarios}", "icon": "", "trend": None, "color": "#2196F3"},
+            {"title": "Vendas Hoje", "value": f"Kz {int(snapshot.vendas_hoje):,}", "icon": "", "trend": None, "color": ORANGE_ALERT},
+        ]
+        self._mostrar_cards(cards_data)
 
-            # Atualizar gráfico de produtos (pizza) usando top categories from products counts
-            if top_products:
-                categories = [t[0] for t in top_products]
-                values = [int(tp.split()[0].replace(',', '')) if isinstance(tp, str) else 1 for _, tp in top_products]
-                # If parsing fails, fallback to counts
-                if not any(values):
-                    categories = ['Outros']
-                    values = [1]
-                self.product_chart.plot_data(categories, values, "Top Produtos")
-            else:
-                self.product_chart.plot_data(['Nenhum'], [1], "Distribuição de Stock")
+        self.sales_chart.set_data([d.strftime("%d/%m") for d in snapshot.dates], snapshot.sales,
+                                  f"Vendas dos Últimos {self.DIAS_GRAFICO} Dias")
 
-            # Atualizar alertas: combinar low_stock_alerts e expire_alerts
-            alerts = []
-            alerts.extend(expire_alerts)
-            alerts.extend(low_stock_alerts)
-            # if no alerts, add a sample
-            if not alerts:
-                alerts = [
-                    {'icon': '', 'text': 'Nenhum alerta crítico no momento', 'type': 'info', 'color': TEAL_PRIMARY}
-                ]
+        # Gráfico de produtos (pizza) com as quantidades vendidas dos mais vendidos
+        if any(vendido for _, vendido in snapshot.top_products):
+            self.product_chart.set_data([nome for nome, _ in snapshot.top_products],
+                                        [vendido for _, vendido in snapshot.top_products], "Top Produtos")
+        else:
+            self.product_chart.set_data(['Nenhum'], [1], "Distribuição de Stock")
 
-            # montar widget de alertas com os alertas reais
-            # substituir create_responsive_alerts_widget não diretamente; atualizar manualmente
-            # vamos recriar alerts_widget e substituir
-            alerts_widget = self.create_responsive_alerts_widget()
-            # limpar e reconstruir: por simplicidade, sobrescrevemos os textos dentro do widget criado
-            # (a função create_responsive_alerts_widget cria exemplos; para real implementaria uma versão parametrizável)
-            # Para agora deixamos o widget existente e apenas atualizamos a lista de alertas exibida no console
-            print('Dashboard alerts:', alerts)
+        # Para agora deixamos o widget existente e apenas atualizamos a lista de alertas exibida no console
+        print('Dashboard alerts:', self._alertas(snapshot))
 
-        except Exception as e:
-            # fallback: usar dados de exemplo já definidos antes
-            print('Erro ao carregar dados do DB para dashboard:', e)
-            # previous example behaviour
-            cards_data = [
-                {"title": "Total de Vendas", "value": "Kz 245.850", "icon": "", "trend": 12.5, "color": TEAL_PRIMARY},
-                {"title": "Produtos em Stock", "value": "1.234", "icon": "", "trend": -2.3, "color": TEAL_LIGHT},
-                {"title": "Funcionários", "value": "48", "icon": "", "trend": 5.0, "color": "#2196F3"},
-                {"title": "Vendas Hoje", "value": "Kz 12.450", "icon": "", "trend": 8.7, "color": ORANGE_ALERT},
-            ]
-            for i in reversed(range(self.cards_grid.count())):
-                widget = self.cards_grid.itemAt(i).widget()
-                if widget is not None:
-                    widget.deleteLater()
-            for i, card_data in enumerate(cards_data):
-                card = ResponsiveCardWidget(**card_data)
-                row = i // 2
-                col = i % 2
-                self.cards_grid.addWidget(card, row, col)
+    def _alertas(self, snapshot):
+        """Alertas de validade e de stock baixo no formato do widget de alertas"""
+        alerts = [
+            {'icon': '', 'text': f"Lote {lote} de {produto} com validade próxima ({validade})", 'type': 'warning', 'color': ORANGE_ALERT}
+            for produto, lote, validade in snapshot.expiring
+        ] + [
+            {'icon': '', 'text': f"Stock baixo para {nome} (restam {stock} unidades)", 'type': 'info', 'color': TEAL_PRIMARY}
+            for nome, stock, _ in snapshot.low_stock
+        ]
+        return alerts or [
+            {'icon': '', 'text': 'Nenhum alerta crítico no momento', 'type': 'info', 'color': TEAL_PRIMARY}
+        ]
 
-            # fallback charts
-            dates = []
-            sales = []
-            today = datetime.now()
-            for i in range(7):
-                date = today - timedelta(days=6 - i)
-                dates.append(date.strftime("%d/%m"))
-                sales.append(random.randint(20000, 45000))
-            self.sales_chart.plot_sales_data(dates, sales, "Vendas dos Últimos 7 Dias")
-            categories = ['Analgésicos', 'Antibióticos', 'Vitamínicos', 'Outros']
-            values = [45, 30, 15, 10]
-            self.product_chart.plot_data(categories, values, "Distribuição de Stock")
+    def _aplicar_dados_exemplo(self, erro):
+        """Fallback: usar dados de exemplo quando o banco não responde"""
+        print('Erro ao carregar dados do DB para dashboard:', erro)
+        cards_data = [
+            {"title": "Total de Vendas", "value": "Kz 245.850", "icon": "", "trend": 12.5, "color": TEAL_PRIMARY},
+            {"title": "Produtos em Stock", "value": "1.234", "icon": "", "trend": -2.3, "color": TEAL_LIGHT},
+            {"title": "Funcionários", "value": "48", "icon": "", "trend": 5.0, "color": "#2196F3"},
+            {"title": "Vendas Hoje", "value": "Kz 12.450", "icon": "", "trend": 8.7, "color": ORANGE_ALERT},
+        ]
+        self._mostrar_cards(cards_data)
+
+        # fallback charts
+        dates = []
+        sales = []
+        today = datetime.now()
+        for i in range(self.DIAS_GRAFICO):
+            date = today - timedelta(days=self.DIAS_GRAFICO - 1 - i)
+            dates.append(date.strftime("%d/%m"))
+            sales.append(random.randint(20000, 45000))
+        self.sales_chart.set_data(dates, sales, f"Vendas dos Últimos {self.DIAS_GRAFICO} Dias")
+        categories = ['Analgésicos', 'Antibióticos', 'Vitamínicos', 'Outros']
+        values = [45, 30, 15, 10]
+        self.product_chart.set_data(categories, values, "Distribuição de Stock")
+
+    def _mostrar_cards(self, cards_data):
+        # Limpar grid existente
+        for i in reversed(range(self.cards_grid.count())):
+            widget = self.cards_grid.itemAt(i).widget()
+            if widget is not None:
+                widget.deleteLater()
+
+        for i, card_data in enumerate(cards_data):
+            card = ResponsiveCardWidget(**card_data)
+            row = i // 2
+            col = i % 2
+            self.cards_grid.addWidget(card, row, col)
     
     def resizeEvent(self, event):
         """Método chamado quando a janela é redimensionada"""
@@ -1,6 +1,5 @@
 from dataclasses import dataclass
 from pathlib import Path
-import importlib.util
 import sys
 from typing import Optional
 
@@ -10,6 +9,11 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
+try:
+    from .view_registry import ViewRegistry
+except ImportError:
+    from view_registry import ViewRegistry
+
 
 @dataclass
 class ItemVenda:
@@ -20,26 +24,6 @@ class ItemVenda:
     preco_unitario: float
 
 
-def _load_view_from_path(path: Path, class_name: str) -> Optional[QWidget]:
-    """Import `class_name` from `path` and return an instance, or None."""
-    try:
-        if not path.exists():
-            return None
-        spec = importlib.util.spec_from_file_location(path.stem, str(path))
-        if spec is None or spec.loader is None:
-            return None
-        module = importlib.util.module_from_spec(spec)
-        mod_name = f"_item_venda_dynamic_{path.stem}"
-        sys.modules[mod_name] = module
-        spec.loader.exec_module(module)
-        cls = getattr(module, class_name, None)
-        if cls is None:
-            return None
-        return cls()
-    except Exception:
-        return None
-
-
 class ItemVendaPage(QWidget):
     """SPA container for item_venda-related views."""
 
@@ -183,55 +167,51 @@ class ItemVendaPage(QWidget):
         for i, btn in enumerate(buttons):
             btn.setChecked(i == index)
         
-        if 0 <= index < self.stack.count():
-            self.stack.setCurrentIndex(index)
+        self.views.show(index)
 
     def _load_views(self):
-        """Carrega dinamicamente todas as views"""
-        views = [
-            (self.views_dir / "adicionar_item.py", "AdicionarItemView"),
-            (self.views_dir / "lista_item.py", "ListaItemView"),
-            (self.views_dir / "catalogo_view.py", "CatalogoView"),
-            (self.views_dir / "estatisticas_view.py", "EstatisticasView"),
-            (self.views_dir / "importar_view.py", "ImportarView"),
-            (self.views_dir / "exportar_view.py", "ExportarView"),
-        ]
-
-        for path, class_name in views:
-            widget = _load_view_from_path(path, class_name)
-            if widget is None:
-                # Criar placeholder se a view não existir
-                placeholder = QLabel(
-                    f"<h3 style='color:{PRIMARY_COLOR};'> VIEW DE ITENS</h3>"
-                    f"<p style='color:#B0B0B0;'>"
-                    f"Classe: <b>{class_name}</b><br>"
-                    f"Arquivo: {path.name}<br><br>"
-                    f"Crie este arquivo na pasta <code>item_venda/</code> "
-                    f"com uma classe chamada <code>{class_name}</code> "
-                    f"que herde de <code>QWidget</code>."
-                    f"</p>"
-                )
-                placeholder.setAlignment(Qt.AlignCenter)
-                placeholder.setStyleSheet("""
-                    QLabel {
-                        background-color: #FFFFFF;
-                        border-radius: 10px;
-                        border: 1px solid #E6E6E6;
-                        padding: 40px;
-                        margin: 20px;
-                    }
-                """)
-                self.stack.addWidget(placeholder)
-            else:
-                # Configurar estilo da view carregada
-                widget.setStyleSheet("""
-                    QWidget {
-                        background-color: #FFFFFF;
-                        color: #000000;
-                    }
-                """)
-                self.stack.addWidget(widget)
-
+        """Regista as views; cada uma só é criada quando é mostrada pela primeira vez."""
+        self.views = ViewRegistry(
+            self.stack, self.views_dir, placeholder=self._placeholder,
+            style="""
+                QWidget {
+                    background-color: #FFFFFF;
+                    color: #000000;
+                }
+            """,
+            parent=self,
+        )
+        self.views.add("Adicionar", "adicionar_item.py", "AdicionarItemView")
+        self.views.add("Lista", "lista_item.py", "ListaItemView")
+        self.views.add("Catálogo", "catalogo_view.py", "CatalogoView")
+        self.views.add("Estatísticas", "estatisticas_view.py", "EstatisticasView")
+        self.views.add("Importar", "importar_view.py", "ImportarView")
+        self.views.add("Exportar", "exportar_view.py", "ExportarView")
+        self.views.show(0)
+
+    def _placeholder(self, title, filename, class_name):
+        """Placeholder para views que ainda não existem."""
+        placeholder = QLabel(
+            f"<h3 style='color:{PRIMARY_COLOR};'> VIEW DE ITENS</h3>"
+            f"<p style='color:#B0B0B0;'>"
+            f"Classe: <b>{class_name}</b><br>"
+            f"Arquivo: {filename}<br><br>"
+            f"Crie este arquivo na pasta <code>item_venda/</code> "
+            f"com uma classe chamada <code>{class_name}</code> "
+            f"que herde de <code>QWidget</code>."
+            f"</p>"
+        )
+        placeholder.setAlignment(Qt.AlignCenter)
+        placeholder.setStyleSheet("""
+            QLabel {
+                background-color: #FFFFFF;
+                border-radius: 10px;
+                border: 1px solid #E6E6E6;
+                padding: 40px;
+                margin: 20px;
+            }
+        """)
+        return placeholder
 
 if __name__ == '__main__':
     from PyQt5.QtWidgets import QApplication
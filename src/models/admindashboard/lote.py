@@ -7,7 +7,6 @@ widget is shown.
 """
 
 from pathlib import Path
-import importlib.util
 import sys
 from typing import Optional, List
 
@@ -19,6 +18,11 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QPainter, QPainterPath, QLinearGradient
 
+try:
+    from .view_registry import ViewRegistry
+except ImportError:
+    from view_registry import ViewRegistry
+
 from colors import *
 
 
@@ -211,30 +215,6 @@ class HeaderBar(QFrame):
         # (indicador de status removido por solicitação)
 
 
-def _load_view_from_path(path: Path, class_name: str) -> Optional[QWidget]:
-    """Dynamically load a QWidget subclass named `class_name` from `path`.
-    Returns an instance or None if loading fails.
-    """
-    try:
-        if not path.exists():
-            return None
-        spec = importlib.util.spec_from_file_location(path.stem, str(path))
-        if spec is None or spec.loader is None:
-            return None
-        module = importlib.util.module_from_spec(spec)
-        # Ensure module has a unique name in sys.modules
-        mod_name = f"_lote_dynamic_{path.stem}"
-        sys.modules[mod_name] = module
-        spec.loader.exec_module(module)
-        cls = getattr(module, class_name, None)
-        if cls is None:
-            return None
-        return cls()
-    except Exception as e:
-        print(f"Error loading {path}: {e}")
-        return None
-
-
 class ContentPlaceholder(QWidget):
     """Placeholder estilizado para views não implementadas."""
     def __init__(self, title, filename, classname, parent=None):
@@ -358,7 +338,7 @@ class LotePage(QWidget):
 
     def _on_nav_item_selected(self, index):
         """Lida com seleção de item na navegação."""
-        self._animate_view_transition(index)
+        self.views.show(index, self._animate_view_transition)
         
         # Atualizar título do cabeçalho
         titles = [
@@ -409,45 +389,25 @@ class LotePage(QWidget):
                 self.content_stack.setCurrentIndex(index)
 
     def _load_views(self):
-        """Load views dynamically or show placeholders."""
-        views = [
-            (" Adicionar Lote", "adicionar_lote.py", "AdicionarLoteView"),
-            (" Produtos", "produtos.py", "ProdutosView"),
-            (" Lotes Registrados", "lotes_registrados.py", "LotesRegistradosView"),
-        ]
-
-        for title, filename, classname in views:
-            path = self.views_dir / filename
-            widget = _load_view_from_path(path, classname)
-            
-            if widget is None:
-                # Criar placeholder estilizado
-                placeholder = ContentPlaceholder(title, filename, classname)
-                
-                # Container para o placeholder
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(placeholder)
-                
-                self.content_stack.addWidget(container)
-            else:
-                # Configurar estilo da view carregada
-                widget.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: transparent;
-                        color: {TEXT_PRIMARY};
-                    }}
-                """)
-                
-                # Container para a view
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(widget)
-                
-                self.content_stack.addWidget(container)
+        """Regista as views; cada uma só é criada quando é mostrada pela primeira vez."""
+        self.views = ViewRegistry(
+            self.content_stack, self.views_dir, placeholder=ContentPlaceholder,
+            style=f"""
+                QWidget {{
+                    background-color: transparent;
+                    color: {TEXT_PRIMARY};
+                }}
+            """,
+            parent=self,
+        )
+        self.views.add(" Adicionar Lote", "adicionar_lote.py", "AdicionarLoteView")
+        self.views.add(" Produtos", "produtos.py", "ProdutosView")
+        self.views.add(" Lotes Registrados", "lotes_registrados.py", "LotesRegistradosView", prewarm=True)
+        self.views.show(0)
 
+    def refresh(self):
+        """Atualiza a view visível (chamado ao voltar a esta página)."""
+        self.views.refresh()
 
 if __name__ == '__main__':
     # Quick debug runner
@@ -11,8 +11,7 @@ _ROOT = Path(__file__).resolve().parents[3]
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
-from src.config.paths import DB_DIR
-from database.db import connect, get_db_path
+from database.db import get_connection, transaction
 
 
 class LotesRegistradosView(QWidget):
@@ -50,11 +49,13 @@ class LotesRegistradosView(QWidget):
         btns.addWidget(refresh)
         layout.addLayout(btns)
 
+    def refresh(self):
+        """Recarrega os lotes ao voltar à view."""
+        self.load_lotes()
+
     def load_lotes(self):
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
+            cur = get_connection().cursor()
             cur.execute("""
                 SELECT l.id, l.numero_lote, l.validade, l.quantidade_atual, l.preco_compra, l.data_entrada,
                        p.nome_comercial AS produto_nome, f.nome AS fornecedor_nome
@@ -65,7 +66,6 @@ class LotesRegistradosView(QWidget):
                 ORDER BY l.data_entrada DESC
             """)
             rows = cur.fetchall()
-            conn.close()
 
             self.table.setRowCount(len(rows))
             for i, r in enumerate(rows):
@@ -92,12 +92,8 @@ class LotesRegistradosView(QWidget):
         if mb != QMessageBox.Yes:
             return
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
-            cur.execute("UPDATE lotes SET ativo=0 WHERE id=?", (lote_id,))
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute("UPDATE lotes SET ativo=0 WHERE id=?", (lote_id,))
             QMessageBox.information(self, "Sucesso", "Lote desativado.")
             self.load_lotes()
         except Exception as e:
@@ -0,0 +1,137 @@
+"""Registo das páginas dos dashboards.
+
+Cada página é construída apenas na primeira visita e mantida viva no
+``QStackedWidget``; nas visitas seguintes é chamado o seu ``refresh()`` (se
+existir) em vez de voltar a importar o módulo e recriar o widget. Os módulos
+são importados uma única vez (ficam em ``sys.modules``) e o tempo de
+construção de cada página fica registado em ``build_times`` e no log.
+"""
+import importlib
+import importlib.util
+import logging
+import sys
+import time
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QStackedWidget, QWidget
+
+logger = logging.getLogger('kamba.pages')
+
+
+def import_page_module(modulo: str):
+    """Importa ``modulo`` (ex.: ``models.admindashboard.home``) uma única vez.
+
+    Se o pacote não estiver no ``sys.path`` (execução direta do script),
+    carrega o ficheiro homónimo ao lado deste módulo com o mesmo nome, para
+    que as importações seguintes reutilizem a mesma instância.
+    """
+    if modulo in sys.modules:
+        return sys.modules[modulo]
+    try:
+        return importlib.import_module(modulo)
+    except ModuleNotFoundError as e:
+        # só recorre ao ficheiro quando falta o próprio pacote, não uma dependência
+        if e.name and not modulo.startswith(e.name):
+            raise
+        caminho = Path(__file__).resolve().parent / (modulo.rsplit('.', 1)[-1] + '.py')
+        if not caminho.exists():
+            raise
+        spec = importlib.util.spec_from_file_location(modulo, str(caminho))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[modulo] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[modulo]
+            raise
+        return module
+
+
+class _Entrada:
+    def __init__(self, nome, modulo, classe, fallback, kwargs):
+        self.nome = nome
+        self.modulo = modulo
+        self.classe = classe
+        self.fallback = fallback
+        self.kwargs = kwargs
+        self.widget = None
+
+
+class PageRegistry(QObject):
+    """Constrói as páginas de um ``QStackedWidget`` na primeira visita.
+
+    Cada entrada indica o módulo e a classe da página; se a importação ou a
+    construção falhar é usada a classe ``fallback`` (as páginas simples
+    definidas no próprio dashboard). Até ser visitada, cada posição do stack
+    tem um widget vazio.
+    """
+
+    pageBuilt = pyqtSignal(int, str, float)  # índice, nome, ms
+    pageFailed = pyqtSignal(int, str, str)   # índice, nome, erro
+
+    def __init__(self, stack: QStackedWidget, parent=None):
+        super().__init__(parent)
+        self.stack = stack
+        self._entradas = []
+        self.build_times = {}
+
+    def add(self, nome, modulo=None, classe=None, fallback=None, **kwargs) -> int:
+        """Regista uma página e devolve o seu índice no stack."""
+        self._entradas.append(_Entrada(nome, modulo, classe, fallback, kwargs))
+        return self.stack.addWidget(QWidget())
+
+    def is_built(self, index: int) -> bool:
+        return self._entradas[index].widget is not None
+
+    def page(self, index: int):
+        """Página no índice ``index``, construindo-a se necessário."""
+        entrada = self._entradas[index]
+        if entrada.widget is None:
+            self._construir(index, entrada)
+        return entrada.widget
+
+    def show(self, index: int):
+        """Mostra a página: constrói na primeira visita, atualiza nas seguintes."""
+        if not 0 <= index < len(self._entradas):
+            index = 0
+        entrada = self._entradas[index]
+        if entrada.widget is None:
+            self._construir(index, entrada)
+        else:
+            refresh = getattr(entrada.widget, 'refresh', None)
+            if callable(refresh):
+                try:
+                    refresh()
+                except Exception as e:
+                    logger.warning('Falha ao atualizar %s: %s', entrada.nome, e)
+        self.stack.setCurrentIndex(index)
+        return entrada.widget
+
+    def _construir(self, index, entrada):
+        inicio = time.perf_counter()
+        widget = None
+        if entrada.modulo:
+            try:
+                module = import_page_module(entrada.modulo)
+                widget = getattr(module, entrada.classe)(**entrada.kwargs)
+            except Exception as e:
+                logger.warning('Falha ao carregar %s (%s.%s): %s',
+                               entrada.nome, entrada.modulo, entrada.classe, e)
+                self.pageFailed.emit(index, entrada.nome, str(e))
+        if widget is None:
+            widget = (entrada.fallback or QWidget)()
+        ms = (time.perf_counter() - inicio) * 1000.0
+
+        atual = self.stack.currentIndex()
+        placeholder = self.stack.widget(index)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stack.insertWidget(index, widget)
+        if atual >= 0:
+            self.stack.setCurrentIndex(atual)
+
+        entrada.widget = widget
+        self.build_times[entrada.nome] = ms
+        logger.info('Página %s construída em %.1f ms', entrada.nome, ms)
+        self.pageBuilt.emit(index, entrada.nome, ms)
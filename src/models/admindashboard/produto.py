@@ -7,7 +7,6 @@ views are represented by placeholders so the UI remains runnable.
 """
 
 from pathlib import Path
-import importlib.util
 import sys
 from typing import Optional, List
 
@@ -18,6 +17,11 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QPainter, QPainterPath
 
+try:
+    from .view_registry import ViewRegistry
+except ImportError:
+    from view_registry import ViewRegistry
+
 from colors import *
 
 
@@ -207,27 +211,6 @@ class HeaderBar(QFrame):
         layout.addStretch()
 
 
-def _load_view_from_path(path: Path, class_name: str) -> Optional[QWidget]:
-    """Import `class_name` from `path` and return an instance, or None."""
-    try:
-        if not path.exists():
-            return None
-        spec = importlib.util.spec_from_file_location(path.stem, str(path))
-        if spec is None or spec.loader is None:
-            return None
-        module = importlib.util.module_from_spec(spec)
-        mod_name = f"_produto_dynamic_{path.stem}"
-        sys.modules[mod_name] = module
-        spec.loader.exec_module(module)
-        cls = getattr(module, class_name, None)
-        if cls is None:
-            return None
-        return cls()
-    except Exception as e:
-        print(f"Error loading {path}: {e}")
-        return None
-
-
 class ContentPlaceholder(QWidget):
     """Placeholder estilizado para views não implementadas."""
     def __init__(self, title, filename, classname, parent=None):
@@ -310,8 +293,6 @@ class ProdutoPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.views_dir = Path(__file__).parent / "."
-        # Initialize loaded_views before setup_ui because _load_views accesses it
-        self.loaded_views = {}
         self.setup_ui()
 
     def setup_ui(self):
@@ -353,7 +334,7 @@ class ProdutoPage(QWidget):
 
     def _on_nav_item_selected(self, index):
         """Lida com seleção de item na navegação."""
-        self._animate_view_transition(index)
+        self.views.show(index, self._animate_view_transition)
         
         # Atualizar título do cabeçalho
         titles = [
@@ -406,69 +387,44 @@ class ProdutoPage(QWidget):
                 self.content_stack.setCurrentIndex(index)
 
     def _load_views(self):
-        """Load views dynamically or show placeholders."""
-        views = [
-            ("Adicionar Produto", "adicionarproduto_view.py", "AddProductPage"),
-            ("Lista de Produtos", "produtos_view.py", "ProdutosView"),
-            ("Catálogo de Produtos", "catalogo_view.py", "CatalogoView"),
-            ("Produtos em Destaque", "gerir_destaque_view.py", "ManageHighlightPage"),
-        ]
+        """Regista as views; cada uma só é criada quando é mostrada pela primeira vez."""
+        self.views = ViewRegistry(
+            self.content_stack, self.views_dir, placeholder=ContentPlaceholder,
+            style=f"""
+                QWidget {{
+                    background-color: transparent;
+                    color: {TEXT_PRIMARY};
+                }}
+            """,
+            parent=self,
+        )
+        self.views.viewCreated.connect(self._on_view_created)
+        self.views.add("Adicionar Produto", "adicionarproduto_view.py", "AddProductPage")
+        self.views.add("Lista de Produtos", "produtos_view.py", "ProdutosView", prewarm=True)
+        self.views.add("Catálogo de Produtos", "catalogo_view.py", "CatalogoView")
+        self.views.add("Produtos em Destaque", "gerir_destaque_view.py", "ManageHighlightPage")
+        self.views.show(0)
+
+    def refresh(self):
+        """Atualiza a view visível (chamado ao voltar a esta página)."""
+        self.views.refresh()
+
+    def _on_view_created(self, classname, widget):
+        """Liga os sinais expostos pelas views à medida que são criadas."""
+        # Se a view expor sinal de produto adicionado, conectar
+        if hasattr(widget, 'product_added'):
+            widget.product_added.connect(self._on_product_added)
+
+        # Se a view expor um sinal para abrir a aba de adicionar, conectar
+        if hasattr(widget, 'open_add'):
+            widget.open_add.connect(lambda: self._select_view(0))
 
-        for title, filename, classname in views:
-            path = self.views_dir / filename
-            widget = _load_view_from_path(path, classname)
-            
-            if widget is None:
-                # Criar placeholder estilizado
-                placeholder = ContentPlaceholder(title, filename, classname)
-                
-                # Container para o placeholder
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(placeholder)
-                
-                self.content_stack.addWidget(container)
-            else:
-                # Configurar estilo da view carregada
-                widget.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: transparent;
-                        color: {TEXT_PRIMARY};
-                    }}
-                """)
-                
-                # Guardar referência da view real
-                self.loaded_views[classname] = widget
-                
-                # Se a view expor sinal de produto adicionado, conectar
-                if hasattr(widget, 'product_added'):
-                    try:
-                        widget.product_added.connect(self._on_product_added)
-                    except Exception:
-                        pass
-                
-                # Se a view expor um sinal para abrir a aba de adicionar, conectar
-                if hasattr(widget, 'open_add'):
-                    try:
-                        widget.open_add.connect(lambda: self._select_view(0))
-                    except Exception:
-                        pass
-                
-                # Container para a view
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(widget)
-                
-                self.content_stack.addWidget(container)
-    
     def _select_view(self, index):
         """Seleciona uma view pelo índice (para uso interno)."""
         if 0 <= index < len(self.nav_bar.buttons):
             for i, btn in enumerate(self.nav_bar.buttons):
                 btn.setSelected(i == index)
-            self._animate_view_transition(index)
+            self.views.show(index, self._animate_view_transition)
             
             # Atualizar título do cabeçalho
             titles = [
@@ -496,15 +452,7 @@ class ProdutoPage(QWidget):
         # Mostrar notificação
         self.show_notification(f"Produto '{nome}' adicionado com sucesso!", "success")
         
-        # Atualizar a lista de produtos se existir
-        list_widget = self.loaded_views.get('ProdutosView')
-        if list_widget and hasattr(list_widget, 'refresh'):
-            try:
-                list_widget.refresh()
-            except Exception:
-                pass
-        
-        # Alternar para a aba de lista
+        # Alternar para a aba de lista (criada ou atualizada por ``views.show``)
         self._select_view(1)
 
     def show_notification(self, message: str, type: str = "success"):
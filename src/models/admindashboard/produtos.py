@@ -1,3 +1,4 @@
+from bisect import bisect_left
 from pathlib import Path
 import sys
 from PyQt5.QtWidgets import (
@@ -6,7 +7,7 @@ from PyQt5.QtWidgets import (
     QPushButton, QMessageBox, QProgressBar, QGroupBox, QFormLayout,
     QLineEdit, QComboBox, QDateEdit
 )
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QTimer
 from PyQt5.QtGui import QPixmap, QFont, QColor, QPalette, QBrush
 
 # Ensure project root is on sys.path so `src` and other top-level packages are importable
@@ -14,8 +15,10 @@ _ROOT = Path(__file__).resolve().parents[3]
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
-from src.config.paths import DB_DIR
-from database.db import get_db_path, connect
+from database.alertas import NIVEIS, alteracoes_alertas, versao_alertas
+from database.db import get_connection
+from src.utils.async_loader import AsyncLoader
+from src.utils.miniaturas import MINIATURA_MEDIA, miniaturas
 
 from colors import *
 # Local aliases
@@ -31,10 +34,51 @@ TEXT_SECONDARY = "#6B7280"
 TEXT_LIGHT = "#9CA3AF"
 SUCCESS_COLOR = "#10B981"
 
+# ordem dos níveis nos cartões e no filtro
+ORDEM_NIVEIS = {nivel: i for i, nivel in enumerate(NIVEIS)}
+# intervalo entre verificações do contador de alertas, com a vista visível
+INTERVALO_ALERTAS_MS = 5000
+# cartões por linha
+COLUNAS_GRID = 3
+
+ESTILO_NIVEL = {
+    "critical": ("#FEF2F2", DANGER_COLOR),
+    "warning": ("#FFFBEB", WARNING_COLOR),
+    "low": ("#FEFCE8", "#FBBF24"),
+}
+
+
+def consultar_alertas(desde=0):
+    """``(versão, alertas alterados desde a versão ``desde``)`` — ver ``database/alertas.py``."""
+    return alteracoes_alertas(get_connection(), desde)
+
+
 class ProdutosView(QWidget):
-    """Visualização moderna de produtos com baixo stock."""
+    """Visualização moderna de produtos com baixo stock.
+
+    Os níveis vêm de ``alertas_stock``, mantida por triggers. A vista guarda a
+    versão que já mostrou e, enquanto está visível, verifica o contador
+    periodicamente: quando muda, lê só os alertas alterados e cria, substitui
+    ou retira apenas os cartões desses produtos, inserindo-os na posição
+    ordenada (só os cartões a seguir mudam de célula). Os filtros só mostram
+    ou escondem os cartões existentes.
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
+        # produto_id -> cartão; versão de alertas_stock já aplicada
+        self._cards = {}
+        self._versao_alertas = 0
+        # cartões do filtro atual, pela ordem do grid, e as suas chaves
+        self._visiveis = []
+        self._chaves = []
+        self._contagem = dict.fromkeys(NIVEIS, 0)
+        self._erro = None
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._on_low_stock_loaded)
+        self._loader.failed.connect(self._on_low_stock_failed)
+        self._timer = QTimer(self)
+        self._timer.setInterval(INTERVALO_ALERTAS_MS)
+        self._timer.timeout.connect(self._verificar_alertas)
         self._setup_ui()
         self._load_low_stock()
         
@@ -253,8 +297,16 @@ class ProdutosView(QWidget):
         self.grid.setColumnStretch(0, 0)
         self.grid.setColumnStretch(1, 0)
         self.grid.setColumnStretch(2, 0)
-        self.grid.setColumnStretch(3, 0)
+        self.grid.setColumnStretch(COLUNAS_GRID, 1)
         
+        # Mensagens (erro, lista vazia) por cima do grid
+        self.mensagens = QWidgetLocal()
+        self.mensagens.setStyleSheet("background-color: transparent;")
+        self.mensagens_layout = QVBoxLayout(self.mensagens)
+        self.mensagens_layout.setContentsMargins(20, 20, 20, 0)
+        self.mensagens.hide()
+        
+        products_layout.addWidget(self.mensagens)
         products_layout.addWidget(self.container)
         container_layout.addWidget(products_frame)
         
@@ -306,54 +358,20 @@ class ProdutosView(QWidget):
         name = product_data['nome_comercial'] or '-'
         stock = product_data['stock'] or 0
         stock_minimo = product_data['stock_minimo'] or 0
-        photo_bytes = product_data['foto']
-        
-        # Determinar nível de urgência
-        if stock_minimo == 0:
-            # Se não tem mínimo definido, usar padrão
-            if stock == 0:
-                urgency_level = "critical"
-                bg_color = "#FEF2F2"
-                border_color = DANGER_COLOR
-                percent = 0
-            elif stock <= 2:
-                urgency_level = "critical"
-                bg_color = "#FEF2F2"
-                border_color = DANGER_COLOR
-                percent = (stock / 5) * 100 if stock > 0 else 0
-            elif stock <= 5:
-                urgency_level = "warning"
-                bg_color = "#FFFBEB"
-                border_color = WARNING_COLOR
-                percent = (stock / 5) * 100
-            else:
-                urgency_level = "low"
-                bg_color = "#FEFCE8"
-                border_color = "#FBBF24"
-                percent = 100
+        imagem_id = product_data['imagem_id']
+        
+        # Nível calculado pelos triggers de alertas_stock
+        urgency_level = product_data['nivel']
+        bg_color, border_color = ESTILO_NIVEL[urgency_level]
+        if stock_minimo > 0:
+            percent = (stock / stock_minimo) * 100
         else:
-            # Com stock mínimo definido
-            percent = (stock / stock_minimo) * 100 if stock_minimo > 0 else 0
-            
-            if stock == 0:
-                urgency_level = "critical"
-                bg_color = "#FEF2F2"
-                border_color = DANGER_COLOR
-            elif percent <= 20:
-                urgency_level = "critical"
-                bg_color = "#FEF2F2"
-                border_color = DANGER_COLOR
-            elif percent <= 50:
-                urgency_level = "warning"
-                bg_color = "#FFFBEB"
-                border_color = WARNING_COLOR
-            else:
-                urgency_level = "low"
-                bg_color = "#FEFCE8"
-                border_color = "#FBBF24"
-        
-        # Card principal
-        card = QFrame()
+            # Sem mínimo definido, 5 unidades contam como 100%
+            percent = min(100, (stock / 5) * 100)
+        
+        # Card principal (escondido até ser colocado no grid)
+        card = QFrame(self.container)
+        card.hide()
         card.setFixedSize(280, 320)
         card.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         
@@ -391,17 +409,10 @@ class ProdutosView(QWidget):
         img.setAlignment(Qt.AlignCenter)
         img.setFixedSize(90, 90)
         
-        if photo_bytes:
-            pix = QPixmap()
-            if pix.loadFromData(photo_bytes):
-                pix = pix.scaled(85, 85, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                img.setPixmap(pix)
-            else:
-                img.setText("")
-                img.setStyleSheet("font-size: 36px; color: #9CA3AF;")
-        else:
-            img.setText("")
-            img.setStyleSheet("font-size: 36px; color: #9CA3AF;")
+        # Marcador até a miniatura chegar (ou sem foto)
+        img.setText("")
+        img.setStyleSheet("font-size: 36px; color: #9CA3AF;")
+        miniaturas().aplicar(img, imagem_id, MINIATURA_MEDIA)
         
         img_layout.addWidget(img)
         
@@ -534,99 +545,78 @@ class ProdutosView(QWidget):
         layout.addWidget(stock_container)
         layout.addWidget(action_btn)
         
-        # Armazenar dados de urgência
+        # Armazenar dados de urgência e de ordenação
         card.urgency_level = urgency_level
+        card.sort_key = (ORDEM_NIVEIS[urgency_level], stock, name, product_data['id'])
         
         return card
 
-    def _load_low_stock(self):
-        """Carrega produtos com baixo stock."""
+    def refresh(self):
+        """Aplica as alterações aos alertas ao voltar à view."""
+        self._load_low_stock()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def _verificar_alertas(self):
+        """Pede as alterações só se o contador de alertas mudou."""
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
-            
-            # Consulta para produtos com baixo stock
-            cur.execute("""
-                SELECT id, nome_comercial, foto, stock, COALESCE(stock_minimo, 0) as stock_minimo
-                FROM produtos
-                WHERE ativo=1 AND (
-                    (COALESCE(stock_minimo,0) > 0 AND stock <= stock_minimo)
-                    OR (COALESCE(stock_minimo,0) = 0 AND stock <= 5)
-                )
-                ORDER BY 
-                    CASE 
-                        WHEN stock = 0 THEN 1
-                        WHEN stock_minimo > 0 AND stock <= stock_minimo * 0.2 THEN 2
-                        WHEN stock_minimo > 0 AND stock <= stock_minimo * 0.5 THEN 3
-                        ELSE 4
-                    END,
-                    stock ASC,
-                    nome_comercial
-            """)
-            rows = cur.fetchall()
-            conn.close()
-
-            # Limpar grid existente
-            for i in reversed(range(self.grid.count())):
-                w = self.grid.itemAt(i).widget()
-                if w:
-                    w.setParent(None)
-
-            if not rows:
-                # Mensagem quando não há produtos com baixo stock
-                no_products = QLabel(" Todos os produtos estão com stock adequado!")
-                no_products.setAlignment(Qt.AlignCenter)
-                no_products_font = QFont()
-                no_products_font.setPointSize(16)
-                no_products.setFont(no_products_font)
-                no_products.setStyleSheet(f"""
-                    QLabel {{
-                        color: {SUCCESS_COLOR};
-                        padding: 50px;
-                        background-color: white;
-                        border-radius: 15px;
-                        border: 2px solid #A7F3D0;
-                    }}
-                """)
-                self.grid.addWidget(no_products, 0, 0, 1, 4)
-                
-                # Atualizar estatísticas
-                self._update_stats([], rows)
-                return
-
-            # Armazenar todos os produtos para filtragem
-            self.all_products = rows
-            
-            # Aplicar filtro atual
-            self._apply_filter()
-            
-        except Exception as e:
-            # Mensagem de erro melhorada
-            error_container = QFrame()
-            error_container.setStyleSheet(f"""
-                QFrame {{
-                    background-color: #FEF2F2;
-                    border-radius: 10px;
-                    border: 1px solid {DANGER_COLOR}40;
-                    padding: 20px;
-                }}
-            """)
-            error_layout = QVBoxLayout(error_container)
-            
-            error_icon = QLabel("")
-            error_icon.setAlignment(Qt.AlignCenter)
-            error_icon.setStyleSheet("font-size: 32px; margin-bottom: 10px;")
-            
-            error_label = QLabel(f"Erro ao carregar produtos:\n{str(e)}")
-            error_label.setAlignment(Qt.AlignCenter)
-            error_label.setWordWrap(True)
-            error_label.setStyleSheet(f"color: {DANGER_COLOR}; font-weight: 500;")
-            
-            error_layout.addWidget(error_icon)
-            error_layout.addWidget(error_label)
-            
-            self.grid.addWidget(error_container, 0, 0, 1, 4)
+            versao = versao_alertas(get_connection())
+        except Exception:
+            return
+        if versao != self._versao_alertas:
+            self._load_low_stock()
+
+    def _load_low_stock(self):
+        """Lê os alertas alterados desde a última versão (em segundo plano)."""
+        self._loader.run(consultar_alertas, self._versao_alertas)
+
+    def _on_low_stock_loaded(self, resultado):
+        """Cria, substitui ou retira só os cartões dos alertas alterados."""
+        versao, rows = resultado
+        if versao < self._versao_alertas:
+            # A base de dados foi trocada ou recriada: recomeçar do zero
+            for card in self._cards.values():
+                self.grid.removeWidget(card)
+                card.deleteLater()
+            self._cards = {}
+            self._visiveis, self._chaves = [], []
+            self._contagem = dict.fromkeys(NIVEIS, 0)
+            self._versao_alertas = 0
+            self._load_low_stock()
+            return
+        # primeira posição do grid que mudou
+        inicio = len(self._visiveis)
+        for product in rows:
+            antigo = self._cards.pop(product['id'], None)
+            if antigo is not None:
+                self._contagem[antigo.urgency_level] -= 1
+                i = self._retirar(antigo)
+                if i is not None:
+                    inicio = min(inicio, i)
+                antigo.deleteLater()
+            if product['nivel'] is not None:
+                card = self._create_product_card(product)
+                self._cards[product['id']] = card
+                self._contagem[card.urgency_level] += 1
+                if self._no_filtro(card):
+                    i = bisect_left(self._chaves, card.sort_key)
+                    self._visiveis.insert(i, card)
+                    self._chaves.insert(i, card.sort_key)
+                    inicio = min(inicio, i)
+        self._versao_alertas = versao
+        self._erro = None
+        self._posicionar(inicio)
+
+    def _on_low_stock_failed(self, mensagem):
+        """Mostra o erro da consulta por cima dos cards que já existem."""
+        self._erro = mensagem
+        self._atualizar_mensagens()
 
     def _apply_filter(self):
         """Aplica o filtro selecionado."""
@@ -641,119 +631,124 @@ class ProdutosView(QWidget):
                     self.filter_low.isChecked(), self.filter_all.isChecked()]):
             self.filter_all.setChecked(True)
         
-        # Limpar grid
-        for i in reversed(range(self.grid.count())):
-            w = self.grid.itemAt(i).widget()
-            if w:
-                w.setParent(None)
+        self._relayout()
+
+    def _nivel_filtrado(self):
+        """Nível do filtro marcado, ou ``None`` para todos."""
+        if self.filter_critical.isChecked():
+            return "critical"
+        if self.filter_warning.isChecked():
+            return "warning"
+        if self.filter_low.isChecked():
+            return "low"
+        return None
+
+    def _no_filtro(self, card):
+        nivel = self._nivel_filtrado()
+        return nivel is None or card.urgency_level == nivel
+
+    def _retirar(self, card):
+        """Tira ``card`` do grid; devolve a posição que tinha, se estava visível."""
+        self.grid.removeWidget(card)
+        card.hide()
+        i = bisect_left(self._chaves, card.sort_key)
+        if i < len(self._visiveis) and self._visiveis[i] is card:
+            del self._visiveis[i]
+            del self._chaves[i]
+            return i
+        return None
+
+    def _posicionar(self, inicio):
+        """Volta a colocar no grid os cartões visíveis a partir da posição ``inicio``."""
+        for card in self._visiveis[inicio:]:
+            self.grid.removeWidget(card)
+        for i in range(inicio, len(self._visiveis)):
+            card = self._visiveis[i]
+            self.grid.addWidget(card, i // COLUNAS_GRID, i % COLUNAS_GRID)
+            card.show()
+        self._update_stats()
+        self._atualizar_mensagens()
+
+    def _relayout(self):
+        """Reorganiza o grid para o filtro atual, sem recriar os cartões."""
+        for card in self._visiveis:
+            self.grid.removeWidget(card)
+            card.hide()
+        self._visiveis = sorted(
+            (card for card in self._cards.values() if self._no_filtro(card)), key=lambda c: c.sort_key
+        )
+        self._chaves = [card.sort_key for card in self._visiveis]
+        self._posicionar(0)
+
+    def _atualizar_mensagens(self):
+        """Mostra o erro ou a mensagem de lista vazia por cima do grid."""
+        while self.mensagens_layout.count():
+            w = self.mensagens_layout.takeAt(0).widget()
+            if w is not None:
+                w.deleteLater()
+
+        if self._erro is not None:
+            self.mensagens_layout.addWidget(self._create_error_message(self._erro))
+        elif not self._cards:
+            self.mensagens_layout.addWidget(self._create_message(
+                " Todos os produtos estão com stock adequado!", SUCCESS_COLOR, "#A7F3D0", 16
+            ))
+        elif not self._visiveis:
+            self.mensagens_layout.addWidget(self._create_message(
+                "Nenhum produto encontrado para o filtro selecionado", TEXT_SECONDARY, BORDER_COLOR, 14
+            ))
+        self.mensagens.setVisible(self.mensagens_layout.count() > 0)
+
+    def _create_message(self, texto, cor, cor_borda, tamanho):
+        """Mensagem que ocupa o lugar dos cartões."""
+        label = QLabel(texto)
+        label.setAlignment(Qt.AlignCenter)
+        font = QFont()
+        font.setPointSize(tamanho)
+        label.setFont(font)
+        label.setStyleSheet(f"""
+            QLabel {{
+                color: {cor};
+                padding: 50px;
+                background-color: white;
+                border-radius: 15px;
+                border: 2px solid {cor_borda};
+            }}
+        """)
+        return label
+
+    def _create_error_message(self, mensagem):
+        """Mensagem de erro da consulta."""
+        error_container = QFrame()
+        error_container.setStyleSheet(f"""
+            QFrame {{
+                background-color: #FEF2F2;
+                border-radius: 10px;
+                border: 1px solid {DANGER_COLOR}40;
+                padding: 20px;
+            }}
+        """)
+        error_layout = QVBoxLayout(error_container)
         
-        if not hasattr(self, 'all_products'):
-            return
+        error_icon = QLabel("")
+        error_icon.setAlignment(Qt.AlignCenter)
+        error_icon.setStyleSheet("font-size: 32px; margin-bottom: 10px;")
         
-        # Filtrar produtos
-        filtered_products = []
-        for product in self.all_products:
-            card = self._create_product_card(product)
-            
-            if self.filter_critical.isChecked() and card.urgency_level == "critical":
-                filtered_products.append((product, card))
-            elif self.filter_warning.isChecked() and card.urgency_level == "warning":
-                filtered_products.append((product, card))
-            elif self.filter_low.isChecked() and card.urgency_level == "low":
-                filtered_products.append((product, card))
-            elif self.filter_all.isChecked():
-                filtered_products.append((product, card))
-        
-        # Atualizar estatísticas com produtos filtrados
-        self._update_stats(filtered_products, self.all_products)
-        
-        if not filtered_products:
-            # Mensagem quando não há produtos no filtro
-            no_filtered = QLabel(f"Nenhum produto encontrado para o filtro selecionado")
-            no_filtered.setAlignment(Qt.AlignCenter)
-            no_filtered_font = QFont()
-            no_filtered_font.setPointSize(14)
-            no_filtered.setFont(no_filtered_font)
-            no_filtered.setStyleSheet(f"""
-                QLabel {{
-                    color: {TEXT_SECONDARY};
-                    padding: 50px;
-                    background-color: white;
-                    border-radius: 15px;
-                    border: 2px solid {BORDER_COLOR};
-                }}
-            """)
-            self.grid.addWidget(no_filtered, 0, 0, 1, 4)
-            return
+        error_label = QLabel(f"Erro ao carregar produtos:\n{mensagem}")
+        error_label.setAlignment(Qt.AlignCenter)
+        error_label.setWordWrap(True)
+        error_label.setStyleSheet(f"color: {DANGER_COLOR}; font-weight: 500;")
         
-        # Adicionar produtos filtrados ao grid
-        cols = 3
-        row = 0
-        col = 0
-        
-        for product, card in filtered_products:
-            self.grid.addWidget(card, row, col)
-            col += 1
-            if col >= cols:
-                col = 0
-                row += 1
-        
-        # Adicionar espaçador para empurrar cards para esquerda
-        if col > 0:
-            for c in range(col, cols):
-                spacer = QWidgetLocal()
-                spacer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-                self.grid.addWidget(spacer, row, c)
-        
-        # Adicionar coluna de expansão
-        self.grid.setColumnStretch(cols, 1)
-
-    def _update_stats(self, filtered_products, all_products):
-        """Atualiza as estatísticas."""
-        total_all = len(all_products)
-        
-        # Contar por nível de urgência
-        critical = warning = low = 0
-        
-        for product in all_products:
-            stock = product['stock'] or 0
-            stock_minimo = product['stock_minimo'] or 0
-            
-            if stock_minimo == 0:
-                if stock == 0 or stock <= 2:
-                    critical += 1
-                elif stock <= 5:
-                    warning += 1
-                else:
-                    low += 1
-            else:
-                percent = (stock / stock_minimo) * 100 if stock_minimo > 0 else 0
-                if stock == 0 or percent <= 20:
-                    critical += 1
-                elif percent <= 50:
-                    warning += 1
-                else:
-                    low += 1
-        
-        total_filtered = len(filtered_products)
-        
-        # Atualizar cards de estatística usando as referências diretas
-        try:
-            self.stats_total_value.setText(str(total_filtered if filtered_products else total_all))
-        except Exception:
-            pass
-        try:
-            self.stats_critical_value.setText(str(critical))
-        except Exception:
-            pass
-        try:
-            self.stats_warning_value.setText(str(warning))
-        except Exception:
-            pass
-        try:
-            self.stats_low_value.setText(str(low))
-        except Exception:
-            pass
+        error_layout.addWidget(error_icon)
+        error_layout.addWidget(error_label)
+        return error_container
+
+    def _update_stats(self):
+        """Atualiza as estatísticas (contagens mantidas a cada alteração)."""
+        self.stats_total_value.setText(str(len(self._visiveis)))
+        self.stats_critical_value.setText(str(self._contagem["critical"]))
+        self.stats_warning_value.setText(str(self._contagem["warning"]))
+        self.stats_low_value.setText(str(self._contagem["low"]))
 
     def _on_reorder(self, product_id, product_name):
         """Abre diálogo para reposição de stock."""
@@ -16,8 +16,7 @@ _ROOT = Path(__file__).resolve().parents[3]
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
-from src.config.paths import DB_DIR
-from database.db import get_db_path, connect
+from database.db import get_connection, transaction
 
 
 class EditProductDialog(QDialog):
@@ -217,12 +216,9 @@ class EditProductDialog(QDialog):
 
     def _load(self):
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
+            cur = get_connection().cursor()
             cur.execute("SELECT * FROM produtos WHERE id = ?", (self.produto_id,))
             r = cur.fetchone()
-            conn.close()
             if not r:
                 QMessageBox.warning(self, "Erro", "Produto não encontrado")
                 self.reject()
@@ -247,28 +243,24 @@ class EditProductDialog(QDialog):
             return
             
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
-            cur.execute(
-                """UPDATE produtos SET 
-                   nome_comercial=?, preco_venda=?, preco_compra=?, stock=?, 
-                   stock_minimo=?, unidade=?, codigo_barras=?, descricao=? 
-                   WHERE id=?""",
-                (
-                    self.nome.text().strip(),
-                    float(self.preco_venda.value()),
-                    float(self.preco_compra.value()),
-                    int(self.stock.value()),
-                    int(self.stock_minimo.value()),
-                    self.unidade.text().strip() or None,
-                    self.codigo_barras.text().strip() or None,
-                    self.descricao.toPlainText().strip() or None,
-                    self.produto_id
+            with transaction() as conn:
+                conn.execute(
+                    """UPDATE produtos SET 
+                       nome_comercial=?, preco_venda=?, preco_compra=?, stock=?, 
+                       stock_minimo=?, unidade=?, codigo_barras=?, descricao=? 
+                       WHERE id=?""",
+                    (
+                        self.nome.text().strip(),
+                        float(self.preco_venda.value()),
+                        float(self.preco_compra.value()),
+                        int(self.stock.value()),
+                        int(self.stock_minimo.value()),
+                        self.unidade.text().strip() or None,
+                        self.codigo_barras.text().strip() or None,
+                        self.descricao.toPlainText().strip() or None,
+                        self.produto_id
+                    )
                 )
-            )
-            conn.commit()
-            conn.close()
             
             QMessageBox.information(
                 self, 
@@ -533,9 +525,7 @@ class ProdutosView(QWidget):
 
     def load_products(self):
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
+            cur = get_connection().cursor()
             cur.execute("""
                 SELECT id, nome_comercial, preco_venda, stock, stock_minimo 
                 FROM produtos 
@@ -543,7 +533,6 @@ class ProdutosView(QWidget):
                 ORDER BY nome_comercial
             """)
             rows = cur.fetchall()
-            conn.close()
 
             self.table.setRowCount(len(rows))
             for i, r in enumerate(rows):
@@ -716,12 +705,8 @@ class ProdutosView(QWidget):
             return
             
         try:
-            db_path = get_db_path(DB_DIR)
-            conn = connect(db_path)
-            cur = conn.cursor()
-            cur.execute("UPDATE produtos SET ativo=0 WHERE id=?", (produto_id,))
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute("UPDATE produtos SET ativo=0 WHERE id=?", (produto_id,))
             
             QMessageBox.information(
                 self, 
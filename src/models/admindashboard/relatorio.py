@@ -7,7 +7,6 @@ views are represented by placeholders so the UI remains runnable.
 """
 
 from pathlib import Path
-import importlib.util
 import sys
 from typing import Optional
 
@@ -19,6 +18,12 @@ from PyQt5.QtCore import Qt, QPropertyAnimation, QTimer
 from PyQt5.QtGui import QFont, QColor, QPainter, QPainterPath
 
 from config.colors import *
+
+try:
+    from .view_registry import ViewRegistry
+except ImportError:
+    from view_registry import ViewRegistry
+
 # Local aliases and helpers
 MILK_BG = BACKGROUND_GRAY
 CARD_BG = WHITE
@@ -116,26 +121,6 @@ class ModernButton(QPushButton):
             """)
 
 
-def _load_view_from_path(path: Path, class_name: str) -> Optional[QWidget]:
-    """Import `class_name` from `path` and return an instance, or None."""
-    try:
-        if not path.exists():
-            return None
-        spec = importlib.util.spec_from_file_location(path.stem, str(path))
-        if spec is None or spec.loader is None:
-            return None
-        module = importlib.util.module_from_spec(spec)
-        mod_name = f"_produto_dynamic_{path.stem}"
-        sys.modules[mod_name] = module
-        spec.loader.exec_module(module)
-        cls = getattr(module, class_name, None)
-        if cls is None:
-            return None
-        return cls()
-    except Exception:
-        return None
-
-
 class ProdutoPage(QWidget):
     """SPA container for produto-related views."""
 
@@ -273,67 +258,62 @@ class ProdutoPage(QWidget):
             anim.setEndValue(1.0)
             anim.start()
             
-            self.stack.setCurrentIndex(index)
+            self.views.show(index)
 
     def _load_views(self):
-        """Carrega dinamicamente todas as views"""
-        views = [
-            (self.views_dir / "adicionarproduto_view.py", "AddProductPage"),
-            (self.views_dir / "produtos_view.py", "ProdutosView"),
-            (self.views_dir / "catalogo_view.py", "CatalogoView"),
-            (self.views_dir / "relatorio_view.py", "SalesReportPage"),
-            (self.views_dir / "exportarlista_view.py", "ExportListPage"),
-            (self.views_dir / "gerir_destaque_view.py", "ManageHighlightPage"),
-        ]
-
-        for path, class_name in views:
-            widget = _load_view_from_path(path, class_name)
-            if widget is None:
-                # Criar placeholder estilizado se a view não existir
-                placeholder = QWidget()
-                placeholder.setStyleSheet(f"""
-                    background-color: {CARD_BG};
+        """Regista as views; cada uma só é criada quando é mostrada pela primeira vez."""
+        self.views = ViewRegistry(
+            self.stack, self.views_dir, placeholder=self._placeholder,
+            style=f"""
+                QWidget {{
+                    background-color: {MILK_BG};
+                    color: {TEXT_PRIMARY};
                     border-radius: 12px;
-                    border: 2px dashed {LIGHT_BORDER};
-                """)
-                
-                placeholder_layout = QVBoxLayout(placeholder)
-                placeholder_layout.setContentsMargins(40, 40, 40, 40)
-                placeholder_layout.setAlignment(Qt.AlignCenter)
-                
-                placeholder_label = QLabel(
-                    f"<div style='text-align: center;'>"
-                    f"<h3 style='color:{TEAL_PRIMARY}; margin-bottom: 15px; font-size: 20px;'> View em Construção</h3>"
-                    f"<p style='color:{TEXT_SECONDARY}; font-size: 14px; line-height: 1.6; max-width: 500px;'>"
-                    f"<b>Classe:</b> {class_name}<br>"
-                    f"<b>Arquivo:</b> {path.name}<br><br>"
-                    f"Crie este arquivo na pasta <code>produto/</code><br>"
-                    f"com uma classe chamada <code>{class_name}</code><br>"
-                    f"que herde de <code>QWidget</code>."
-                    f"</p>"
-                    f"</div>"
-                )
-                
-                placeholder_label.setWordWrap(True)
-                placeholder_layout.addWidget(placeholder_label)
-                self.stack.addWidget(placeholder)
-            else:
-                # Configurar estilo da view carregada
-                widget.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: {MILK_BG};
-                        color: {TEXT_PRIMARY};
-                        border-radius: 12px;
-                    }}
-                """)
-                
-                # Envolver em um container para margens
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(widget)
-                
-                self.stack.addWidget(container)
+                }}
+            """,
+            parent=self,
+        )
+        self.views.add("Adicionar", "adicionarproduto_view.py", "AddProductPage")
+        self.views.add("Lista", "produtos_view.py", "ProdutosView")
+        self.views.add("Catálogo", "catalogo_view.py", "CatalogoView")
+        self.views.add("Relatórios", "relatorio_view.py", "SalesReportPage")
+        self.views.add("Exportar", "exportarlista_view.py", "ExportListPage")
+        self.views.add("Destaques", "gerir_destaque_view.py", "ManageHighlightPage")
+        self.views.show(0)
+
+    def refresh(self):
+        """Atualiza a view visível (chamado ao voltar a esta página)."""
+        self.views.refresh()
+
+    def _placeholder(self, title, filename, class_name):
+        """Placeholder estilizado para views que ainda não existem."""
+        placeholder = QWidget()
+        placeholder.setStyleSheet(f"""
+            background-color: {CARD_BG};
+            border-radius: 12px;
+            border: 2px dashed {LIGHT_BORDER};
+        """)
+        
+        placeholder_layout = QVBoxLayout(placeholder)
+        placeholder_layout.setContentsMargins(40, 40, 40, 40)
+        placeholder_layout.setAlignment(Qt.AlignCenter)
+        
+        placeholder_label = QLabel(
+            f"<div style='text-align: center;'>"
+            f"<h3 style='color:{TEAL_PRIMARY}; margin-bottom: 15px; font-size: 20px;'> View em Construção</h3>"
+            f"<p style='color:{TEXT_SECONDARY}; font-size: 14px; line-height: 1.6; max-width: 500px;'>"
+            f"<b>Classe:</b> {class_name}<br>"
+            f"<b>Arquivo:</b> {filename}<br><br>"
+            f"Crie este arquivo na pasta <code>produto/</code><br>"
+            f"com uma classe chamada <code>{class_name}</code><br>"
+            f"que herde de <code>QWidget</code>."
+            f"</p>"
+            f"</div>"
+        )
+        
+        placeholder_label.setWordWrap(True)
+        placeholder_layout.addWidget(placeholder_label)
+        return placeholder
 
     def _apply_modern_styles(self):
         """Aplica estilos modernos à interface."""
@@ -1,5 +1,4 @@
 from pathlib import Path
-import sqlite3
 from datetime import datetime
 import sys
 
@@ -13,37 +12,20 @@ from PyQt5.QtGui import QFont
 
 # Import robusto: tenta import relativo, senão usa import absoluto
 try:
-    from .db_utils import _find_db_file, ensure_transacoes_table
+    from .db_utils import get_connection, transaction, ensure_transacoes_table
 except ImportError:
     # Se executado como script direto
     sys.path.insert(0, str(Path(__file__).parent))
-    from db_utils import _find_db_file, ensure_transacoes_table
-
-
-def _ensure_table(db_file):
-    conn = sqlite3.connect(str(db_file))
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS transacoes_financeiras (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tipo TEXT NOT NULL,
-            descricao TEXT,
-            valor REAL NOT NULL,
-            data_transacao TEXT,
-            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-    )
-    conn.commit()
-    conn.close()
+    from db_utils import get_connection, transaction, ensure_transacoes_table
+
+from src.services.financas_service import CATEGORIAS_SAIDA, CATEGORIA_PADRAO, total_tipo, totais_periodo, totais_saida
+from src.utils.date_utils import filtro_periodo, intervalo_mes
 
 
 class SaidaDialog(QDialog):
     """Dialog genérico para registrar saídas com categoria selecionável"""
-    def __init__(self, parent=None, db_file=None, on_success=None):
+    def __init__(self, parent=None, on_success=None):
         super().__init__(parent)
-        self.db_file = db_file
         self.on_success = on_success
         self.setWindowTitle("Registrar Saída")
         self.setGeometry(100, 100, 550, 300)
@@ -56,14 +38,7 @@ class SaidaDialog(QDialog):
         cat_layout = QHBoxLayout()
         cat_layout.addWidget(QLabel("Categoria:"))
         self.categoria_combo = QComboBox()
-        self.categoria_combo.addItems([
-            "Transferência",
-            "Compra Stock",
-            "Uso Pessoal",
-            "Passagem",
-            "Salário",
-            "Outro"
-        ])
+        self.categoria_combo.addItems(CATEGORIAS_SAIDA)
         cat_layout.addWidget(self.categoria_combo)
         layout.addLayout(cat_layout)
 
@@ -110,9 +85,6 @@ class SaidaDialog(QDialog):
         self.setLayout(layout)
 
     def add_saida(self):
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
-            return
         valor = float(self.valor_field.value())
         descricao = self.desc_field.text().strip()
         categoria = self.categoria_combo.currentText()
@@ -126,14 +98,11 @@ class SaidaDialog(QDialog):
         data_str = self.date_field.date().toString("yyyy-MM-dd")
         
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO transacoes_financeiras (tipo, descricao, valor, data_transacao) VALUES (?, ?, ?, ?)",
-                ("saida", f"{categoria}: {descricao}", valor, data_str)
-            )
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute(
+                    "INSERT INTO transacoes_financeiras (tipo, descricao, categoria, valor, data_transacao) VALUES (?, ?, ?, ?, ?)",
+                    ("saida", f"{categoria}: {descricao}", categoria, valor, data_str)
+                )
             QMessageBox.information(self, "Sucesso", "Saída registrada.")
             if self.on_success:
                 self.on_success()
@@ -145,11 +114,9 @@ class SaidaDialog(QDialog):
 class SaidaView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.db_file = _find_db_file()
         self._init_ui()
         # ensure transactions table exists so we can record saidas
-        if self.db_file:
-            _ensure_table(self.db_file)
+        ensure_transacoes_table()
 
     def _init_ui(self):
         layout = QVBoxLayout(self)
@@ -237,7 +204,7 @@ class SaidaView(QWidget):
         layout.addLayout(results_layout)
 
     def open_saida_dialog(self, categoria=None):
-        dlg = SaidaDialog(self, self.db_file, on_success=self.compute_month_stats)
+        dlg = SaidaDialog(self, on_success=self.compute_month_stats)
         if categoria:
             # Pre-seleciona a categoria se foi passada
             idx = dlg.categoria_combo.findText(categoria)
@@ -247,27 +214,18 @@ class SaidaView(QWidget):
 
     def compute_month_stats(self):
         """Calcula total de saídas no mês selecionado, por categoria."""
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
-            return
-
         date = self.mes_picker.date()
         year = date.year()
         month = date.month()
         ym = f"{year}-{month:02d}"
 
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-
-            # Total geral de saídas
-            cur.execute("SELECT SUM(valor) as total_saida FROM transacoes_financeiras WHERE tipo = 'saida' AND strftime('%Y-%m', data_transacao) = ?", (ym,))
-            r = cur.fetchone()
-            total_saida = r['total_saida'] if r and r['total_saida'] is not None else 0.0
+            # Total geral e totais por categoria numa única consulta
+            periodo = intervalo_mes(ym)
+            totais = totais_periodo(*periodo)
+            total_saida = total_tipo(totais, 'saida')
             self.total_label.setText(f"Total saído no mês: Kz {total_saida:,.2f}")
 
-            # Totais por categoria (procura pela descrição que começa com a categoria)
             categorias = [
                 ("Transferência", self.transferencia_label),
                 ("Compra Stock", self.stock_label),
@@ -277,17 +235,14 @@ class SaidaView(QWidget):
                 ("Outro", self.outro_label)
             ]
 
+            por_categoria = totais_saida(totais)
             for cat_name, label_widget in categorias:
-                cur.execute(
-                    "SELECT SUM(valor) as cat_total FROM transacoes_financeiras WHERE tipo = 'saida' AND descricao LIKE ? AND strftime('%Y-%m', data_transacao) = ?",
-                    (f"{cat_name}:%", ym)
-                )
-                r = cur.fetchone()
-                cat_total = r['cat_total'] if r and r['cat_total'] is not None else 0.0
-                label_widget.setText(f"{cat_name}: Kz {cat_total:,.2f}")
+                label_widget.setText(f"{cat_name}: Kz {por_categoria[cat_name]:,.2f}")
 
             # Carregar tabela de saídas
-            cur.execute("SELECT data_transacao, descricao, valor FROM transacoes_financeiras WHERE tipo = 'saida' AND strftime('%Y-%m', data_transacao) = ? ORDER BY data_transacao DESC LIMIT 100", (ym,))
+            condicao, mes = filtro_periodo("data_transacao", *periodo)
+            cur = get_connection().cursor()
+            cur.execute(f"SELECT data_transacao, descricao, valor FROM transacoes_financeiras WHERE tipo = 'saida' AND {condicao} ORDER BY data_transacao DESC LIMIT 100", mes)
             rows = cur.fetchall()
             
             self.table.setRowCount(0)
@@ -298,15 +253,10 @@ class SaidaView(QWidget):
                 self.table.setItem(row, 1, QTableWidgetItem(str(r['descricao'] or '')))
                 self.table.setItem(row, 2, QTableWidgetItem(f"Kz {r['valor']:,.2f}"))
 
-            conn.close()
-
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Falha ao calcular estatísticas: {e}")
 
     def add_transaction(self):
-        if not self.db_file:
-            QMessageBox.warning(self, "Erro", "Arquivo de banco de dados não encontrado.")
-            return
         descricao = self.desc.text().strip()
         valor = float(self.valor.value())
         data_str = self.date.date().toString("yyyy-MM-dd")
@@ -314,14 +264,11 @@ class SaidaView(QWidget):
             QMessageBox.warning(self, "Valor inválido", "Insira um valor maior que zero.")
             return
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO transacoes_financeiras (tipo, descricao, valor, data_transacao) VALUES (?, ?, ?, ?)",
-                ("saida", descricao, valor, data_str)
-            )
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute(
+                    "INSERT INTO transacoes_financeiras (tipo, descricao, categoria, valor, data_transacao) VALUES (?, ?, ?, ?, ?)",
+                    ("saida", descricao, CATEGORIA_PADRAO, valor, data_str)
+                )
             self.desc.clear()
             self.valor.setValue(0)
             self.load_transactions()
@@ -329,14 +276,15 @@ class SaidaView(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao gravar saída: {e}")
 
+    def refresh(self):
+        """Recarrega as saídas e as estatísticas do mês ao voltar à view."""
+        self.load_transactions()
+        self.compute_month_stats()
+
     def load_transactions(self):
         self.table.setRowCount(0)
-        if not self.db_file:
-            return
         try:
-            conn = sqlite3.connect(str(self.db_file))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+            cur = get_connection().cursor()
             cur.execute("SELECT data_transacao, descricao, valor FROM transacoes_financeiras WHERE tipo = 'saida' ORDER BY data_transacao DESC LIMIT 200")
             rows = cur.fetchall()
             for r in rows:
@@ -345,6 +293,5 @@ class SaidaView(QWidget):
                 self.table.setItem(row, 0, QTableWidgetItem(str(r['data_transacao'])))
                 self.table.setItem(row, 1, QTableWidgetItem(str(r['descricao'] or '')))
                 self.table.setItem(row, 2, QTableWidgetItem(f"Kz {r['valor']:,.2f}"))
-            conn.close()
         except Exception:
             pass
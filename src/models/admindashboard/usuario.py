@@ -7,7 +7,6 @@ class used below. If a view is missing, a placeholder label is shown.
 """
 
 from pathlib import Path
-import importlib.util
 import sys
 from typing import Optional, List
 
@@ -18,6 +17,11 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QPainter, QPainterPath
 
+try:
+    from .view_registry import ViewRegistry
+except ImportError:
+    from view_registry import ViewRegistry
+
 from colors import *
 
 
@@ -209,27 +213,6 @@ class HeaderBar(QFrame):
         layout.addStretch()
 
 
-def _load_view_from_path(path: Path, class_name: str) -> Optional[QWidget]:
-    """Import `class_name` from `path` and return an instance, or None."""
-    try:
-        if not path.exists():
-            return None
-        spec = importlib.util.spec_from_file_location(path.stem, str(path))
-        if spec is None or spec.loader is None:
-            return None
-        module = importlib.util.module_from_spec(spec)
-        mod_name = f"_usuario_dynamic_{path.stem}"
-        sys.modules[mod_name] = module
-        spec.loader.exec_module(module)
-        cls = getattr(module, class_name, None)
-        if cls is None:
-            return None
-        return cls()
-    except Exception as e:
-        print(f"Error loading {path}: {e}")
-        return None
-
-
 class ContentPlaceholder(QWidget):
     """Placeholder estilizado para views não implementadas."""
     def __init__(self, title, filename, classname, parent=None):
@@ -312,8 +295,6 @@ class UsuarioPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.views_dir = Path(__file__).parent / "."
-        # Initialize loaded_views before setup_ui because _load_views accesses it
-        self.loaded_views = {}
         self.setup_ui()
 
     def setup_ui(self):
@@ -355,7 +336,7 @@ class UsuarioPage(QWidget):
 
     def _on_nav_item_selected(self, index):
         """Lida com seleção de item na navegação."""
-        self._animate_view_transition(index)
+        self.views.show(index, self._animate_view_transition)
         
         # Atualizar título do cabeçalho
         titles = [
@@ -412,58 +393,35 @@ class UsuarioPage(QWidget):
                 self.content_stack.setCurrentIndex(index)
 
     def _load_views(self):
-        """Load views dynamically or show placeholders."""
-        views = [
-            ("Adicionar Usuário", "adicionar_usuario.py", "AdicionarUsuarioView"),
-            ("Lista de Usuários", "usuarios_view.py", "UsuariosView"),
-            ("Usuários Registrados", "usuarios_registrados.py", "UsuariosRegistradosView"),
-            ("Permissões", "permissoes_view.py", "PermissoesView"),
-            ("Logs do Sistema", "logs_view.py", "LogsView"),
-            ("Configurações", "config_view.py", "ConfigView"),
-        ]
+        """Regista as views; cada uma só é criada quando é mostrada pela primeira vez."""
+        self.views = ViewRegistry(
+            self.content_stack, self.views_dir, placeholder=ContentPlaceholder,
+            style=f"""
+                QWidget {{
+                    background-color: transparent;
+                    color: {TEXT_PRIMARY};
+                }}
+            """,
+            parent=self,
+        )
+        self.views.viewCreated.connect(self._on_view_created)
+        self.views.add("Adicionar Usuário", "adicionar_usuario.py", "AdicionarUsuarioView")
+        self.views.add("Lista de Usuários", "usuarios_view.py", "UsuariosView", prewarm=True)
+        self.views.add("Usuários Registrados", "usuarios_registrados.py", "UsuariosRegistradosView")
+        self.views.add("Permissões", "permissoes_view.py", "PermissoesView")
+        self.views.add("Logs do Sistema", "logs_view.py", "LogsView")
+        self.views.add("Configurações", "config_view.py", "ConfigView")
+        self.views.show(0)
+
+    def refresh(self):
+        """Atualiza a view visível (chamado ao voltar a esta página)."""
+        self.views.refresh()
+
+    def _on_view_created(self, classname, widget):
+        """Liga o sinal de usuário salvo quando a view o expõe."""
+        if hasattr(widget, 'user_saved'):
+            widget.user_saved.connect(self._on_user_saved)
 
-        for title, filename, classname in views:
-            path = self.views_dir / filename
-            widget = _load_view_from_path(path, classname)
-            
-            if widget is None:
-                # Criar placeholder estilizado
-                placeholder = ContentPlaceholder(title, filename, classname)
-                
-                # Container para o placeholder
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(placeholder)
-                
-                self.content_stack.addWidget(container)
-            else:
-                # Configurar estilo da view carregada
-                widget.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: transparent;
-                        color: {TEXT_PRIMARY};
-                    }}
-                """)
-                
-                # Guardar referência da view real
-                self.loaded_views[classname] = widget
-                
-                # Conectar sinal de usuário salvo (se a view o expuser)
-                if hasattr(widget, 'user_saved'):
-                    try:
-                        widget.user_saved.connect(self._on_user_saved)
-                    except Exception:
-                        pass
-                
-                # Container para a view
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(widget)
-                
-                self.content_stack.addWidget(container)
-    
     def _on_user_saved(self, user_info):
         """Handler chamado quando `AdicionarUsuarioView` emite `user_saved`."""
         nome = user_info.get('nome', '') if isinstance(user_info, dict) else ''
@@ -472,7 +430,7 @@ class UsuarioPage(QWidget):
         self.show_notification(f"Usuário '{nome}' adicionado com sucesso!", "success")
         
         # Atualizar a lista de usuários se existir
-        list_widget = self.loaded_views.get('UsuariosView')
+        list_widget = self.views.loaded('UsuariosView')
         if list_widget and hasattr(list_widget, 'refresh'):
             try:
                 list_widget.refresh()
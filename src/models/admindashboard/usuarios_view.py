@@ -4,6 +4,7 @@ Exporta `UsuariosView`, um QWidget com lista de usuários,
 campo de pesquisa e ações básicas.
 """
 import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -15,6 +16,14 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QPainter, QPainterPath, QFont
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import get_connection
+from src.utils.miniaturas import MINIATURA_PEQUENA, miniaturas
+
 from colors import *
 # Cores simplificadas
 BACKGROUND = WHITE
@@ -66,6 +75,8 @@ class UsuarioCard(QFrame):
             font-weight: bold;
             font-size: 14px;
         """)
+        # Foto (se existir) substitui as iniciais quando a miniatura chegar
+        miniaturas().aplicar(avatar_label, self.usuario.get('imagem_id'), MINIATURA_PEQUENA)
         
         # Informações principais
         info_widget = QWidget()
@@ -331,36 +342,10 @@ class UsuariosView(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.db_path = self._get_db_path()
         self.usuarios = []
         self._setup_ui()
         self.carregar_usuarios()
 
-    def _get_db_path(self):
-        """Obtém o caminho do banco de dados."""
-        try:
-            from src.config.paths import DB_DIR
-            from database.db import get_db_path
-            db_path = get_db_path(DB_DIR)
-            if db_path.exists():
-                return str(db_path)
-        except Exception:
-            pass
-
-        possible_paths = [
-            Path(__file__).parents[4] / 'database' / 'kamba_farma.db',
-            Path(__file__).parents[3] / 'database' / 'kamba_farma.db',
-            Path(__file__).parents[2] / 'database' / 'kamba_farma.db',
-            Path(__file__).parents[1] / 'database' / 'kamba_farma.db',
-            Path(__file__).parent / 'kamba_farma.db',
-        ]
-
-        for path in possible_paths:
-            if path.exists():
-                return str(path)
-
-        return str(Path(__file__).parent / 'usuarios_demo.db')
-
     def _setup_ui(self):
         """Configura a interface do usuário simplificada."""
         main_layout = QVBoxLayout(self)
@@ -538,14 +523,12 @@ class UsuariosView(QWidget):
     def carregar_usuarios(self):
         """Carrega os usuários do banco de dados."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = get_connection().cursor()
             
             cursor.execute("PRAGMA table_info(usuarios)")
             colunas = [row['name'] for row in cursor.fetchall()]
             
-            campos = ['id', 'nome', 'email', 'username', 'perfil', 'ativo', 'criado_em']
+            campos = ['id', 'nome', 'email', 'username', 'perfil', 'ativo', 'criado_em', 'imagem_id']
             campos_disponiveis = [c for c in campos if c in colunas]
             
             if not campos_disponiveis:
@@ -564,7 +547,6 @@ class UsuariosView(QWidget):
                 usuario['criado_em'] = usuario.get('criado_em', 'N/A')
                 self.usuarios.append(usuario)
             
-            conn.close()
             self.atualizar_cards()
             
         except sqlite3.Error as e:
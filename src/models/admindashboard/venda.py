@@ -5,14 +5,13 @@ subfolder. Expected view files and class names (defaults):
 
 - vender_produto.py -> `VenderProdutoView`
 - devolucao_de_produto.py -> `DevolucaoDeProdutoView`
-- historico_de_venda.py -> `HistoricoDeVendaView`
+- historico_de_venda.py -> `HistoricoVendaView`
 
 If a view file is missing or doesn't expose the expected class, a
 user-friendly placeholder is shown with instructions.
 """
 
 from pathlib import Path
-import importlib.util
 import sys
 from typing import Optional, TYPE_CHECKING, List
 
@@ -29,6 +28,11 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QPainter, QPainterPath
 
+try:
+    from .view_registry import ViewRegistry
+except ImportError:
+    from view_registry import ViewRegistry
+
 
 # Paleta de cores (unificada) - mesma do lote.py e financas.py
 PRIMARY_COLOR = "#28C7D3"
@@ -237,27 +241,6 @@ class HeaderBar(QFrame):
         layout.addStretch()
 
 
-def _load_view_from_path(path: Path, class_name: str) -> Optional[QWidget]:
-    """Import `class_name` from `path` and return an instance, or None."""
-    try:
-        if not path.exists():
-            return None
-        spec = importlib.util.spec_from_file_location(path.stem, str(path))
-        if spec is None or spec.loader is None:
-            return None
-        module = importlib.util.module_from_spec(spec)
-        mod_name = f"_venda_dynamic_{path.stem}"
-        sys.modules[mod_name] = module
-        spec.loader.exec_module(module)
-        cls = getattr(module, class_name, None)
-        if cls is None:
-            return None
-        return cls()
-    except Exception as e:
-        print(f"Error loading {path}: {e}")
-        return None
-
-
 class ContentPlaceholder(QWidget):
     """Placeholder estilizado para views não implementadas."""
     def __init__(self, title, filename, classname, parent=None):
@@ -381,7 +364,7 @@ class VendaPage(QWidget):
 
     def _on_nav_item_selected(self, index):
         """Lida com seleção de item na navegação."""
-        self._animate_view_transition(index)
+        self.views.show(index, self._animate_view_transition)
         
         # Atualizar título do cabeçalho
         titles = [
@@ -400,61 +383,6 @@ class VendaPage(QWidget):
             self.header.title_label.setText(titles[index])
             self.header.subtitle_label.setText(subtitles[index])
 
-        # Tentar recarregar dinamicamente a view correspondente
-        dynamic_views = {
-            0: ("vender_produto", "VenderProdutoView", "vender_produto.py"),
-            1: ("devolucao_de_produto", "DevolucaoDeProdutoView", "devolucao_de_produto.py"),
-            2: ("historico_de_venda", "HistoricoVendaView", "historico_de_venda.py"),
-        }
-
-        if index in dynamic_views:
-            mod_short, cls_name, fname = dynamic_views[index]
-            try:
-                import importlib
-                # tentar importar como pacote primeiro
-                try:
-                    mod = importlib.import_module(f"models.admindashboard.{mod_short}")
-                    importlib.reload(mod)
-                except ModuleNotFoundError:
-                    # fallback: procurar o arquivo nas pastas de views conhecidas
-                    mod = None
-                    import importlib.util
-                    views_dirs = [Path(__file__).parent / ".", Path(__file__).parent]
-                    for d in views_dirs:
-                        candidate = d / fname
-                        if candidate.exists():
-                            spec = importlib.util.spec_from_file_location(f"models.admindashboard.{mod_short}", str(candidate))
-                            mod = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(mod)
-                            break
-                    if mod is None:
-                        raise
-
-                ViewClass = getattr(mod, cls_name, None)
-                if ViewClass:
-                    old_widget = self.content_stack.widget(index) if index < self.content_stack.count() else None
-                    new_widget = ViewClass()
-                    if old_widget is not None:
-                        self.content_stack.removeWidget(old_widget)
-                        try:
-                            old_widget.deleteLater()
-                        except Exception:
-                            pass
-                    # Container para a view
-                    container = QWidget()
-                    container_layout = QVBoxLayout(container)
-                    container_layout.setContentsMargins(0, 0, 0, 0)
-                    container_layout.addWidget(new_widget)
-                    
-                    self.content_stack.insertWidget(index, container)
-                    self.content_stack.setCurrentIndex(index)
-                    return
-            except Exception as e:
-                try:
-                    from PyQt5.QtWidgets import QMessageBox
-                    QMessageBox.warning(self, 'Erro', f'Falha ao carregar a view: {e}')
-                except Exception:
-                    print('Falha ao carregar a view:', e)
 
     def _animate_view_transition(self, index):
         """Anima a transição entre views."""
@@ -488,45 +416,25 @@ class VendaPage(QWidget):
                 self.content_stack.setCurrentIndex(index)
 
     def _load_views(self):
-        """Load vender, devolver and historico views from known locations."""
-        views = [
-            ("Vender Produto", "vender_produto.py", "VenderProdutoView"),
-            ("Devolver Produto", "devolucao_de_produto.py", "DevolucaoDeProdutoView"),
-            ("Histórico de Vendas", "historico_de_venda.py", "HistoricoDeVendaView"),
-        ]
-
-        for title, filename, classname in views:
-            path = self.views_dir / filename
-            widget = _load_view_from_path(path, classname)
-            
-            if widget is None:
-                # Criar placeholder estilizado
-                placeholder = ContentPlaceholder(title, filename, classname)
-                
-                # Container para o placeholder
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(placeholder)
-                
-                self.content_stack.addWidget(container)
-            else:
-                # Configurar estilo da view carregada
-                widget.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: transparent;
-                        color: {TEXT_PRIMARY};
-                    }}
-                """)
-                
-                # Container para a view
-                container = QWidget()
-                container_layout = QVBoxLayout(container)
-                container_layout.setContentsMargins(0, 0, 0, 0)
-                container_layout.addWidget(widget)
-                
-                self.content_stack.addWidget(container)
-
+        """Regista as views; cada uma só é criada quando é mostrada pela primeira vez."""
+        self.views = ViewRegistry(
+            self.content_stack, self.views_dir, placeholder=ContentPlaceholder,
+            style=f"""
+                QWidget {{
+                    background-color: transparent;
+                    color: {TEXT_PRIMARY};
+                }}
+            """,
+            parent=self,
+        )
+        self.views.add("Vender Produto", "vender_produto.py", "VenderProdutoView")
+        self.views.add("Devolver Produto", "devolucao_de_produto.py", "DevolucaoDeProdutoView")
+        self.views.add("Histórico de Vendas", "historico_de_venda.py", "HistoricoVendaView", prewarm=True)
+        self.views.show(0)
+
+    def refresh(self):
+        """Atualiza a view visível (chamado ao voltar a esta página)."""
+        self.views.refresh()
 
 if __name__ == '__main__':
     from PyQt5.QtWidgets import QApplication
@@ -1,23 +1,43 @@
 from pathlib import Path
 import sys
-import sqlite3
-import json
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
     QPushButton, QFrame, QTableWidget, QTableWidgetItem,
     QHeaderView, QSpinBox, QMessageBox, QScrollArea, QGridLayout,
     QSizePolicy, QSpacerItem, QComboBox, QDialog, QDialogButtonBox,
-    QFormLayout, QGroupBox
+    QFormLayout, QGroupBox, QListWidget, QListWidgetItem
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QEvent, QTimer
 from PyQt5.QtCore import QStringListModel
 from PyQt5.QtWidgets import QCompleter
 from PyQt5.QtGui import QPixmap, QFont, QColor, QPainter, QPainterPath, QIcon, QTextDocument
 from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
+from collections import deque
 from datetime import datetime
+import time
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import get_connection
+from database.pesquisa import pesquisar_produtos, versao_produtos
+from src.services.autocomplete_service import carregar_indice
+from src.services.leitor_service import LATENCIA_ALVO_MS, DetetorLeitor, carregar_mapa_codigos
+from src.services.venda_service import processar_venda
+from src.utils.async_loader import AsyncLoader
+from src.utils.logger import logger
+from src.utils.miniaturas import MINIATURA_GRANDE, miniaturas
 
 from colors import *
 
+
+def carregar_catalogo_venda():
+    """Índices em memória do ecrã de venda: nomes (sugestões) e códigos de barras."""
+    return carregar_indice(), carregar_mapa_codigos()
+
+
 class RoundedFrame(QFrame):
     """Frame com cantos arredondados."""
     def __init__(self, radius=12, parent=None):
@@ -179,7 +199,7 @@ class ProductCard(QFrame):
         layout.addWidget(self.image_container)
         layout.addWidget(info_frame, 1)
     
-    def set_product_info(self, name, stock, price, code, category, image_bytes=None):
+    def set_product_info(self, name, stock, price, code, category, imagem_id=None):
         """Define as informações do produto no card."""
         self.name_label.setText(name)
         self.stock_label.setText(f"Estoque: {stock}")
@@ -187,17 +207,10 @@ class ProductCard(QFrame):
         self.code_label.setText(f"Código: {code}" if code else "Código: --")
         self.category_label.setText(f"Categoria: {category}" if category else "Categoria: --")
         
-        if image_bytes:
-            pixmap = QPixmap()
-            if pixmap.loadFromData(image_bytes):
-                pixmap = pixmap.scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.product_image.setPixmap(pixmap)
-            else:
-                self.product_image.setText("")
-                self.product_image.setStyleSheet("font-size: 48px; color: #9CA3AF;")
-        else:
-            self.product_image.setText("")
-            self.product_image.setStyleSheet("font-size: 48px; color: #9CA3AF;")
+        # Marcador até a miniatura chegar (ou sem foto)
+        self.product_image.setText("")
+        self.product_image.setStyleSheet("font-size: 48px; color: #9CA3AF;")
+        miniaturas().aplicar(self.product_image, imagem_id, MINIATURA_GRANDE)
         
         # Atualizar quantidade máxima baseada no estoque
         self.quantity_spinbox.setMaximum(stock)
@@ -380,6 +393,18 @@ class SaleItemTable(QTableWidget):
         
         return subtotal
     
+    def add_or_merge(self, product_id, name, quantity, price):
+        """Adiciona o produto ou, se já estiver na venda, soma a quantidade; devolve a linha."""
+        for row in range(self.rowCount()):
+            item = self.item(row, 0)
+            if item and item.data(Qt.UserRole) == product_id:
+                new_qty = int(self.item(row, 1).text()) + quantity
+                self.item(row, 1).setText(str(new_qty))
+                self.item(row, 3).setText(f"Kz {new_qty * price:,.2f}")
+                return row
+        self.add_item(product_id, name, quantity, price)
+        return self.rowCount() - 1
+
     def _adjust_quantity(self, row, delta):
         """Ajusta a quantidade de um item."""
         quantity_item = self.item(row, 1)
@@ -425,10 +450,22 @@ class SaleItemTable(QTableWidget):
 
 class VendaView(QWidget):
     """Janela principal de vendas."""
-    
+
+    # Pausa na escrita (ms) antes de atualizar as sugestões
+    DEBOUNCE_SUGESTOES_MS = 120
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.cart_items = []  # Lista de itens no carrinho
+        # Índices em memória: nomes para as sugestões (autocomplete_service)
+        # e códigos de barras para o leitor (leitor_service)
+        self._indice_nomes = None
+        self._mapa_codigos = None
+        self._indice_loader = AsyncLoader(self)
+        self._indice_loader.loaded.connect(self._on_indice_loaded)
+        self._leitor = DetetorLeitor()
+        # Últimas latências leitura -> carrinho (ms)
+        self.latencias_leitor = deque(maxlen=200)
         self.setup_ui()
     
     def setup_ui(self):
@@ -508,7 +545,7 @@ class VendaView(QWidget):
         search_label.setStyleSheet(f"font-weight: 600; color: {TEXT_PRIMARY}; font-size: 14px;")
         
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Digite o nome, código ou categoria do produto...")
+        self.search_input.setPlaceholderText("Digite o nome, princípio ativo, código ou categoria do produto...")
         self.search_input.setStyleSheet(f"""
             QLineEdit {{
                 padding: 10px 15px;
@@ -543,23 +580,40 @@ class VendaView(QWidget):
         search_layout.addWidget(self.search_input, 1)
         search_layout.addWidget(self.search_btn)
 
-        # Autocomplete (completer) para nomes de produto
+        # Autocomplete (completer) para nomes de produto: a lista já vem
+        # filtrada e ordenada do índice em memória, o completer só a mostra
         self._completer_model = QStringListModel()
         self._completer = QCompleter(self._completer_model, self)
-        self._completer.setCaseSensitivity(Qt.CaseInsensitive)
-        try:
-            # prefer popup that filters contains
-            from PyQt5.Qt import Qt as _QtConst
-            self._completer.setFilterMode(_QtConst.MatchContains)
-        except Exception:
-            pass
-        self._completer.setCompletionMode(QCompleter.PopupCompletion)
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
         self.search_input.setCompleter(self._completer)
-        self.search_input.textChanged.connect(self._update_completions)
         self._completer.activated.connect(self._on_completer_activated)
-        
+
+        # Só procura quando o utilizador pára de escrever; o texto que ficou
+        # para trás nunca chega a ser procurado
+        self._completion_timer = QTimer(self)
+        self._completion_timer.setSingleShot(True)
+        self._completion_timer.setInterval(self.DEBOUNCE_SUGESTOES_MS)
+        self._completion_timer.timeout.connect(self._update_completions)
+        self.search_input.textChanged.connect(self._completion_timer.start)
+        self.search_input.installEventFilter(self)
+        
+        # Resultados da pesquisa, do mais relevante ao menos relevante
+        self.results_list = QListWidget()
+        self.results_list.setMaximumHeight(180)
+        self.results_list.setStyleSheet(f"""
+            QListWidget {{
+                border: 1px solid {BORDER_COLOR};
+                border-radius: 8px;
+                font-size: 13px;
+            }}
+            QListWidget::item {{ padding: 6px 10px; }}
+            QListWidget::item:selected {{ background-color: {PRIMARY_COLOR}; color: white; }}
+        """)
+        self.results_list.hide()
+
         row1_layout.addWidget(client_frame)
         row1_layout.addWidget(search_frame)
+        row1_layout.addWidget(self.results_list)
         content_layout.addWidget(row1_frame)
         
         # Linha 2: Card do produto
@@ -674,101 +728,154 @@ class VendaView(QWidget):
         
         # Conectar sinais
         self.setup_connections()
-
-        # compute DB file path: walk upwards until a `database` folder is found
-        file_path = Path(__file__).resolve()
-        _ROOT = file_path
-        for _ in range(8):
-            if (_ROOT / 'database').exists():
-                break
-            _ROOT = _ROOT.parent
-        self._db_file = _ROOT / 'database' / 'kamba_farma.db'
     
     def setup_connections(self):
         """Conecta os sinais e slots."""
         self.search_btn.clicked.connect(self.search_product)
         self.search_input.returnPressed.connect(self.search_product)
+        self.results_list.currentItemChanged.connect(self._on_result_selected)
         self.product_card.add_to_cart_btn.clicked.connect(self.add_to_cart)
         self.cancel_btn.clicked.connect(self.cancel_sale)
         self.sell_btn.clicked.connect(self.finalize_sale)
     
+    # Número máximo de resultados mostrados na lista da pesquisa
+    LIMITE_RESULTADOS = 20
+
     def search_product(self):
-        """Pesquisa um produto no banco de dados."""
+        """Pesquisa produtos (índice FTS5) e mostra a lista ordenada por relevância."""
         search_term = self.search_input.text().strip()
         
         if not search_term:
             QMessageBox.warning(self, "Aviso", "Digite um termo para pesquisa.")
             return
         
-        # Realizar busca no banco de dados
         try:
-            db_path = self._db_file
-            if not db_path.exists():
-                QMessageBox.critical(self, "Erro", f"Arquivo de banco de dados não encontrado: {db_path}")
-                return
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            cur = conn.cursor()
-            like = f"%{search_term}%"
-            cur.execute(
-                """
-                SELECT id, nome_comercial, stock, preco_venda, codigo_barras, categoria, foto
-                FROM produtos
-                WHERE ativo=1 AND (nome_comercial LIKE ? OR codigo_barras LIKE ? OR categoria LIKE ?)
-                ORDER BY nome_comercial LIMIT 1
-                """,
-                (like, like, like)
-            )
-            row = cur.fetchone()
-            conn.close()
-
-            if not row:
-                QMessageBox.information(self, "Nenhum resultado", "Nenhum produto encontrado para o termo pesquisado.")
-                return
+            rows = pesquisar_produtos(get_connection(), search_term, self.LIMITE_RESULTADOS)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao buscar produto: {e}")
+            return
+
+        self.results_list.blockSignals(True)
+        self.results_list.clear()
+        for row in rows:
+            detalhes = [row['nome_comercial']]
+            if row['principio_ativo']:
+                detalhes.append(row['principio_ativo'])
+            detalhes.append(f"Stock: {row['stock'] or 0}")
+            detalhes.append(f"Kz {row['preco_venda'] or 0:,.2f}")
+            item = QListWidgetItem("  ·  ".join(detalhes))
+            item.setData(Qt.UserRole, row['id'])
+            self.results_list.addItem(item)
+        self.results_list.blockSignals(False)
+
+        if not rows:
+            self.results_list.hide()
+            QMessageBox.information(self, "Nenhum resultado", "Nenhum produto encontrado para o termo pesquisado.")
+            return
+
+        # com um só resultado não há nada a escolher
+        self.results_list.setVisible(len(rows) > 1)
+        self.results_list.setCurrentRow(0)
+
+    def _on_result_selected(self, item, _anterior=None):
+        if item is not None:
+            self.show_product(item.data(Qt.UserRole))
 
-            product_id = row['id']
-            nome = row['nome_comercial']
-            stock = row['stock'] or 0
-            price = row['preco_venda'] or 0.0
-            code = row['codigo_barras'] or ''
-            category = row['categoria'] or ''
-            image = row['foto']
-
-            self.product_card.set_product_info(nome, stock, price, code, category, image)
-            self.current_product_id = product_id
-            self.current_product_price = float(price)
+    def show_product(self, product_id: int):
+        """Mostra no card o produto ``product_id`` (com a miniatura da foto)."""
+        try:
+            row = get_connection().execute(
+                "SELECT id, nome_comercial, stock, preco_venda, codigo_barras, categoria, imagem_id FROM produtos WHERE id = ?",
+                (product_id,)
+            ).fetchone()
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao buscar produto: {e}")
             return
+        if not row:
+            return
+
+        price = row['preco_venda'] or 0.0
+        self.product_card.set_product_info(
+            row['nome_comercial'], row['stock'] or 0, price,
+            row['codigo_barras'] or '', row['categoria'] or '', row['imagem_id']
+        )
+        self.current_product_id = row['id']
+        self.current_product_price = float(price)
 
-    def _update_completions(self, text: str):
-        """Atualiza o modelo do completer com nomes que contenham o texto digitado."""
-        term = text.strip()
-        if not term:
+    def _update_completions(self):
+        """Atualiza as sugestões com o texto atual (índice em memória, sem consultar a base)."""
+        term = self.search_input.text().strip()
+        if not term or self._indice_nomes is None:
             self._completer_model.setStringList([])
             return
+        names = self._indice_nomes.sugestoes(term)
+        self._completer_model.setStringList(names)
+        if names and self.search_input.hasFocus():
+            self._completer.complete()
 
+    def _sincronizar_indice(self):
+        """Recarrega os índices em memória em segundo plano se o catálogo mudou."""
         try:
-            db_path = self._db_file
-            if not db_path.exists():
-                return
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-            like = f"%{term}%"
-            cur.execute("SELECT nome_comercial FROM produtos WHERE ativo=1 AND nome_comercial LIKE ? ORDER BY nome_comercial LIMIT 20", (like,))
-            rows = cur.fetchall()
-            conn.close()
-            names = [r['nome_comercial'] for r in rows]
-            self._completer_model.setStringList(names)
+            versao = versao_produtos(get_connection())
         except Exception:
-            # don't break typing on error
             return
+        if self._indice_nomes is None or self._indice_nomes.versao != versao:
+            self._indice_loader.run(carregar_catalogo_venda)
+
+    def _on_indice_loaded(self, catalogo):
+        self._indice_nomes, self._mapa_codigos = catalogo
+        if self.search_input.hasFocus() and self.search_input.text().strip():
+            self._update_completions()
+
+    def eventFilter(self, obj, event):
+        if obj is self.search_input:
+            if event.type() == QEvent.FocusIn:
+                self._sincronizar_indice()
+            elif event.type() == QEvent.KeyPress:
+                agora = time.perf_counter()
+                if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+                    texto = self.search_input.text().strip()
+                    if self._leitor.e_leitura(texto, agora) and self._registar_leitura(texto, agora):
+                        # tratado: não chega ao returnPressed (pesquisa normal)
+                        return True
+                    self._leitor.reiniciar()
+                elif event.text() and event.text().isprintable():
+                    self._leitor.tecla(agora)
+        return super().eventFilter(obj, event)
+
+    def _registar_leitura(self, codigo: str, inicio: float) -> bool:
+        """Junta ao carrinho o produto lido pelo leitor; ``False`` se o código não for conhecido.
+
+        ``inicio`` é o instante do Enter que terminou a leitura; a latência
+        medida vai daí até o carrinho estar atualizado.
+        """
+        produto = self._mapa_codigos.procurar(codigo) if self._mapa_codigos is not None else None
+        if produto is None:
+            return False
+
+        row = self.items_table.add_or_merge(produto.id, produto.nome, 1, produto.preco)
+        self.update_totals()
+        self._completion_timer.stop()
+        self.search_input.clear()
+        self.items_table.selectRow(row)
+        self._leitor.reiniciar()
+
+        latencia = (time.perf_counter() - inicio) * 1000
+        self.latencias_leitor.append(latencia)
+        if latencia > LATENCIA_ALVO_MS:
+            logger.warning("Leitura %s -> carrinho em %.1f ms (objetivo %.0f ms)", codigo, latencia, LATENCIA_ALVO_MS)
+        else:
+            logger.debug("Leitura %s -> carrinho em %.1f ms", codigo, latencia)
+        return True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._sincronizar_indice()
 
     def _on_completer_activated(self, text: str):
         """Quando o usuário seleciona uma sugestão, preencher o campo e buscar o produto."""
         self.search_input.setText(text)
+        self._completion_timer.stop()
         self.search_product()
 
     def set_active_nav(self, btn: QPushButton):
@@ -811,24 +918,8 @@ class VendaView(QWidget):
         product_name = self.product_card.name_label.text()
         quantity = self.product_card.quantity_spinbox.value()
         
-        # Verificar se já está no carrinho
-        for i in range(self.items_table.rowCount()):
-            item = self.items_table.item(i, 0)
-            if item and item.data(Qt.UserRole) == self.current_product_id:
-                # Atualizar quantidade
-                current_qty = int(self.items_table.item(i, 1).text())
-                new_qty = current_qty + quantity
-                self.items_table.item(i, 1).setText(str(new_qty))
-                
-                # Recalcular subtotal
-                subtotal = new_qty * self.current_product_price
-                self.items_table.item(i, 3).setText(f"Kz {subtotal:,.2f}")
-                
-                self.update_totals()
-                return
-        
-        # Adicionar novo item
-        self.items_table.add_item(
+        # Se já estiver no carrinho, soma a quantidade
+        self.items_table.add_or_merge(
             self.current_product_id,
             product_name,
             quantity,
@@ -865,6 +956,8 @@ class VendaView(QWidget):
         self.items_table.clear_table()
         self.client_input.clear()
         self.search_input.clear()
+        self.results_list.clear()
+        self.results_list.hide()
         self.product_card.set_product_info(
             "Nenhum produto selecionado",
             0,
@@ -936,16 +1029,18 @@ class VendaView(QWidget):
                 doc.print_(printer)
         except Exception as e:
             QMessageBox.warning(self, "Impressão", f"Falha ao imprimir fatura: {e}")
-    
+
+    def _usuario_atual_id(self):
+        """Id do utilizador autenticado (``current_user`` da janela do dashboard)."""
+        utilizador = getattr(self.window(), 'current_user', None) or {}
+        return utilizador.get('id')
+
     def finalize_sale(self):
         """Finaliza a venda."""
         if self.items_table.rowCount() == 0:
             QMessageBox.warning(self, "Aviso", "Adicione itens à venda primeiro.")
             return
         
-        # TODO: Implementar lógica real de venda no banco de dados
-        # Por enquanto, vamos mostrar um resumo
-        
         client_name = self.client_input.text().strip()
         if not client_name:
             QMessageBox.warning(self, "Aviso", "O nome do cliente é obrigatório para registrar a venda.")
@@ -953,99 +1048,22 @@ class VendaView(QWidget):
         total = self.items_table.get_total()
         item_count = self.items_table.rowCount()
         
-        # Persistir venda no banco
-        try:
-            db_path = self._db_file
-            if not db_path.exists():
-                QMessageBox.critical(self, "Erro", f"Arquivo de banco de dados não encontrado: {db_path}")
-                return
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            cur = conn.cursor()
-
-            # Inserir venda
-            cur.execute("INSERT INTO vendas (usuario_id, total) VALUES (?, ?)", (None, total))
-            venda_id = cur.lastrowid
-            # Preparar histórico: coletar itens para gravar no historico_compra
-            itens_historico = []
-
-            # Para cada item, distribuir entre lotes disponíveis e inserir itens_venda
-            for row in range(self.items_table.rowCount()):
-                product_item = self.items_table.item(row, 0)
-                produto_id = product_item.data(Qt.UserRole)
-                quantidade = int(self.items_table.item(row, 1).text())
-                price_text = self.items_table.item(row, 2).text().replace("Kz", "").replace(",", "").strip()
-                preco_unit = float(price_text)
-                # tentar obter o nome comercial do produto para a fatura/histórico
-                try:
-                    cur.execute("SELECT nome_comercial FROM produtos WHERE id = ?", (produto_id,))
-                    prod_row = cur.fetchone()
-                    produto_nome = prod_row['nome_comercial'] if prod_row else None
-                except Exception:
-                    produto_nome = None
-
-                itens_historico.append({
-                    "produto_id": produto_id,
-                    "produto_nome": produto_nome,
-                    "quantidade": quantidade,
-                    "preco_unitario": preco_unit
-                })
-                quantidade_rem = quantidade
-
-                # Distribuir por lotes FIFO (por validade mais próxima)
-                while quantidade_rem > 0:
-                    cur.execute(
-                        "SELECT id, quantidade_atual FROM lotes WHERE produto_id = ? AND quantidade_atual > 0 AND ativo=1 ORDER BY validade ASC, id ASC LIMIT 1",
-                        (produto_id,)
-                    )
-                    lote = cur.fetchone()
-                    if lote is None:
-                        # sem lotes com stock suficiente — ainda assim registrar item sem lote
-                        subtotal = quantidade_rem * preco_unit
-                        cur.execute(
-                            "INSERT INTO itens_venda (venda_id, produto_id, lote_id, quantidade, preco_unitario, subtotal) VALUES (?, ?, ?, ?, ?, ?)",
-                            (venda_id, produto_id, None, quantidade_rem, preco_unit, subtotal)
-                        )
-                        quantidade_rem = 0
-                    else:
-                        lote_id = lote['id']
-                        lote_qtd = lote['quantidade_atual']
-                        usar = min(quantidade_rem, lote_qtd)
-                        subtotal = usar * preco_unit
-                        cur.execute(
-                            "INSERT INTO itens_venda (venda_id, produto_id, lote_id, quantidade, preco_unitario, subtotal) VALUES (?, ?, ?, ?, ?, ?)",
-                            (venda_id, produto_id, lote_id, usar, preco_unit, subtotal)
-                        )
-                        # Atualizar lote
-                        cur.execute(
-                            "UPDATE lotes SET quantidade_atual = quantidade_atual - ? WHERE id = ?",
-                            (usar, lote_id)
-                        )
-                        quantidade_rem -= usar
-
-                # Atualizar stock do produto
-                cur.execute("UPDATE produtos SET stock = COALESCE(stock,0) - ? WHERE id = ?", (quantidade, produto_id))
-
-            # Inserir registro no historico_compra e itens normalizados
-            try:
-                quantidade_total = sum(i['quantidade'] for i in itens_historico)
-                produtos_json = json.dumps(itens_historico, ensure_ascii=False)
-                cur.execute(
-                    "INSERT INTO historico_compra (comprador_nome, produtos_comprados, quantidade_total) VALUES (?, ?, ?)",
-                    (client_name, produtos_json, quantidade_total)
-                )
-                historico_id = cur.lastrowid
-                for it in itens_historico:
-                    cur.execute(
-                        "INSERT INTO historico_compra_itens (historico_compra_id, produto_id, quantidade, preco_unitario) VALUES (?, ?, ?, ?)",
-                        (historico_id, it['produto_id'], it['quantidade'], it.get('preco_unitario'))
-                    )
-            except Exception:
-                # se falhar ao gravar histórico, não impedimos a venda; apenas continuar
-                pass
+        # Recolher os itens do carrinho
+        itens = []
+        for row in range(self.items_table.rowCount()):
+            product_item = self.items_table.item(row, 0)
+            price_text = self.items_table.item(row, 2).text().replace("Kz", "").replace(",", "").strip()
+            itens.append({
+                "produto_id": product_item.data(Qt.UserRole),
+                "quantidade": int(self.items_table.item(row, 1).text()),
+                "preco_unitario": float(price_text),
+            })
 
-            conn.commit()
+        # Persistir venda no banco (alocação de lotes, stock e histórico)
+        try:
+            venda = processar_venda(itens, usuario_id=self._usuario_atual_id(), comprador_nome=client_name)
+            venda_id = venda['venda_id']
+            itens_historico = venda['itens']
 
             # Tentar imprimir fatura
             try:
@@ -1064,13 +1082,7 @@ class VendaView(QWidget):
 
             self.clear_sale()
         except Exception as e:
-            conn.rollback()
             QMessageBox.critical(self, "Erro", f"Erro ao finalizar venda: {e}")
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
 
 # Backwards-compatibility: expose `VendaPage` name expected elsewhere
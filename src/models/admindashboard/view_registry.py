@@ -0,0 +1,190 @@
+"""Registo partilhado das sub-views das páginas SPA (produto, lote, venda, ...).
+
+Substitui as cópias de ``_load_view_from_path`` de cada página. Cada módulo
+de view é importado uma única vez (cache por caminho, com o nome canónico
+``models.admindashboard.<ficheiro>`` em ``sys.modules``) e cada sub-view só é
+instanciada quando é mostrada pela primeira vez. Depois da primeira
+apresentação da página, os módulos das restantes views são importados — e as
+views marcadas com ``prewarm`` construídas — uma de cada vez, quando o event
+loop do Qt está livre.
+"""
+import importlib.util
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QStackedWidget, QVBoxLayout, QWidget
+
+try:
+    from .page_registry import import_page_module
+except ImportError:
+    from page_registry import import_page_module
+
+logger = logging.getLogger('kamba.pages')
+
+_DIR = Path(__file__).resolve().parent
+_modulos = {}
+
+
+def load_view_module(path: Path):
+    """Módulo do ficheiro ``path`` (importado uma vez), ou None se não existir."""
+    path = Path(path).resolve()
+    if path in _modulos:
+        return _modulos[path]
+    module = None
+    if path.exists():
+        if path.parent == _DIR:
+            module = import_page_module(f"models.admindashboard.{path.stem}")
+        else:
+            nome = f"_view_{path.parent.name}_{path.stem}"
+            spec = importlib.util.spec_from_file_location(nome, str(path))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[nome] = module
+            spec.loader.exec_module(module)
+    _modulos[path] = module
+    return module
+
+
+def load_view_class(path: Path, class_name: str):
+    """Classe ``class_name`` definida em ``path``, ou None."""
+    module = load_view_module(path)
+    return getattr(module, class_name, None) if module is not None else None
+
+
+class _View:
+    def __init__(self, title, path, classname, prewarm, container):
+        self.title = title
+        self.path = path
+        self.classname = classname
+        self.prewarm = prewarm
+        self.container = container
+        self.widget = None
+        self.criada = False
+
+
+class ViewRegistry(QObject):
+    """Sub-views de um ``QStackedWidget`` criadas a pedido.
+
+    Cada posição do stack é um contentor vazio até a view ser mostrada.
+    ``placeholder(title, filename, classname)`` cria o widget apresentado
+    quando o ficheiro ou a classe não existem; ``style`` é aplicado às views
+    carregadas e ``viewCreated`` permite à página ligar os sinais de cada view.
+    """
+
+    viewCreated = pyqtSignal(str, object)  # classname, widget
+
+    def __init__(self, stack: QStackedWidget, views_dir: Path,
+                 placeholder: Callable[[str, str, str], QWidget] = None,
+                 style: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.stack = stack
+        self.views_dir = Path(views_dir)
+        self._placeholder = placeholder
+        self._style = style
+        self._views = []
+        self._pendentes = []
+        self._prewarm_iniciado = False
+
+    def add(self, title: str, filename: str, classname: str, prewarm: bool = False) -> int:
+        """Regista uma view e devolve o seu índice (ainda não a instancia)."""
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._views.append(_View(title, self.views_dir / filename, classname, prewarm, container))
+        return self.stack.addWidget(container)
+
+    def view(self, index: int):
+        """Instância da view (criando-a se necessário); None se não carregou."""
+        entrada = self._views[index]
+        if not entrada.criada:
+            self._criar(entrada)
+        return entrada.widget
+
+    def loaded(self, classname: str):
+        """View já criada com a classe ``classname`` (sem a instanciar)."""
+        for entrada in self._views:
+            if entrada.classname == classname and entrada.widget is not None:
+                return entrada.widget
+        return None
+
+    def show(self, index: int, animate: Callable[[int], None] = None):
+        """Mostra a view ``index``; nas visitas seguintes apenas a atualiza."""
+        if not 0 <= index < len(self._views):
+            return
+        entrada = self._views[index]
+        if entrada.criada:
+            self.refresh(index)
+        else:
+            self._criar(entrada)
+        if animate is not None:
+            animate(index)
+        else:
+            self.stack.setCurrentIndex(index)
+        self.start_prewarm()
+
+    def refresh(self, index: Optional[int] = None):
+        """Chama ``refresh()`` da view (por omissão a atual), se existir."""
+        if index is None:
+            index = self.stack.currentIndex()
+        if not 0 <= index < len(self._views):
+            return
+        refresh = getattr(self._views[index].widget, 'refresh', None)
+        if callable(refresh):
+            try:
+                refresh()
+            except Exception as e:
+                logger.warning('Falha ao atualizar %s: %s', self._views[index].classname, e)
+
+    def start_prewarm(self):
+        """Agenda, para quando o event loop estiver livre, o pré-carregamento."""
+        if self._prewarm_iniciado:
+            return
+        self._prewarm_iniciado = True
+        self._pendentes = [e for e in self._views if not e.criada]
+        QTimer.singleShot(0, self._prewarm_seguinte)
+
+    def _prewarm_seguinte(self):
+        # um passo por iteração do event loop, para não bloquear a interface
+        while self._pendentes:
+            entrada = self._pendentes.pop(0)
+            if entrada.criada:
+                continue
+            try:
+                if entrada.prewarm:
+                    self._criar(entrada)
+                else:
+                    load_view_module(entrada.path)
+            except Exception as e:
+                logger.warning('Pré-carregamento de %s falhou: %s', entrada.path.name, e)
+            break
+        if self._pendentes:
+            QTimer.singleShot(0, self._prewarm_seguinte)
+
+    def _criar(self, entrada: _View):
+        entrada.criada = True
+        inicio = time.perf_counter()
+        widget = None
+        try:
+            cls = load_view_class(entrada.path, entrada.classname)
+            if cls is not None:
+                widget = cls()
+        except Exception as e:
+            print(f"Error loading {entrada.path}: {e}")
+
+        if widget is None:
+            if self._placeholder is not None:
+                entrada.container.layout().addWidget(
+                    self._placeholder(entrada.title, entrada.path.name, entrada.classname)
+                )
+            return
+
+        if self._style:
+            widget.setStyleSheet(self._style)
+        entrada.widget = widget
+        entrada.container.layout().addWidget(widget)
+        logger.info('View %s criada em %.1f ms', entrada.classname,
+                    (time.perf_counter() - inicio) * 1000.0)
+        self.viewCreated.emit(entrada.classname, widget)
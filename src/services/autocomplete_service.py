@@ -0,0 +1,87 @@
+"""Sugestões de nomes de produto em memória para a caixa de pesquisa da venda.
+
+``carregar_indice`` lê uma vez os nomes dos produtos ativos e devolve um
+``IndiceNomes``; as sugestões são calculadas sem acesso à base enquanto o
+utilizador escreve. A comparação ignora maiúsculas e acentos. Primeiro vêm
+os nomes que começam pelo texto (intervalo contíguo da lista ordenada,
+encontrado com ``bisect``) e depois os que o contêm noutra posição
+(``str.find`` sobre todos os nomes concatenados). As duas procuras param ao
+chegar ao limite, por isso uma consulta custa microssegundos mesmo com
+dezenas de milhares de produtos.
+
+O índice guarda a ``versao_produtos`` com que foi lido; a vista compara-a
+com a atual para saber quando recarregar.
+"""
+import bisect
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Iterable, List
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import transaction
+from database.pesquisa import versao_produtos
+
+LIMITE_SUGESTOES = 20
+# separador entre nomes no texto concatenado (não aparece em nomes normalizados)
+_SEPARADOR = "\n"
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos ("Ácido" -> "acido")."""
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).replace(_SEPARADOR, " ")
+
+
+class IndiceNomes:
+    """Nomes ordenados pela forma normalizada, para procura por prefixo e por conteúdo."""
+
+    def __init__(self, nomes: Iterable[str], versao: int = 0):
+        pares = sorted({(normalizar(n), n) for n in nomes if n})
+        self.versao = versao
+        self._chaves = [chave for chave, _ in pares]
+        self._nomes = [nome for _, nome in pares]
+        # posição de cada nome no texto concatenado
+        self._inicios = []
+        posicao = 0
+        for chave in self._chaves:
+            self._inicios.append(posicao)
+            posicao += len(chave) + len(_SEPARADOR)
+        self._texto = _SEPARADOR.join(self._chaves)
+
+    def __len__(self):
+        return len(self._nomes)
+
+    def sugestoes(self, termo: str, limite: int = LIMITE_SUGESTOES) -> List[str]:
+        """Até ``limite`` nomes: primeiro os que começam por ``termo``, depois os que o contêm."""
+        chave = normalizar(termo.strip())
+        if not chave:
+            return []
+
+        inicio = bisect.bisect_left(self._chaves, chave)
+        fim = inicio
+        while fim < len(self._chaves) and fim - inicio < limite and self._chaves[fim].startswith(chave):
+            fim += 1
+        resultado = self._nomes[inicio:fim]
+        prefixos = range(inicio, fim)
+
+        posicao = self._texto.find(chave)
+        while posicao != -1 and len(resultado) < limite:
+            indice = bisect.bisect_right(self._inicios, posicao) - 1
+            if posicao != self._inicios[indice] or indice not in prefixos:
+                resultado.append(self._nomes[indice])
+            # continuar depois deste nome (cada nome aparece uma vez)
+            posicao = self._texto.find(chave, self._inicios[indice] + len(self._chaves[indice]) + 1)
+        return resultado
+
+
+def carregar_indice() -> IndiceNomes:
+    """Lê os nomes dos produtos ativos e a versão do catálogo na mesma transação."""
+    with transaction() as conn:
+        versao = versao_produtos(conn)
+        nomes = [r[0] for r in conn.execute("SELECT nome_comercial FROM produtos WHERE ativo = 1")]
+    return IndiceNomes(nomes, versao)
@@ -0,0 +1,189 @@
+"""Fecho de caixa diário (relatório Z).
+
+``calcular_relatorio_z`` junta numa transação de leitura os totais do dia
+por operador e posto, os produtos vendidos, as devoluções e as saídas de
+caixa — cinco consultas por intervalo ``[dia, dia seguinte)`` servidas por
+índices, independentemente do número de vendas do dia. ``fechar_caixa``
+grava o resultado em ``fechos_caixa``/``fechos_caixa_operadores``
+(imutáveis) e ``relatorio_z`` devolve o relatório gravado, para que as
+consultas e auditorias posteriores não voltem a ler as vendas do dia.
+Depois do fecho, triggers rejeitam vendas e saídas com a data desse dia
+(como nos meses fechados), por isso o relatório gravado continua completo.
+"""
+import json
+import sys
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import transaction
+from src.utils.date_utils import filtro_periodo, intervalo_dia
+
+
+@dataclass(frozen=True)
+class RelatorioZ:
+    """Relatório de um dia de caixa (calculado ao vivo ou lido do fecho)."""
+
+    dia: str
+    total_vendas: float
+    num_vendas: int
+    num_itens: int
+    total_saidas: float
+    num_devolucoes: int
+    qtd_devolvida: int
+    # (produto, quantidade, valor), do mais vendido para o menos vendido
+    produtos: Tuple[Tuple[str, int, float], ...]
+    # (descrição, valor)
+    saidas: Tuple[Tuple[str, float], ...]
+    # (usuario_id, operador, terminal, num_vendas, num_itens, total)
+    operadores: Tuple[Tuple[Optional[int], Optional[str], Optional[str], int, int, float], ...]
+    # None enquanto o dia não está fechado
+    fechado_em: Optional[str] = None
+
+    @property
+    def saldo(self) -> float:
+        return self.total_vendas - self.total_saidas
+
+
+def calcular_relatorio_z(dia: str) -> RelatorioZ:
+    """Calcula o relatório Z do dia ``dia`` (yyyy-MM-dd) a partir das vendas."""
+    intervalo = intervalo_dia(dia)
+    vendas, params_vendas = filtro_periodo("v.data_venda", *intervalo)
+    saidas, params_saidas = filtro_periodo("data_transacao", *intervalo)
+    devolvidas, params_devolvidas = filtro_periodo("data_devolucao", *intervalo)
+
+    with transaction() as conn:
+        # itens de cada venda do dia (um só join), depois por operador e posto
+        operadores = conn.execute(
+            f"""
+            SELECT d.usuario_id, u.nome AS operador, d.terminal,
+                   COUNT(*) AS num_vendas,
+                   SUM(d.itens) AS num_itens,
+                   COALESCE(SUM(d.total), 0) AS total
+            FROM (
+                SELECT v.id, v.usuario_id, v.terminal, v.total,
+                       COALESCE(SUM(iv.quantidade), 0) AS itens
+                FROM vendas v
+                LEFT JOIN itens_venda iv ON iv.venda_id = v.id
+                WHERE {vendas}
+                GROUP BY v.id
+            ) d
+            LEFT JOIN usuarios u ON u.id = d.usuario_id
+            GROUP BY d.usuario_id, d.terminal
+            ORDER BY total DESC
+            """,
+            params_vendas,
+        ).fetchall()
+
+        produtos = conn.execute(
+            f"""
+            SELECT COALESCE(p.nome_comercial, '---') AS nome,
+                   SUM(iv.quantidade) AS qtd, SUM(iv.subtotal) AS subtotal
+            FROM vendas v
+            JOIN itens_venda iv ON iv.venda_id = v.id
+            LEFT JOIN produtos p ON p.id = iv.produto_id
+            WHERE {vendas}
+            GROUP BY iv.produto_id
+            ORDER BY qtd DESC
+            """,
+            params_vendas,
+        ).fetchall()
+
+        lista_saidas = conn.execute(
+            f"SELECT descricao, valor FROM transacoes_financeiras "
+            f"WHERE tipo = 'saida' AND {saidas} ORDER BY data_transacao DESC",
+            params_saidas,
+        ).fetchall()
+
+        devolucoes = conn.execute(
+            f"SELECT COUNT(*) AS num, COALESCE(SUM(quantidade), 0) AS qtd FROM devolucoes WHERE {devolvidas}",
+            params_devolvidas,
+        ).fetchone()
+
+    return RelatorioZ(
+        dia=dia,
+        total_vendas=float(sum(r['total'] for r in operadores)),
+        num_vendas=sum(r['num_vendas'] for r in operadores),
+        num_itens=int(sum(r['num_itens'] for r in operadores)),
+        total_saidas=float(sum(r['valor'] or 0 for r in lista_saidas)),
+        num_devolucoes=devolucoes['num'],
+        qtd_devolvida=devolucoes['qtd'],
+        produtos=tuple((r['nome'] or '-', int(r['qtd'] or 0), float(r['subtotal'] or 0)) for r in produtos),
+        saidas=tuple((r['descricao'] or '', float(r['valor'] or 0)) for r in lista_saidas),
+        operadores=tuple(
+            (r['usuario_id'], r['operador'], r['terminal'], r['num_vendas'], int(r['num_itens']), float(r['total']))
+            for r in operadores
+        ),
+    )
+
+
+def relatorio_z(dia: str) -> Optional[RelatorioZ]:
+    """Relatório Z gravado do dia ``dia``, ou ``None`` se o caixa não foi fechado."""
+    with transaction() as conn:
+        fecho = conn.execute("SELECT * FROM fechos_caixa WHERE dia = ?", (dia,)).fetchone()
+        if fecho is None:
+            return None
+        operadores = conn.execute(
+            "SELECT usuario_id, operador, terminal, num_vendas, num_itens, total "
+            "FROM fechos_caixa_operadores WHERE dia = ? ORDER BY total DESC",
+            (dia,),
+        ).fetchall()
+    return RelatorioZ(
+        dia=dia,
+        total_vendas=fecho['total_vendas'],
+        num_vendas=fecho['num_vendas'],
+        num_itens=fecho['num_itens'],
+        total_saidas=fecho['total_saidas'],
+        num_devolucoes=fecho['num_devolucoes'],
+        qtd_devolvida=fecho['qtd_devolvida'],
+        produtos=tuple(tuple(p) for p in json.loads(fecho['produtos'])),
+        saidas=tuple(tuple(s) for s in json.loads(fecho['saidas'])),
+        operadores=tuple(
+            (r['usuario_id'] or None, r['operador'], r['terminal'] or None,
+             r['num_vendas'], r['num_itens'], r['total'])
+            for r in operadores
+        ),
+        fechado_em=fecho['fechado_em'],
+    )
+
+
+def consultar_dia(dia: str) -> RelatorioZ:
+    """Relatório gravado se o dia estiver fechado; senão calculado ao vivo."""
+    return relatorio_z(dia) or calcular_relatorio_z(dia)
+
+
+def fechar_caixa(dia: str, usuario_id: Optional[int] = None, hoje: Optional[date] = None) -> RelatorioZ:
+    """Calcula e grava o relatório Z do dia ``dia``; cada dia fecha uma vez."""
+    if dia > (hoje or date.today()).isoformat():
+        raise ValueError(f"O dia {dia} ainda não começou")
+    with transaction(immediate=True) as conn:
+        if conn.execute("SELECT 1 FROM fechos_caixa WHERE dia = ?", (dia,)).fetchone():
+            raise ValueError(f"O caixa do dia {dia} já está fechado")
+        z = calcular_relatorio_z(dia)
+        conn.execute(
+            """
+            INSERT INTO fechos_caixa (dia, total_vendas, num_vendas, num_itens, total_saidas,
+                                      num_devolucoes, qtd_devolvida, produtos, saidas, fechado_por)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                dia, z.total_vendas, z.num_vendas, z.num_itens, z.total_saidas,
+                z.num_devolucoes, z.qtd_devolvida,
+                json.dumps(z.produtos, ensure_ascii=False),
+                json.dumps(z.saidas, ensure_ascii=False),
+                usuario_id,
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO fechos_caixa_operadores (dia, usuario_id, terminal, operador, num_vendas, num_itens, total) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(dia, uid or 0, terminal or "", operador, n, itens, total)
+             for uid, operador, terminal, n, itens, total in z.operadores],
+        )
+    return relatorio_z(dia)
@@ -0,0 +1,110 @@
+"""Dados da página inicial do dashboard numa única leitura.
+
+``carregar_dashboard`` lê os indicadores, a série de vendas dos últimos N
+dias e as listas de alertas dentro de uma só transação de leitura (todas as
+consultas veem o mesmo estado da base) e devolve um ``DashboardSnapshot``
+imutável. Os totais de vendas e a série vêm das tabelas agregadas
+``vendas_diarias``/``vendas_mensais`` (mantidas por triggers, ver
+``database.agregados``): o gráfico lê uma linha por dia da janela em vez de
+todas as vendas do intervalo. Os mais vendidos vêm de ``vendas_produtos`` e
+os lotes a caducar do índice parcial de ``lotes(validade)`` com stock.
+"""
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.agregados import mais_vendidos, total_vendas_dia, vendas_por_dia
+from database.db import transaction
+from src.utils.date_utils import intervalo_dias
+
+# Dias de antecedência para o alerta de validade
+DIAS_VALIDADE = 30
+# Margem acima do stock mínimo a partir da qual o produto entra nos alertas
+MARGEM_STOCK = 5
+LIMITE_LISTAS = 5
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Estado do dashboard num instante (só tuplos, não pode ser alterado)."""
+
+    total_vendas: float
+    produtos_stock: int
+    qtd_usuarios: int
+    vendas_hoje: float
+    # (nome, quantidade vendida)
+    top_products: Tuple[Tuple[str, int], ...]
+    # (nome, stock, stock_minimo)
+    low_stock: Tuple[Tuple[str, int, Optional[int]], ...]
+    # (produto, numero_lote, validade)
+    expiring: Tuple[Tuple[str, str, str], ...]
+    dates: Tuple[date, ...]
+    sales: Tuple[float, ...]
+    gerado_em: datetime
+
+
+def carregar_dashboard(dias: int = 7, hoje: Optional[date] = None) -> DashboardSnapshot:
+    """Lê todos os dados do dashboard numa transação de leitura."""
+    hoje = hoje or date.today()
+    inicio = hoje - timedelta(days=dias - 1)
+    # [início, amanhã) para a série; até hoje + DIAS_VALIDADE (inclusive) para a validade
+    serie = intervalo_dias(inicio, hoje)
+    _, limite_validade = intervalo_dias(hoje, hoje + timedelta(days=DIAS_VALIDADE))
+
+    with transaction() as conn:
+        kpis = conn.execute(
+            """
+            SELECT
+                (SELECT COALESCE(SUM(total), 0) FROM vendas_mensais) AS total_vendas,
+                (SELECT COALESCE(SUM(stock), 0) FROM produtos) AS produtos_stock,
+                (SELECT COUNT(*) FROM usuarios) AS qtd_usuarios
+            """
+        ).fetchone()
+        vendas_hoje = total_vendas_dia(conn, hoje.isoformat())
+        por_dia = vendas_por_dia(conn, *serie)
+
+        top = mais_vendidos(conn, LIMITE_LISTAS)
+
+        stock = conn.execute(
+            """
+            SELECT nome_comercial, stock, stock_minimo
+            FROM produtos
+            WHERE ativo = 1 AND stock IS NOT NULL AND stock <= COALESCE(stock_minimo, 0) + ?
+            ORDER BY stock ASC
+            LIMIT ?
+            """,
+            (MARGEM_STOCK, LIMITE_LISTAS),
+        ).fetchall()
+
+        validade = conn.execute(
+            """
+            SELECT p.nome_comercial AS produto, l.numero_lote, l.validade
+            FROM lotes l
+            LEFT JOIN produtos p ON p.id = l.produto_id
+            WHERE l.quantidade_atual > 0 AND l.validade < ?
+            ORDER BY l.validade ASC
+            LIMIT ?
+            """,
+            (limite_validade, LIMITE_LISTAS),
+        ).fetchall()
+
+    datas = tuple(inicio + timedelta(days=i) for i in range(dias))
+    return DashboardSnapshot(
+        total_vendas=float(kpis['total_vendas'] or 0),
+        produtos_stock=int(kpis['produtos_stock'] or 0),
+        qtd_usuarios=int(kpis['qtd_usuarios'] or 0),
+        vendas_hoje=float(vendas_hoje or 0),
+        top_products=tuple((nome or '---', int(vendido or 0)) for nome, vendido in top),
+        low_stock=tuple((r['nome_comercial'], r['stock'], r['stock_minimo']) for r in stock),
+        expiring=tuple((r['produto'], r['numero_lote'], r['validade']) for r in validade),
+        dates=datas,
+        sales=tuple(float(por_dia.get(d.isoformat()) or 0) for d in datas),
+        gerado_em=datetime.now(),
+    )
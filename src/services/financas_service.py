@@ -0,0 +1,162 @@
+"""Totais financeiros de um período a partir das tabelas agregadas.
+
+``totais_periodo`` devolve as vendas e as transações financeiras de
+``[início, fim)`` agrupadas por ``tipo`` e ``categoria``, lidas numa
+transação de leitura de ``vendas_*`` e ``financas_*`` (``database/agregados.py``):
+meses inteiros das tabelas mensais, dias soltos das diárias. O custo depende
+do número de dias do período, não do número de vendas ou transações.
+
+Um mês fechado com ``fechar_mes`` fica congelado em ``fechos_mensais``
+(triggers impedem alterar o fecho e as vendas/transações desse mês);
+``totais_mes``/``totais_meses`` leem os fechos e os meses ainda abertos de
+``vendas_mensais``/``financas_mensais`` — uma linha por mês e categoria.
+"""
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.agregados import financas_periodo, vendas_periodo
+from database.db import transaction
+from src.utils.date_utils import intervalo_mes
+
+# Categorias de saída (coluna transacoes_financeiras.categoria)
+CATEGORIAS_SAIDA = ["Transferência", "Compra Stock", "Uso Pessoal", "Passagem", "Salário", "Outro"]
+CATEGORIA_PADRAO = "Outro"
+
+# Tipo com que as vendas aparecem nos totais
+TIPO_VENDA = "venda"
+
+# {tipo: {categoria: total}}; entradas sem categoria ficam em ``None``
+Totais = Dict[str, Dict[Optional[str], float]]
+
+
+def totais_periodo(inicio: Optional[str] = None, fim: Optional[str] = None) -> Totais:
+    """Vendas e transações de ``inicio <= data < fim`` (yyyy-MM-dd) por tipo e categoria."""
+    totais: Totais = {}
+    with transaction() as conn:
+        vendas = vendas_periodo(conn, inicio, fim)
+        financas = financas_periodo(conn, inicio, fim)
+    if vendas:
+        totais[TIPO_VENDA] = {None: float(vendas)}
+    for (tipo, categoria), total in financas.items():
+        totais.setdefault(tipo, {})[categoria or None] = float(total)
+    return totais
+
+
+def total_tipo(totais: Totais, tipo: str) -> float:
+    """Soma de todas as categorias de ``tipo``."""
+    return sum(totais.get(tipo, {}).values())
+
+
+def totais_saida(totais: Totais) -> Dict[str, float]:
+    """Total de cada categoria de saída (0 nas que não tiveram movimentos)."""
+    saidas = totais.get("saida", {})
+    return {cat: saidas.get(cat, 0.0) for cat in CATEGORIAS_SAIDA}
+
+
+def resumo_balanco(totais: Totais) -> dict:
+    """Entradas, saídas por categoria e resultado a partir de ``totais``."""
+    vendas = total_tipo(totais, TIPO_VENDA)
+    kumbu = total_tipo(totais, "kumbu")
+    emprestimo = total_tipo(totais, "emprestimo")
+    total_entrada = vendas + kumbu + emprestimo
+    total_saida = total_tipo(totais, "saida")
+    return {
+        "vendas": vendas,
+        "kumbu": kumbu,
+        "emprestimo": emprestimo,
+        "total_entrada": total_entrada,
+        "saidas": totais_saida(totais),
+        "total_saida": total_saida,
+        "lucro": total_entrada - total_saida,
+    }
+
+
+# =========================================================
+# Fecho mensal
+# =========================================================
+def _mes(data: date) -> str:
+    return f"{data.year}-{data.month:02d}"
+
+
+def _ler_fechos(conn, inicio: str, fim: str) -> Dict[str, Totais]:
+    """Totais congelados dos meses fechados com ``inicio <= mes <= fim``."""
+    fechos: Dict[str, Totais] = {
+        mes: {} for (mes,) in conn.execute(
+            "SELECT mes FROM fechos_mensais WHERE mes >= ? AND mes <= ?", (inicio, fim)
+        )
+    }
+    for mes, tipo, categoria, total in conn.execute(
+        "SELECT mes, tipo, categoria, total FROM fechos_mensais_totais WHERE mes >= ? AND mes <= ?",
+        (inicio, fim),
+    ):
+        fechos[mes].setdefault(tipo, {})[categoria or None] = total
+    return fechos
+
+
+def _ler_abertos(conn, inicio: str, fim: str) -> Dict[str, Totais]:
+    """Totais de ``inicio <= mes <= fim`` lidos das tabelas agregadas mensais."""
+    abertos: Dict[str, Totais] = {}
+    for mes, tipo, categoria, total in conn.execute(
+        """
+        SELECT mes, ?, '', total FROM vendas_mensais WHERE mes >= ? AND mes <= ?
+        UNION ALL
+        SELECT mes, tipo, categoria, total FROM financas_mensais WHERE mes >= ? AND mes <= ?
+        """,
+        (TIPO_VENDA, inicio, fim, inicio, fim),
+    ):
+        abertos.setdefault(mes, {}).setdefault(tipo, {})[categoria or None] = float(total)
+    return abertos
+
+
+def fechar_mes(mes: str, hoje: Optional[date] = None) -> Totais:
+    """Congela os totais do mês ``mes`` (yyyy-MM); só meses já terminados."""
+    if mes >= _mes(hoje or date.today()):
+        raise ValueError(f"O mês {mes} ainda não terminou")
+    with transaction(immediate=True) as conn:
+        if conn.execute("SELECT 1 FROM fechos_mensais WHERE mes = ?", (mes,)).fetchone():
+            raise ValueError(f"O mês {mes} já está fechado")
+        totais = totais_periodo(*intervalo_mes(mes))
+        resumo = resumo_balanco(totais)
+        conn.execute(
+            "INSERT INTO fechos_mensais (mes, total_entrada, total_saida, lucro) VALUES (?, ?, ?, ?)",
+            (mes, resumo["total_entrada"], resumo["total_saida"], resumo["lucro"]),
+        )
+        conn.executemany(
+            "INSERT INTO fechos_mensais_totais (mes, tipo, categoria, total) VALUES (?, ?, ?, ?)",
+            [(mes, tipo, categoria or "", total)
+             for tipo, categorias in totais.items() for categoria, total in categorias.items()],
+        )
+    return totais
+
+
+def totais_mes(mes: str) -> Tuple[Totais, bool]:
+    """Totais do mês ``mes`` e se vêm de um fecho (``True``) ou do cálculo ao vivo."""
+    with transaction() as conn:
+        fecho = _ler_fechos(conn, mes, mes)
+        if mes in fecho:
+            return fecho[mes], True
+        return _ler_abertos(conn, mes, mes).get(mes, {}), False
+
+
+def totais_meses(inicio: str, fim: str) -> Dict[str, Totais]:
+    """Totais de cada mês de ``inicio`` a ``fim`` (yyyy-MM, inclusive).
+
+    Os meses fechados vêm dos fechos e os abertos das tabelas agregadas
+    mensais: uma linha por tipo/categoria e mês, seja qual for o volume.
+    """
+    ano, numero = (int(p) for p in inicio.split("-"))
+    meses = []
+    while f"{ano}-{numero:02d}" <= fim:
+        meses.append(f"{ano}-{numero:02d}")
+        ano, numero = (ano + 1, 1) if numero == 12 else (ano, numero + 1)
+    with transaction() as conn:
+        fechos = _ler_fechos(conn, inicio, fim)
+        abertos = _ler_abertos(conn, inicio, fim)
+    return {mes: fechos[mes] if mes in fechos else abertos.get(mes, {}) for mes in meses}
@@ -0,0 +1,98 @@
+"""Leitor de código de barras no ecrã de venda.
+
+Um leitor USB comporta-se como um teclado muito rápido: escreve o código
+inteiro em poucos milissegundos e termina com Enter. ``DetetorLeitor``
+distingue essas rajadas da escrita de uma pessoa pelo intervalo entre
+teclas. ``MapaCodigos`` resolve o código lido exatamente, num ``dict`` em
+memória carregado de ``produtos`` (com a ``versao_produtos`` da leitura,
+para a vista saber quando recarregar), sem consultar a base durante a
+venda.
+"""
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import transaction
+from database.pesquisa import versao_produtos
+
+# Intervalo máximo entre teclas (s) dentro de uma leitura
+INTERVALO_MAX_LEITOR = 0.03
+# Códigos mais curtos do que isto são tratados como texto escrito
+MINIMO_CARACTERES = 4
+# Objetivo de latência da leitura ao carrinho (ms)
+LATENCIA_ALVO_MS = 30.0
+
+
+@dataclass(frozen=True)
+class ProdutoLeitura:
+    id: int
+    nome: str
+    preco: float
+
+
+class MapaCodigos:
+    """``codigo_barras`` -> produto ativo."""
+
+    def __init__(self, linhas: Iterable[Tuple[str, int, str, float]], versao: int = 0):
+        self.versao = versao
+        self._produtos: Dict[str, ProdutoLeitura] = {
+            codigo.strip(): ProdutoLeitura(pid, nome, float(preco or 0))
+            for codigo, pid, nome, preco in linhas
+            if codigo and codigo.strip()
+        }
+
+    def __len__(self):
+        return len(self._produtos)
+
+    def procurar(self, codigo: str) -> Optional[ProdutoLeitura]:
+        return self._produtos.get(codigo.strip())
+
+
+def carregar_mapa_codigos() -> MapaCodigos:
+    """Lê os códigos de barras dos produtos ativos e a versão do catálogo."""
+    with transaction() as conn:
+        versao = versao_produtos(conn)
+        linhas = conn.execute(
+            "SELECT codigo_barras, id, nome_comercial, preco_venda FROM produtos "
+            "WHERE ativo = 1 AND codigo_barras IS NOT NULL AND codigo_barras != ''"
+        ).fetchall()
+    return MapaCodigos((tuple(r) for r in linhas), versao)
+
+
+class DetetorLeitor:
+    """Reconhece rajadas de teclas (leitor de código de barras) num campo de texto.
+
+    ``tecla`` é chamado a cada carácter escrito e ``e_leitura`` quando chega
+    o Enter; os instantes são em segundos (``time.perf_counter``).
+    """
+
+    def __init__(self, intervalo_max: float = INTERVALO_MAX_LEITOR, minimo: int = MINIMO_CARACTERES):
+        self.intervalo_max = intervalo_max
+        self.minimo = minimo
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._ultima: Optional[float] = None
+        self._teclas = 0
+
+    def tecla(self, instante: float):
+        if self._ultima is None or instante - self._ultima > self.intervalo_max:
+            # pausa: começa uma rajada nova
+            self._teclas = 0
+        self._teclas += 1
+        self._ultima = instante
+
+    def e_leitura(self, texto: str, instante: float) -> bool:
+        """``True`` se ``texto`` foi todo escrito numa rajada terminada agora."""
+        return (
+            self._ultima is not None
+            and instante - self._ultima <= self.intervalo_max
+            and len(texto) >= self.minimo
+            and self._teclas >= len(texto)
+        )
@@ -1,4 +1,162 @@
-def processar_venda(itens, usuario_id):
-    """Processa uma venda: calcula total e regista."""
+"""Registo de vendas com alocação de lotes por validade (FEFO).
+
+``processar_venda`` é o motor usado pelo ecrã de venda e pode correr sem
+interface (testes, benchmarks). Numa única transação ``BEGIN IMMEDIATE``:
+lê de uma vez todos os lotes candidatos dos produtos do carrinho, distribui
+as quantidades em memória pelo lote de validade mais próxima e grava todas
+as linhas com ``executemany``. O número de instruções não depende do
+tamanho do carrinho nem da fragmentação dos lotes.
+"""
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import transaction
+from src.config.settings import TERMINAL
+
+
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+def alocar_lotes(itens: List[Dict[str, Any]], lotes: List[Dict[str, Any]]):
+    """Distribui as quantidades do carrinho pelos lotes disponíveis.
+
+    ``lotes`` deve vir ordenado por produto e validade (o primeiro de cada
+    produto é o que expira primeiro). Devolve ``(linhas, consumo)``: as
+    linhas de ``itens_venda`` como tuplas ``(produto_id, lote_id, quantidade,
+    preco_unitario, subtotal)`` e o total retirado de cada lote. A parte
+    sem stock em lotes fica numa linha com ``lote_id`` a ``None``.
+    """
+    por_produto: Dict[int, List[List[int]]] = {}
+    for lote in lotes:
+        por_produto.setdefault(lote["produto_id"], []).append([lote["id"], lote["quantidade_atual"]])
+
+    linhas = []
+    consumo: Dict[int, int] = {}
+    for item in itens:
+        produto_id = item["produto_id"]
+        preco = float(item["preco_unitario"])
+        restante = int(item["quantidade"])
+        for lote in por_produto.get(produto_id, []):
+            if restante <= 0:
+                break
+            lote_id, disponivel = lote
+            if disponivel <= 0:
+                continue
+            usar = min(restante, disponivel)
+            lote[1] -= usar
+            consumo[lote_id] = consumo.get(lote_id, 0) + usar
+            linhas.append((produto_id, lote_id, usar, preco, usar * preco))
+            restante -= usar
+        if restante > 0:
+            linhas.append((produto_id, None, restante, preco, restante * preco))
+    return linhas, consumo
+
+
+def processar_venda(itens, usuario_id=None, comprador_nome=None, terminal=None):
+    """Processa uma venda: aloca lotes, atualiza stock e regista.
+
+    Args:
+        itens: lista de dicts com ``produto_id``, ``quantidade`` e
+            ``preco_unitario``.
+        usuario_id: utilizador que fez a venda (opcional).
+        comprador_nome: se indicado, grava também o ``historico_compra``.
+        terminal: posto de venda (por defeito ``settings.TERMINAL``).
+
+    Returns:
+        Dict com ``venda_id``, ``total``, ``itens`` (com ``produto_nome``),
+        ``usuario_id`` e ``historico_id``.
+    """
+    if not itens:
+        raise ValueError("A venda não tem itens")
+
     total = sum(i['quantidade'] * i['preco_unitario'] for i in itens)
-    return {'total': total, 'itens': itens, 'usuario_id': usuario_id}
+    produto_ids = sorted({i['produto_id'] for i in itens})
+    marcadores = _placeholders(len(produto_ids))
+
+    with transaction(immediate=True) as conn:
+        cur = conn.cursor()
+
+        cur.execute(
+            f"SELECT id, nome_comercial FROM produtos WHERE id IN ({marcadores})",
+            produto_ids
+        )
+        nomes = {r[0]: r[1] for r in cur.fetchall()}
+
+        # lotes sem validade ficam para o fim
+        cur.execute(
+            f"""
+            SELECT id, produto_id, quantidade_atual
+            FROM lotes
+            WHERE produto_id IN ({marcadores}) AND quantidade_atual > 0 AND ativo = 1
+            ORDER BY produto_id, validade IS NULL, validade, id
+            """,
+            produto_ids
+        )
+        lotes = [{'id': r[0], 'produto_id': r[1], 'quantidade_atual': r[2]} for r in cur.fetchall()]
+
+        linhas, consumo = alocar_lotes(itens, lotes)
+
+        cur.execute(
+            "INSERT INTO vendas (usuario_id, total, terminal) VALUES (?, ?, ?)",
+            (usuario_id, total, terminal or TERMINAL)
+        )
+        venda_id = cur.lastrowid
+
+        cur.executemany(
+            "INSERT INTO itens_venda (venda_id, produto_id, lote_id, quantidade, preco_unitario, subtotal) VALUES (?, ?, ?, ?, ?, ?)",
+            [(venda_id,) + linha for linha in linhas]
+        )
+        cur.executemany(
+            "UPDATE lotes SET quantidade_atual = quantidade_atual - ? WHERE id = ?",
+            [(qtd, lote_id) for lote_id, qtd in consumo.items()]
+        )
+        vendido: Dict[int, int] = {}
+        for i in itens:
+            vendido[i['produto_id']] = vendido.get(i['produto_id'], 0) + int(i['quantidade'])
+        cur.executemany(
+            "UPDATE produtos SET stock = COALESCE(stock,0) - ? WHERE id = ?",
+            [(qtd, pid) for pid, qtd in vendido.items()]
+        )
+
+        itens_historico = [
+            {
+                "produto_id": i['produto_id'],
+                "produto_nome": nomes.get(i['produto_id']),
+                "quantidade": int(i['quantidade']),
+                "preco_unitario": float(i['preco_unitario']),
+            }
+            for i in itens
+        ]
+
+        historico_id = None
+        if comprador_nome:
+            cur.execute(
+                "INSERT INTO historico_compra (venda_id, comprador_nome, produtos_comprados, quantidade_total) VALUES (?, ?, ?, ?)",
+                (
+                    venda_id,
+                    comprador_nome,
+                    json.dumps(itens_historico, ensure_ascii=False),
+                    sum(i['quantidade'] for i in itens_historico),
+                )
+            )
+            historico_id = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO historico_compra_itens (historico_compra_id, produto_id, quantidade, preco_unitario) VALUES (?, ?, ?, ?)",
+                [(historico_id, i['produto_id'], i['quantidade'], i['preco_unitario']) for i in itens_historico]
+            )
+
+    return {
+        'venda_id': venda_id,
+        'total': total,
+        'itens': itens_historico,
+        'usuario_id': usuario_id,
+        'historico_id': historico_id,
+    }
@@ -6,10 +6,16 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QColor
 import sys
-import sqlite3
 from pathlib import Path
 import logging
 
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import get_connection, resolve_db_path
+
 # logging para debug de login (arquivo local)
 logger = logging.getLogger('kamba.login')
 if not logger.handlers:
@@ -558,24 +564,10 @@ class LoginWindow(QMainWindow):
 
         # Se não for usuário local, tentar autenticar contra a base de dados
         if not user:
-            # resolver caminho do DB a partir de config, fallback para busca
-            try:
-                from config.settings import DB_FILE
-                db_path = DB_FILE
-            except Exception:
-                # subir até encontrar pasta `database`
-                file_path = Path(__file__).resolve()
-                _ROOT = file_path
-                for _ in range(8):
-                    if (_ROOT / 'database').exists():
-                        break
-                    _ROOT = _ROOT.parent
-                db_path = _ROOT / 'database' / 'kamba_farma.db'
+            db_path = resolve_db_path()
 
             try:
-                conn = sqlite3.connect(str(db_path))
-                conn.row_factory = sqlite3.Row
-                cur = conn.cursor()
+                cur = get_connection().cursor()
                 logger.debug("Login attempt username=%r db_path=%s", username, db_path)
                 cur.execute("SELECT id, nome, senha_hash, perfil, ativo FROM usuarios WHERE nome = ? COLLATE NOCASE LIMIT 1", (username,))
                 row = cur.fetchone()
@@ -583,7 +575,6 @@ class LoginWindow(QMainWindow):
                     # Fallback: allow entering 'admin' to match perfil='admin'
                     cur.execute("SELECT id, nome, senha_hash, perfil, ativo FROM usuarios WHERE perfil = ? COLLATE NOCASE LIMIT 1", (username,))
                     row = cur.fetchone()
-                conn.close()
 
                 if not row:
                     logger.debug("User not found (by name or profile): %r", username)
@@ -0,0 +1,174 @@
+"""Carregamento de dados em segundo plano para as vistas Qt.
+
+``AsyncLoader`` executa funções de leitura num ``QThreadPool`` e devolve o
+resultado à thread da interface através de sinais. Cada thread do pool usa
+a sua própria ligação (``database.db.get_connection`` é por thread), por isso
+as funções de dados existentes podem ser usadas sem alterações.
+
+Só o pedido mais recente de cada loader é entregue: ao lançar um pedido novo
+o anterior é cancelado e, se ainda assim terminar, o resultado é descartado.
+As funções correm dentro de ``database.db.query_guard``, por isso cancelar
+aborta a consulta em curso em poucos milissegundos e cada pedido respeita o
+tempo máximo de consulta (``budget``).
+"""
+import sys
+from pathlib import Path
+
+from PyQt5.QtCore import QEvent, QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtWidgets import QProgressDialog
+
+# Ensure project root is on sys.path so `database` is importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import CancelToken, QueryCancelled, query_guard
+
+
+class _Sinais(QObject):
+    loaded = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+
+
+class _Tarefa(QRunnable):
+    def __init__(self, pedido, funcao, args, kwargs, token, budget):
+        super().__init__()
+        self.pedido = pedido
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.token = token
+        self.budget = budget
+        self.sinais = _Sinais()
+
+    def run(self):
+        if self.token.cancelled:
+            self.sinais.cancelled.emit(self.pedido)
+            return
+        try:
+            with query_guard(self.token, self.budget):
+                resultado = self.funcao(*self.args, **self.kwargs)
+        except QueryCancelled:
+            self.sinais.cancelled.emit(self.pedido)
+        except Exception as e:
+            self.sinais.failed.emit(self.pedido, str(e))
+        else:
+            if self.token.cancelled:
+                self.sinais.cancelled.emit(self.pedido)
+            else:
+                self.sinais.loaded.emit(self.pedido, resultado)
+
+
+class AsyncLoader(QObject):
+    """Executa uma função de dados fora da thread da interface.
+
+    Uso típico numa vista::
+
+        self._loader = AsyncLoader(self)
+        self._loader.loaded.connect(self._aplicar_dados)
+        self._loader.run(consultar_dados, filtro)
+
+    ``loaded``/``failed``/``cancelled`` só são emitidos para o pedido mais
+    recente; ``finished`` é emitido sempre que esse pedido termina. ``budget``
+    é o tempo máximo de consulta de cada pedido (por omissão o global de
+    ``database.db.set_query_budget``).
+    """
+
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None, pool: QThreadPool = None, budget=...):
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self.budget = budget
+        self._pedido = 0
+        self._token = None
+        self._recarregar = None
+        self._interrompido = False
+        # referências Python até o worker terminar (o PyQt não as mantém)
+        self._tarefas = {}
+
+    @property
+    def busy(self) -> bool:
+        return self._token is not None
+
+    def run(self, funcao, *args, **kwargs) -> int:
+        """Lança ``funcao(*args, **kwargs)`` e descarta o pedido anterior."""
+        if self._token is not None:
+            self._token.cancel()
+        self._pedido += 1
+        self._token = CancelToken()
+        tarefa = _Tarefa(self._pedido, funcao, args, kwargs, self._token, self.budget)
+        tarefa.sinais.loaded.connect(self._on_loaded)
+        tarefa.sinais.failed.connect(self._on_failed)
+        tarefa.sinais.cancelled.connect(self._on_cancelled)
+        self._tarefas[self._pedido] = tarefa
+        self._pool.start(tarefa)
+        return self._pedido
+
+    def cancel(self):
+        """Cancela o pedido em curso (o resultado deixa de ser entregue)."""
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+            self.cancelled.emit()
+            self.finished.emit()
+
+    def attach_progress(self, dialog: QProgressDialog):
+        """Liga o botão Cancelar do diálogo ao pedido em curso e fecha-o no fim."""
+        dialog.canceled.connect(self.cancel)
+        self.finished.connect(dialog.close)
+        return dialog
+
+    def progress_dialog(self, parent, texto: str) -> QProgressDialog:
+        """Cria e mostra um ``QProgressDialog`` indeterminado ligado ao loader."""
+        dialog = QProgressDialog(texto, "Cancelar", 0, 0, parent)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        self.attach_progress(dialog)
+        dialog.show()
+        return dialog
+
+    def cancel_on_hide(self, widget, recarregar):
+        """Cancela o pedido quando ``widget`` deixa de estar visível.
+
+        Se um carregamento foi interrompido assim, ``recarregar()`` é chamado
+        quando o widget voltar a ser mostrado.
+        """
+        self._recarregar = recarregar
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Hide and self.busy:
+            self._interrompido = True
+            self.cancel()
+        elif event.type() == QEvent.Show and self._interrompido:
+            self._interrompido = False
+            self._recarregar()
+        return False
+
+    # --- entrega na thread da interface ---
+    def _concluir(self, pedido) -> bool:
+        self._tarefas.pop(pedido, None)
+        if pedido != self._pedido or self._token is None:
+            return False  # pedido antigo ou já cancelado
+        self._token = None
+        return True
+
+    def _on_loaded(self, pedido, resultado):
+        if self._concluir(pedido):
+            self.loaded.emit(resultado)
+            self.finished.emit()
+
+    def _on_failed(self, pedido, mensagem):
+        if self._concluir(pedido):
+            self.failed.emit(mensagem)
+            self.finished.emit()
+
+    def _on_cancelled(self, pedido):
+        if self._concluir(pedido):
+            self.cancelled.emit()
+            self.finished.emit()
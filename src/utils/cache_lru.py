@@ -0,0 +1,50 @@
+"""Cache LRU limitada pelo total de bytes dos valores guardados.
+
+Cada entrada tem um custo (em bytes) indicado por quem a guarda; quando a
+soma ultrapassa o limite saem as entradas usadas há mais tempo. Não depende
+do Qt: a cache de miniaturas (``src/utils/miniaturas.py``) guarda nela
+``QPixmap`` com o custo do seu tamanho em memória.
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheLRU:
+    def __init__(self, limite_bytes: int):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, chave):
+        return chave in self._entradas
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """Valor de ``chave`` (marcado como usado agora), ou ``None``."""
+        entrada = self._entradas.get(chave)
+        if entrada is None:
+            return None
+        self._entradas.move_to_end(chave)
+        return entrada[0]
+
+    def guardar(self, chave: Hashable, valor: Any, custo: int):
+        """Guarda ``valor``; um valor maior do que o limite não é guardado."""
+        self.remover(chave)
+        if custo > self.limite_bytes:
+            return
+        self._entradas[chave] = (valor, custo)
+        self.bytes += custo
+        while self.bytes > self.limite_bytes:
+            _, (_, custo_antigo) = self._entradas.popitem(last=False)
+            self.bytes -= custo_antigo
+
+    def remover(self, chave: Hashable):
+        entrada = self._entradas.pop(chave, None)
+        if entrada is not None:
+            self.bytes -= entrada[1]
+
+    def limpar(self):
+        self._entradas.clear()
+        self.bytes = 0
@@ -0,0 +1,396 @@
+"""Gráficos leves desenhados com QPainter: linha, barras e pizza.
+
+Substituem os ``FigureCanvas`` do matplotlib no dashboard e podem ser usados
+em qualquer página (finanças, relatórios, ...). A geometria fica em cache e
+só é recalculada quando os dados mudam:
+
+* ``LineChart`` guarda a série num ``QPainterPath`` em coordenadas de dados
+  (x = índice, y = valor) e converte-a para o ecrã com uma ``QTransform`` ao
+  desenhar, por isso redimensionar não reconstrói o caminho e acrescentar um
+  ponto apenas o prolonga. Séries longas são reduzidas com LTTB
+  (``src.utils.series.lttb``) para cerca de um ponto por cada dois pixels.
+* ``BarChart`` guarda os retângulos das barras para o tamanho atual;
+  ``set_value`` recalcula e redesenha apenas a barra alterada.
+* ``PieChart`` guarda os ângulos das fatias, recalculados só com dados novos.
+
+Chamar ``set_data`` com os mesmos dados não provoca nenhum redesenho.
+"""
+import math
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPainterPath, QPen, QTransform
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+# Ensure project root is on sys.path so `src` is importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.config.colors import (
+    ACCENT_COLOR, DARK_GRAY, PRIMARY_COLOR, PRIMARY_DARK, SECONDARY_COLOR, WHITE,
+)
+from src.utils.series import lttb
+
+BACKGROUND = "#FAFAFA"
+GRID_COLOR = "#B0BEC5"
+PALETTE = [PRIMARY_COLOR, "#FF9800", "#2196F3", PRIMARY_DARK, SECONDARY_COLOR, ACCENT_COLOR, GRID_COLOR]
+
+# Séries com mais pontos do que isto não desenham marcadores
+MAX_MARKERS = 40
+
+
+def format_compact(valor: float) -> str:
+    """Valor curto para os eixos (1.2M, 45k, 950)."""
+    absoluto = abs(valor)
+    if absoluto >= 1_000_000:
+        return f"{valor / 1_000_000:.1f}M"
+    if absoluto >= 1_000:
+        return f"{valor / 1_000:.0f}k"
+    return f"{valor:.0f}"
+
+
+def _nice_ceiling(valor: float) -> float:
+    """Arredonda ``valor`` para cima para 1, 2, 2.5 ou 5 x 10^n (escala do eixo)."""
+    if valor <= 0:
+        return 1.0
+    potencia = 10 ** math.floor(math.log10(valor))
+    for passo in (1, 2, 2.5, 5, 10):
+        if valor <= passo * potencia:
+            return passo * potencia
+    return 10 * potencia
+
+
+class _Chart(QWidget):
+    """Base comum: título, fundo, grelha horizontal e eixo Y."""
+
+    GRID_LINES = 4
+
+    def __init__(self, parent=None, title: str = ""):
+        super().__init__(parent)
+        self._title = title
+        self._title_font = QFont()
+        self._title_font.setPointSize(10)
+        self._title_font.setBold(True)
+        self._axis_font = QFont()
+        self._axis_font.setPointSize(8)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def setTitle(self, title: str):
+        if title != self._title:
+            self._title = title
+            self.update()
+
+    def _begin(self, painter: QPainter) -> QRectF:
+        """Desenha fundo e título; devolve a área disponível para o gráfico."""
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QColor(BACKGROUND))
+        area = QRectF(self.rect()).adjusted(10, 8, -10, -8)
+        if self._title:
+            painter.setFont(self._title_font)
+            painter.setPen(QColor(DARK_GRAY))
+            altura = QFontMetrics(self._title_font).height()
+            painter.drawText(QRectF(area.left(), area.top(), area.width(), altura),
+                             Qt.AlignHCenter | Qt.AlignVCenter, self._title)
+            area.setTop(area.top() + altura + 8)
+        return area
+
+    def _draw_empty(self, painter: QPainter, area: QRectF):
+        painter.setFont(self._axis_font)
+        painter.setPen(QColor(GRID_COLOR))
+        painter.drawText(area, Qt.AlignCenter, "Sem dados")
+
+    def _plot_rect(self, area: QRectF, ymax: float) -> QRectF:
+        """Área do gráfico, descontando as margens dos rótulos dos eixos."""
+        fm = QFontMetrics(self._axis_font)
+        esquerda = fm.horizontalAdvance(format_compact(ymax)) + 8
+        return area.adjusted(esquerda, 4, -4, -(fm.height() + 6))
+
+    def _draw_grid(self, painter: QPainter, plot: QRectF, ymin: float, ymax: float):
+        fm = QFontMetrics(self._axis_font)
+        painter.setFont(self._axis_font)
+        pen = QPen(QColor(GRID_COLOR), 1, Qt.DashLine)
+        pen.setCosmetic(True)
+        for i in range(self.GRID_LINES + 1):
+            valor = ymin + (ymax - ymin) * i / self.GRID_LINES
+            y = plot.bottom() - plot.height() * i / self.GRID_LINES
+            painter.setPen(pen)
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(QColor(DARK_GRAY))
+            painter.drawText(QRectF(0, y - fm.height() / 2, plot.left() - 4, fm.height()),
+                             Qt.AlignRight | Qt.AlignVCenter, format_compact(valor))
+
+    def _draw_x_labels(self, painter: QPainter, labels: Sequence[str], xs: Sequence[float], y: float):
+        """Rótulos do eixo X, saltando os que não cabem."""
+        if not labels:
+            return
+        fm = QFontMetrics(self._axis_font)
+        largura = max(fm.horizontalAdvance(str(l)) for l in labels) + 8
+        espaco = (xs[-1] - xs[0]) / max(len(xs) - 1, 1) if len(xs) > 1 else largura
+        passo = max(1, math.ceil(largura / max(espaco, 1)))
+        painter.setFont(self._axis_font)
+        painter.setPen(QColor(DARK_GRAY))
+        for i in range(0, len(labels), passo):
+            painter.drawText(QRectF(xs[i] - largura / 2, y + 4, largura, fm.height()),
+                             Qt.AlignHCenter | Qt.AlignTop, str(labels[i]))
+
+
+class LineChart(_Chart):
+    """Gráfico de linha com área preenchida, para séries temporais."""
+
+    def __init__(self, parent=None, title: str = "", color: str = PRIMARY_COLOR):
+        super().__init__(parent, title)
+        self.setMinimumHeight(200)
+        self._color = QColor(color)
+        self._labels: List[str] = []
+        self._values: List[float] = []
+        self._path: Optional[QPainterPath] = None
+        self._points: List[tuple] = []   # pontos desenhados (x = índice original)
+        self._threshold = 0                # limiar LTTB usado para construir o caminho
+
+    def set_data(self, labels: Sequence, values: Sequence[float], title: Optional[str] = None):
+        """Substitui a série; se só forem acrescentados pontos, prolonga o caminho."""
+        if title is not None:
+            self.setTitle(title)
+        labels = [str(l) for l in labels]
+        values = [float(v or 0) for v in values]
+        antigos = len(self._values)
+        if labels[:antigos] == self._labels and values[:antigos] == self._values:
+            for label, value in zip(labels[antigos:], values[antigos:]):
+                self.append_point(label, value)
+            return
+        self._labels = labels
+        self._values = values
+        self._path = None
+        self.update()
+
+    def append_point(self, label, value: float, max_points: Optional[int] = None):
+        """Acrescenta um ponto no fim (descartando os mais antigos acima de ``max_points``)."""
+        self._labels.append(str(label))
+        self._values.append(float(value or 0))
+        if max_points is not None and len(self._values) > max_points:
+            del self._labels[:-max_points]
+            del self._values[:-max_points]
+            self._path = None
+        elif self._path is not None and len(self._points) == len(self._values) - 1 \
+                and len(self._values) <= self._threshold:
+            # série sem redução: basta prolongar o caminho em cache
+            ponto = (len(self._values) - 1, self._values[-1])
+            self._path.lineTo(*ponto)
+            self._points.append(ponto)
+        else:
+            self._path = None
+        self.update()
+
+    def clear(self):
+        self.set_data([], [])
+
+    def _build_path(self, threshold: int):
+        pontos = lttb(list(enumerate(self._values)), threshold)
+        caminho = QPainterPath()
+        caminho.moveTo(*pontos[0])
+        for ponto in pontos[1:]:
+            caminho.lineTo(*ponto)
+        self._points = pontos
+        self._path = caminho
+        self._threshold = threshold
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        area = self._begin(painter)
+        if not self._values:
+            self._draw_empty(painter, area)
+            return
+
+        ymin = min(0.0, min(self._values))
+        ymax = _nice_ceiling(max(self._values))
+        plot = self._plot_rect(area, ymax)
+        if plot.width() <= 0 or plot.height() <= 0:
+            return
+
+        threshold = max(3, int(plot.width() / 2))
+        if self._path is None or (len(self._values) > min(threshold, self._threshold)
+                                  and threshold != self._threshold):
+            self._build_path(threshold)
+
+        self._draw_grid(painter, plot, ymin, ymax)
+
+        n = len(self._values)
+        sx = plot.width() / (n - 1) if n > 1 else 0.0
+        sy = -plot.height() / (ymax - ymin)
+        dx = plot.left() if n > 1 else plot.center().x()
+        transform = QTransform(sx, 0, 0, sy, dx, plot.bottom() - sy * ymin)
+
+        # área sob a linha (fechada sobre o eixo) e linha, em coordenadas de dados
+        ultimo_x = self._points[-1][0]
+        preenchimento = QPainterPath(self._path)
+        preenchimento.lineTo(ultimo_x, ymin)
+        preenchimento.lineTo(self._points[0][0], ymin)
+        preenchimento.closeSubpath()
+        fundo = QColor(self._color)
+        fundo.setAlphaF(0.12)
+
+        painter.save()
+        painter.setTransform(transform, True)
+        painter.fillPath(preenchimento, fundo)
+        pen = QPen(self._color, 2.5)
+        pen.setCosmetic(True)
+        pen.setJoinStyle(Qt.RoundJoin)
+        painter.setPen(pen)
+        painter.drawPath(self._path)
+        painter.restore()
+
+        if len(self._points) <= MAX_MARKERS:
+            painter.setPen(QPen(self._color, 2))
+            painter.setBrush(QColor(WHITE))
+            for ponto in self._points:
+                painter.drawEllipse(transform.map(QPointF(*ponto)), 3.5, 3.5)
+
+        xs = [transform.map(QPointF(i, ymin)).x() for i in range(n)]
+        self._draw_x_labels(painter, self._labels, xs, plot.bottom())
+
+
+class BarChart(_Chart):
+    """Gráfico de barras verticais (uma cor por barra, ciclando a paleta)."""
+
+    def __init__(self, parent=None, title: str = "", colors: Sequence[str] = None):
+        super().__init__(parent, title)
+        self.setMinimumHeight(180)
+        self._colors = [QColor(c) for c in (colors or PALETTE)]
+        self._labels: List[str] = []
+        self._values: List[float] = []
+        self._bars: List[QRectF] = []
+        self._geometry_key = None
+        self._plot = QRectF()
+        self._ymax = 1.0
+
+    def set_data(self, labels: Sequence, values: Sequence[float], title: Optional[str] = None):
+        if title is not None:
+            self.setTitle(title)
+        labels = [str(l) for l in labels]
+        values = [float(v or 0) for v in values]
+        if labels == self._labels and values == self._values:
+            return
+        self._labels = labels
+        self._values = values
+        self._geometry_key = None
+        self.update()
+
+    def set_value(self, index: int, value: float):
+        """Altera uma barra; se a escala não mudar só essa barra é redesenhada."""
+        value = float(value or 0)
+        if self._values[index] == value:
+            return
+        self._values[index] = value
+        if self._geometry_key is None or _nice_ceiling(max(self._values)) != self._ymax:
+            self._geometry_key = None
+            self.update()
+            return
+        antiga = self._bars[index]
+        self._bars[index] = self._bar_rect(index)
+        self.update(antiga.united(self._bars[index]).toAlignedRect().adjusted(-2, -2, 2, 2))
+
+    def _bar_rect(self, index: int) -> QRectF:
+        largura = self._plot.width() / len(self._values)
+        altura = self._plot.height() * max(self._values[index], 0) / self._ymax
+        margem = largura * 0.2
+        return QRectF(self._plot.left() + index * largura + margem, self._plot.bottom() - altura,
+                      largura - 2 * margem, altura)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        area = self._begin(painter)
+        if not self._values:
+            self._draw_empty(painter, area)
+            return
+
+        chave = (self.width(), self.height(), len(self._values), self._title)
+        if chave != self._geometry_key:
+            self._ymax = _nice_ceiling(max(self._values))
+            self._plot = self._plot_rect(area, self._ymax)
+            self._bars = [self._bar_rect(i) for i in range(len(self._values))]
+            self._geometry_key = chave
+
+        self._draw_grid(painter, self._plot, 0.0, self._ymax)
+        painter.setPen(Qt.NoPen)
+        for i, barra in enumerate(self._bars):
+            if barra.intersects(QRectF(event.rect())):
+                painter.setBrush(self._colors[i % len(self._colors)])
+                painter.drawRoundedRect(barra, 3, 3)
+        self._draw_x_labels(painter, self._labels, [b.center().x() for b in self._bars],
+                            self._plot.bottom())
+
+
+class PieChart(_Chart):
+    """Gráfico de pizza com percentagens e legenda."""
+
+    def __init__(self, parent=None, title: str = "", colors: Sequence[str] = None):
+        super().__init__(parent, title)
+        self.setMinimumSize(200, 200)
+        self._colors = [QColor(c) for c in (colors or PALETTE)]
+        self._labels: List[str] = []
+        self._values: List[float] = []
+        self._slices = []   # (início, extensão) em 1/16 de grau, percentagem
+
+    def set_data(self, labels: Sequence, values: Sequence[float], title: Optional[str] = None):
+        if title is not None:
+            self.setTitle(title)
+        labels = [str(l) for l in labels]
+        values = [max(float(v or 0), 0.0) for v in values]
+        if labels == self._labels and values == self._values:
+            return
+        self._labels = labels
+        self._values = values
+        total = sum(values)
+        self._slices = []
+        inicio = 90 * 16
+        for value in values:
+            extensao = -round(5760 * value / total) if total else 0
+            self._slices.append((inicio, extensao, value / total if total else 0.0))
+            inicio += extensao
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        area = self._begin(painter)
+        if not any(self._values):
+            self._draw_empty(painter, area)
+            return
+
+        fm = QFontMetrics(self._axis_font)
+        legenda = area.width() > area.height() * 1.3
+        largura_legenda = (max(fm.horizontalAdvance(l) for l in self._labels) + 24) if legenda else 0
+        lado = min(area.width() - largura_legenda, area.height())
+        circulo = QRectF(area.left() + (area.width() - largura_legenda - lado) / 2,
+                         area.top() + (area.height() - lado) / 2, lado, lado)
+
+        painter.setPen(QPen(QColor(WHITE), 1.5))
+        for i, (inicio, extensao, _) in enumerate(self._slices):
+            painter.setBrush(self._colors[i % len(self._colors)])
+            painter.drawPie(circulo, inicio, extensao)
+
+        painter.setFont(self._axis_font)
+        painter.setPen(QColor(DARK_GRAY))
+        raio = lado * 0.32
+        for inicio, extensao, fracao in self._slices:
+            if abs(extensao) < 15 * 16:
+                continue
+            angulo = math.radians((inicio + extensao / 2) / 16)
+            centro = QPointF(circulo.center().x() + raio * math.cos(angulo),
+                             circulo.center().y() - raio * math.sin(angulo))
+            painter.drawText(QRectF(centro.x() - 30, centro.y() - 10, 60, 20),
+                             Qt.AlignCenter, f"{fracao:.1%}")
+
+        if legenda:
+            y = area.top() + (area.height() - len(self._labels) * (fm.height() + 4)) / 2
+            x = area.right() - largura_legenda + 8
+            for i, label in enumerate(self._labels):
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(self._colors[i % len(self._colors)])
+                painter.drawRect(QRectF(x, y + 2, 10, fm.height() - 4))
+                painter.setPen(QColor(DARK_GRAY))
+                painter.drawText(QPointF(x + 16, y + fm.ascent()), label)
+                y += fm.height() + 4
@@ -1,6 +1,69 @@
-from datetime import date
+"""Datas e períodos dos relatórios.
+
+Os filtros por período usam sempre intervalos semiabertos
+``coluna >= início AND coluna < fim`` sobre o valor guardado (texto ISO
+``yyyy-MM-dd[ HH:MM:SS]``), nunca ``DATE(coluna)``/``strftime(...)``: com a
+coluna "nua" o SQLite pode usar os índices (``idx_vendas_data``,
+``idx_transacoes_tipo_data``, ``idx_lotes_produto_validade``) numa pesquisa
+por intervalo em vez de ler a tabela toda.
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple, Union
+
+# (início inclusivo, fim exclusivo) em yyyy-MM-dd
+Intervalo = Tuple[str, str]
+Dia = Union[date, str]
+
 
 def dias_para_validade(data_validade: date) -> int:
     if data_validade is None:
         return 99999
     return (data_validade - date.today()).days
+
+
+def _para_data(dia: Dia) -> date:
+    if isinstance(dia, datetime):
+        return dia.date()
+    if isinstance(dia, date):
+        return dia
+    return date.fromisoformat(str(dia)[:10])
+
+
+def intervalo_dias(inicio: Dia, fim: Dia) -> Intervalo:
+    """Do dia ``inicio`` ao dia ``fim``, ambos incluídos."""
+    return _para_data(inicio).isoformat(), (_para_data(fim) + timedelta(days=1)).isoformat()
+
+
+def intervalo_dia(dia: Dia) -> Intervalo:
+    """O dia ``dia`` (``date`` ou yyyy-MM-dd)."""
+    return intervalo_dias(dia, dia)
+
+
+def intervalo_mes(mes: Union[date, str]) -> Intervalo:
+    """O mês ``mes`` (``date`` de qualquer dia do mês ou yyyy-MM)."""
+    if isinstance(mes, date):
+        ano, numero = mes.year, mes.month
+    else:
+        ano, numero = (int(p) for p in str(mes)[:7].split('-'))
+    seguinte = date(ano + 1, 1, 1) if numero == 12 else date(ano, numero + 1, 1)
+    return date(ano, numero, 1).isoformat(), seguinte.isoformat()
+
+
+def intervalo_ano(ano: int) -> Intervalo:
+    return date(ano, 1, 1).isoformat(), date(ano + 1, 1, 1).isoformat()
+
+
+def filtro_periodo(coluna: str, inicio: Optional[str] = None, fim: Optional[str] = None) -> Tuple[str, tuple]:
+    """Condição SQL e parâmetros para ``inicio <= coluna < fim``.
+
+    Qualquer um dos limites pode faltar (intervalo aberto desse lado); sem
+    nenhum devolve ``("1", ())``.
+    """
+    condicoes, params = [], []
+    if inicio:
+        condicoes.append(f"{coluna} >= ?")
+        params.append(inicio)
+    if fim:
+        condicoes.append(f"{coluna} < ?")
+        params.append(fim)
+    return " AND ".join(condicoes) or "1", tuple(params)
@@ -0,0 +1,109 @@
+"""Preparação das fotos escolhidas nos formulários antes de serem gravadas.
+
+``ler_foto`` lê o ficheiro escolhido e devolve uma ``FotoPreparada``: a
+imagem é rodada segundo a orientação EXIF, reduzida até
+``FOTO_LADO_MAXIMO`` píxeis no lado maior e recodificada em JPEG com
+``FOTO_QUALIDADE`` (PNG se tiver transparência). A recodificação descarta
+os metadados (EXIF, GPS, perfis), por isso o que chega a ``imagens`` é só a
+imagem, normalmente uma fração do ficheiro original. Se a recodificação não
+for menor e a imagem não precisar de ser reduzida nem rodada, fica o
+ficheiro original.
+
+Só usa ``QImage``/``QImageReader``, que funcionam fora da thread da
+interface: os formulários chamam ``ler_foto`` através de um ``AsyncLoader``.
+"""
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt5.QtGui import QImageIOHandler, QImageReader
+
+# Ensure project root is on sys.path so `src` and other top-level packages are importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.config.settings import FOTO_LADO_MAXIMO, FOTO_QUALIDADE
+
+# ficheiros maiores do que isto nem são lidos
+TAMANHO_MAXIMO_FICHEIRO = 20 * 1024 * 1024
+FILTRO_IMAGENS = "Imagens (*.png *.jpg *.jpeg *.bmp *.gif *.webp)"
+
+
+def formatar_bytes(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.0f} KB"
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+@dataclass(frozen=True)
+class FotoPreparada:
+    dados: bytes
+    tamanho_original: int
+    largura: int
+    altura: int
+
+    @property
+    def poupado(self) -> int:
+        return self.tamanho_original - len(self.dados)
+
+    def resumo(self) -> str:
+        """Ex.: "2.4 MB → 180 KB (-93%)"."""
+        percentagem = 100 * self.poupado / self.tamanho_original if self.tamanho_original else 0
+        return (
+            f"{formatar_bytes(self.tamanho_original)} → {formatar_bytes(len(self.dados))} "
+            f"({-percentagem:+.0f}%)"
+        )
+
+
+def codificar_imagem(imagem, qualidade: int) -> bytes:
+    """JPEG com ``qualidade`` (PNG se houver transparência).
+
+    ``ValueError`` se o Qt não conseguir gravar o formato (ex.: plugin de
+    imagem em falta na versão empacotada).
+    """
+    formato = "PNG" if imagem.hasAlphaChannel() else "JPEG"
+    saida = QBuffer()
+    saida.open(QIODevice.WriteOnly)
+    if not imagem.save(saida, formato, qualidade if formato == "JPEG" else -1):
+        raise ValueError(f"Não foi possível codificar a imagem em {formato}")
+    return bytes(saida.data())
+
+
+def preparar_foto(dados: bytes, lado_maximo: int = FOTO_LADO_MAXIMO, qualidade: int = FOTO_QUALIDADE) -> FotoPreparada:
+    """Reduz e recodifica ``dados``; ``ValueError`` se não forem uma imagem."""
+    buffer = QBuffer()
+    buffer.setData(QByteArray(dados))
+    buffer.open(QIODevice.ReadOnly)
+    leitor = QImageReader(buffer)
+    # aplica a orientação EXIF, que se perde com os metadados
+    leitor.setAutoTransform(True)
+    imagem = leitor.read()
+    if imagem.isNull():
+        raise ValueError(f"Ficheiro de imagem inválido: {leitor.errorString()}")
+    alterada = leitor.transformation() != QImageIOHandler.TransformationNone
+
+    if imagem.width() > lado_maximo or imagem.height() > lado_maximo:
+        imagem = imagem.scaled(lado_maximo, lado_maximo, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        alterada = True
+
+    recodificada = codificar_imagem(imagem, qualidade)
+    if not alterada and len(recodificada) >= len(dados):
+        # recodificar só aumentaria o ficheiro
+        recodificada = bytes(dados)
+    return FotoPreparada(recodificada, len(dados), imagem.width(), imagem.height())
+
+
+def ler_foto(caminho: str) -> FotoPreparada:
+    """Lê o ficheiro ``caminho`` e prepara a foto para ser gravada."""
+    tamanho = Path(caminho).stat().st_size
+    if tamanho > TAMANHO_MAXIMO_FICHEIRO:
+        raise ValueError(
+            f"A imagem selecionada tem {formatar_bytes(tamanho)}; "
+            f"o máximo é {formatar_bytes(TAMANHO_MAXIMO_FICHEIRO)}."
+        )
+    with open(caminho, "rb") as f:
+        return preparar_foto(f.read())
@@ -0,0 +1,207 @@
+"""Miniaturas das fotos e cache de ``QPixmap`` partilhada pelas vistas.
+
+As fotos (``database/imagens.py``) são reduzidas a tamanhos fixos quando são
+gravadas (``guardar_foto``); os cartões de produto e de usuário mostram só a
+miniatura do seu tamanho. ``Miniaturas`` é única no processo
+(``miniaturas()``): guarda os ``QPixmap`` numa cache LRU limitada em bytes,
+com a chave ``(imagem_id, tamanho)``, e descodifica as que faltam num
+``QThreadPool`` — a vista mostra o marcador que já tinha (ícone ou iniciais)
+até a miniatura chegar. Imagens antigas, gravadas sem miniaturas, recebem-nas
+no primeiro pedido.
+"""
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+# Ensure project root is on sys.path so `database` is importable
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from database.db import transaction
+from database.imagens import guardar_imagem, guardar_miniaturas, ler_imagem, ler_miniatura, tem_miniaturas
+from src.utils.cache_lru import CacheLRU
+from src.utils.fotos import codificar_imagem
+from src.utils.logger import logger
+
+# lado maior das miniaturas, em píxeis
+MINIATURA_PEQUENA = 48   # avatar dos usuários
+MINIATURA_MEDIA = 85     # cartões de stock baixo
+MINIATURA_GRANDE = 120   # catálogo e ecrã de venda
+TAMANHOS_MINIATURA = (MINIATURA_PEQUENA, MINIATURA_MEDIA, MINIATURA_GRANDE)
+
+# memória máxima da cache de pixmaps (bytes de píxeis)
+LIMITE_CACHE_BYTES = 32 * 1024 * 1024
+QUALIDADE_JPEG = 85
+
+# propriedade do QLabel com a miniatura que ele espera
+_PROPRIEDADE = "miniatura"
+
+
+def gerar_miniaturas(dados: bytes) -> Dict[int, bytes]:
+    """``{tamanho: bytes}`` para cada tamanho fixo; ``{}`` se a imagem for inválida.
+
+    Usa ``QImage``, que pode ser usado fora da thread da interface.
+    ``ValueError`` se as miniaturas não puderem ser codificadas.
+    """
+    imagem = QImage()
+    if not dados or not imagem.loadFromData(dados):
+        return {}
+    resultado = {}
+    for tamanho in TAMANHOS_MINIATURA:
+        reduzida = imagem
+        if imagem.width() > tamanho or imagem.height() > tamanho:
+            reduzida = imagem.scaled(tamanho, tamanho, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        resultado[tamanho] = codificar_imagem(reduzida, QUALIDADE_JPEG)
+    return resultado
+
+
+def guardar_foto(conn, dados: Optional[bytes]) -> Optional[int]:
+    """Como ``guardar_imagem``, gerando as miniaturas de uma imagem nova."""
+    imagem_id = guardar_imagem(conn, dados)
+    if imagem_id is not None and not tem_miniaturas(conn, imagem_id):
+        guardar_miniaturas(conn, imagem_id, gerar_miniaturas(dados))
+    return imagem_id
+
+
+def carregar_miniatura(imagem_id: int, tamanho: int) -> Optional[QImage]:
+    """Lê e descodifica a miniatura, gerando-a a partir da foto se faltar.
+
+    Devolve ``None`` se a imagem não existir ou não for válida; erros da base
+    de dados (ex.: ``database is locked``) propagam-se.
+    """
+    original = None
+    with transaction() as conn:
+        dados = ler_miniatura(conn, imagem_id, tamanho)
+        if dados is None:
+            original = ler_imagem(conn, imagem_id)
+    if dados is None:
+        # a foto original é descodificada sem nenhum lock da base de dados;
+        # só a gravação das miniaturas usa uma transação de escrita (curta)
+        geradas = gerar_miniaturas(original)
+        if geradas:
+            with transaction(immediate=True) as conn:
+                guardar_miniaturas(conn, imagem_id, geradas)
+        dados = geradas.get(tamanho)
+    if dados is None:
+        return None
+    imagem = QImage()
+    return imagem if imagem.loadFromData(dados) else None
+
+
+class _Sinais(QObject):
+    pronta = pyqtSignal(object, object)
+    erro = pyqtSignal(object)
+
+
+class _Tarefa(QRunnable):
+    def __init__(self, chave, sinais):
+        super().__init__()
+        self.chave = chave
+        self.sinais = sinais
+
+    def run(self):
+        try:
+            imagem = carregar_miniatura(*self.chave)
+        except Exception as e:
+            # erro transitório (base ocupada, ...): pode voltar a ser pedida
+            logger.warning("Miniatura %s não carregada: %s", self.chave, e)
+            self.sinais.erro.emit(self.chave)
+            return
+        self.sinais.pronta.emit(self.chave, imagem)
+
+
+class Miniaturas(QObject):
+    """Cache de miniaturas com descodificação em segundo plano.
+
+    Uso numa vista (o marcador já está no ``QLabel``)::
+
+        miniaturas().aplicar(label, row['imagem_id'], MINIATURA_GRANDE)
+
+    Delegates que desenham a miniatura usam ``pedir`` e redesenham o item
+    quando ``pronta(imagem_id, tamanho)`` for emitido.
+    """
+
+    pronta = pyqtSignal(int, int)
+
+    def __init__(self, parent=None, limite_bytes: int = LIMITE_CACHE_BYTES, pool: QThreadPool = None):
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._cache = CacheLRU(limite_bytes)
+        # chave -> QLabels à espera
+        self._pendentes = {}
+        # referências Python até o worker terminar (o PyQt não as mantém)
+        self._tarefas = {}
+        # imagens inválidas ou inexistentes (não voltam a ser pedidas)
+        self._falhadas = set()
+        self._sinais = _Sinais()
+        self._sinais.pronta.connect(self._on_pronta)
+        self._sinais.erro.connect(self._on_erro)
+
+    def pixmap(self, imagem_id: int, tamanho: int) -> Optional[QPixmap]:
+        """Pixmap em cache (sem descodificar nada), ou ``None``."""
+        return self._cache.obter((imagem_id, tamanho))
+
+    def pedir(self, imagem_id: int, tamanho: int) -> Optional[QPixmap]:
+        """Pixmap em cache, ou ``None`` e a miniatura é pedida em segundo plano."""
+        chave = (imagem_id, tamanho)
+        pix = self._cache.obter(chave)
+        if pix is None and chave not in self._pendentes and chave not in self._falhadas:
+            self._pendentes[chave] = []
+            self._tarefas[chave] = _Tarefa(chave, self._sinais)
+            self._pool.start(self._tarefas[chave])
+        return pix
+
+    def aplicar(self, label, imagem_id: Optional[int], tamanho: int) -> bool:
+        """Mostra a miniatura em ``label``; ``True`` se já estava em cache.
+
+        Sem ``imagem_id`` o ``label`` deixa de esperar qualquer miniatura (um
+        pedido anterior que chegue depois não o altera).
+        """
+        if imagem_id is None:
+            label.setProperty(_PROPRIEDADE, None)
+            return False
+        label.setProperty(_PROPRIEDADE, f"{imagem_id}:{tamanho}")
+        pix = self.pedir(imagem_id, tamanho)
+        if pix is not None:
+            label.setPixmap(pix)
+            return True
+        if (imagem_id, tamanho) in self._pendentes:
+            self._pendentes[(imagem_id, tamanho)].append(label)
+        return False
+
+    def _on_erro(self, chave):
+        # os QLabels ficam com o marcador; o próximo pedido tenta outra vez
+        self._pendentes.pop(chave, None)
+        self._tarefas.pop(chave, None)
+
+    def _on_pronta(self, chave, imagem):
+        labels = self._pendentes.pop(chave, [])
+        self._tarefas.pop(chave, None)
+        if imagem is None:
+            self._falhadas.add(chave)
+            return
+        pix = QPixmap.fromImage(imagem)
+        self._cache.guardar(chave, pix, pix.width() * pix.height() * max(pix.depth(), 8) // 8)
+        esperado = f"{chave[0]}:{chave[1]}"
+        for label in labels:
+            try:
+                if label.property(_PROPRIEDADE) == esperado:
+                    label.setPixmap(pix)
+            except RuntimeError:
+                pass  # o cartão foi destruído entretanto
+        self.pronta.emit(*chave)
+
+
+_instancia: Optional[Miniaturas] = None
+
+
+def miniaturas() -> Miniaturas:
+    """Cache de miniaturas do processo (criada na primeira chamada, na thread da interface)."""
+    global _instancia
+    if _instancia is None:
+        _instancia = Miniaturas()
+    return _instancia
@@ -0,0 +1,43 @@
+"""Utilitários para séries temporais (sem dependências de Qt)."""
+from typing import List, Sequence, Tuple
+
+Ponto = Tuple[float, float]
+
+
+def lttb(pontos: Sequence[Ponto], limiar: int) -> List[Ponto]:
+    """Reduz ``pontos`` a ``limiar`` pontos com Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada balde intermédio, o ponto
+    que forma o maior triângulo com o ponto escolhido antes e com a média do
+    balde seguinte, preservando picos e vales visíveis no gráfico. Se a série
+    já tiver ``limiar`` pontos ou menos é devolvida sem alterações.
+    """
+    n = len(pontos)
+    if limiar >= n or limiar < 3:
+        return list(pontos)
+
+    amostra = [pontos[0]]
+    tamanho = (n - 2) / (limiar - 2)
+    anterior = 0
+    for i in range(limiar - 2):
+        # média do balde seguinte (terceiro vértice do triângulo)
+        inicio = int((i + 1) * tamanho) + 1
+        fim = min(int((i + 2) * tamanho) + 1, n)
+        seguinte = pontos[inicio:fim]
+        media_x = sum(p[0] for p in seguinte) / len(seguinte)
+        media_y = sum(p[1] for p in seguinte) / len(seguinte)
+
+        ax, ay = pontos[anterior]
+        escolhido = int(i * tamanho) + 1
+        maior = -1.0
+        for j in range(escolhido, int((i + 1) * tamanho) + 1):
+            x, y = pontos[j]
+            area = abs((ax - media_x) * (y - ay) - (ax - x) * (media_y - ay))
+            if area > maior:
+                maior = area
+                escolhido = j
+        amostra.append(pontos[escolhido])
+        anterior = escolhido
+
+    amostra.append(pontos[-1])
+    return amostra
@@ -0,0 +1,25 @@
+import pytest
+
+from database import db
+from database.migrations import migrate
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "sem_migracao: o tmp_db fica vazio para o teste preparar um esquema antigo antes de migrar",
+    )
+
+
+@pytest.fixture
+def tmp_db(tmp_path, request):
+    """Base de dados temporária, migrada, usada pela ligação partilhada durante o teste."""
+    caminho = tmp_path / "teste.db"
+    db.set_db_path(caminho)
+    try:
+        if request.node.get_closest_marker("sem_migracao") is None:
+            migrate()
+        yield caminho
+    finally:
+        db.close_connection()
+        db.set_db_path(None)
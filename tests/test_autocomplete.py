@@ -0,0 +1,29 @@
+from database import db
+from database.pesquisa import versao_produtos
+from src.services.autocomplete_service import IndiceNomes, carregar_indice
+
+
+def test_sugestoes_prefixo_antes_de_conteudo():
+    indice = IndiceNomes(["Ben-u-ron Paracetamol", "Paracetamol", "Ácido Fólico", "Aspirina", "Paracetamol"])
+    assert len(indice) == 4
+    assert indice.sugestoes("para") == ["Paracetamol", "Ben-u-ron Paracetamol"]
+    assert indice.sugestoes("ACIDO") == ["Ácido Fólico"]
+    assert indice.sugestoes("ol") == ["Ácido Fólico", "Ben-u-ron Paracetamol", "Paracetamol"]
+    assert indice.sugestoes("a", limite=2) == ["Ácido Fólico", "Aspirina"]
+    assert indice.sugestoes("  ") == []
+
+
+def test_versao_produtos_invalida_indice(tmp_db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO produtos (id, nome_comercial) VALUES (1, 'Aspirina')")
+        conn.execute("INSERT INTO produtos (id, nome_comercial, ativo) VALUES (2, 'Inativo', 0)")
+    indice = carregar_indice()
+    assert indice.sugestoes('i') == ['Aspirina']
+
+    conn = db.get_connection()
+    with db.transaction():
+        conn.execute("UPDATE produtos SET stock = 5 WHERE id = 1")
+    assert versao_produtos(conn) == indice.versao
+    with db.transaction():
+        conn.execute("UPDATE produtos SET nome_comercial = 'Aspirina C' WHERE id = 1")
+    assert versao_produtos(conn) != indice.versao
@@ -0,0 +1,22 @@
+from src.utils.cache_lru import CacheLRU
+
+
+def test_cache_lru_limite_em_bytes():
+    cache = CacheLRU(limite_bytes=100)
+    cache.guardar("a", "A", 40)
+    cache.guardar("b", "B", 40)
+    # "a" passa a ser a usada mais recentemente
+    assert cache.obter("a") == "A"
+    cache.guardar("c", "C", 40)
+    assert "b" not in cache
+    assert cache.obter("a") == "A" and cache.obter("c") == "C"
+    assert cache.bytes == 80
+
+    # substituir atualiza o custo; valores acima do limite não entram
+    cache.guardar("a", "A2", 10)
+    assert cache.bytes == 50
+    cache.guardar("grande", "G", 101)
+    assert "grande" not in cache and len(cache) == 2
+
+    cache.limpar()
+    assert len(cache) == 0 and cache.bytes == 0 and cache.obter("a") is None
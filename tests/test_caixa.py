@@ -0,0 +1,86 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from database import db
+from database.migrations import migrate
+from src.services.caixa_service import calcular_relatorio_z, consultar_dia, fechar_caixa
+
+
+def test_fechar_caixa_grava_relatorio_z(tmp_db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO usuarios (id, nome, senha_hash, perfil) VALUES (7, 'Ana', 'x', 'user')")
+        conn.execute("INSERT INTO produtos (id, nome_comercial) VALUES (1, 'Paracetamol'), (2, 'Ibuprofeno')")
+        conn.executemany(
+            "INSERT INTO vendas (id, usuario_id, terminal, total, data_venda) VALUES (?, ?, ?, ?, ?)",
+            [(1, 7, 'caixa-1', 30.0, '2026-10-16 09:00:00'),
+             (2, 7, 'caixa-1', 10.0, '2026-10-16 18:00:00'),
+             (3, None, 'caixa-2', 5.0, '2026-10-16 12:00:00'),
+             (4, 7, 'caixa-1', 99.0, '2026-10-17 08:00:00')],
+        )
+        conn.executemany(
+            "INSERT INTO itens_venda (venda_id, produto_id, quantidade, preco_unitario, subtotal) VALUES (?, ?, ?, ?, ?)",
+            [(1, 1, 3, 10.0, 30.0), (2, 2, 1, 10.0, 10.0), (3, 1, 1, 5.0, 5.0), (4, 2, 9, 11.0, 99.0)],
+        )
+        conn.execute(
+            "INSERT INTO transacoes_financeiras (tipo, descricao, categoria, valor, data_transacao) "
+            "VALUES ('saida', 'Passagem: táxi', 'Passagem', 4, '2026-10-16')"
+        )
+        conn.execute(
+            "INSERT INTO devolucoes (historico_compra_id, produto_id, quantidade, data_devolucao) "
+            "VALUES (1, 1, 2, '2026-10-16 10:00:00')"
+        )
+
+    ao_vivo = calcular_relatorio_z('2026-10-16')
+    assert (ao_vivo.total_vendas, ao_vivo.num_vendas, ao_vivo.num_itens, ao_vivo.saldo) == (45.0, 3, 5, 41.0)
+    assert (ao_vivo.num_devolucoes, ao_vivo.qtd_devolvida) == (1, 2)
+    assert ao_vivo.produtos == (('Paracetamol', 4, 35.0), ('Ibuprofeno', 1, 10.0))
+    assert ao_vivo.operadores == ((7, 'Ana', 'caixa-1', 2, 4, 40.0), (None, None, 'caixa-2', 1, 1, 5.0))
+    assert ao_vivo.fechado_em is None
+
+    with pytest.raises(ValueError):
+        fechar_caixa('2026-10-18', hoje=date(2026, 10, 17))
+    z = fechar_caixa('2026-10-16', usuario_id=7, hoje=date(2026, 10, 17))
+    assert z.fechado_em is not None
+    assert z.operadores == ao_vivo.operadores and z.produtos == ao_vivo.produtos and z.saidas == ao_vivo.saidas
+    with pytest.raises(ValueError):
+        fechar_caixa('2026-10-16', hoje=date(2026, 10, 17))
+
+    # o relatório gravado não muda e é o que se lê depois
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            conn.execute("UPDATE fechos_caixa SET total_vendas = 0")
+    assert consultar_dia('2026-10-16') == z
+    # nem as vendas e saídas do dia fechado
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO vendas (total, data_venda) VALUES (1, '2026-10-16 23:00:00')")
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            conn.execute("UPDATE transacoes_financeiras SET valor = 0")
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO vendas (total, data_venda) VALUES (1, '2026-10-17 09:00:00')")
+
+
+@pytest.mark.sem_migracao
+def test_devolucoes_antigas_vindas_do_log(tmp_db):
+    conn = db.get_connection()
+    conn.execute(
+        "CREATE TABLE logs_sistema (id INTEGER PRIMARY KEY AUTOINCREMENT, usuario_id INTEGER, acao TEXT, "
+        "tabela_afetada TEXT, registro_id INTEGER, data_log TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.executemany(
+        "INSERT INTO logs_sistema (acao, tabela_afetada, registro_id, data_log) VALUES (?, ?, ?, ?)",
+        [('devolucao: produto 12 quantidade 3', 'historico_compra', 5, '2026-10-16 10:00:00'),
+         ('login', None, None, '2026-10-16 11:00:00')],
+    )
+    conn.commit()
+    migrate()
+
+    linhas = db.get_connection().execute(
+        "SELECT historico_compra_id, produto_id, quantidade, data_devolucao FROM devolucoes"
+    ).fetchall()
+    assert [tuple(r) for r in linhas] == [(5, 12, 3, '2026-10-16 10:00:00')]
+    z = calcular_relatorio_z('2026-10-16')
+    assert (z.num_devolucoes, z.qtd_devolvida) == (1, 3)
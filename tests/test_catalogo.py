@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5.QtCore import QModelIndex, Qt
+
+from src.models.admindashboard.catalogo_view import (
+    FILTRO_ROLE, IMAGEM_ROLE, LOTE_CATALOGO, PRECO_ROLE, CatalogoFiltro, CatalogoModel,
+)
+from src.services.autocomplete_service import normalizar
+from src.utils.miniaturas import MINIATURA_GRANDE, MINIATURA_PEQUENA, miniaturas
+
+
+def _produtos(nomes, imagens=None):
+    imagens = imagens or {}
+    return [(i, nome, 10.0 * i, imagens.get(i), normalizar(nome)) for i, nome in enumerate(nomes)]
+
+
+def test_modelo_expoe_os_produtos_em_lotes():
+    modelo = CatalogoModel()
+    modelo.definir_produtos(_produtos([f"Produto {i:04d}" for i in range(2 * LOTE_CATALOGO + 50)]))
+
+    assert modelo.rowCount() == LOTE_CATALOGO
+    assert modelo.canFetchMore(QModelIndex())
+    modelo.fetchMore(QModelIndex())
+    assert modelo.rowCount() == 2 * LOTE_CATALOGO
+    modelo.fetchMore(QModelIndex())
+    assert modelo.rowCount() == 2 * LOTE_CATALOGO + 50
+    assert not modelo.canFetchMore(QModelIndex())
+
+    indice = modelo.index(3)
+    assert (indice.data(Qt.DisplayRole), indice.data(PRECO_ROLE), indice.data(Qt.UserRole)) == ("Produto 0003", 30.0, 3)
+    assert indice.data(FILTRO_ROLE) == "produto 0003" and indice.data(IMAGEM_ROLE) is None
+
+    # uma lista nova volta ao primeiro lote
+    modelo.definir_produtos(_produtos(["A", "B"]))
+    assert modelo.rowCount() == 2 and not modelo.canFetchMore(QModelIndex())
+
+
+def test_filtro_ignora_acentos_e_maiusculas_em_todo_o_catalogo():
+    nomes = [f"Produto {i:04d}" for i in range(LOTE_CATALOGO)] + ["Ácido Fólico", "ACIDO acetilsalicílico", "Paracetamol"]
+    modelo = CatalogoModel()
+    modelo.definir_produtos(_produtos(nomes))
+    filtro = CatalogoFiltro(modelo)
+
+    filtro.pesquisar("acido")
+    assert sorted(filtro.index(i, 0).data() for i in range(filtro.rowCount())) == ["ACIDO acetilsalicílico", "Ácido Fólico"]
+    filtro.pesquisar("  ÁCIDO fól ")
+    assert filtro.rowCount() == 1 and filtro.index(0, 0).data(Qt.UserRole) == LOTE_CATALOGO
+    filtro.pesquisar("")
+    assert filtro.rowCount() == len(nomes)
+
+
+def test_miniatura_pronta_so_redesenha_linhas_expostas():
+    modelo = CatalogoModel()
+    modelo.definir_produtos(_produtos(
+        [f"Produto {i:04d}" for i in range(LOTE_CATALOGO + 10)], imagens={0: 7, 5: 8, LOTE_CATALOGO + 1: 7}
+    ))
+    alteradas = []
+    modelo.dataChanged.connect(lambda inicio, fim, papeis: alteradas.append((inicio.row(), fim.row(), list(papeis))))
+
+    miniaturas().pronta.emit(7, MINIATURA_GRANDE)
+    assert alteradas == [(0, 0, [IMAGEM_ROLE])]
+
+    alteradas.clear()
+    miniaturas().pronta.emit(7, MINIATURA_PEQUENA)
+    assert alteradas == []
+
+    modelo.fetchMore(QModelIndex())
+    miniaturas().pronta.emit(7, MINIATURA_GRANDE)
+    assert [linha for linha, _, _ in alteradas] == [0, LOTE_CATALOGO + 1]
@@ -0,0 +1,42 @@
+import dataclasses
+from datetime import date
+
+import pytest
+
+from database import db
+from src.services.dashboard_service import carregar_dashboard
+
+
+def test_carregar_dashboard(tmp_db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO produtos (id, nome_comercial, stock, stock_minimo) VALUES (1, 'Paracetamol', 3, 2)")
+        conn.execute("INSERT INTO produtos (id, nome_comercial, stock, stock_minimo) VALUES (2, 'Ibuprofeno', 90, 2)")
+        # produto desativado: não entra nos alertas de stock
+        conn.execute("INSERT INTO produtos (id, nome_comercial, stock, stock_minimo, ativo) VALUES (3, 'Aspirina', 0, 2, 0)")
+        conn.execute("INSERT INTO lotes (produto_id, numero_lote, validade, quantidade_atual) VALUES (1, 'L1', '2026-10-20', 3)")
+        conn.execute("INSERT INTO lotes (produto_id, numero_lote, validade, quantidade_atual) VALUES (2, 'L2', '2027-06-01', 90)")
+        # lote já esgotado: não entra nos alertas de validade
+        conn.execute("INSERT INTO lotes (produto_id, numero_lote, validade, quantidade_atual) VALUES (2, 'L0', '2026-10-01', 0)")
+        conn.executemany(
+            "INSERT INTO vendas (total, data_venda) VALUES (?, ?)",
+            [(100.0, '2026-10-10 09:00:00'), (50.0, '2026-10-15 23:59:59'),
+             (25.0, '2026-10-15 08:00:00'), (10.0, '2026-10-16 00:00:00')],
+        )
+        conn.executemany(
+            "INSERT INTO itens_venda (venda_id, produto_id, quantidade, preco_unitario, subtotal) VALUES (?, ?, ?, ?, ?)",
+            [(1, 1, 4, 25.0, 100.0), (2, 2, 5, 10.0, 50.0), (3, 1, 1, 25.0, 25.0), (4, 2, 1, 10.0, 10.0)],
+        )
+        conn.execute("UPDATE itens_venda SET quantidade = 2 WHERE venda_id = 4")
+
+    snapshot = carregar_dashboard(dias=3, hoje=date(2026, 10, 16))
+
+    assert snapshot.dates == (date(2026, 10, 14), date(2026, 10, 15), date(2026, 10, 16))
+    assert snapshot.sales == (0.0, 75.0, 10.0)
+    assert snapshot.total_vendas == 185.0
+    assert snapshot.vendas_hoje == 10.0
+    assert snapshot.produtos_stock == 93
+    assert snapshot.low_stock == (('Paracetamol', 3, 2),)
+    assert snapshot.expiring == (('Paracetamol', 'L1', '2026-10-20'),)
+    assert snapshot.top_products == (('Ibuprofeno', 7), ('Paracetamol', 5))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.total_vendas = 0
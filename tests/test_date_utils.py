@@ -0,0 +1,27 @@
+from datetime import date
+
+from database import db
+from src.utils.date_utils import filtro_periodo, intervalo_ano, intervalo_dia, intervalo_dias, intervalo_mes
+
+
+def test_intervalos_semiabertos():
+    assert intervalo_dia('2026-02-28') == ('2026-02-28', '2026-03-01')
+    assert intervalo_dias(date(2026, 10, 1), '2026-10-16 12:00:00') == ('2026-10-01', '2026-10-17')
+    assert intervalo_mes('2026-12') == ('2026-12-01', '2027-01-01')
+    assert intervalo_mes(date(2026, 2, 14)) == ('2026-02-01', '2026-03-01')
+    assert intervalo_ano(2026) == ('2026-01-01', '2027-01-01')
+    assert filtro_periodo('v.data_venda', '2026-10-01') == ('v.data_venda >= ?', ('2026-10-01',))
+    assert filtro_periodo('x') == ('1', ())
+
+
+def test_filtro_periodo_usa_indice(tmp_db):
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO vendas (total, data_venda) VALUES (?, ?)",
+        [(1.0, '2026-09-30 23:59:59'), (2.0, '2026-10-01 00:00:00'), (4.0, '2026-10-31 23:00:00')],
+    )
+    condicao, params = filtro_periodo('data_venda', *intervalo_mes('2026-10'))
+    sql = f"SELECT SUM(total) FROM vendas WHERE {condicao}"
+    assert conn.execute(sql, params).fetchone()[0] == 6.0
+    plano = " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+    assert 'idx_vendas_data' in plano and '>' in plano
@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from database import db
+
+# consulta que só termina quando é interrompida
+_INFINITA = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+
+
+def test_caminho_configurado_em_settings(tmp_path, monkeypatch):
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "DB_FILE", tmp_path / "configurada.db")
+    db.set_db_path(None)
+    try:
+        assert db.resolve_db_path() == tmp_path / "configurada.db"
+        db.set_db_path(tmp_path / "outra.db")
+        assert db.resolve_db_path() == tmp_path / "outra.db"
+    finally:
+        db.set_db_path(None)
+
+
+def test_query_guard_cancelamento(tmp_db):
+    token = db.CancelToken()
+    threading.Timer(0.05, token.cancel).start()
+    with pytest.raises(db.QueryCancelled):
+        with db.query_guard(token, budget=None) as conn:
+            conn.execute(_INFINITA).fetchone()
+    # a ligação continua utilizável e sem handler
+    assert db.get_connection().execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_query_guard_tempo_maximo(tmp_db):
+    with pytest.raises(db.QueryTimeout):
+        with db.query_guard(budget=0.05) as conn:
+            conn.execute(_INFINITA).fetchone()
+
+
+def test_agregados_triggers_e_reconstrucao(tmp_db):
+    from database.agregados import reconstruir_agregados, total_vendas_mes, totais_financas, vendas_por_dia
+
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO vendas (id, total, data_venda) VALUES (1, 100, '2026-10-15 09:00:00')")
+        conn.execute("INSERT INTO vendas (id, total, data_venda) VALUES (2, 50, '2026-10-16 10:00:00')")
+        conn.execute("UPDATE vendas SET data_venda = '2026-11-01 08:00:00' WHERE id = 2")
+        conn.execute("INSERT INTO vendas (id, total, data_venda) VALUES (3, 30, '2026-10-15 18:00:00')")
+        conn.execute("DELETE FROM vendas WHERE id = 3")
+        conn.execute("INSERT INTO transacoes_financeiras (tipo, valor, data_transacao) VALUES ('saida', 20, '2026-10-15')")
+    conn = db.get_connection()
+    esperado = (
+        vendas_por_dia(conn, '2026-10-01', '2026-12-01'),
+        total_vendas_mes(conn, '2026-10'),
+        totais_financas(conn, mes='2026-10'),
+    )
+    assert esperado == ({'2026-10-15': 100.0, '2026-11-01': 50.0}, 100.0, {'saida': 20.0})
+
+    reconstruir_agregados()
+    assert (
+        vendas_por_dia(conn, '2026-10-01', '2026-12-01'),
+        total_vendas_mes(conn, '2026-10'),
+        totais_financas(conn, mes='2026-10'),
+    ) == esperado
+
+
+def test_pesquisa_produtos_fts(tmp_db):
+    from database.pesquisa import expressao_fts, pesquisar_produtos
+
+    with db.transaction() as conn:
+        conn.execute(
+            "INSERT INTO produtos (nome_comercial, principio_ativo, categoria, codigo_barras) "
+            "VALUES ('Aspirina', 'Ácido acetilsalicílico', 'Analgésicos', '5601234567890')"
+        )
+        conn.execute(
+            "INSERT INTO produtos (nome_comercial, principio_ativo, categoria) "
+            "VALUES ('Ben-u-ron', 'Paracetamol', 'Analgésicos')"
+        )
+        conn.execute("INSERT INTO produtos (nome_comercial, principio_ativo, ativo) VALUES ('Paracetamol 1g', 'x', 0)")
+        conn.execute("INSERT INTO produtos (nome_comercial, principio_ativo) VALUES ('Panadol', 'Paracetamol')")
+        conn.execute("UPDATE produtos SET nome_comercial = 'Paracetamol Generis' WHERE nome_comercial = 'Panadol'")
+
+    conn = db.get_connection()
+
+    def nomes(termo):
+        return [r['nome_comercial'] for r in pesquisar_produtos(conn, termo)]
+
+    assert nomes('acido') == ['Aspirina']
+    assert nomes('5601') == ['Aspirina']
+    # o nome pesa mais do que o princípio ativo; inativos ficam de fora
+    assert nomes('parac') == ['Paracetamol Generis', 'Ben-u-ron']
+    assert nomes('panadol') == []
+    assert expressao_fts('"a" OR b*') == '"a"* "OR"* "b"*'
+
+
+@pytest.mark.sem_migracao
+def test_imagens_migracao_e_dedupe(tmp_db):
+    from database.imagens import guardar_imagem, guardar_miniaturas, ler_imagem, ler_miniatura, remover_imagens_orfas
+    from database.migrations import SCHEMA_FILE, migrate
+
+    # base antiga: fotos guardadas na própria linha do produto
+    schema = SCHEMA_FILE.read_text(encoding="utf-8").replace(
+        "imagem_id INTEGER REFERENCES imagens(id)", "foto BLOB"
+    )
+    with db.transaction() as conn:
+        conn.executescript(schema)
+        conn.execute("INSERT INTO produtos (id, nome_comercial, foto) VALUES (1, 'A', x'01020304')")
+        conn.execute("INSERT INTO produtos (id, nome_comercial, foto) VALUES (2, 'B', x'01020304')")
+        conn.execute("INSERT INTO produtos (id, nome_comercial) VALUES (3, 'C')")
+    migrate()
+
+    conn = db.get_connection()
+    linhas = conn.execute("SELECT id, foto, imagem_id FROM produtos ORDER BY id").fetchall()
+    assert [r['foto'] for r in linhas] == [None, None, None]
+    assert linhas[0]['imagem_id'] == linhas[1]['imagem_id'] is not None
+    assert linhas[2]['imagem_id'] is None
+    assert ler_imagem(conn, linhas[0]['imagem_id']) == b'\x01\x02\x03\x04'
+
+    with db.transaction() as conn:
+        assert guardar_imagem(conn, b'\x01\x02\x03\x04') == linhas[0]['imagem_id']
+        assert guardar_imagem(conn, b'') is None
+        orfa = guardar_imagem(conn, b'outra')
+        guardar_miniaturas(conn, orfa, {48: b'm48', 120: b'm120'})
+        assert ler_miniatura(conn, orfa, 120) == b'm120'
+        assert remover_imagens_orfas(conn) == 1
+    assert conn.execute("SELECT COUNT(*) FROM imagens").fetchone()[0] == 1
+    # as miniaturas saem com a imagem
+    assert conn.execute("SELECT COUNT(*) FROM miniaturas").fetchone()[0] == 0
+
+    # substituir ou apagar: a imagem sai quando deixa de ser usada
+    with db.transaction() as conn:
+        nova = guardar_imagem(conn, b'nova')
+        conn.execute("UPDATE produtos SET imagem_id = ? WHERE id = 1", (nova,))
+    assert ler_imagem(conn, linhas[0]['imagem_id']) is not None  # ainda usada pelo produto 2
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM produtos WHERE id = 2")
+        conn.execute("DELETE FROM produtos WHERE id = 1")
+    assert conn.execute("SELECT COUNT(*) FROM imagens").fetchone()[0] == 0
@@ -1,2 +1,31 @@
-def test_placeholder():
-    assert True
+from database import db
+from database.alertas import alteracoes_alertas, contagem_alertas, reconstruir_alertas_stock
+
+
+def test_alertas_stock_incrementais(tmp_db):
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO produtos (id, nome_comercial, stock, stock_minimo) VALUES (?, ?, ?, ?)",
+            [(1, 'A', 1, 10), (2, 'B', 100, 10), (3, 'C', 4, 0), (4, 'D', 8, 10)],
+        )
+    conn = db.get_connection()
+    versao, linhas = alteracoes_alertas(conn)
+    assert {r['id']: r['nivel'] for r in linhas} == {1: 'critical', 3: 'warning', 4: 'low'}
+    assert contagem_alertas(conn) == {'critical': 1, 'warning': 1, 'low': 1}
+
+    with db.transaction() as conn:
+        conn.execute("UPDATE produtos SET stock = 50 WHERE id = 1")   # sai de alerta
+        conn.execute("UPDATE produtos SET stock = 90 WHERE id = 2")   # continua sem alerta
+        conn.execute("UPDATE produtos SET stock = 5 WHERE id = 4")    # low -> warning
+        conn.execute("UPDATE produtos SET ativo = 0 WHERE id = 3")    # desativado
+    nova, linhas = alteracoes_alertas(conn, versao)
+    assert {r['id']: r['nivel'] for r in linhas} == {1: None, 3: None, 4: 'warning'}
+    assert alteracoes_alertas(conn, nova) == (nova, [])
+
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM produtos WHERE id = 4")
+    assert [(r['id'], r['nivel']) for r in alteracoes_alertas(conn, nova)[1]] == [(4, None)]
+
+    antes = contagem_alertas(conn)
+    reconstruir_alertas_stock()
+    assert contagem_alertas(conn) == antes == {'critical': 0, 'warning': 0, 'low': 0}
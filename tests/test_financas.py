@@ -0,0 +1,108 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from database import db
+from database.migrations import migrate
+from database.agregados import dividir_periodo
+from src.services.financas_service import (
+    TIPO_VENDA, fechar_mes, resumo_balanco, total_tipo, totais_mes, totais_meses, totais_periodo, totais_saida,
+)
+from src.utils.date_utils import intervalo_mes
+
+
+@pytest.mark.sem_migracao
+def test_totais_periodo_por_tipo_e_categoria(tmp_db):
+    conn = db.get_connection()
+    # base antiga: a categoria só existe como prefixo da descrição
+    conn.execute(
+        "CREATE TABLE transacoes_financeiras (id INTEGER PRIMARY KEY AUTOINCREMENT, tipo TEXT NOT NULL, "
+        "descricao TEXT, valor REAL NOT NULL, data_transacao TEXT, criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.executemany(
+        "INSERT INTO transacoes_financeiras (tipo, descricao, valor, data_transacao) VALUES (?, ?, ?, ?)",
+        [('saida', 'Passagem: táxi', 10.0, '2026-10-02'),
+         ('saida', 'Compra Stock: lote 7', 200.0, '2026-10-05'),
+         ('saida', 'gasolina', 15.0, '2026-10-31'),
+         ('saida', 'Passagem: autocarro', 99.0, '2026-11-01'),
+         ('kumbu', 'Kumbu', 50.0, '2026-10-03')],
+    )
+    conn.commit()
+    migrate()
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO vendas (total, data_venda) VALUES (300, '2026-10-20 10:00:00')")
+
+    totais = totais_periodo(*intervalo_mes('2026-10'))
+
+    assert total_tipo(totais, TIPO_VENDA) == 300.0
+    assert totais['kumbu'] == {None: 50.0}
+    saidas = totais_saida(totais)
+    assert (saidas['Passagem'], saidas['Compra Stock'], saidas['Outro']) == (10.0, 200.0, 15.0)
+    assert total_tipo(totais, 'saida') == 225.0
+
+
+def test_fecho_mensal_congela_o_mes(tmp_db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO vendas (total, data_venda) VALUES (100, '2026-09-10 10:00:00')")
+        conn.execute("INSERT INTO vendas (total, data_venda) VALUES (40, '2026-10-02 10:00:00')")
+        conn.execute(
+            "INSERT INTO transacoes_financeiras (tipo, descricao, categoria, valor, data_transacao) "
+            "VALUES ('saida', 'Salário: Ana', 'Salário', 30, '2026-09-30')"
+        )
+
+    with pytest.raises(ValueError):
+        fechar_mes('2026-10', hoje=date(2026, 10, 17))
+    fechar_mes('2026-09', hoje=date(2026, 10, 17))
+    with pytest.raises(ValueError):
+        fechar_mes('2026-09', hoje=date(2026, 10, 17))
+
+    # o mês fechado já não muda, nem o fecho
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            conn.execute("DELETE FROM vendas WHERE data_venda < '2026-10-01'")
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            conn.execute("UPDATE fechos_mensais SET lucro = 0")
+
+    totais, fechado = totais_mes('2026-09')
+    assert fechado and resumo_balanco(totais)['lucro'] == 70.0
+    assert totais_saida(totais)['Salário'] == 30.0
+    meses = totais_meses('2026-08', '2026-10')
+    assert list(meses) == ['2026-08', '2026-09', '2026-10']
+    assert (meses['2026-08'], meses['2026-09'], total_tipo(meses['2026-10'], TIPO_VENDA)) == ({}, totais, 40.0)
+    # mês aberto: lido de vendas_mensais/financas_mensais
+    assert totais_mes('2026-10') == (meses['2026-10'], False)
+    assert meses['2026-10'] == totais_periodo(*intervalo_mes('2026-10'))
+
+
+def test_dividir_periodo_em_dias_e_meses():
+    assert dividir_periodo('2026-09-15', '2026-12-03') == (
+        [('2026-09-15', '2026-10-01'), ('2026-12-01', '2026-12-03')], ('2026-10', '2026-12')
+    )
+    assert dividir_periodo(*intervalo_mes('2026-10')) == ([], ('2026-10', '2026-11'))
+    assert dividir_periodo('2026-10-05', '2026-10-20') == ([('2026-10-05', '2026-10-20')], None)
+    assert dividir_periodo(None, '2026-10-20') == ([('2026-10-01', '2026-10-20')], (None, '2026-10'))
+    assert dividir_periodo(None, None) == ([], (None, None))
+
+
+def test_totais_periodo_le_os_agregados(tmp_db):
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO vendas (total, data_venda) VALUES (?, ?)",
+            [(1, '2026-09-14 10:00:00'), (2, '2026-09-15 10:00:00'), (4, '2026-10-31 23:00:00'),
+             (8, '2026-11-02 09:00:00'), (16, '2026-11-03 09:00:00')],
+        )
+        conn.executemany(
+            "INSERT INTO transacoes_financeiras (tipo, categoria, valor, data_transacao) VALUES (?, ?, ?, ?)",
+            [('saida', 'Passagem', 10, '2026-09-20'), ('saida', 'Passagem', 5, '2026-10-02'),
+             ('saida', 'Salário', 30, '2026-11-02'), ('kumbu', None, 7, '2026-10-10')],
+        )
+        conn.execute("UPDATE transacoes_financeiras SET categoria = 'Outro' WHERE valor = 30")
+
+    totais = totais_periodo('2026-09-15', '2026-11-03')
+
+    assert total_tipo(totais, TIPO_VENDA) == 14.0
+    assert totais['saida'] == {'Passagem': 15.0, 'Outro': 30.0}
+    assert totais['kumbu'] == {None: 7.0}
+    assert total_tipo(totais_periodo(), TIPO_VENDA) == 31.0
@@ -0,0 +1,72 @@
+import struct
+
+import pytest
+
+QtGui = pytest.importorskip("PyQt5.QtGui")
+from PyQt5.QtCore import QBuffer, QIODevice, Qt
+
+from src.utils import fotos
+from src.utils.fotos import ler_foto, preparar_foto
+
+
+def _codificar(imagem, formato, qualidade=-1):
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    assert imagem.save(buffer, formato, qualidade)
+    return bytes(buffer.data())
+
+
+def _imagem(largura, altura, formato=QtGui.QImage.Format_RGB32, cor=Qt.red):
+    imagem = QtGui.QImage(largura, altura, formato)
+    imagem.fill(cor)
+    return imagem
+
+
+def _com_orientacao(jpeg: bytes, orientacao: int) -> bytes:
+    """Acrescenta ao JPEG um segmento EXIF só com a orientação."""
+    tiff = b"MM\x00*" + struct.pack(">I", 8) + struct.pack(">H", 1)
+    tiff += struct.pack(">HHIHH", 0x0112, 3, 1, orientacao, 0) + struct.pack(">I", 0)
+    exif = b"Exif\x00\x00" + tiff
+    return jpeg[:2] + b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif + jpeg[2:]
+
+
+def test_reduz_e_aplica_a_orientacao_exif():
+    original = _com_orientacao(_codificar(_imagem(400, 200), "JPEG", 95), 6)
+
+    foto = preparar_foto(original, lado_maximo=100)
+
+    # rodada 90° e reduzida até 100 px no lado maior
+    assert (foto.largura, foto.altura) == (50, 100)
+    assert foto.dados[:2] == b"\xff\xd8" and b"Exif" not in foto.dados
+    assert foto.tamanho_original == len(original)
+
+
+def test_transparencia_fica_em_png():
+    original = _codificar(_imagem(300, 300, QtGui.QImage.Format_ARGB32, Qt.transparent), "PNG")
+
+    foto = preparar_foto(original, lado_maximo=64)
+
+    assert foto.dados.startswith(b"\x89PNG")
+    assert (foto.largura, foto.altura) == (64, 64)
+
+
+def test_mantem_o_original_se_recodificar_aumentar():
+    original = _codificar(_imagem(2, 2), "PNG")
+
+    foto = preparar_foto(original)
+
+    assert foto.dados == original and foto.poupado == 0
+
+
+def test_imagem_invalida():
+    with pytest.raises(ValueError):
+        preparar_foto(b"isto nao e uma imagem")
+
+
+def test_limite_de_tamanho_do_ficheiro(tmp_path, monkeypatch):
+    caminho = tmp_path / "foto.png"
+    caminho.write_bytes(_codificar(_imagem(40, 40), "PNG"))
+    monkeypatch.setattr(fotos, "TAMANHO_MAXIMO_FICHEIRO", 10)
+
+    with pytest.raises(ValueError, match="máximo"):
+        ler_foto(str(caminho))
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PyQt5.QtWidgets")
+
+# as páginas do painel importam `colors` a partir da própria pasta
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "models" / "admindashboard"))
+
+from database import db
+from src.models.admindashboard import historico_de_venda
+from src.models.admindashboard.historico_de_venda import (
+    HistoricoVendaModel, _condicao_cursor, obter_pagina_historico,
+)
+
+
+def _vendas(n):
+    # datas repetidas para obrigar o desempate pelo id
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO vendas (id, total, data_venda) VALUES (?, ?, ?)",
+            [(i, float(i), f"2026-10-{1 + i // 7:02d} 09:00:00") for i in range(1, n + 1)],
+        )
+
+
+def test_paginas_seguem_o_cursor_sem_repetir_nem_saltar(tmp_db):
+    _vendas(50)
+
+    vistos, cursor = [], None
+    while True:
+        vendas, cursor = obter_pagina_historico(cursor, tamanho=8)
+        vistos += [v["venda_id"] for v in vendas]
+        if cursor is None:
+            break
+
+    assert vistos == list(range(50, 0, -1))
+
+
+def test_pagina_funda_procura_no_indice(tmp_db):
+    condicao, params = _condicao_cursor(("2026-10-03 09:00:00", 15))
+    plano = " ".join(
+        r[-1] for r in db.get_connection().execute(
+            "EXPLAIN QUERY PLAN SELECT v.id FROM vendas v WHERE " + condicao
+            + " ORDER BY v.data_venda DESC, v.id DESC LIMIT 10",
+            params,
+        )
+    )
+    assert "SEARCH v USING COVERING INDEX idx_vendas_data (data_venda<?)" in plano
+
+
+
+def test_modelo_guarda_so_a_janela_e_rele_paginas_antigas(tmp_db, monkeypatch):
+    monkeypatch.setattr(historico_de_venda, "PAGINA_HISTORICO", 4)
+    monkeypatch.setattr(historico_de_venda, "JANELA_HISTORICO", 2)
+    _vendas(30)
+
+    modelo = HistoricoVendaModel()
+    modelo.definir({}, *obter_pagina_historico(tamanho=4))
+    while modelo.canFetchMore():
+        modelo.fetchMore()
+
+    assert modelo.rowCount() == 30
+    assert len(modelo._paginas) == 2
+    # a primeira página já saiu da janela e volta a ser lida pelo cursor
+    assert [modelo.venda(r)["venda_id"] for r in range(30)] == list(range(30, 0, -1))
+    assert len(modelo._paginas) == 2
@@ -0,0 +1,37 @@
+from database import db
+from src.services.leitor_service import DetetorLeitor, carregar_mapa_codigos
+
+
+def _escrever(detetor, texto, inicio, intervalo):
+    for i, _ in enumerate(texto):
+        detetor.tecla(inicio + i * intervalo)
+    return inicio + len(texto) * intervalo
+
+
+def test_detetor_distingue_leitor_de_teclado():
+    detetor = DetetorLeitor(intervalo_max=0.03, minimo=4)
+    fim = _escrever(detetor, '5601234567890', 10.0, 0.004)
+    assert detetor.e_leitura('5601234567890', fim)
+
+    detetor.reiniciar()
+    fim = _escrever(detetor, '5601234567890', 20.0, 0.15)
+    assert not detetor.e_leitura('5601234567890', fim)
+
+    # texto escrito à mão e depois uma rajada curta no fim: não é uma leitura
+    detetor.reiniciar()
+    detetor.tecla(30.0)
+    fim = _escrever(detetor, '1234', 30.5, 0.004)
+    assert not detetor.e_leitura('x1234', fim)
+    assert not detetor.e_leitura('1234', fim + 1.0)
+
+
+def test_mapa_codigos(tmp_db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO produtos (id, nome_comercial, codigo_barras, preco_venda) VALUES (1, 'Aspirina', '5601234567890', 350)")
+        conn.execute("INSERT INTO produtos (id, nome_comercial, codigo_barras, ativo) VALUES (2, 'Inativo', '111', 0)")
+        conn.execute("INSERT INTO produtos (id, nome_comercial) VALUES (3, 'Sem código')")
+    mapa = carregar_mapa_codigos()
+    assert len(mapa) == 1
+    produto = mapa.procurar(' 5601234567890 ')
+    assert (produto.id, produto.nome, produto.preco) == (1, 'Aspirina', 350.0)
+    assert mapa.procurar('111') is None
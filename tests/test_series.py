@@ -0,0 +1,16 @@
+from src.utils.series import lttb
+
+
+def test_lttb_mantem_extremos_e_picos():
+    pontos = [(i, 10.0) for i in range(365)]
+    pontos[200] = (200, 500.0)
+    amostra = lttb(pontos, 50)
+    assert len(amostra) == 50
+    assert amostra[0] == pontos[0] and amostra[-1] == pontos[-1]
+    assert (200, 500.0) in amostra
+    assert [p[0] for p in amostra] == sorted(p[0] for p in amostra)
+
+
+def test_lttb_serie_curta_inalterada():
+    pontos = [(0, 1.0), (1, 2.0), (2, 3.0)]
+    assert lttb(pontos, 10) == pontos
@@ -1,2 +1,48 @@
-def test_placeholder():
-    assert True
+from database import db
+from src.services.venda_service import alocar_lotes, processar_venda
+
+
+def test_alocar_lotes_por_validade():
+    lotes = [
+        {'id': 1, 'produto_id': 10, 'quantidade_atual': 3},
+        {'id': 2, 'produto_id': 10, 'quantidade_atual': 5},
+    ]
+    itens = [{'produto_id': 10, 'quantidade': 6, 'preco_unitario': 2.0}]
+    linhas, consumo = alocar_lotes(itens, lotes)
+    assert linhas == [(10, 1, 3, 2.0, 6.0), (10, 2, 3, 2.0, 6.0)]
+    assert consumo == {1: 3, 2: 3}
+
+
+def test_alocar_lotes_sem_stock_suficiente():
+    lotes = [{'id': 1, 'produto_id': 10, 'quantidade_atual': 2}]
+    itens = [
+        {'produto_id': 10, 'quantidade': 1, 'preco_unitario': 1.0},
+        {'produto_id': 10, 'quantidade': 3, 'preco_unitario': 1.0},
+    ]
+    linhas, consumo = alocar_lotes(itens, lotes)
+    assert linhas == [(10, 1, 1, 1.0, 1.0), (10, 1, 1, 1.0, 1.0), (10, None, 2, 1.0, 2.0)]
+    assert consumo == {1: 2}
+
+
+def test_processar_venda(tmp_db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO produtos (id, nome_comercial, stock) VALUES (1, 'Paracetamol', 8)")
+        conn.executemany(
+            "INSERT INTO lotes (id, produto_id, validade, quantidade_atual) VALUES (?, 1, ?, ?)",
+            [(1, '2030-01-01', 5), (2, '2029-01-01', 3)]
+        )
+
+    venda = processar_venda(
+        [{'produto_id': 1, 'quantidade': 4, 'preco_unitario': 100.0}],
+        comprador_nome='Ana'
+    )
+
+    conn = db.get_connection()
+    assert venda['total'] == 400.0
+    assert venda['itens'][0]['produto_nome'] == 'Paracetamol'
+    lotes = dict(conn.execute("SELECT id, quantidade_atual FROM lotes").fetchall())
+    assert lotes == {1: 4, 2: 0}
+    assert conn.execute("SELECT stock FROM produtos WHERE id = 1").fetchone()[0] == 4
+    assert conn.execute("SELECT COUNT(*) FROM itens_venda WHERE venda_id = ?", (venda['venda_id'],)).fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM historico_compra_itens").fetchone()[0] == 1
+    assert conn.execute("SELECT venda_id FROM historico_compra").fetchone()[0] == venda['venda_id']